@@ -0,0 +1,418 @@
+import os
+import re
+import json
+import hmac
+import hashlib
+import time
+import tempfile
+import threading
+import http.client
+from datetime import datetime, timezone
+from urllib.parse import quote, urlsplit
+
+# Where rendered artifacts live, so any resume-engine replica (and the Java backend, through any replica) can
+# serve a file another replica rendered. Blobs are content-addressed (the key is the SHA-256 of the bytes, so
+# identical PDFs are stored once and keys never go stale); small JSON "refs" name things by other keys, e.g.
+# the render manifest for a render key. Uploads and downloads are streamed in chunks, never held in memory.
+#
+# Backends: a local directory (the default; on a shared volume it is already multi-replica), and any
+# S3-compatible object store (AWS S3, MinIO, R2, ...) spoken to directly with SigV4-signed requests, with a
+# bounded local read-through cache per replica. s3_standin.py is a local stand-in for tests and benchmarks.
+
+# --- CONFIGURATION ---
+CHUNK_BYTES = 1 << 16
+# How often, at most, a store with a TTL walks its files for expired ones (checked on writes)
+TTL_SWEEP_SECONDS = 300
+
+class ArtifactNotFound(KeyError):
+    """No blob or ref under the requested key."""
+
+class ArtifactStoreError(RuntimeError):
+    """The backend answered with an unexpected status."""
+
+# Ref names stay URL- and filename-safe, so they need no encoding in object keys or paths
+REF_NAME_RE = re.compile(r"^[A-Za-z0-9._-]{1,200}$")
+
+def _check_ref(name):
+    if not REF_NAME_RE.match(name):
+        raise ValueError(f"Invalid ref name: {name!r}")
+    return name
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# --- LOCAL BACKEND ---
+
+class LocalArtifactStore:
+    """Blobs under <root>/blobs/ab/<sha256>, refs under <root>/refs/<name>.json. Writes go to a temp file and are
+    renamed into place, so readers never see a partial object. With max_bytes set it acts as a cache and evicts
+    the least recently read blobs once the total size goes over the limit; with ttl_seconds set, blobs and refs
+    not read or written for that long are removed as well."""
+
+    def __init__(self, root, max_bytes=None, ttl_seconds=None):
+        self.root = os.path.abspath(root)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._size = None
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(self.root, "refs"), exist_ok=True)
+
+    def _blob_path(self, key):
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ArtifactNotFound(key)
+        return os.path.join(self.root, "blobs", key[:2], key)
+
+    def _ref_path(self, name):
+        return os.path.join(self.root, "refs", _check_ref(name) + ".json")
+
+    def exists(self, key):
+        return os.path.exists(self._blob_path(key))
+
+    def size(self, key):
+        try:
+            return os.path.getsize(self._blob_path(key))
+        except FileNotFoundError:
+            raise ArtifactNotFound(key)
+
+    def put_file(self, path, key=None):
+        """Stores the file under its content hash and returns (key, size); an existing blob is not rewritten."""
+        key = key or sha256_file(path)
+        if not self.exists(key):
+            with open(path, "rb") as source:
+                self.put_stream(key, iter(lambda: source.read(CHUNK_BYTES), b""))
+        return key, self.size(key)
+
+    def put_stream(self, key, chunks):
+        """Stores already-addressed content (e.g. a blob being downloaded from another backend)."""
+        writer = self.writer(key)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+
+    def writer(self, key=None):
+        """A BlobWriter into this store; with a key, commit() checks the content against it."""
+        return BlobWriter(self, key)
+
+    def open(self, key):
+        """The blob as an iterator of chunks."""
+        path = self._blob_path(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            raise ArtifactNotFound(key)
+        if self.max_bytes or self.ttl_seconds:
+            os.utime(path)  # Recency for eviction; reading alone does not update mtime
+        return _file_chunks(f)
+
+    def put_ref(self, name, payload):
+        target = self._ref_path(name)
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(temp_path, target)
+
+    def get_ref(self, name):
+        path = self._ref_path(name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if self.ttl_seconds:
+            _touch_quietly(path)
+        return payload
+
+    # --- cache eviction ---
+
+    def _blob_files(self):
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, "blobs")):
+            for name in filenames:
+                if not name.endswith(".tmp"):
+                    yield os.path.join(dirpath, name)
+
+    def _account(self, added):
+        if self.ttl_seconds:
+            self._expire()
+        if not self.max_bytes:
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(os.path.getsize(path) for path in self._blob_files())
+            else:
+                self._size += added
+            if self._size <= self.max_bytes:
+                return
+            # Evict down to 90% of the limit, oldest first
+            files = sorted(self._blob_files(), key=os.path.getmtime)
+            for path in files:
+                if self._size <= self.max_bytes * 0.9:
+                    break
+                try:
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    self._size -= size
+                except OSError:
+                    pass
+
+    def _expire(self):
+        """Removes blobs and refs older than the TTL; walks the store at most every TTL_SWEEP_SECONDS."""
+        now = time.time()
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + min(TTL_SWEEP_SECONDS, self.ttl_seconds)
+        cutoff = now - self.ttl_seconds
+        refs_dir = os.path.join(self.root, "refs")
+        refs = (os.path.join(refs_dir, name) for name in os.listdir(refs_dir) if name.endswith(".json"))
+        for path in list(self._blob_files()) + list(refs):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._size = None  # Recounted on the next write
+
+class BlobWriter:
+    """Writes a blob chunk by chunk into a temp file next to its final place, hashing as it goes; commit()
+    renames it into place under its hash (checked against the expected key, if one was given)."""
+
+    def __init__(self, store, key=None):
+        self.store, self.key = store, key
+        self.digest, self.size = hashlib.sha256(), 0
+        staging = os.path.join(store.root, "blobs")
+        fd, self.temp_path = tempfile.mkstemp(dir=staging, suffix=".tmp")
+        self.file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.digest.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self):
+        self.file.close()
+        key = self.digest.hexdigest()
+        if self.key and key != self.key:
+            self.abort()
+            raise ArtifactStoreError(f"Content of {self.key} does not match its key.")
+        target = self.store._blob_path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(self.temp_path, target)
+        self.store._account(self.size)
+        return key, self.size
+
+    def abort(self):
+        self.file.close()
+        _remove_quietly(self.temp_path)
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _touch_quietly(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+def _file_chunks(f):
+    with f:
+        for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+            yield chunk
+
+# --- S3-COMPATIBLE BACKEND ---
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+def sigv4_headers(method, url, region, access_key, secret_key, payload_sha256=EMPTY_SHA256, headers=None, now=None,
+                  service="s3"):
+    """AWS Signature Version 4 headers for one request (path-style URL, no query string)."""
+    parts = urlsplit(url)
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date = amz_date[:8]
+    signed = {k.lower(): str(v).strip() for k, v in (headers or {}).items()}
+    signed.update({"host": parts.netloc, "x-amz-content-sha256": payload_sha256, "x-amz-date": amz_date})
+    names = sorted(signed)
+    canonical = "\n".join([method, quote(parts.path or "/", safe="/~"), parts.query,
+                           "".join(f"{name}:{signed[name]}\n" for name in names), ";".join(names), payload_sha256])
+    scope = f"{date}/{region}/{service}/aws4_request"
+    to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical.encode("utf-8")).hexdigest()])
+    key = ("AWS4" + secret_key).encode("utf-8")
+    for part in (date, region, service, "aws4_request"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    signature = hmac.new(key, to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    signed["authorization"] = (f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+                               f"SignedHeaders={';'.join(names)}, Signature={signature}")
+    return signed
+
+class S3ArtifactStore:
+    """Blobs at <prefix>/blobs/ab/<sha256> and refs at <prefix>/refs/<name>.json in one bucket (path-style
+    addressing, which every S3-compatible server accepts). Blob uploads are signed with their own SHA-256 (the
+    key), so the server verifies the content. Reads go through an optional LocalArtifactStore cache."""
+
+    def __init__(self, endpoint, bucket, access_key, secret_key, region="us-east-1", prefix="artifacts", cache=None,
+                 timeout=30):
+        parts = urlsplit(endpoint)
+        self.scheme, self.netloc = parts.scheme or "http", parts.netloc
+        self.endpoint = f"{self.scheme}://{self.netloc}"
+        self.bucket, self.prefix = bucket, prefix.strip("/")
+        self.access_key, self.secret_key, self.region = access_key, secret_key, region
+        self.cache, self.timeout = cache, timeout
+
+    def _url(self, object_key):
+        return f"{self.endpoint}/{self.bucket}/{self.prefix}/{object_key}"
+
+    def _blob_key(self, key):
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ArtifactNotFound(key)
+        return f"blobs/{key[:2]}/{key}"
+
+    def _request(self, method, object_key, body=None, payload_sha256=EMPTY_SHA256, headers=None):
+        """Sends one signed request and returns (connection, response); the caller reads and closes."""
+        url = self._url(object_key)
+        signed = sigv4_headers(method, url, self.region, self.access_key, self.secret_key, payload_sha256, headers)
+        connection_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(self.netloc, timeout=self.timeout)
+        try:
+            connection.request(method, urlsplit(url).path, body=body, headers=signed)
+            return connection, connection.getresponse()
+        except BaseException:
+            connection.close()
+            raise
+
+    def _simple(self, method, object_key, **kwargs):
+        connection, response = self._request(method, object_key, **kwargs)
+        try:
+            return response.status, response.read(), response
+        finally:
+            connection.close()
+
+    def exists(self, key):
+        if self.cache is not None and self.cache.exists(key):
+            return True
+        status, _, _ = self._simple("HEAD", self._blob_key(key))
+        if status not in (200, 404):
+            raise ArtifactStoreError(f"HEAD {key}: HTTP {status}")
+        return status == 200
+
+    def size(self, key):
+        if self.cache is not None and self.cache.exists(key):
+            return self.cache.size(key)
+        status, _, response = self._simple("HEAD", self._blob_key(key))
+        if status == 404:
+            raise ArtifactNotFound(key)
+        if status != 200:
+            raise ArtifactStoreError(f"HEAD {key}: HTTP {status}")
+        return int(response.getheader("Content-Length"))
+
+    def put_file(self, path, key=None):
+        key = key or sha256_file(path)
+        size = os.path.getsize(path)
+        if not self.exists(key):
+            with open(path, "rb") as body:  # http.client streams file objects in blocks
+                status, data, _ = self._simple("PUT", self._blob_key(key), body=body, payload_sha256=key,
+                                               headers={"Content-Length": str(size),
+                                                        "Content-Type": "application/octet-stream"})
+            if status not in (200, 201):
+                raise ArtifactStoreError(f"PUT {key}: HTTP {status} {data[:200]!r}")
+        if self.cache is not None:
+            # The replica that rendered a file is the one requests for it are routed to; keep it warm there
+            self.cache.put_file(path, key)
+        return key, size
+
+    def open(self, key):
+        if self.cache is not None:
+            try:
+                return self.cache.open(key)
+            except ArtifactNotFound:
+                pass
+        connection, response = self._request("GET", self._blob_key(key))
+        if response.status != 200:
+            connection.close()
+            if response.status == 404:
+                raise ArtifactNotFound(key)
+            raise ArtifactStoreError(f"GET {key}: HTTP {response.status}")
+        return self._download(key, connection, response)
+
+    def _download(self, key, connection, response):
+        """Streams the response to the caller and, when a cache is configured, into it on the way. The cache
+        writer checks the hash, so a truncated or corrupted download never enters the cache."""
+        writer = self.cache.writer(key) if self.cache is not None else None
+        try:
+            for chunk in iter(lambda: response.read(CHUNK_BYTES), b""):
+                if writer:
+                    writer.write(chunk)
+                yield chunk
+            if writer:
+                writer.commit()
+                writer = None
+        finally:
+            if writer:
+                writer.abort()  # The client went away mid-download, or the read failed
+            connection.close()
+
+    def put_ref(self, name, payload):
+        body = json.dumps(payload).encode("utf-8")
+        status, data, _ = self._simple("PUT", f"refs/{_check_ref(name)}.json", body=body,
+                                       payload_sha256=hashlib.sha256(body).hexdigest(),
+                                       headers={"Content-Length": str(len(body)), "Content-Type": "application/json"})
+        if status not in (200, 201):
+            raise ArtifactStoreError(f"PUT ref {name}: HTTP {status} {data[:200]!r}")
+        if self.cache is not None:
+            self.cache.put_ref(name, payload)
+
+    def get_ref(self, name):
+        if self.cache is not None:
+            cached = self.cache.get_ref(name)
+            if cached is not None:
+                return cached
+        status, data, _ = self._simple("GET", f"refs/{_check_ref(name)}.json")
+        if status == 404:
+            return None
+        if status != 200:
+            raise ArtifactStoreError(f"GET ref {name}: HTTP {status}")
+        payload = json.loads(data)
+        if self.cache is not None:
+            self.cache.put_ref(name, payload)
+        return payload
+
+# --- CONFIGURATION FROM THE ENVIRONMENT ---
+
+def from_env():
+    """ARTIFACT_STORE=local (ARTIFACT_STORE_DIR; point every replica at one shared volume) of at most
+    ARTIFACT_STORE_MAX_MB, keeping files for ARTIFACT_STORE_TTL_HOURS after their last use (0 turns either limit
+    off), or ARTIFACT_STORE=s3 (S3_ENDPOINT_URL, S3_BUCKET, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY, S3_REGION,
+    S3_PREFIX; expiry is left to the bucket's lifecycle rules), with a local read-through cache in
+    ARTIFACT_CACHE_DIR of at most ARTIFACT_CACHE_MAX_MB."""
+    backend = os.getenv("ARTIFACT_STORE", "local")
+    if backend == "local":
+        max_mb = float(os.getenv("ARTIFACT_STORE_MAX_MB", "2048"))
+        ttl_hours = float(os.getenv("ARTIFACT_STORE_TTL_HOURS", "72"))
+        return LocalArtifactStore(os.getenv("ARTIFACT_STORE_DIR", os.path.join(tempfile.gettempdir(), "resume_artifacts")),
+                                  max_bytes=int(max_mb * 1024 * 1024) or None, ttl_seconds=ttl_hours * 3600 or None)
+    if backend != "s3":
+        raise ValueError(f"Unknown ARTIFACT_STORE '{backend}' (expected 'local' or 's3').")
+    cache_mb = float(os.getenv("ARTIFACT_CACHE_MAX_MB", "512"))
+    cache = None
+    if cache_mb > 0:
+        cache = LocalArtifactStore(os.getenv("ARTIFACT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "resume_artifacts_cache")),
+                                   max_bytes=int(cache_mb * 1024 * 1024))
+    return S3ArtifactStore(
+        os.environ["S3_ENDPOINT_URL"], os.environ["S3_BUCKET"],
+        os.getenv("S3_ACCESS_KEY_ID") or os.environ["AWS_ACCESS_KEY_ID"],
+        os.getenv("S3_SECRET_ACCESS_KEY") or os.environ["AWS_SECRET_ACCESS_KEY"],
+        region=os.getenv("S3_REGION", "us-east-1"), prefix=os.getenv("S3_PREFIX", "artifacts"), cache=cache,
+    )
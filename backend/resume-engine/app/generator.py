@@ -1,33 +1,116 @@
 import os
 import json
+import re
 import subprocess
 import uuid
-import re
 import tempfile
+import datetime
 from jinja2 import Environment, FileSystemLoader
+from pypdf import PdfReader, PdfWriter
+from . import profiling
+
+# Single-character LaTeX escapes, applied in one str.translate pass. The tables are built once at import
+# (the filters used to rebuild a dict and recompile a regex on every call, once per field per render).
+LATEX_ESCAPES = str.maketrans({
+    '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
+    '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}', '\\': r'\textbackslash{}',
+})
+# A less aggressive table that leaves braces and backslashes alone, so commands like \textbf{} survive
+SAFE_LATEX_ESCAPES = str.maketrans({
+    '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
+})
+# Most resume text has no special characters at all; a single search skips the translate for it
+LATEX_SPECIALS = re.compile(r'[&%$#_{}~^\\]')
+SAFE_LATEX_SPECIALS = re.compile(r'[&%$#_]')
 
 # A function to escape most special LaTeX characters
 def escape_latex(text):
-    if not isinstance(text, str):
+    if not isinstance(text, str) or not LATEX_SPECIALS.search(text):
         return text
-    conv = {
-        '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
-        '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
-        '^': r'\textasciicircum{}', '\\': r'\textbackslash{}',
-    }
-    regex = re.compile('|'.join(re.escape(key) for key in sorted(conv.keys(), key = len, reverse=True)))
-    return regex.sub(lambda match: conv[match.group()], text)
+    return text.translate(LATEX_ESCAPES)
 
-# NEW: A less aggressive filter that allows some commands like \textbf{}
 def safe_latex(text):
-    if not isinstance(text, str):
+    if not isinstance(text, str) or not SAFE_LATEX_SPECIALS.search(text):
         return text
-    conv = {
-        '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
+    return text.translate(SAFE_LATEX_ESCAPES)
+
+# Each list section and the field an entry needs in order to be rendered at all
+SECTION_KEYS = {
+    "education": "institution",
+    "work_experience": "company_name",
+    "projects": "project_name",
+    "skills": "name",
+    "achievements": "description",
+    "certifications": "name",
+}
+
+def _fields(item):
+    """(name, value) pairs of a pydantic model or a plain dict, without converting the model first."""
+    if isinstance(item, dict):
+        return item.items()
+    return ((name, getattr(item, name)) for name in type(item).model_fields)
+
+def _prepare_entry(item):
+    entry = {}
+    for name, value in _fields(item):
+        if isinstance(value, list):
+            # Bullet lists are offered both ways; templates pick escaped or "_safe" (keeps \textbf{} etc.)
+            entry[name] = [escape_latex(v) for v in value]
+            entry[name + "_safe"] = [safe_latex(v) for v in value]
+        else:
+            entry[name] = escape_latex(value)
+    return entry
+
+def prepare_personal_info(personal_info):
+    """Escaped personal info for the heading; raw keeps the unescaped values used inside URLs."""
+    view = {name: escape_latex(value) for name, value in _fields(personal_info)}
+    view["raw"] = dict(_fields(personal_info))
+    return view
+
+def prepare_resume_data(data):
+    """The single normalization pass before rendering. Takes the ResumeData model (or its dict) and returns the
+    view the templates consume: every string escaped, section entries without their key field dropped, and
+    has/counts flags per section. personal_info.raw keeps the unescaped values used inside URLs."""
+    get = data.get if isinstance(data, dict) else lambda name: getattr(data, name)
+    personal_info = get("personal_info")
+    view = {
+        "personal_info": prepare_personal_info(personal_info),
+        "has": {},
+        "counts": {},
+    }
+    for section, key in SECTION_KEYS.items():
+        entries = [_prepare_entry(item) for item in get(section) or []
+                   if (item.get(key) if isinstance(item, dict) else getattr(item, key))]
+        view[section] = entries
+        view["has"][section] = bool(entries)
+        view["counts"][section] = len(entries)
+    return view
+
+# The letter's date, as in the plain-text letters of scripts2/letter_assembly.py
+LETTER_DATE_FORMAT = "%B %d, %Y"
+
+def prepare_cover_letter(letter, personal_info=None, today=None):
+    """The cover letter view for the templates: every string escaped, and the parts the request left out filled
+    in the way scripts2/letter_assembly.py writes them (today's date, "Hiring Manager", the subject line with the
+    candidate's name, "Sincerely,")."""
+    get = letter.get if isinstance(letter, dict) else lambda name: getattr(letter, name)
+    recipient_name = get("recipient_name") or "Hiring Manager"
+    name = dict(_fields(personal_info)).get("full_name") if personal_info is not None else None
+    subject = f"Application for {get('job_title') or 'the advertised position'}" + (f" - {name}" if name else "")
+    recipient = [line for value in (recipient_name, get("company_name"), get("company_address")) if value
+                 for line in value.splitlines() if line.strip()]
+    return {
+        "date": escape_latex(get("date") or (today or datetime.date.today()).strftime(LETTER_DATE_FORMAT)),
+        "recipient": " \\\\\n".join(escape_latex(line) for line in recipient),
+        "subject": escape_latex(get("subject") or subject),
+        "salutation": escape_latex(get("salutation") or f"Dear {recipient_name},"),
+        "paragraphs": [escape_latex(p) for p in get("paragraphs") or [] if p and p.strip()],
+        "closing": escape_latex(get("closing") or "Sincerely,"),
     }
-    regex = re.compile('|'.join(re.escape(key) for key in sorted(conv.keys(), key = len, reverse=True)))
-    return regex.sub(lambda match: conv[match.group()], text)
 
+def _dump(data):
+    return data if isinstance(data, dict) else data.model_dump()
 
 class ResumeGenerator:
     def __init__(self, template_dir="app/templates"):
@@ -51,42 +134,123 @@ class ResumeGenerator:
         
         # FIX: Use "pdflatex" directly. This assumes it is installed in the system PATH
         # (which our new Dockerfile does via apt-get install texlive...)
-        self.pdflatex_path = "pdflatex"
+        # PDFLATEX_PATH swaps in another compiler (load_test.py uses stub_pdflatex.py to isolate the engine)
+        self.pdflatex_path = os.getenv("PDFLATEX_PATH", "pdflatex")
 
-    def generate(self, template_name: str, data: dict):
+    def generate(self, template_name: str, data):
+        """Renders and compiles a resume. `data` is the validated ResumeData model (or an equivalent dict)."""
         session_id = str(uuid.uuid4())
         output_dir = os.path.join(self.temp_dir, session_id)
         os.makedirs(output_dir)
 
-        main_tex_filename = f"{template_name}.tex"
-        template = self.env.get_template(f"{template_name}/{main_tex_filename}")
-        latex_source = template.render(resume_data=data)
+        tex_filepath = self._render(output_dir, "resume.tex", f"{template_name}/{template_name}.tex",
+                                    resume_data=prepare_resume_data(data))
+        pdf_filepath = self._compile(output_dir, "resume.tex")
+
+        json_filepath = os.path.join(output_dir, "resume.json")
+        with profiling.span("write_json"), open(json_filepath, 'w', encoding='utf-8') as f:
+            if isinstance(data, dict):
+                json.dump(data, f, indent=4)
+            else:
+                f.write(data.model_dump_json(indent=4))
         
-        tex_filepath = os.path.join(output_dir, "resume.tex")
-        with open(tex_filepath, 'w', encoding='utf-8') as f:
+        return {
+            "pdf_path": pdf_filepath,
+            "tex_path": tex_filepath,
+            "json_path": json_filepath
+        }
+
+    def generate_cover_letter(self, template_name: str, personal_info, letter):
+        """Renders and compiles a cover letter in a resume template's style (its preamble and heading)."""
+        output_dir = os.path.join(self.temp_dir, str(uuid.uuid4()))
+        os.makedirs(output_dir)
+
+        tex_filepath = self._render(output_dir, "cover_letter.tex", f"{template_name}/cover_letter.tex",
+                                    resume_data={"personal_info": prepare_personal_info(personal_info)},
+                                    cover_letter=prepare_cover_letter(letter, personal_info),
+                                    include_resume=False)
+        pdf_filepath = self._compile(output_dir, "cover_letter.tex")
+
+        json_filepath = os.path.join(output_dir, "cover_letter.json")
+        with profiling.span("write_json"), open(json_filepath, 'w', encoding='utf-8') as f:
+            json.dump({"personal_info": _dump(personal_info), "cover_letter": _dump(letter)}, f, indent=4)
+
+        return {
+            "pdf_path": pdf_filepath,
+            "tex_path": tex_filepath,
+            "json_path": json_filepath
+        }
+
+    def generate_packet(self, template_name: str, data, letter, split=False):
+        """Renders the cover letter and the resume as one document and compiles it in a single pdflatex run, so the
+        preamble, packages and fonts are loaded once for both. With split, the PDF is then cut into the letter and
+        the resume (at the page count the document records). Returns {"files": {name: path}, "letter_pages",
+        "pages"}."""
+        output_dir = os.path.join(self.temp_dir, str(uuid.uuid4()))
+        os.makedirs(output_dir)
+
+        personal_info = data["personal_info"] if isinstance(data, dict) else data.personal_info
+        tex_filepath = self._render(output_dir, "application_packet.tex", f"{template_name}/cover_letter.tex",
+                                    resume_data=prepare_resume_data(data),
+                                    cover_letter=prepare_cover_letter(letter, personal_info), include_resume=True)
+        pdf_filepath = self._compile(output_dir, "application_packet.tex")
+        try:
+            with open(os.path.join(output_dir, "application_packet.split"), encoding="utf-8") as f:
+                letter_pages = int(f.read().strip())
+        except (OSError, ValueError):
+            raise RuntimeError("The packet did not record the cover letter's page count.")
+
+        files = {"application_packet.tex": tex_filepath}
+        with profiling.span("split_pdf", split=split):
+            reader = PdfReader(pdf_filepath)
+            pages = len(reader.pages)
+            if not 0 < letter_pages < pages:
+                raise RuntimeError(f"Invalid packet split: letter pages {letter_pages} of {pages}.")
+            if split:
+                for name, page_range in (("cover_letter.pdf", range(0, letter_pages)), ("resume.pdf", range(letter_pages, pages))):
+                    writer = PdfWriter()
+                    for index in page_range:
+                        writer.add_page(reader.pages[index])
+                    files[name] = os.path.join(output_dir, name)
+                    with open(files[name], "wb") as f:
+                        writer.write(f)
+            else:
+                files["application_packet.pdf"] = pdf_filepath
+
+        with profiling.span("write_json"):
+            for name, value in (("resume.json", data), ("cover_letter.json", letter)):
+                files[name] = os.path.join(output_dir, name)
+                with open(files[name], 'w', encoding='utf-8') as f:
+                    json.dump(_dump(value), f, indent=4)
+
+        return {"files": files, "letter_pages": letter_pages, "pages": pages}
+
+    def _render(self, output_dir, tex_filename, template_path, **context):
+        """Renders a template into output_dir and returns the .tex path."""
+        with profiling.span("render_template", template=template_path):
+            template = self.env.get_template(template_path)
+            latex_source = template.render(**context)
+
+        tex_filepath = os.path.join(output_dir, tex_filename)
+        with profiling.span("write_tex"), open(tex_filepath, 'w', encoding='utf-8') as f:
             f.write(latex_source)
+        return tex_filepath
 
-        cmd = [self.pdflatex_path, "resume.tex"]
+    def _compile(self, output_dir, tex_filename):
+        """Compiles the .tex file in output_dir and returns the PDF path."""
+        cmd = [self.pdflatex_path, tex_filename]
         try:
             # Run twice to resolve references/page numbers if needed
-            subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=output_dir)
-            subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=output_dir)
+            for compile_pass in (1, 2):
+                with profiling.span("pdflatex", compile_pass=compile_pass):
+                    subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=output_dir)
         except subprocess.CalledProcessError as e:
             print("LaTeX compilation failed. See log below:")
             print(e.stdout)
             raise RuntimeError(f"LaTeX Error: {e.stdout}")
 
-        pdf_filepath = os.path.join(output_dir, "resume.pdf")
+        pdf_filepath = os.path.join(output_dir, os.path.splitext(tex_filename)[0] + ".pdf")
         
         if not os.path.exists(pdf_filepath):
             raise FileNotFoundError("PDF generation failed, file not found.")
-
-        json_filepath = os.path.join(output_dir, "resume.json")
-        with open(json_filepath, 'w') as f:
-            json.dump(data, f, indent=4)
-        
-        return {
-            "pdf_path": pdf_filepath,
-            "tex_path": tex_filepath,
-            "json_path": json_filepath
-        }
\ No newline at end of file
+        return pdf_filepath
\ No newline at end of file
@@ -2,13 +2,40 @@ import zipfile
 import io
 import traceback
 import os
-from fastapi import FastAPI, HTTPException
-from starlette.responses import StreamingResponse
-from .models import GenerationRequest
+import shutil
+import hashlib
+import socket
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse, PlainTextResponse
+from .models import GenerationRequest, CoverLetterRequest, PacketRequest
 from .generator import ResumeGenerator
+from . import artifact_store
+from . import profiling
 
 app = FastAPI()
 generator = ResumeGenerator()
+store = artifact_store.from_env()
+
+# Reported with every render, so routing and cache locality across replicas can be checked from the outside
+REPLICA_ID = os.getenv("REPLICA_ID", socket.gethostname())
+# Part of the render ref name: bump when templates or the generator change, so older renders are not served
+RENDER_VERSION = "1"
+ARTIFACT_TYPES = {"resume.pdf": "application/pdf", "resume.tex": "application/x-tex", "resume.json": "application/json"}
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profiles requests that ask for it (X-Profile: 1) and keeps any that turn out slow; see app/profiling.py."""
+    if request.url.path.startswith("/profiles"):
+        return await call_next(request)
+    requested = request.headers.get(profiling.HEADER) == "1"
+    with profiling.profiled("request", f"{request.method} {request.url.path}", requested) as profile:
+        response = await call_next(request)
+    if profile is not None and requested:
+        response.headers["X-Profile-Id"] = profile.id
+        response.headers["X-Replica"] = REPLICA_ID
+    return response
 
 # Health check endpoint
 @app.get("/")
@@ -23,10 +50,11 @@ async def generate_resume(request: GenerationRequest):
         print(f"--- 📝 Received name: {request.resume_data.personal_info.full_name} ---")
 
         # This is the most likely point of failure.
-        generated_files = generator.generate(
-            request.template_name,
-            request.resume_data.dict()
-        )
+        with profiling.span("generate"):
+            generated_files = generator.generate(
+                request.template_name,
+                request.resume_data
+            )
 
         print(f"--- ✅ SUCCESS: Files generated at {generated_files} ---")
 
@@ -42,7 +70,7 @@ async def generate_resume(request: GenerationRequest):
 
         print("--- ⚙️ Zipping files... ---")
         zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED, False) as zip_file:
+        with profiling.span("zip"), zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED, False) as zip_file:
             zip_file.write(pdf_path, arcname="resume.pdf")
             zip_file.write(tex_path, arcname="resume.tex")
             zip_file.write(json_path, arcname="resume.json")
@@ -60,4 +88,131 @@ async def generate_resume(request: GenerationRequest):
         print("--- ❌ CRITICAL ERROR CAUGHT ---")
         traceback.print_exc()  # This will print the full, detailed error to your logs
         print("---------------------------")
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+def zip_response(files, filename):
+    """The generated files as a zip download; files maps each name in the archive to its path."""
+    zip_buffer = io.BytesIO()
+    with profiling.span("zip"), zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED, False) as zip_file:
+        for name, path in files.items():
+            zip_file.write(path, arcname=name)
+    zip_buffer.seek(0)
+    return StreamingResponse(
+        zip_buffer,
+        media_type="application/x-zip-compressed",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+@app.post("/generate/cover-letter")
+async def generate_cover_letter(request: CoverLetterRequest):
+    """Renders a cover letter in the style of a resume template: a zip of cover_letter.pdf, .tex and .json."""
+    try:
+        with profiling.span("generate_cover_letter"):
+            generated_files = await run_in_threadpool(generator.generate_cover_letter, request.template_name,
+                                                      request.personal_info, request.cover_letter)
+        return zip_response({"cover_letter.pdf": generated_files["pdf_path"], "cover_letter.tex": generated_files["tex_path"],
+                             "cover_letter.json": generated_files["json_path"]}, "cover_letter_files.zip")
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+@app.post("/generate/packet")
+async def generate_packet(request: PacketRequest):
+    """Renders the cover letter and the resume in one pdflatex document and run (the preamble and fonts are loaded
+    once, instead of once per document). The zip holds application_packet.pdf, or with "split" the same compile
+    cut into cover_letter.pdf and resume.pdf, plus the packet's .tex and both JSON inputs."""
+    try:
+        with profiling.span("generate_packet", split=request.split):
+            packet = await run_in_threadpool(generator.generate_packet, request.template_name, request.resume_data,
+                                             request.cover_letter, request.split)
+        return zip_response(packet["files"], "application_packet_files.zip")
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+def render_ref(key):
+    return f"render.v{RENDER_VERSION}.{key}"
+
+def render_to_store(key, request: GenerationRequest):
+    with profiling.span("store_lookup"):
+        manifest = store.get_ref(render_ref(key))
+    # The store evicts old blobs (size limit, TTL, bucket lifecycle rules); a manifest whose files are gone is
+    # rendered again
+    if manifest is not None and all(store.exists(f["key"]) for f in manifest["files"].values()):
+        return dict(manifest, cached=True, replica=REPLICA_ID)
+
+    with profiling.span("generate"):
+        generated_files = generator.generate(request.template_name, request.resume_data)
+    output_dir = os.path.dirname(generated_files["pdf_path"])
+    try:
+        files = {}
+        for name, path in (("resume.pdf", generated_files["pdf_path"]), ("resume.tex", generated_files["tex_path"]),
+                           ("resume.json", generated_files["json_path"])):
+            with profiling.span("store_upload", file=name):
+                blob_key, size = store.put_file(path)
+            files[name] = {"key": blob_key, "size": size}
+    finally:
+        # Everything is in the store now; the working directory is no longer needed
+        shutil.rmtree(output_dir, ignore_errors=True)
+    manifest = {"render_key": key, "template_name": request.template_name, "files": files}
+    store.put_ref(render_ref(key), manifest)
+    return dict(manifest, cached=False, replica=REPLICA_ID)
+
+@app.post("/render")
+async def render_resume(raw_request: Request):
+    """Renders into the shared artifact store and returns the manifest. The render key is the SHA-256 of the
+    request body, which the backend also uses to pick the replica (so repeat renders and their downloads land on
+    the replica whose cache holds them); a render any replica already stored is returned without compiling."""
+    body = await raw_request.body()
+    try:
+        request = GenerationRequest.model_validate_json(body)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    try:
+        # Off the event loop: the compile is blocking
+        return await run_in_threadpool(render_to_store, hashlib.sha256(body).hexdigest(), request)
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+@app.get("/artifacts/{key}/{file_name}")
+def download_artifact(key: str, file_name: str):
+    """Streams one file of a stored render from the artifact store, whichever replica rendered it."""
+    if file_name not in ARTIFACT_TYPES or len(key) != 64:
+        raise HTTPException(status_code=404, detail="Not found")
+    manifest = store.get_ref(render_ref(key))
+    if manifest is None or file_name not in manifest["files"]:
+        raise HTTPException(status_code=404, detail="Not found")
+    blob = manifest["files"][file_name]
+    try:
+        chunks = store.open(blob["key"])
+    except artifact_store.ArtifactNotFound:
+        raise HTTPException(status_code=404, detail="Not found")
+    return StreamingResponse(chunks, media_type=ARTIFACT_TYPES[file_name], headers={
+        "Content-Length": str(blob["size"]),
+        "ETag": '"' + blob["key"] + '"',
+        # Render keys are content hashes: the same URL always names the same bytes
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "X-Replica": REPLICA_ID,
+    })
+
+@app.get("/profiles")
+def list_profiles():
+    """Summaries of this replica's stored request profiles, newest first."""
+    return profiling.list_profiles()
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """One profile: the span timeline and the sampled stacks."""
+    try:
+        return profiling.load(profile_id)
+    except profiling.ProfileNotFound:
+        raise HTTPException(status_code=404, detail="Not found")
+
+@app.get("/profiles/{profile_id}/folded")
+def get_profile_folded(profile_id: str):
+    """One profile's sampled stacks in folded format, for flamegraph.pl or speedscope."""
+    try:
+        return PlainTextResponse(profiling.folded(profiling.load(profile_id)))
+    except profiling.ProfileNotFound:
+        raise HTTPException(status_code=404, detail="Not found")
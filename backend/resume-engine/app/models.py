@@ -70,4 +70,29 @@ class ResumeData(CamelCaseModel):
 
 class GenerationRequest(CamelCaseModel):
     template_name: str
-    resume_data: ResumeData
\ No newline at end of file
+    resume_data: ResumeData
+
+class CoverLetter(CamelCaseModel):
+    # The body paragraphs (what coverletter.py writes between the greeting and the sign-off); the rest of the
+    # letter has defaults filled in by the generator
+    paragraphs: List[str]
+    date: Optional[str] = None
+    recipient_name: Optional[str] = None
+    company_name: Optional[str] = None
+    company_address: Optional[str] = None
+    job_title: Optional[str] = None
+    subject: Optional[str] = None
+    salutation: Optional[str] = None
+    closing: Optional[str] = None
+
+class CoverLetterRequest(CamelCaseModel):
+    template_name: str
+    personal_info: PersonalInfo
+    cover_letter: CoverLetter
+
+class PacketRequest(CamelCaseModel):
+    template_name: str
+    resume_data: ResumeData
+    cover_letter: CoverLetter
+    # False: one PDF (letter, then resume); True: the same single compile, split into the letter and the resume
+    split: bool = False
\ No newline at end of file
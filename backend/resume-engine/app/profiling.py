@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import tempfile
+import threading
+import contextlib
+import contextvars
+
+# Request profiling for the engine. A request is profiled when it carries "X-Profile: 1" or when it turns out
+# slower than PROFILE_SLOW_MS: every request records a span timeline (the handler, and inside
+# ResumeGenerator.generate the template render, the .tex write, each pdflatex pass and the .json write), and a
+# sampled share of requests also has the stacks of the threads it runs on sampled in the background. Kept
+# profiles are JSON files with bounded retention, served by GET /profiles, /profiles/{id} and
+# /profiles/{id}/folded (folded stacks for flamegraph.pl or speedscope).
+#
+# The pipeline scripts have the same hooks in scripts/shared/profiling.py; this copy differs in keeping the
+# current profile in a context variable (requests run concurrently here) and in sampling every thread a request
+# touches, since handlers move between the event loop and the thread pool.
+
+# --- CONFIGURATION ---
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "resume_engine", "profiles"))
+# Requests slower than this are kept automatically; 0 keeps only requested profiles
+SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "5000"))
+# Share of requests whose stacks are sampled (requested ones always are); spans are recorded for every request
+SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MAX_PROFILES = int(os.getenv("PROFILE_MAX_COUNT", "200"))
+MAX_AGE_SECONDS = float(os.getenv("PROFILE_MAX_AGE", str(3 * 24 * 3600)))
+MAX_STACK_DEPTH = 64
+HEADER = "X-Profile"
+
+_current = contextvars.ContextVar("profile", default=None)
+
+class ProfileNotFound(Exception):
+    pass
+
+# --- STACK SAMPLING ---
+
+class StackSampler:
+    """Samples the call stacks of a set of threads every interval and counts identical stacks (folded format).
+    A thread shared with other requests (the event loop) also contributes their samples while it is sampled."""
+
+    def __init__(self, interval_ms):
+        self.interval = interval_ms / 1000.0
+        self.thread_ids, self.counts, self.samples = set(), {}, 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.thread_ids):
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    key = ";".join(reversed(stack))
+                    self.counts[key] = self.counts.get(key, 0) + 1
+                    self.samples += 1
+
+# --- PROFILES AND SPANS ---
+
+class Profile:
+    def __init__(self, kind, name, requested, sampled):
+        self.id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        self.kind, self.name, self.requested = kind, name, requested
+        self.started, self.started_perf = time.time(), time.perf_counter()
+        self.spans, self._depth = [], 0
+        self.sampler = StackSampler(INTERVAL_MS) if sampled else None
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started_perf) * 1000.0
+
+    def watch_current_thread(self):
+        if self.sampler:
+            self.sampler.thread_ids.add(threading.get_ident())
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        self.watch_current_thread()
+        record = {"name": name, "start_ms": round(self.elapsed_ms(), 2), "depth": self._depth}
+        if attrs:
+            record["attrs"] = attrs
+        self.spans.append(record)
+        self._depth += 1
+        try:
+            yield record.setdefault("attrs", {})
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            self._depth -= 1
+            record["duration_ms"] = round(self.elapsed_ms() - record["start_ms"], 2)
+            if not record["attrs"]:
+                del record["attrs"]
+
+    def to_dict(self, duration_ms, trigger):
+        return {"id": self.id, "kind": self.kind, "name": self.name, "ts": self.started,
+                "duration_ms": round(duration_ms, 1), "trigger": trigger,
+                "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+                "samples": self.sampler.samples if self.sampler else 0,
+                "sample_interval_ms": INTERVAL_MS if self.sampler else None,
+                "stacks": self.sampler.counts if self.sampler else {}}
+
+def span(name, **attrs):
+    """A timed span in the current request's profile; a no-op (yielding a throwaway dict) outside of one."""
+    profile = _current.get()
+    if profile is None:
+        return contextlib.nullcontext({})
+    return profile.span(name, **attrs)
+
+@contextlib.contextmanager
+def profiled(kind, name, requested=False):
+    """Profiles the enclosed request and keeps the profile if it was requested or ran slower than SLOW_MS.
+    The profile is visible to everything the request runs, including run_in_threadpool calls, which copy the
+    context."""
+    if not (requested or SLOW_MS > 0):
+        yield None
+        return
+    profile = Profile(kind, name, requested, sampled=requested or random.random() < SAMPLE_RATE)
+    profile.watch_current_thread()
+    token = _current.set(profile)
+    if profile.sampler:
+        profile.sampler.start()
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        if profile.sampler:
+            profile.sampler.stop()
+        duration_ms = profile.elapsed_ms()
+        if requested or duration_ms >= SLOW_MS:
+            save(profile.to_dict(duration_ms, "requested" if requested else "slow"))
+
+# --- STORAGE ---
+
+def _path(profile_id):
+    if not profile_id or not all(c.isalnum() or c == "-" for c in profile_id):
+        raise ProfileNotFound(profile_id)
+    return os.path.join(PROFILE_DIR, profile_id + ".json")
+
+def save(profile):
+    """Writes the profile and prunes the directory to MAX_PROFILES files no older than MAX_AGE_SECONDS.
+    Profiling must never fail a request, so errors are only logged."""
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = _path(profile["id"])
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(profile, f)
+        os.replace(path + ".tmp", path)
+        prune()
+    except OSError as e:
+        print(f"--- ⚠️ Could not save profile: {e} ---")
+
+def prune():
+    cutoff = time.time() - MAX_AGE_SECONDS
+    entries = []
+    for name in os.listdir(PROFILE_DIR):
+        path = os.path.join(PROFILE_DIR, name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if name.endswith(".json"):
+            entries.append((mtime, path))
+        elif name.endswith(".tmp") and mtime < cutoff:
+            entries.append((0, path))
+    entries.sort(reverse=True)
+    for index, (mtime, path) in enumerate(entries):
+        if index >= MAX_PROFILES or mtime < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def load(profile_id):
+    try:
+        with open(_path(profile_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ProfileNotFound(profile_id)
+
+def summary(profile):
+    spans = sorted((s for s in profile["spans"] if s["depth"] == 0), key=lambda s: -s.get("duration_ms", 0))
+    result = {key: profile[key] for key in ("id", "kind", "name", "ts", "duration_ms", "trigger", "samples")}
+    result["top_spans"] = [{"name": s["name"], "duration_ms": s.get("duration_ms")} for s in spans[:5]]
+    return result
+
+def list_profiles():
+    """Summaries of the stored profiles, newest first."""
+    try:
+        names = sorted((n for n in os.listdir(PROFILE_DIR) if n.endswith(".json")), reverse=True)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            profiles.append(summary(load(name[:-len(".json")])))
+        except (OSError, ValueError, KeyError, ProfileNotFound):
+            continue
+    return profiles
+
+def folded(profile):
+    """The sampled stacks in the folded format read by flamegraph.pl and speedscope."""
+    return "\n".join(f"{stack} {count}" for stack, count in sorted(profile["stacks"].items()))
@@ -0,0 +1,121 @@
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import statistics
+
+from pypdf import PdfReader
+
+from app.generator import ResumeGenerator
+from app.models import ResumeData, CoverLetter
+from bench_render import large_resume
+
+# Compile-time comparison for the application packet (ResumeGenerator.generate_packet): the cover letter and the
+# resume as one document in one pdflatex run, against the two separate renders it replaces (generate_cover_letter
+# then generate, each paying its own pdflatex start-up, preamble and font loading).
+#
+# Per template and mode: wall time per application (letter + resume), pdflatex processes started, and the page
+# counts, checking that the split packet has the same pages as the separate renders. Uses the real pdflatex
+# unless --stub-compiler (stub_pdflatex.py, which models a fixed cost per run plus a cost per page; its numbers
+# show the process saving only).
+#
+#   python bench_packet.py --repeat 5
+#   python bench_packet.py --stub-compiler --repeat 20
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES = ("professional", "modern_line", "one_column", "elegant")
+MODES = ("separate", "packet", "packet_split")
+COMPILE_PASSES = 2  # ResumeGenerator runs pdflatex twice per document
+
+LETTER = {
+    "paragraphs": [
+        "I am writing to apply for the Senior Backend Engineer position at Stripe. Over the past five years I have "
+        "built and operated payment services in Python and Go that handle more than 2M requests a day.",
+        "At Acme I led the move of our settlement pipeline to Kafka, cutting end-of-day reconciliation from four "
+        "hours to 40 minutes, and designed the REST APIs our partners integrate with.",
+        "I am drawn to Stripe's focus on developer experience and reliability, and would welcome the chance to "
+        "bring my experience with distributed systems to your payments infrastructure team.",
+        "Thank you for your time and consideration. I look forward to discussing how I can contribute.",
+    ],
+    "company_name": "Stripe",
+    "company_address": "354 Oyster Point Blvd\nSouth San Francisco, CA",
+    "job_title": "Senior Backend Engineer",
+}
+
+def sample_resume(rng, scale):
+    """A realistic ResumeData dict (bench_render's generator) with a real name, so the heading renders."""
+    data = large_resume(rng, scale)
+    data["personal_info"].update({"full_name": "Jane Q. Doe", "email": "jane.doe@example.com", "phone": "415 555 0100",
+                                  "address": "San Francisco, CA", "github_handle": "janedoe", "linkedin_handle": "janedoe"})
+    return data
+
+def pdf_pages(path):
+    return len(PdfReader(path).pages)
+
+def run_mode(generator, mode, template, resume, letter):
+    """One application in the given mode: (elapsed ms, pdflatex processes, {pdf name: pages})."""
+    started = time.perf_counter()
+    if mode == "separate":
+        letter_files = generator.generate_cover_letter(template, resume.personal_info, letter)
+        resume_files = generator.generate(template, resume)
+        elapsed = (time.perf_counter() - started) * 1000.0
+        pages = {"cover_letter.pdf": pdf_pages(letter_files["pdf_path"]), "resume.pdf": pdf_pages(resume_files["pdf_path"])}
+        output_dirs = {os.path.dirname(letter_files["pdf_path"]), os.path.dirname(resume_files["pdf_path"])}
+        processes = 2 * COMPILE_PASSES
+    else:
+        packet = generator.generate_packet(template, resume, letter, split=mode == "packet_split")
+        elapsed = (time.perf_counter() - started) * 1000.0
+        pages = {name: pdf_pages(path) for name, path in packet["files"].items() if name.endswith(".pdf")}
+        output_dirs = {os.path.dirname(path) for path in packet["files"].values()}
+        processes = COMPILE_PASSES
+    for output_dir in output_dirs:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    return elapsed, processes, pages
+
+def main():
+    parser = argparse.ArgumentParser(description="Application packet compile time against two separate renders.")
+    parser.add_argument("--repeat", type=int, default=5, help="Applications per template and mode")
+    parser.add_argument("--scale", type=int, default=1, help="Resume size multiplier (1 is about one page)")
+    parser.add_argument("--templates", nargs="+", default=list(TEMPLATES))
+    parser.add_argument("--stub-compiler", action="store_true", help="Use stub_pdflatex.py instead of pdflatex")
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    if args.stub_compiler:
+        os.environ["PDFLATEX_PATH"] = os.path.join(ENGINE_DIR, "stub_pdflatex.py")
+    elif shutil.which(os.getenv("PDFLATEX_PATH", "pdflatex")) is None:
+        sys.exit("pdflatex not found: install TeX Live or run with --stub-compiler")
+
+    generator = ResumeGenerator(template_dir=os.path.join(ENGINE_DIR, "app", "templates"))
+    resume = ResumeData.model_validate(sample_resume(random.Random(args.seed), args.scale))
+    letter = CoverLetter.model_validate(LETTER)
+
+    report = {"compiler": os.getenv("PDFLATEX_PATH", "pdflatex"), "repeat": args.repeat, "templates": {}}
+    for template in args.templates:
+        results = {}
+        run_mode(generator, "packet", template, resume, letter)  # Warm-up: template compile, disk cache
+        # Modes interleaved, so drift in machine load affects them alike
+        timings = {mode: [] for mode in MODES}
+        for _ in range(args.repeat):
+            for mode in MODES:
+                elapsed, processes, pages = run_mode(generator, mode, template, resume, letter)
+                timings[mode].append(elapsed)
+                results[mode] = {"pdflatex_processes": processes, "pages": pages}
+        for mode in MODES:
+            results[mode].update({"mean_ms": round(statistics.mean(timings[mode]), 1),
+                                  "p50_ms": round(statistics.median(timings[mode]), 1)})
+        for mode in ("packet", "packet_split"):
+            results[mode]["time_saved"] = round(1.0 - results[mode]["mean_ms"] / results["separate"]["mean_ms"], 3)
+        # The split packet must hold the same pages as the two separate documents
+        results["split_pages_match"] = results["packet_split"]["pages"] == results["separate"]["pages"]
+        report["templates"][template] = results
+        print(json.dumps({template: results}), file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if all(r["split_pages_match"] for r in report["templates"].values()) else 1)
+
+if __name__ == "__main__":
+    main()
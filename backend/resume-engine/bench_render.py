@@ -0,0 +1,198 @@
+import re
+import sys
+import json
+import time
+import random
+import argparse
+
+from app.generator import ResumeGenerator, escape_latex, safe_latex, prepare_resume_data, SECTION_KEYS
+from app.models import ResumeData
+
+# Equivalence check and render microbenchmark for the single-pass ResumeData normalization in generator.py.
+#
+# 1. Fuzz: random strings heavy in LaTeX specials must escape exactly as the original regex-based filters did,
+#    and random resumes (with blank entries, None fields, specials everywhere) must produce a prepared view whose
+#    sections, flags and escaped values match what the templates used to compute with selectattr + filters.
+# 2. Benchmark: on large, realistic resumes, times the normalization pass, each template's render from the
+#    prepared view, and the old per-call filters against the precompiled ones.
+#
+#   python bench_render.py --cases 2000 --renders 200
+
+# --- REFERENCE IMPLEMENTATION (the filters as they were before normalization) ---
+
+def reference_escape_latex(text):
+    if not isinstance(text, str):
+        return text
+    conv = {
+        '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
+        '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}',
+        '^': r'\textasciicircum{}', '\\': r'\textbackslash{}',
+    }
+    regex = re.compile('|'.join(re.escape(key) for key in sorted(conv.keys(), key = len, reverse=True)))
+    return regex.sub(lambda match: conv[match.group()], text)
+
+def reference_safe_latex(text):
+    if not isinstance(text, str):
+        return text
+    conv = {
+        '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#', '_': r'\_',
+    }
+    regex = re.compile('|'.join(re.escape(key) for key in sorted(conv.keys(), key = len, reverse=True)))
+    return regex.sub(lambda match: conv[match.group()], text)
+
+def reference_view(data):
+    """What the templates saw before: the raw .dict() sections, filtered with selectattr(key) at render time."""
+    view = {}
+    for section, key in SECTION_KEYS.items():
+        entries = [entry for entry in data[section] if entry.get(key)]
+        view[section] = [{name: ([reference_escape_latex(v) for v in value] if isinstance(value, list) else reference_escape_latex(value))
+                          for name, value in entry.items()} for entry in entries]
+        for entry, original in zip(view[section], entries):
+            for name, value in original.items():
+                if isinstance(value, list):
+                    entry[name + "_safe"] = [reference_safe_latex(v) for v in value]
+    return view
+
+# --- FUZZ DATA ---
+
+ALPHABET = "abcXYZ 019-.,:/()'\"" + "&%$#_{}~^\\" + "éü—•€✓\t"
+
+def random_text(rng, max_len=40, allow_empty=True):
+    if allow_empty and rng.random() < 0.15:
+        return ""
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(1, max_len)))
+
+def random_resume(rng, scale=1):
+    """A ResumeData dict; scale multiplies the entry and bullet counts (scale 3 is a long resume)."""
+    def maybe(value):
+        return None if rng.random() < 0.2 else value
+    def points():
+        return [random_text(rng, 120) for _ in range(rng.randint(0, 6 * scale))]
+    return {
+        "personal_info": {"full_name": random_text(rng), "address": random_text(rng), "email": random_text(rng),
+                          "phone": random_text(rng, 15), "github_handle": maybe(random_text(rng, 15)),
+                          "linkedin_handle": maybe(random_text(rng, 15)), "portfolio_url": maybe(random_text(rng, 30)),
+                          "extra_info": maybe(random_text(rng))},
+        "education": [{"degree": random_text(rng), "institution": random_text(rng), "start_year": random_text(rng, 4),
+                       "end_year": random_text(rng, 4), "gpa": maybe(random_text(rng, 5))} for _ in range(rng.randint(0, 2 * scale))],
+        "work_experience": [{"job_title": random_text(rng), "company_name": random_text(rng), "location": random_text(rng),
+                             "start_date": random_text(rng, 8), "end_date": random_text(rng, 8), "description_points": points()}
+                            for _ in range(rng.randint(0, 4 * scale))],
+        "projects": [{"project_name": random_text(rng), "start_date": random_text(rng, 8), "end_date": random_text(rng, 8),
+                      "tech_stack": random_text(rng), "description_points": points()} for _ in range(rng.randint(0, 3 * scale))],
+        "skills": [{"name": random_text(rng, 15), "value": random_text(rng, 80)} for _ in range(rng.randint(0, 4 * scale))],
+        "achievements": [{"description": random_text(rng, 100)} for _ in range(rng.randint(0, 3 * scale))],
+        "certifications": [{"name": random_text(rng), "issuer": random_text(rng), "date": random_text(rng, 8)}
+                           for _ in range(rng.randint(0, 3 * scale))],
+    }
+
+# --- CHECKS ---
+
+def check_filters(rng, cases):
+    failures = []
+    for _ in range(cases):
+        text = random_text(rng, 200, allow_empty=True)
+        if escape_latex(text) != reference_escape_latex(text):
+            failures.append(("escape_latex", text))
+        if safe_latex(text) != reference_safe_latex(text):
+            failures.append(("safe_latex", text))
+    for value in (None, 0, 3.5, []):
+        if escape_latex(value) != reference_escape_latex(value) or safe_latex(value) != reference_safe_latex(value):
+            failures.append(("non-string", repr(value)))
+    return failures
+
+def check_views(rng, cases):
+    failures = []
+    for case in range(cases):
+        data = random_resume(rng)
+        model = ResumeData(**data)
+        reference = reference_view(model.model_dump())
+        for source in (model, model.model_dump()):
+            view = prepare_resume_data(source)
+            for section in SECTION_KEYS:
+                if view[section] != reference[section]:
+                    failures.append((case, section, "entries"))
+                if view["has"][section] != bool(reference[section]) or view["counts"][section] != len(reference[section]):
+                    failures.append((case, section, "flags"))
+            info = model.personal_info
+            for name, value in view["personal_info"].items():
+                if name != "raw" and value != reference_escape_latex(getattr(info, name)):
+                    failures.append((case, f"personal_info.{name}", "escaped"))
+            if view["personal_info"]["raw"] != info.model_dump():
+                failures.append((case, "personal_info.raw", "raw"))
+    return failures
+
+# --- BENCHMARK ---
+
+WORDS = ["built", "led", "scaled", "the", "payments", "API", "pipeline", "using", "Python", "Kafka", "on", "AWS",
+         "reducing", "latency", "for", "users", "across", "teams", "with", "Spring", "Boot", "and", "React"]
+SPECIALS = ["40%", "R&D", "$2M", "C#", "snake_case", "{braces}", "~3x"]
+
+def realistic_text(rng, words):
+    """Resume-like text: mostly plain words, with a LaTeX special in roughly one string in ten."""
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text + " " + rng.choice(SPECIALS) if rng.random() < 0.1 else text
+
+def large_resume(rng, scale):
+    data = random_resume(rng, scale)
+    for section in SECTION_KEYS:
+        for entry in data[section]:
+            for name, value in entry.items():
+                if isinstance(value, list):
+                    entry[name] = [realistic_text(rng, 18) for _ in value]
+                elif isinstance(value, str):
+                    entry[name] = realistic_text(rng, 4)
+    return data
+
+def _strings(data):
+    for section in SECTION_KEYS:
+        for entry in data[section]:
+            for value in entry.values():
+                yield from value if isinstance(value, list) else [value]
+
+def timed_ms(fn, items, repeat):
+    started = time.perf_counter()
+    for i in range(repeat):
+        fn(items[i % len(items)])
+    return (time.perf_counter() - started) * 1000.0 / repeat
+
+def benchmark(renders, scale, seed):
+    """Per template: the normalization pass and the render it feeds. Filters: escaping every string of a large
+    resume with the old per-call filters vs the precompiled ones. model_dump: the .dict() round trip main.py skips."""
+    generator = ResumeGenerator()
+    rng = random.Random(seed)
+    resumes = [ResumeData(**large_resume(rng, scale)) for _ in range(20)]
+    views = [prepare_resume_data(resume) for resume in resumes]
+    dumps = [resume.model_dump() for resume in resumes]
+    report = {"bullets_per_resume": round(sum(len(e["description_points"]) for v in views
+                                              for s in ("work_experience", "projects") for e in v[s]) / len(views), 1),
+              "prepare_ms": round(timed_ms(prepare_resume_data, resumes, renders), 3),
+              "model_dump_ms": round(timed_ms(lambda r: r.model_dump(), resumes, renders), 3),
+              "filters": {
+                  "reference_ms": round(timed_ms(lambda d: [(reference_escape_latex(v), reference_safe_latex(v)) for v in _strings(d)], dumps, renders), 3),
+                  "precompiled_ms": round(timed_ms(lambda d: [(escape_latex(v), safe_latex(v)) for v in _strings(d)], dumps, renders), 3),
+              },
+              "templates": {}}
+    for name in ("professional", "modern_line", "one_column", "elegant"):
+        template = generator.env.get_template(f"{name}/{name}.tex")
+        render_ms = timed_ms(lambda view: template.render(resume_data=view), views, renders)
+        report["templates"][name] = {"render_ms": round(render_ms, 3), "prepare_plus_render_ms": round(report["prepare_ms"] + render_ms, 3)}
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Fuzz-checks ResumeData normalization and benchmarks template rendering.")
+    parser.add_argument("--cases", type=int, default=1000, help="Fuzz cases per check")
+    parser.add_argument("--renders", type=int, default=200, help="Renders per template and path in the benchmark")
+    parser.add_argument("--scale", type=int, default=3, help="Size multiplier for benchmark resumes (3 = a long resume)")
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = check_filters(rng, args.cases) + check_views(rng, args.cases)
+    report = {"fuzz_cases": args.cases, "failures": [repr(f)[:200] for f in failures[:20]], "failure_count": len(failures),
+              "benchmark": benchmark(args.renders, args.scale, args.seed)}
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+import os
+import sys
+import csv
+import json
+import time
+import socket
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+
+# Open-loop load generator for the resume-engine (/generate) and the AI pipelines.
+#
+# Requests arrive as a Poisson process at each offered rate, independently of how fast earlier ones complete,
+# and latency is measured from the scheduled arrival time, so queueing shows up instead of being hidden.
+# Each rate step reports achieved throughput, latency percentiles and error rate; the first step that misses
+# the throughput, error or latency objective is reported as the saturation point. The sweep is repeated per
+# core count by pinning the spawned engine (or pipeline processes) to that many CPUs.
+#
+# Examples:
+#   python load_test.py engine --spawn-engine --stub-compiler --cores 1,2 --rates 2,4,8,16
+#   python load_test.py scripts --cores 1,2,4 --rates 0.5,1,2,4       (pipelines against the model stand-in)
+#   python load_test.py api --url http://127.0.0.1:8080 --rates 0.2,0.5,1
+
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOURCES_DIR = os.path.abspath(os.path.join(ENGINE_DIR, "..", "src", "main", "resources"))
+sys.path.append(os.path.join(RESOURCES_DIR, "scripts", "shared"))
+from telemetry import percentile  # The pipelines' own report helper, so both report percentiles alike
+
+TEMPLATES = ["professional", "modern_line", "one_column", "elegant"]
+
+# Default request mixes: share of each request kind per target
+DEFAULT_MIXES = {
+    "engine": {"generate": 1.0},
+    "scripts": {"tailor": 0.35, "evaluate": 0.3, "coverletter": 0.2, "interview": 0.15},
+    "api": {"tailor": 0.3, "evaluate": 0.25, "coverletter": 0.15, "interview": 0.1, "generate": 0.2},
+}
+
+SCRIPTS = {
+    "tailor": "scripts/tailor.py",
+    "evaluate": "scripts1/evaluate.py",
+    "coverletter": "scripts2/coverletter.py",
+    "interview": "scripts3/interview_generator.py",
+}
+
+API_ENDPOINTS = {
+    "tailor": "/api/v1/tailor",
+    "evaluate": "/api/v1/evaluate-resume",
+    "coverletter": "/api/v1/generate-cover-letter",
+    "interview": "/api/v1/interview/generate",
+    "generate": "/api/v1/generate",
+}
+
+# --- PAYLOADS ---
+
+SKILLS = ["Python", "Java", "SQL", "Docker", "Kubernetes", "AWS", "React", "TypeScript", "PostgreSQL", "Redis",
+          "Kafka", "Spring Boot", "FastAPI", "Terraform", "CI/CD", "GraphQL", "C++", "Go", "Pandas", "Airflow"]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimized", "Automated", "Scaled", "Reduced", "Shipped", "Mentored"]
+OBJECTS = ["a payments API", "the data pipeline", "search ranking", "the CI/CD system", "an internal analytics tool",
+           "the mobile backend", "a caching layer", "on-call tooling", "the onboarding flow", "a recommendation service"]
+IMPACTS = ["cutting latency by 40%", "saving $120k/year", "for 2M+ users", "with 99.95% uptime", "in 6 weeks",
+           "reducing incidents by 30%", "across 4 teams", "improving conversion by 12%"]
+
+JOB_DESCRIPTIONS = [
+    "Senior Backend Engineer at Globex. Required: Python, SQL, REST APIs, Docker, 5+ years of experience. "
+    "Preferred: Kubernetes, AWS, Kafka. You will design scalable services, mentor engineers and own on-call.",
+    "Full Stack Developer at Initech. Required: React, TypeScript, Node.js, PostgreSQL. Preferred: GraphQL, CI/CD. "
+    "Collaborate with designers and product managers in a fast-paced startup environment.",
+    "Data Engineer at Umbrella Corp. Required: Python, Airflow, SQL, Spark. Preferred: Terraform, AWS, dbt. "
+    "Build reliable batch and streaming pipelines; strong communication and ownership expected.",
+    "Java Developer at Hooli. Required: Java, Spring Boot, Microservices, SQL. Preferred: Docker, Kubernetes, Redis. "
+    "Work in an agile team delivering customer-facing features with high code quality & test coverage (80%+).",
+]
+
+def bullet(rng):
+    # Includes characters the templates must escape (%, $, &, #, _)
+    return f"{rng.choice(VERBS)} {rng.choice(OBJECTS)} {rng.choice(IMPACTS)} using {rng.choice(SKILLS)} & {rng.choice(SKILLS)}"
+
+def make_resume_data(rng):
+    """A synthetic ResumeData payload; sizes follow a small/typical/long mix of real resumes."""
+    jobs, projects, bullets = rng.choices([(1, 1, 3), (3, 2, 4), (5, 4, 6)], weights=[0.3, 0.5, 0.2])[0]
+    return {
+        "personal_info": {"full_name": f"Candidate {rng.randint(1, 10**6)}", "address": "Pune, India",
+                          "email": "candidate@example.com", "phone": "9876543210", "github_handle": "candidate",
+                          "linkedin_handle": "candidate", "portfolio_url": None, "extra_info": None},
+        "education": [{"degree": "B.Tech Computer Science", "institution": "State Institute of Technology",
+                       "start_year": "2015", "end_year": "2019", "gpa": "8.7/10"}],
+        "work_experience": [{"job_title": rng.choice(["Software Engineer", "Backend Developer", "Data Engineer"]),
+                             "company_name": f"Company_{i} & Co", "location": "Remote", "start_date": f"Jan {2019 + i}",
+                             "end_date": "Present" if i == 0 else f"Dec {2019 + i}",
+                             "description_points": [bullet(rng) for _ in range(bullets)]} for i in range(jobs)],
+        "projects": [{"project_name": f"Project #{i + 1}", "start_date": "2021", "end_date": "2022",
+                      "tech_stack": ", ".join(rng.sample(SKILLS, 3)),
+                      "description_points": [bullet(rng) for _ in range(max(2, bullets - 2))]} for i in range(projects)],
+        "skills": [{"name": "Languages", "value": ", ".join(rng.sample(SKILLS, 6))},
+                   {"name": "Tools", "value": ", ".join(rng.sample(SKILLS, 5))}],
+        "achievements": [{"description": "Top 1% in a national coding contest (rank #42)"}],
+        "certifications": [{"name": "AWS Certified Developer", "issuer": "Amazon", "date": "2022"}],
+    }
+
+def resume_text(data):
+    """The plain-text resume the AI pipelines receive, derived from a ResumeData payload."""
+    info = data["personal_info"]
+    lines = [info["full_name"], f"{info['email']} | {info['phone']}", "", "EXPERIENCE"]
+    for job in data["work_experience"]:
+        lines.append(f"{job['job_title']}, {job['company_name']} ({job['start_date']} - {job['end_date']})")
+        lines += [f"- {point}" for point in job["description_points"]]
+    lines += ["", "PROJECTS"]
+    for project in data["projects"]:
+        lines.append(f"{project['project_name']} [{project['tech_stack']}]")
+        lines += [f"- {point}" for point in project["description_points"]]
+    lines += ["", "SKILLS"] + [f"{s['name']}: {s['value']}" for s in data["skills"]]
+    return "\n".join(lines)
+
+def make_request(rng, mix):
+    kind = rng.choices(list(mix), weights=list(mix.values()))[0]
+    data = make_resume_data(rng)
+    return kind, {"resume_data": data, "template_name": rng.choice(TEMPLATES),
+                  "resume": resume_text(data), "job_description": rng.choice(JOB_DESCRIPTIONS)}
+
+# --- TARGETS ---
+
+def http_post(url, body, content_type, timeout):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+        return response.status
+
+class EngineTarget:
+    """POSTs ResumeData to the resume-engine's /generate and reads the whole zip."""
+
+    def __init__(self, url, timeout):
+        self.url, self.timeout = url.rstrip("/"), timeout
+
+    def send(self, kind, payload):
+        body = json.dumps({"template_name": payload["template_name"], "resume_data": payload["resume_data"]}).encode("utf-8")
+        http_post(self.url + "/generate", body, "application/json", self.timeout)
+
+class ScriptsTarget:
+    """Runs the pipeline scripts the way AiService does (one python3 process per request, input on stdin)."""
+
+    def __init__(self, cores, env, timeout):
+        self.cores, self.env, self.timeout = cores, env, timeout
+
+    def send(self, kind, payload):
+        stdin = payload["job_description"] if kind == "interview" else \
+            payload["resume"] + "\n---DELIMITER---\n" + payload["job_description"]
+        completed = subprocess.run([sys.executable, os.path.join(RESOURCES_DIR, SCRIPTS[kind])], input=stdin,
+                                   capture_output=True, text=True, env=self.env, timeout=self.timeout,
+                                   preexec_fn=pin_to(self.cores))
+        if completed.returncode != 0:
+            raise RuntimeError(f"{kind} exited with {completed.returncode}: {completed.stderr.strip()[-200:]}")
+
+class ApiTarget:
+    """Drives the Java backend's public endpoints (which run the real pipelines and the engine behind them)."""
+
+    def __init__(self, url, timeout):
+        self.url, self.timeout = url.rstrip("/"), timeout
+
+    def send(self, kind, payload):
+        if kind == "interview":
+            body, content_type = payload["job_description"].encode("utf-8"), "text/plain"
+        elif kind == "generate":
+            body = json.dumps({"template_name": payload["template_name"], "resume_data": payload["resume_data"]}).encode("utf-8")
+            content_type = "application/json"
+        elif kind == "tailor":
+            body = json.dumps({"resumeText": payload["resume"], "jobDescription": payload["job_description"]}).encode("utf-8")
+            content_type = "application/json"
+        else:
+            body = json.dumps({"resume": payload["resume"], "jobDescription": payload["job_description"]}).encode("utf-8")
+            content_type = "application/json"
+        http_post(self.url + API_ENDPOINTS[kind], body, content_type, self.timeout)
+
+def pin_to(cores):
+    """preexec_fn restricting a child process to the first `cores` CPUs (Linux only; otherwise unpinned)."""
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        return None
+    return lambda: os.sched_setaffinity(0, range(cores))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def spawn_engine(cores, workers, stub_compiler, log_path):
+    """Starts a local resume-engine pinned to `cores` CPUs and waits for its health check."""
+    port = free_port()
+    env = dict(os.environ)
+    if stub_compiler:
+        env["PDFLATEX_PATH"] = os.path.join(ENGINE_DIR, "stub_pdflatex.py")
+    log = open(log_path, "a")
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+                                "--workers", str(workers), "--log-level", "warning"],
+                               cwd=ENGINE_DIR, env=env, stdout=log, stderr=log, preexec_fn=pin_to(cores))
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/", timeout=1):
+                return process, url
+        except (urllib.error.URLError, ConnectionError, OSError):
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Resume engine did not start; see {log_path}")
+
+# --- OPEN-LOOP DRIVER ---
+
+def run_step(target, rate, duration, mix, rng, max_outstanding, service_s=0.0):
+    """Offers `rate` requests/second for `duration` seconds; latencies count from each scheduled arrival."""
+    arrivals, t = [], rng.expovariate(rate)
+    while t < duration:
+        arrivals.append((t, make_request(rng, mix)))
+        t += rng.expovariate(rate)
+
+    results, lock, threads = [], threading.Lock(), []
+    outstanding = threading.BoundedSemaphore(max_outstanding)
+
+    def fire(scheduled, kind, payload):
+        error = None
+        try:
+            target.send(kind, payload)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+        finally:
+            outstanding.release()
+        finished = time.perf_counter()
+        with lock:
+            results.append({"kind": kind, "latency_ms": (finished - scheduled) * 1000.0, "finished": finished, "error": error})
+
+    started = time.perf_counter()
+    for offset, (kind, payload) in arrivals:
+        scheduled = started + offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if not outstanding.acquire(blocking=False):
+            # The client itself is saturated: count the arrival as failed rather than delaying the schedule
+            results.append({"kind": kind, "latency_ms": None, "finished": time.perf_counter(), "error": "dropped: too many outstanding"})
+            continue
+        thread = threading.Thread(target=fire, args=(scheduled, kind, payload), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+    ok = [r for r in results if r["error"] is None]
+    latencies = [r["latency_ms"] for r in ok]
+    # The window ends when the backlog has drained; the unloaded service time (from the warm-up) is discounted so
+    # that a short step of an unsaturated system is not penalised for its last request still in flight at the end
+    window = max([duration] + [r["finished"] - started - service_s for r in ok])
+    errors = {}
+    for r in results:
+        if r["error"]:
+            errors[r["error"].split(":")[0]] = errors.get(r["error"].split(":")[0], 0) + 1
+    return {
+        "offered_rps": rate,
+        # Poisson arrivals vary around the offered rate; short steps are judged against what actually arrived
+        "arrival_rps": round(len(arrivals) / duration, 3),
+        "requests": len(results),
+        "achieved_rps": round(len(ok) / window, 3),
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "p50_ms": round(percentile(latencies, 50) or 0, 1),
+        "p95_ms": round(percentile(latencies, 95) or 0, 1),
+        "p99_ms": round(percentile(latencies, 99) or 0, 1),
+        "by_kind_p95_ms": {k: round(percentile([r["latency_ms"] for r in ok if r["kind"] == k], 95), 1) for k in mix
+                           if any(r["kind"] == k for r in ok)},
+        "errors": errors,
+    }
+
+def saturation(steps, slo_ms, max_error_rate):
+    """The first rate whose throughput falls 10% short of the arrival rate, or that breaks the error/latency objective."""
+    sustained = None
+    for step in steps:
+        reasons = []
+        if step["achieved_rps"] < 0.9 * step["arrival_rps"]:
+            reasons.append("throughput")
+        if step["error_rate"] > max_error_rate:
+            reasons.append("errors")
+        if slo_ms and step["p95_ms"] > slo_ms:
+            reasons.append("p95_latency")
+        if reasons:
+            return {"saturated_at_rps": step["offered_rps"], "reasons": reasons, "max_sustained_rps": sustained}
+        sustained = step["offered_rps"]
+    return {"saturated_at_rps": None, "reasons": [], "max_sustained_rps": sustained}
+
+def environment_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ENGINE_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {"cpu_count": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform(), "git_commit": commit}
+
+def parse_mix(text, target):
+    if not text:
+        return DEFAULT_MIXES[target]
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test for the resume-engine and the AI pipelines.")
+    parser.add_argument("target", choices=["engine", "scripts", "api"], help="What to drive")
+    parser.add_argument("--url", help="Base URL of an already running engine (engine) or Java backend (api)")
+    parser.add_argument("--spawn-engine", action="store_true", help="Start a local engine per core count (engine target)")
+    parser.add_argument("--engine-workers", type=int, default=1, help="uvicorn workers for a spawned engine (start.sh runs 1)")
+    parser.add_argument("--stub-compiler", action="store_true", help="Use stub_pdflatex.py instead of pdflatex in a spawned engine")
+    parser.add_argument("--model-backend", choices=["standin", "gemini"], default="standin", help="Model backend for the scripts target")
+    parser.add_argument("--cores", default="", help="Comma-separated core counts to pin to (default: unpinned)")
+    parser.add_argument("--rates", default="0.5,1,2,4,8", help="Comma-separated offered rates (requests/second)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per rate step")
+    parser.add_argument("--mix", help="Request mix, e.g. tailor=0.5,evaluate=0.5 (default depends on target)")
+    parser.add_argument("--slo-p95-ms", type=float, help="p95 latency objective used for the saturation point")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Error rate objective used for the saturation point")
+    parser.add_argument("--max-outstanding", type=int, default=512, help="Client-side cap on in-flight requests")
+    parser.add_argument("--timeout", type=float, default=180, help="Per-request timeout in seconds")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured requests before each sweep")
+    parser.add_argument("--seed", type=int, default=1234, help="Random seed for arrivals and payloads")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--csv", help="Also write the latency-vs-throughput curve as CSV")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix, args.target)
+    rates = [float(r) for r in args.rates.split(",") if r.strip()]
+    core_counts = [int(c) for c in args.cores.split(",") if c.strip()] or [None]
+    if args.target in ("api",) or (args.target == "engine" and not args.spawn_engine):
+        if not args.url:
+            parser.error("--url is required unless --spawn-engine is used")
+        if core_counts != [None]:
+            print("Warning: --cores only applies to spawned engines and pipeline processes; ignoring.", file=sys.stderr)
+            core_counts = [None]
+
+    # Pipeline state (admission, caches, telemetry) goes to a scratch directory so a load test never touches real state
+    scratch = tempfile.mkdtemp(prefix="load_test_")
+    script_env = dict(os.environ, MODEL_BACKEND=args.model_backend, ADMISSION_STATE_DIR=scratch, STANDIN_STATE_DIR=scratch,
+                      JD_PREFETCH_DIR=os.path.join(scratch, "jd_prefetch"), MODEL_TELEMETRY_PATH=os.path.join(scratch, "model_calls.jsonl"),
+                      QUESTION_BANK_PATH=os.path.join(scratch, "question_bank.sqlite3"))
+
+    report = {"config": vars(args), "mix": mix, "environment": environment_info(), "results": []}
+    for cores in core_counts:
+        engine = None
+        if args.target == "engine":
+            if args.spawn_engine:
+                engine, url = spawn_engine(cores, args.engine_workers, args.stub_compiler, os.path.join(scratch, "engine.log"))
+            else:
+                url = args.url
+            target = EngineTarget(url, args.timeout)
+        elif args.target == "scripts":
+            target = ScriptsTarget(cores, script_env, args.timeout)
+        else:
+            target = ApiTarget(args.url, args.timeout)
+
+        try:
+            rng, warmup_s = random.Random(args.seed), []
+            for _ in range(args.warmup):
+                try:
+                    warmup_started = time.perf_counter()
+                    target.send(*make_request(rng, mix))
+                    warmup_s.append(time.perf_counter() - warmup_started)
+                except Exception as e:
+                    print(f"Warning: warm-up request failed: {e}", file=sys.stderr)
+            service_s = min(warmup_s, default=0.0)
+            steps = []
+            for rate in rates:
+                step = run_step(target, rate, args.duration, mix, random.Random(f"{args.seed}-{rate}"), args.max_outstanding, service_s)
+                print(f"cores={cores or 'all'} offered={rate}/s achieved={step['achieved_rps']}/s "
+                      f"p95={step['p95_ms']}ms errors={step['error_rate']:.1%}", file=sys.stderr)
+                steps.append(step)
+        finally:
+            if engine:
+                engine.terminate()
+                engine.wait(timeout=10)
+        report["results"].append({"cores": cores or os.cpu_count(), "pinned": cores is not None,
+                                  "unloaded_service_ms": round(service_s * 1000.0, 1), "steps": steps,
+                                  "saturation": saturation(steps, args.slo_p95_ms, args.max_error_rate)})
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["cores", "offered_rps", "arrival_rps", "achieved_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate"])
+            for result in report["results"]:
+                for step in result["steps"]:
+                    writer.writerow([result["cores"], step["offered_rps"], step["arrival_rps"], step["achieved_rps"], step["p50_ms"],
+                                     step["p95_ms"], step["p99_ms"], step["error_rate"]])
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
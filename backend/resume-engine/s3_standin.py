@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import unquote
+
+from app.artifact_store import sigv4_headers, CHUNK_BYTES
+
+# A local stand-in for an S3-compatible object store, for testing and benchmarking the S3 artifact backend
+# without a cloud account: path-style PUT/GET/HEAD of objects, stored as files under one directory. Requests must
+# carry a valid SigV4 signature for the configured credentials, and signed payload hashes are checked, like S3.
+#
+#   python s3_standin.py --port 9000 --dir /tmp/s3 &
+#   ARTIFACT_STORE=s3 S3_ENDPOINT_URL=http://127.0.0.1:9000 S3_BUCKET=artifacts \
+#   S3_ACCESS_KEY_ID=standin S3_SECRET_ACCESS_KEY=standin-secret uvicorn app.main:app
+
+ACCESS_KEY = os.getenv("S3_STANDIN_ACCESS_KEY", "standin")
+SECRET_KEY = os.getenv("S3_STANDIN_SECRET_KEY", "standin-secret")
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    root = None
+    latency_s = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _path(self):
+        return os.path.join(self.root, *[part for part in unquote(self.path).split("/") if part not in ("", ".", "..")])
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _authorized(self):
+        """Recomputes the SigV4 signature from the request's own signed headers and date."""
+        auth = self.headers.get("Authorization", "")
+        try:
+            fields = dict(part.strip().split("=", 1) for part in auth[len("AWS4-HMAC-SHA256 "):].split(","))
+            names = fields["SignedHeaders"].split(";")
+            access_key, date, region = fields["Credential"].split("/")[:3]
+            now = datetime.strptime(self.headers["x-amz-date"], "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+        except (KeyError, ValueError):
+            return False
+        extra = {name: self.headers[name] for name in names
+                 if name not in ("host", "x-amz-content-sha256", "x-amz-date") and self.headers[name] is not None}
+        expected = sigv4_headers(self.command, f"http://{self.headers['Host']}{self.path}", region, ACCESS_KEY, SECRET_KEY,
+                                 self.headers.get("x-amz-content-sha256", ""), extra, now)
+        return access_key == ACCESS_KEY and expected["authorization"] == auth
+
+    def _begin(self):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if not self._authorized():
+            self._reply(403, b"<Error><Code>SignatureDoesNotMatch</Code></Error>")
+            return False
+        return True
+
+    def do_PUT(self):
+        if not self._begin():
+            return
+        path, length = self._path(), int(self.headers.get("Content-Length", "0"))
+        expected = self.headers.get("x-amz-content-sha256")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        digest, remaining = hashlib.sha256(), length
+        with os.fdopen(fd, "wb") as f:
+            while remaining:
+                chunk = self.rfile.read(min(CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                digest.update(chunk)
+                remaining -= len(chunk)
+        if remaining or (expected != "UNSIGNED-PAYLOAD" and digest.hexdigest() != expected):
+            os.remove(temp_path)
+            self._reply(400, b"<Error><Code>BadDigest</Code></Error>")
+            return
+        os.replace(temp_path, path)
+        self._reply(200, headers={"ETag": '"' + digest.hexdigest()[:32] + '"'})
+
+    def _send_object(self, with_body):
+        if not self._begin():
+            return
+        path = self._path()
+        if not os.path.isfile(path):
+            self._reply(404, b"<Error><Code>NoSuchKey</Code></Error>")
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Type", "application/octet-stream")
+        self.end_headers()
+        if with_body:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+                    self.wfile.write(chunk)
+
+    def do_GET(self):
+        self._send_object(True)
+
+    def do_HEAD(self):
+        self._send_object(False)
+
+def serve(directory, port=0, latency_ms=0.0):
+    """Starts the stand-in on a background thread; returns the server (its port is server.server_address[1])."""
+    handler = type("BoundHandler", (Handler,), {"root": os.path.abspath(directory), "latency_s": latency_ms / 1000.0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local S3-compatible stand-in for the artifact store.")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "s3_standin"))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every request, like a network round trip")
+    args = parser.parse_args()
+    server = serve(args.dir, args.port, args.latency_ms)
+    print(f"S3 stand-in on http://127.0.0.1:{server.server_address[1]} storing under {args.dir}", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+import os
+import sys
+import time
+
+# Stand-in for pdflatex used by load_test.py (PDFLATEX_PATH=/path/to/stub_pdflatex.py) to isolate the
+# resume-engine's own overhead from TeX. It burns CPU for STUB_PDFLATEX_CPU_MS per run (the start-up, preamble
+# and font loading a real compile pays) plus STUB_PDFLATEX_PAGE_MS per page, and writes a minimal PDF next to
+# the .tex file with one page per \clearpage-separated part. For an application packet it also writes the
+# letter's page count (1) to <job>.split, as the packet template does.
+
+CPU_MS = float(os.getenv("STUB_PDFLATEX_CPU_MS", "120"))
+PAGE_MS = float(os.getenv("STUB_PDFLATEX_PAGE_MS", "0"))
+
+def minimal_pdf(pages):
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objects = ["<</Type/Catalog/Pages 2 0 R>>", f"<</Type/Pages/Kids[{kids}]/Count {pages}>>"]
+    objects += ["<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>"] * pages
+    pdf, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj{body}endobj\n".encode()
+    xref = "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    return pdf + (f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n{xref}"
+                  f"trailer<</Size {len(objects) + 1}/Root 1 0 R>>\nstartxref\n{len(pdf)}\n%%EOF\n").encode()
+
+def main():
+    tex_files = [arg for arg in sys.argv[1:] if arg.endswith(".tex")]
+    if not tex_files or not os.path.exists(tex_files[0]):
+        print("! Stub pdflatex: no input .tex file found.")
+        sys.exit(1)
+
+    with open(tex_files[0], encoding="utf-8") as f:
+        source = f.read()
+    pages = 1 + source.count("\\clearpage")
+
+    deadline = time.process_time() + (CPU_MS + PAGE_MS * pages) / 1000.0
+    counter = 0
+    while time.process_time() < deadline:
+        counter += 1
+
+    job = os.path.splitext(tex_files[0])[0]
+    with open(job + ".pdf", "wb") as f:
+        f.write(minimal_pdf(pages))
+    if "\\jobname.split" in source:
+        with open(job + ".split", "w") as f:
+            f.write("1\n")
+    print("Output written (stub pdflatex).")
+
+if __name__ == "__main__":
+    main()
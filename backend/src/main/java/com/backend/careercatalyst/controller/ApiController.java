@@ -6,10 +6,14 @@ import com.backend.careercatalyst.dto.EvaluationRequest;
 import com.backend.careercatalyst.dto.EvaluationResponse;
 import com.backend.careercatalyst.dto.GenerateRequest;
 import com.backend.careercatalyst.dto.InterviewResponse;
+import com.backend.careercatalyst.dto.JdPrefetchRequest;
+import com.backend.careercatalyst.dto.RankJobsRequest;
+import com.backend.careercatalyst.dto.ResumeData;
 import com.backend.careercatalyst.dto.TailorRequest; // <-- NEW
 import com.backend.careercatalyst.dto.TailorResponse; // <-- NEW
 import com.backend.careercatalyst.service.AiService; // <-- NEW
 import com.backend.careercatalyst.service.ResumeGenerationService;
+import com.fasterxml.jackson.databind.ObjectMapper;
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.core.io.Resource;
 import org.springframework.http.ContentDisposition;
@@ -18,30 +22,40 @@ import org.springframework.http.HttpStatus;
 import org.springframework.http.MediaType;
 import org.springframework.http.ResponseEntity;
 import org.springframework.web.bind.annotation.*;
+import org.springframework.web.multipart.MultipartFile;
 import reactor.core.publisher.Mono;
 import reactor.core.scheduler.Schedulers; // <-- NEW
 import com.backend.careercatalyst.dto.InterviewResponse;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.util.HashMap;
 import java.util.Map;
 
 @RestController
 @RequestMapping("/api/v1")
 public class ApiController {
 
+    // Requests carrying "X-Profile: 1" are profiled end to end by the pipeline scripts or the resume engine
+    private static final String PROFILE_HEADER = "X-Profile";
+
     private final ResumeGenerationService resumeGenerationService;
     private final AiService aiService; // <-- NEW: Inject the AiService
+    private final ObjectMapper objectMapper;
 
     @Autowired
-    public ApiController(ResumeGenerationService resumeGenerationService, AiService aiService) {
+    public ApiController(ResumeGenerationService resumeGenerationService, AiService aiService, ObjectMapper objectMapper) {
         this.resumeGenerationService = resumeGenerationService;
         this.aiService = aiService;
+        this.objectMapper = objectMapper;
     }
 
     /**
      * Endpoint to generate a new resume.
      */
     @PostMapping("/generate")
-    public Mono<ResponseEntity<Map<String, String>>> generateResume(@RequestBody GenerateRequest generateRequest) {
-        return resumeGenerationService.generateAndSaveResume(generateRequest)
+    public Mono<ResponseEntity<Map<String, String>>> generateResume(@RequestBody GenerateRequest generateRequest,
+                                                                    @RequestHeader(value = PROFILE_HEADER, required = false) String profile) {
+        return resumeGenerationService.generateAndSaveResume(generateRequest, "1".equals(profile))
                 .map(response -> ResponseEntity.ok(response))
                 .onErrorResume(e -> {
                     e.printStackTrace();
@@ -53,8 +67,9 @@ public class ApiController {
      * Endpoint to get a PDF preview of the resume.
      */
     @PostMapping("/preview")
-    public Mono<ResponseEntity<byte[]>> previewResume(@RequestBody GenerateRequest generateRequest) {
-        return resumeGenerationService.getResumePreview(generateRequest)
+    public Mono<ResponseEntity<byte[]>> previewResume(@RequestBody GenerateRequest generateRequest,
+                                                      @RequestHeader(value = PROFILE_HEADER, required = false) String profile) {
+        return resumeGenerationService.getResumePreview(generateRequest, "1".equals(profile))
                 .map(pdfBytes -> {
                     HttpHeaders headers = new HttpHeaders();
                     headers.setContentType(MediaType.APPLICATION_PDF);
@@ -74,10 +89,13 @@ public class ApiController {
      * @return A ResponseEntity with the AI-generated suggestions.
      */
     @PostMapping("/tailor")
-    public Mono<ResponseEntity<TailorResponse>> tailorResume(@RequestBody TailorRequest request) {
+    public Mono<ResponseEntity<TailorResponse>> tailorResume(@RequestBody TailorRequest request,
+                                                             @RequestHeader(value = PROFILE_HEADER, required = false) String profile,
+                                                             @RequestHeader(value = HttpHeaders.CACHE_CONTROL, required = false) String cacheControl) {
         // Since running a Python script is a blocking operation, we wrap it
         // and run it on a dedicated thread pool to keep the controller non-blocking.
-        return Mono.fromCallable(() -> aiService.getTailoredResume(request.getResumeText(), request.getJobDescription()))
+        return Mono.fromCallable(() -> aiService.getTailoredResume(request.getResumeText(), request.getJobDescription(), request.getJdHandle(),
+                        request.getSessionId(), "1".equals(profile), isRefresh(cacheControl)))
                 .subscribeOn(Schedulers.boundedElastic())
                 .map(tailoredContent -> ResponseEntity.ok(new TailorResponse(tailoredContent)))
                 .onErrorResume(e -> {
@@ -86,6 +104,43 @@ public class ApiController {
                     return Mono.just(ResponseEntity.status(HttpStatus.INTERNAL_SERVER_ERROR).body(errorResponse));
                 });
     }
+
+    /**
+     * Endpoint to tailor a resume into structured ResumeData instead of free-form LaTeX.
+     * If a templateName is given, the result is also rendered by the resume engine like /generate.
+     * @param request The request body containing the resume, job description and optional template name.
+     * @return A ResponseEntity with the tailored resumeData (plus download URLs when rendered).
+     */
+    @PostMapping("/tailor/resume-data")
+    public Mono<ResponseEntity<Map<String, Object>>> tailorResumeData(@RequestBody TailorRequest request,
+                                                                      @RequestHeader(value = PROFILE_HEADER, required = false) String profile,
+                                                                      @RequestHeader(value = HttpHeaders.CACHE_CONTROL, required = false) String cacheControl) {
+        return Mono.fromCallable(() -> objectMapper.readValue(
+                        aiService.getTailoredResumeData(request.getResumeText(), request.getJobDescription(), request.getJdHandle(),
+                                request.getSessionId(), "1".equals(profile), isRefresh(cacheControl)), ResumeData.class))
+                .subscribeOn(Schedulers.boundedElastic())
+                .flatMap(resumeData -> {
+                    Map<String, Object> body = new HashMap<>();
+                    body.put("resumeData", resumeData);
+                    if (request.getTemplateName() == null || request.getTemplateName().isBlank()) {
+                        return Mono.just(ResponseEntity.ok(body));
+                    }
+                    GenerateRequest generateRequest = new GenerateRequest();
+                    generateRequest.setTemplateName(request.getTemplateName());
+                    generateRequest.setResumeData(resumeData);
+                    return resumeGenerationService.generateAndSaveResume(generateRequest, "1".equals(profile))
+                            .map(urls -> {
+                                body.putAll(urls);
+                                return ResponseEntity.ok(body);
+                            });
+                })
+                .onErrorResume(e -> {
+                    e.printStackTrace();
+                    Map<String, Object> errorBody = new HashMap<>();
+                    errorBody.put("error", e.getMessage());
+                    return Mono.just(ResponseEntity.status(HttpStatus.INTERNAL_SERVER_ERROR).body(errorBody));
+                });
+    }
     // ---------------------------------
     // --- NEW: AI ATS EVALUATOR ENDPOINT ---
     /**
@@ -94,9 +149,12 @@ public class ApiController {
      * @return A ResponseEntity with the AI-generated evaluation.
      */
     @PostMapping("/evaluate-resume")
-    public Mono<ResponseEntity<EvaluationResponse>> evaluateResume(@RequestBody EvaluationRequest request) {
+    public Mono<ResponseEntity<EvaluationResponse>> evaluateResume(@RequestBody EvaluationRequest request,
+                                                                   @RequestHeader(value = PROFILE_HEADER, required = false) String profile,
+                                                                   @RequestHeader(value = HttpHeaders.CACHE_CONTROL, required = false) String cacheControl) {
         // Wrap the blocking script call in a non-blocking Mono
-        return Mono.fromCallable(() -> aiService.getEvaluationResult(request.getResume(), request.getJobDescription()))
+        return Mono.fromCallable(() -> aiService.getEvaluationResult(request.getResume(), request.getJobDescription(), request.getJdHandle(),
+                        "1".equals(profile), isRefresh(cacheControl)))
                 .subscribeOn(Schedulers.boundedElastic())
                 .map(evaluationContent -> ResponseEntity.ok(new EvaluationResponse(evaluationContent)))
                 .onErrorResume(e -> {
@@ -106,6 +164,123 @@ public class ApiController {
                 });
     }
 
+    /**
+     * Endpoint for the instant local ATS keyword score, returned in milliseconds while the full report is pending.
+     * @param request The request body containing the resume and job description.
+     * @return A ResponseEntity whose evaluation is a JSON string with the score and matched/missing keywords.
+     */
+    @PostMapping("/evaluate-resume/quick")
+    public Mono<ResponseEntity<EvaluationResponse>> quickEvaluateResume(@RequestBody EvaluationRequest request) {
+        return Mono.fromCallable(() -> aiService.getQuickEvaluationScore(request.getResume(), request.getJobDescription()))
+                .subscribeOn(Schedulers.boundedElastic())
+                .map(scoreJson -> ResponseEntity.ok(new EvaluationResponse(scoreJson)))
+                .onErrorResume(e -> {
+                    e.printStackTrace();
+                    EvaluationResponse errorResponse = new EvaluationResponse("Error: " + e.getMessage());
+                    return Mono.just(ResponseEntity.status(HttpStatus.INTERNAL_SERVER_ERROR).body(errorResponse));
+                });
+    }
+
+    /**
+     * Endpoint to rank one resume against many saved job descriptions in a single pass, without generating any
+     * report. The full report of a posting the user opens comes from /evaluate-resume with its jdHandle.
+     * @param request The request body containing the resume, the job descriptions and optional analysis settings.
+     * @return A ResponseEntity with the ranked postings (score, coverage, matched/missing keywords) and run stats.
+     */
+    @PostMapping("/evaluate-resume/rank")
+    public Mono<ResponseEntity<Map<String, Object>>> rankJobDescriptions(@RequestBody RankJobsRequest request) {
+        return Mono.fromCallable(() -> objectMapper.readValue(
+                        aiService.rankJobDescriptions(request.getResume(), request.getJobDescriptions(), request.getAnalysis(),
+                                request.getPrefetchTop()), Map.class))
+                .subscribeOn(Schedulers.boundedElastic())
+                .map(result -> {
+                    Map<String, Object> body = new HashMap<>();
+                    result.forEach((key, value) -> body.put(String.valueOf(key), value));
+                    return ResponseEntity.ok(body);
+                })
+                .onErrorResume(e -> {
+                    e.printStackTrace();
+                    Map<String, Object> errorBody = new HashMap<>();
+                    errorBody.put("error", e.getMessage());
+                    return Mono.just(ResponseEntity.status(HttpStatus.INTERNAL_SERVER_ERROR).body(errorBody));
+                });
+    }
+
+    /**
+     * Endpoint to start the job description analysis as soon as the JD is provided, while the user is still
+     * picking a resume. Returns a handle (and per-pipeline status) to send with the later tailor/evaluate request.
+     * @param request The request body containing the job description and optional pipelines ("tailor", "evaluate").
+     * @return A ResponseEntity with the handle and the prefetch status of each pipeline.
+     */
+    @PostMapping("/jd/prefetch")
+    public Mono<ResponseEntity<Map<String, Object>>> prefetchJobDescription(@RequestBody JdPrefetchRequest request) {
+        return Mono.fromCallable(() -> objectMapper.readValue(
+                        aiService.prefetchJobDescriptionAnalysis(request.getJobDescription(), request.getPipelines()), Map.class))
+                .subscribeOn(Schedulers.boundedElastic())
+                .map(result -> {
+                    Map<String, Object> body = new HashMap<>();
+                    result.forEach((key, value) -> body.put(String.valueOf(key), value));
+                    return ResponseEntity.ok(body);
+                })
+                .onErrorResume(e -> {
+                    e.printStackTrace();
+                    Map<String, Object> errorBody = new HashMap<>();
+                    errorBody.put("error", e.getMessage());
+                    return Mono.just(ResponseEntity.status(HttpStatus.INTERNAL_SERVER_ERROR).body(errorBody));
+                });
+    }
+
+    /**
+     * Endpoint to turn an uploaded resume (PDF, DOCX, TeX or text) into the plain text the AI features take,
+     * plus its detected sections, so the client can reuse the text instead of converting the file each time.
+     * @param file The uploaded resume file (multipart field "file").
+     * @return A ResponseEntity with the text, sections, source ("extracted" or "resume_json") and content hash.
+     */
+    @PostMapping(value = "/resume/ingest", consumes = MediaType.MULTIPART_FORM_DATA_VALUE)
+    public Mono<ResponseEntity<Map<String, Object>>> ingestResume(@RequestParam("file") MultipartFile file) {
+        String filename = file.getOriginalFilename() == null ? "" : file.getOriginalFilename();
+        int dot = filename.lastIndexOf('.');
+        // Keep only a safe extension: the script picks the extractor from it (or sniffs the content)
+        String extension = dot >= 0 ? filename.substring(dot).toLowerCase().replaceAll("[^a-z0-9.]", "") : "";
+        return Mono.fromCallable(() -> {
+                    Path tempFile = Files.createTempFile("resume_upload_", extension);
+                    try {
+                        file.transferTo(tempFile);
+                        return objectMapper.readValue(aiService.ingestResumeDocument(tempFile.toString()), Map.class);
+                    } finally {
+                        deleteQuietly(tempFile);
+                    }
+                })
+                .subscribeOn(Schedulers.boundedElastic())
+                .map(result -> {
+                    Map<String, Object> body = new HashMap<>();
+                    result.forEach((key, value) -> body.put(String.valueOf(key), value));
+                    return ResponseEntity.ok(body);
+                })
+                .onErrorResume(e -> {
+                    e.printStackTrace();
+                    Map<String, Object> errorBody = new HashMap<>();
+                    errorBody.put("error", e.getMessage());
+                    return Mono.just(ResponseEntity.status(HttpStatus.UNPROCESSABLE_ENTITY).body(errorBody));
+                });
+    }
+
+    /**
+     * "Cache-Control: no-cache" (a regenerate button) asks for a new run instead of a cached result; identical
+     * requests already in flight are still shared.
+     */
+    private static boolean isRefresh(String cacheControl) {
+        return cacheControl != null && cacheControl.toLowerCase().contains("no-cache");
+    }
+
+    private static void deleteQuietly(Path path) {
+        try {
+            Files.deleteIfExists(path);
+        } catch (Exception ignored) {
+            // Temp files are also cleaned up by the OS
+        }
+    }
+
     // --- NEW: AI COVER LETTER GENERATOR ENDPOINT ---
     /**
      * Endpoint to generate a cover letter based on a resume and job description.
@@ -113,9 +288,11 @@ public class ApiController {
      * @return A ResponseEntity with the AI-generated cover letter.
      */
     @PostMapping("/generate-cover-letter")
-    public Mono<ResponseEntity<CoverLetterResponse>> generateCoverLetter(@RequestBody CoverLetterRequest request) {
+    public Mono<ResponseEntity<CoverLetterResponse>> generateCoverLetter(@RequestBody CoverLetterRequest request,
+                                                                         @RequestHeader(value = HttpHeaders.CACHE_CONTROL, required = false) String cacheControl) {
         // Wrap the blocking script call in a non-blocking Mono
-        return Mono.fromCallable(() -> aiService.getGeneratedCoverLetter(request.getResume(), request.getJobDescription()))
+        return Mono.fromCallable(() -> aiService.getGeneratedCoverLetter(request.getResume(), request.getJobDescription(),
+                        isRefresh(cacheControl)))
                 .subscribeOn(Schedulers.boundedElastic())
                 .map(coverLetterContent -> ResponseEntity.ok(new CoverLetterResponse(coverLetterContent)))
                 .onErrorResume(e -> {
@@ -127,8 +304,9 @@ public class ApiController {
 
     // --- NEW: AI MOCK INTERVIEW ENDPOINT ---
     @PostMapping("/interview/generate")
-    public Mono<ResponseEntity<InterviewResponse>> generateInterviewQuestions(@RequestBody String jobDescription) {
-        return Mono.fromCallable(() -> aiService.getInterviewQuestions(jobDescription))
+    public Mono<ResponseEntity<InterviewResponse>> generateInterviewQuestions(@RequestBody String jobDescription,
+                                                                              @RequestHeader(value = HttpHeaders.CACHE_CONTROL, required = false) String cacheControl) {
+        return Mono.fromCallable(() -> aiService.getInterviewQuestions(jobDescription, isRefresh(cacheControl)))
                 .subscribeOn(Schedulers.boundedElastic())
                 .map(jsonContent -> ResponseEntity.ok(new InterviewResponse(jsonContent)))
                 .onErrorResume(e -> {
@@ -137,6 +315,52 @@ public class ApiController {
                         .body(new InterviewResponse("{\"error\": \"" + e.getMessage() + "\"}")));
                 });
     }
+    /**
+     * Endpoint for the pipeline result cache metrics: per pipeline, the runs started, the requests coalesced into
+     * an identical run in flight, the requests answered from the cache, and the share of runs saved.
+     * @return A ResponseEntity with the counters and the cache occupancy.
+     */
+    @GetMapping("/pipelines/cache")
+    public ResponseEntity<Map<String, Object>> pipelineCacheStats() {
+        return ResponseEntity.ok(aiService.getPipelineCacheStats());
+    }
+
+    /**
+     * Endpoint to list the stored pipeline profiles (requested with X-Profile, or kept because the run was slow).
+     * Resume engine profiles are listed by each engine replica itself, under /profiles.
+     * @return A ResponseEntity with the profile summaries (id, pipeline, duration, trigger, slowest spans), newest first.
+     */
+    @GetMapping(value = "/profiles/pipelines", produces = MediaType.APPLICATION_JSON_VALUE)
+    public Mono<ResponseEntity<String>> listPipelineProfiles() {
+        return Mono.fromCallable(aiService::listPipelineProfiles)
+                .subscribeOn(Schedulers.boundedElastic())
+                .map(ResponseEntity::ok)
+                .onErrorResume(e -> {
+                    e.printStackTrace();
+                    return Mono.just(ResponseEntity.status(HttpStatus.INTERNAL_SERVER_ERROR).build());
+                });
+    }
+
+    /**
+     * Endpoint to download one pipeline profile for offline analysis.
+     * @param profileId The profile id from the listing (or the run's X-Profile request).
+     * @param format    "json" for spans and sampled stacks, "folded" for the stacks alone (flamegraph.pl, speedscope).
+     * @return A ResponseEntity with the profile as an attachment.
+     */
+    @GetMapping("/profiles/pipelines/{profileId}")
+    public Mono<ResponseEntity<String>> downloadPipelineProfile(@PathVariable String profileId,
+                                                                @RequestParam(defaultValue = "json") String format) {
+        boolean folded = "folded".equals(format);
+        return Mono.fromCallable(() -> aiService.getPipelineProfile(profileId, folded))
+                .subscribeOn(Schedulers.boundedElastic())
+                .map(content -> ResponseEntity.ok()
+                        .contentType(folded ? MediaType.TEXT_PLAIN : MediaType.APPLICATION_JSON)
+                        .header(HttpHeaders.CONTENT_DISPOSITION,
+                                "attachment; filename=\"" + profileId + (folded ? ".folded" : ".json") + "\"")
+                        .body(content))
+                .onErrorResume(e -> Mono.just(ResponseEntity.status(HttpStatus.NOT_FOUND).build()));
+    }
+
     /**
      * Endpoint to download a previously generated file (PDF, TeX, or JSON).
      */
@@ -3,10 +3,14 @@ package com.backend.careercatalyst.dto;
 public class EvaluationRequest {
     private String resume;
     private String jobDescription;
+    // Optional: handle returned by /jd/prefetch, so the JD analysis started earlier is reused
+    private String jdHandle;
 
     // Getters and Setters
     public String getResume() { return resume; }
     public void setResume(String resume) { this.resume = resume; }
     public String getJobDescription() { return jobDescription; }
     public void setJobDescription(String jobDescription) { this.jobDescription = jobDescription; }
+    public String getJdHandle() { return jdHandle; }
+    public void setJdHandle(String jdHandle) { this.jdHandle = jdHandle; }
 }
\ No newline at end of file
@@ -0,0 +1,15 @@
+package com.backend.careercatalyst.dto;
+
+import java.util.List;
+
+public class JdPrefetchRequest {
+    private String jobDescription;
+    // Optional: pipelines to prefetch for ("tailor", "evaluate"); all of them when empty
+    private List<String> pipelines;
+
+    // Getters and Setters
+    public String getJobDescription() { return jobDescription; }
+    public void setJobDescription(String jobDescription) { this.jobDescription = jobDescription; }
+    public List<String> getPipelines() { return pipelines; }
+    public void setPipelines(List<String> pipelines) { this.pipelines = pipelines; }
+}
@@ -0,0 +1,22 @@
+package com.backend.careercatalyst.dto;
+
+import java.util.List;
+
+public class RankJobsRequest {
+    private String resume;
+    private List<String> jobDescriptions;
+    // Optional: "cached" (default), "model" or "local"; where each JD's skill lists come from
+    private String analysis;
+    // Optional: how many top-ranked postings get their JD analysis started in the background
+    private Integer prefetchTop;
+
+    // Getters and Setters
+    public String getResume() { return resume; }
+    public void setResume(String resume) { this.resume = resume; }
+    public List<String> getJobDescriptions() { return jobDescriptions; }
+    public void setJobDescriptions(List<String> jobDescriptions) { this.jobDescriptions = jobDescriptions; }
+    public String getAnalysis() { return analysis; }
+    public void setAnalysis(String analysis) { this.analysis = analysis; }
+    public Integer getPrefetchTop() { return prefetchTop; }
+    public void setPrefetchTop(Integer prefetchTop) { this.prefetchTop = prefetchTop; }
+}
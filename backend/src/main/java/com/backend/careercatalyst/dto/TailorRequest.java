@@ -4,6 +4,12 @@ public class TailorRequest {
     // These names MUST match the keys in the JSON payload
     private String resumeText;
     private String jobDescription;
+    // Optional: resume-engine template used to render structured (ResumeData) tailoring results
+    private String templateName;
+    // Optional: handle returned by /jd/prefetch, so the JD analysis started earlier is reused
+    private String jdHandle;
+    // Optional: tailor session id, so a re-run only re-tailors the bullets that changed since the last run
+    private String sessionId;
 
     // Getters and Setters
     public String getResumeText() {
@@ -21,4 +27,28 @@ public class TailorRequest {
     public void setJobDescription(String jobDescription) {
         this.jobDescription = jobDescription;
     }
+
+    public String getTemplateName() {
+        return templateName;
+    }
+
+    public void setTemplateName(String templateName) {
+        this.templateName = templateName;
+    }
+
+    public String getJdHandle() {
+        return jdHandle;
+    }
+
+    public void setJdHandle(String jdHandle) {
+        this.jdHandle = jdHandle;
+    }
+
+    public String getSessionId() {
+        return sessionId;
+    }
+
+    public void setSessionId(String sessionId) {
+        this.sessionId = sessionId;
+    }
 }
\ No newline at end of file
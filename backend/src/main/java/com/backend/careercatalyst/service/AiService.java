@@ -1,47 +1,134 @@
 package com.backend.careercatalyst.service;
 
+import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.beans.factory.annotation.Value;
 import org.springframework.core.io.ClassPathResource;
+import org.springframework.core.io.Resource;
+import org.springframework.core.io.support.PathMatchingResourcePatternResolver;
 import org.springframework.stereotype.Service;
 
 import java.io.*;
 import java.nio.charset.StandardCharsets;
 import java.nio.file.Files;
+import java.nio.file.Path;
 import java.nio.file.StandardCopyOption;
+import java.security.MessageDigest;
+import java.security.NoSuchAlgorithmException;
 import java.util.ArrayList;
 import java.util.Collections;
+import java.util.HexFormat;
 import java.util.List;
+import java.util.Map;
 import java.util.concurrent.TimeUnit;
+import java.util.function.Supplier;
+import java.util.regex.Pattern;
 import java.util.stream.Collectors;
 
 @Service
 public class AiService {
 
+    // Resource folders holding the Python pipelines; extracted together so they can share helpers
+    private static final String[] SCRIPT_ROOTS = {"scripts", "scripts1", "scripts2", "scripts3"};
+    // Ids written by scripts/shared/profiling.py: timestamp plus a random suffix
+    private static final Pattern PROFILE_ID = Pattern.compile("\\d{8}-\\d{6}-[0-9a-f]{8}");
+
     @Value("${google.api.key}")
     private String googleApiKey;
 
+    @Value("${file.storage.path}")
+    private String fileStoragePath;
+
+    private Path scriptWorkspace;
+    // Hash of the extracted scripts, part of every result cache key so a redeploy never serves an older result
+    private String pipelineVersion;
+
+    @Autowired
+    private PipelineResultCache pipelineResultCache;
+
     /**
-     * Public method for the AI Resume Tailor.
+     * Public method for the AI Resume Tailor. Identical requests (same resume, JD and session, up to whitespace)
+     * share one run while it is in flight and are answered from the result cache afterwards, unless refresh is set.
      */
-    public String getTailoredResume(String resume, String jobDescription) {
-        String combinedInput = (resume != null ? resume : "") + "\n---DELIMITER---\n" + (jobDescription != null ? jobDescription : "");
-        return runPythonScript("scripts/tailor.py", combinedInput);
+    public String getTailoredResume(String resume, String jobDescription, String jdHandle, String sessionId, boolean profile,
+                                    boolean refresh) {
+        String resumeText = PipelineResultCache.normalize(resume);
+        String jobText = PipelineResultCache.normalize(jobDescription);
+        return runCoalesced("tailor", profile, refresh, List.of(resumeText, jobText, String.valueOf(sessionId)),
+                () -> runPythonScript("scripts/tailor.py", resumeText + "\n---DELIMITER---\n" + jobText,
+                        withProfile(profile, withSession(sessionId, withJdHandle(jdHandle)))));
+    }
+
+    /**
+     * Public method for the AI Resume Tailor in structured mode: returns ResumeData JSON for the resume-engine templates.
+     */
+    public String getTailoredResumeData(String resume, String jobDescription, String jdHandle, String sessionId, boolean profile,
+                                        boolean refresh) {
+        String resumeText = PipelineResultCache.normalize(resume);
+        String jobText = PipelineResultCache.normalize(jobDescription);
+        return runCoalesced("tailor-resume-data", profile, refresh, List.of(resumeText, jobText, String.valueOf(sessionId)),
+                () -> runPythonScript("scripts/tailor.py", resumeText + "\n---DELIMITER---\n" + jobText,
+                        withProfile(profile, withSession(sessionId, withJdHandle(jdHandle, "--format", "resume-data")))));
     }
 
     /**
      * Public method for the ATS Evaluator.
      */
-    public String getEvaluationResult(String resume, String jobDescription) {
+    public String getEvaluationResult(String resume, String jobDescription, String jdHandle, boolean profile, boolean refresh) {
+        String resumeText = PipelineResultCache.normalize(resume);
+        String jobText = PipelineResultCache.normalize(jobDescription);
+        return runCoalesced("evaluate", profile, refresh, List.of(resumeText, jobText),
+                () -> runPythonScript("scripts1/evaluate.py", resumeText + "\n---DELIMITER---\n" + jobText,
+                        withProfile(profile, withJdHandle(jdHandle))));
+    }
+
+    /**
+     * Public method for the instant local ATS keyword score (no model calls).
+     */
+    public String getQuickEvaluationScore(String resume, String jobDescription) {
         String combinedInput = (resume != null ? resume : "") + "\n---DELIMITER---\n" + (jobDescription != null ? jobDescription : "");
-        return runPythonScript("scripts1/evaluate.py", combinedInput);
+        return runPythonScript("scripts1/evaluate.py", combinedInput, "--local-only");
+    }
+
+    /**
+     * Public method for ranking one resume against many job descriptions: a single local scoring pass over all
+     * of them, returning JSON with the ranked postings (each with the jdHandle its full report is requested with).
+     */
+    public String rankJobDescriptions(String resume, List<String> jobDescriptions, String analysis, Integer prefetchTop) {
+        String combinedInput = (resume != null ? resume : "") + "\n---DELIMITER---\n"
+                + String.join("\n---JOB---\n", jobDescriptions != null ? jobDescriptions : List.of());
+        List<String> args = new ArrayList<>();
+        if (analysis != null && !analysis.isBlank()) {
+            args.add("--analysis");
+            args.add(analysis);
+        }
+        if (prefetchTop != null && prefetchTop > 0) {
+            args.add("--prefetch-top");
+            args.add(String.valueOf(prefetchTop));
+        }
+        return runPythonScript("scripts1/rank_jobs.py", combinedInput, args.toArray(new String[0]));
+    }
+
+    /**
+     * Public method for the speculative JD analysis: starts the tailor/evaluate Step 1 in the background
+     * and returns JSON with a handle that later tailor and evaluation requests can pass along.
+     */
+    public String prefetchJobDescriptionAnalysis(String jobDescription, List<String> pipelines) {
+        // Normalized like the pipelines' own input, so the prefetched analysis is found under the same handle
+        String jobText = PipelineResultCache.normalize(jobDescription);
+        if (pipelines == null || pipelines.isEmpty()) {
+            return runPythonScript("scripts/shared/jd_prefetch.py", jobText);
+        }
+        return runPythonScript("scripts/shared/jd_prefetch.py", jobText, "--pipelines", String.join(",", pipelines));
     }
 
     /**
      * Public method for the AI Cover Letter Generator.
      */
-    public String getGeneratedCoverLetter(String resume, String jobDescription) {
-        String combinedInput = (resume != null ? resume : "") + "\n---DELIMITER---\n" + (jobDescription != null ? jobDescription : "");
-        return runPythonScript("scripts2/coverletter.py", combinedInput);
+    public String getGeneratedCoverLetter(String resume, String jobDescription, boolean refresh) {
+        String resumeText = PipelineResultCache.normalize(resume);
+        String jobText = PipelineResultCache.normalize(jobDescription);
+        return runCoalesced("cover-letter", false, refresh, List.of(resumeText, jobText),
+                () -> runPythonScript("scripts2/coverletter.py", resumeText + "\n---DELIMITER---\n" + jobText));
     }
 
     /**
@@ -51,54 +138,191 @@ public class AiService {
         return runPythonScriptWithArgs("scripts/bulk_score.py", directoryPath, jobDescription);
     }
 
+    /**
+     * Public method for Document Ingestion: extracts normalized text and sections from an uploaded PDF, DOCX or TeX
+     * resume (cached by content hash; resumes generated by us are answered from their stored resume.json).
+     */
+    public String ingestResumeDocument(String filePath) {
+        String storagePath = Path.of(fileStoragePath).toAbsolutePath().normalize().toString();
+        return runPythonScriptWithArgs("scripts/shared/document_ingest.py", filePath, "--storage-dir", storagePath);
+    }
+
     /**
      * Public method for AI Mock Interview (Question Generator).
      */
-    public String getInterviewQuestions(String jobDescription) {
-        return runPythonScript("scripts3/interview_generator.py", jobDescription);
+    public String getInterviewQuestions(String jobDescription, boolean refresh) {
+        String jobText = PipelineResultCache.normalize(jobDescription);
+        return runCoalesced("interview", false, refresh, List.of(jobText),
+                () -> runPythonScript("scripts3/interview_generator.py", jobText));
+    }
+
+    /**
+     * Public method for the result cache metrics: per pipeline, the runs started and the requests that were
+     * coalesced into a run in flight or answered from the cache.
+     */
+    public Map<String, Object> getPipelineCacheStats() {
+        return pipelineResultCache.stats();
+    }
+
+    /**
+     * Public method for the pipeline profiles: summaries of the stored profiles, newest first, as JSON.
+     */
+    public String listPipelineProfiles() {
+        return runPythonScriptWithArgs("scripts/shared/profiling.py", "--list");
+    }
+
+    /**
+     * Public method for one stored pipeline profile: the whole profile as JSON, or its sampled stacks in
+     * folded format (for flamegraph.pl or speedscope).
+     */
+    public String getPipelineProfile(String profileId, boolean folded) {
+        if (profileId == null || !PROFILE_ID.matcher(profileId).matches()) {
+            throw new IllegalArgumentException("Invalid profile id.");
+        }
+        return runPythonScriptWithArgs("scripts/shared/profiling.py", folded ? "--folded" : "--show", profileId);
     }
 
     /**
-     * Helper to copy a script from the JAR to a temporary file so Python can run it.
+     * Runs a pipeline through the result cache, keyed by the pipeline, the script version and the normalized
+     * inputs. The jdHandle is not part of the key: it only saves the JD analysis, the result is the same. Profiled
+     * runs bypass the cache, the profile has to come from a real run.
+     */
+    private String runCoalesced(String pipeline, boolean profile, boolean refresh, List<String> keyParts, Supplier<String> run) {
+        if (profile) {
+            return pipelineResultCache.bypass(pipeline, run);
+        }
+        String key = PipelineResultCache.key(pipeline, getPipelineVersion(), keyParts);
+        return pipelineResultCache.getOrRun(pipeline, key, !refresh, run);
+    }
+
+    private String getPipelineVersion() {
+        try {
+            getScriptWorkspace();
+        } catch (IOException e) {
+            throw new RuntimeException("Error extracting the pipeline scripts: " + e.getMessage(), e);
+        }
+        return pipelineVersion;
+    }
+
+    /**
+     * Hash of the extracted scripts, taken right after extraction (before any run writes caches next to them).
+     */
+    private static String hashWorkspace(Path workspace) throws IOException {
+        try {
+            MessageDigest digest = MessageDigest.getInstance("SHA-256");
+            List<Path> files;
+            try (var walk = Files.walk(workspace)) {
+                files = walk.filter(Files::isRegularFile).sorted().toList();
+            }
+            for (Path file : files) {
+                digest.update(workspace.relativize(file).toString().getBytes(StandardCharsets.UTF_8));
+                digest.update(Files.readAllBytes(file));
+            }
+            return HexFormat.of().formatHex(digest.digest()).substring(0, 16);
+        } catch (NoSuchAlgorithmException e) {
+            throw new IllegalStateException("SHA-256 is not available", e);
+        }
+    }
+
+    /**
+     * Appends "--jd-handle <handle>" to the script arguments when the client sent a prefetch handle.
+     */
+    private static String[] withJdHandle(String jdHandle, String... args) {
+        List<String> allArgs = new ArrayList<>(List.of(args));
+        if (jdHandle != null && !jdHandle.isBlank()) {
+            allArgs.add("--jd-handle");
+            allArgs.add(jdHandle);
+        }
+        return allArgs.toArray(new String[0]);
+    }
+
+    /**
+     * Appends --session for tailor requests that belong to a session; the session's cached JD analysis,
+     * structure and bullet rewrites are then reused and only new or edited bullets go to the model.
+     */
+    private static String[] withSession(String sessionId, String... args) {
+        List<String> allArgs = new ArrayList<>(List.of(args));
+        if (sessionId != null && !sessionId.isBlank()) {
+            allArgs.add("--session");
+            allArgs.add(sessionId);
+        }
+        return allArgs.toArray(new String[0]);
+    }
+
+    /**
+     * Appends --profile when the client asked for a profile (X-Profile header); the script then keeps a span
+     * timeline and sampled stacks of the run whatever its duration (see scripts/shared/profiling.py).
+     */
+    private static String[] withProfile(boolean profile, String... args) {
+        List<String> allArgs = new ArrayList<>(List.of(args));
+        if (profile) {
+            allArgs.add("--profile");
+        }
+        return allArgs.toArray(new String[0]);
+    }
+
+    /**
+     * Helper to extract the Python scripts from the JAR into a temporary workspace so Python can run them.
+     * The whole scripts tree is copied once (keeping the scripts/, scripts1/, ... layout), so a script can
+     * import its sibling modules or another pipeline's helpers, e.g. bulk_score.py reusing evaluate.py.
      */
     private File copyScriptToTempFile(String scriptPath) throws IOException {
-        // 1. Load the file from the JAR (Classpath)
-        ClassPathResource resource = new ClassPathResource(scriptPath);
-        if (!resource.exists()) {
+        Path scriptFile = getScriptWorkspace().resolve(scriptPath);
+        if (!Files.exists(scriptFile)) {
             throw new FileNotFoundException("Script not found in JAR: " + scriptPath);
         }
+        return scriptFile.toFile();
+    }
 
-        // 2. Create a temp file
-        String extension = scriptPath.contains(".") ? scriptPath.substring(scriptPath.lastIndexOf(".")) : ".tmp";
-        File tempFile = File.createTempFile("ai_script_", extension);
-        tempFile.deleteOnExit(); // Auto-delete when app stops
+    private synchronized Path getScriptWorkspace() throws IOException {
+        if (scriptWorkspace != null) {
+            return scriptWorkspace;
+        }
 
-        // 3. Copy the content
-        try (InputStream inputStream = resource.getInputStream()) {
-            Files.copy(inputStream, tempFile.toPath(), StandardCopyOption.REPLACE_EXISTING);
+        // 1. Create the temp workspace
+        Path workspace = Files.createTempDirectory("ai_scripts_");
+        workspace.toFile().deleteOnExit(); // Auto-delete when app stops
+
+        // 2. Copy every file under each script root, preserving the relative paths
+        PathMatchingResourcePatternResolver resolver = new PathMatchingResourcePatternResolver();
+        for (String root : SCRIPT_ROOTS) {
+            String baseUrl = new ClassPathResource(root + "/").getURL().toString();
+            for (Resource resource : resolver.getResources("classpath:" + root + "/**/*.*")) {
+                String resourceUrl = resource.getURL().toString();
+                if (!resource.isReadable() || !resourceUrl.startsWith(baseUrl)) {
+                    continue;
+                }
+                Path target = workspace.resolve(root).resolve(resourceUrl.substring(baseUrl.length())).normalize();
+                Files.createDirectories(target.getParent());
+                target.getParent().toFile().deleteOnExit();
+                try (InputStream inputStream = resource.getInputStream()) {
+                    Files.copy(inputStream, target, StandardCopyOption.REPLACE_EXISTING);
+                }
+                target.toFile().deleteOnExit();
+            }
         }
-        
-        // 4. Also copy helper text files if needed (like prompt templates) in the same directory
-        // This is a bit tricky in JARs. For now, we assume prompts are handled by the python script loading or 
-        // we just ensure the python script is self-contained. 
-        // *If your python scripts load other .txt files using relative paths, 
-        // *you might need to update the python scripts to load those from strings passed by Java instead.
-        // *However, for this fix, we focus on running the main script.
 
-        return tempFile;
+        pipelineVersion = hashWorkspace(workspace);
+        scriptWorkspace = workspace;
+        return scriptWorkspace;
     }
 
     /**
      * Runs a Python script using STDIN for input (Tailor, ATS, Cover Letter, Interview).
      */
-    private String runPythonScript(String scriptPath, String inputData) {
+    private String runPythonScript(String scriptPath, String inputData, String... args) {
         Process process = null;
         try {
-            // FIX: Extract file from JAR to Temp
+            // FIX: Extract file from JAR to the temp workspace
             File scriptFile = copyScriptToTempFile(scriptPath);
 
             // Use "python3" for Linux/Docker environments
-            ProcessBuilder processBuilder = new ProcessBuilder("python3", scriptFile.getAbsolutePath());
+            List<String> command = new ArrayList<>();
+            command.add("python3");
+            command.add(scriptFile.getAbsolutePath());
+            Collections.addAll(command, args);
+
+            ProcessBuilder processBuilder = new ProcessBuilder(command);
             processBuilder.environment().put("GOOGLE_API_KEY", this.googleApiKey);
             processBuilder.environment().put("PYTHONIOENCODING", "UTF-8");
 
@@ -139,7 +363,7 @@ public class AiService {
      */
     private String runPythonScriptWithArgs(String scriptPath, String... args) {
         try {
-            // FIX: Extract file from JAR to Temp
+            // FIX: Extract file from JAR to the temp workspace
             File scriptFile = copyScriptToTempFile(scriptPath);
 
             List<String> command = new ArrayList<>();
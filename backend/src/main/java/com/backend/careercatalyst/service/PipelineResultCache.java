@@ -0,0 +1,245 @@
+package com.backend.careercatalyst.service;
+
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+
+import java.nio.charset.StandardCharsets;
+import java.security.MessageDigest;
+import java.security.NoSuchAlgorithmException;
+import java.util.HexFormat;
+import java.util.Iterator;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.TreeMap;
+import java.util.concurrent.CompletableFuture;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.atomic.AtomicLong;
+import java.util.function.Supplier;
+
+/**
+ * Single-flight coalescing and a bounded TTL cache for the AI pipeline runs. Double submits, refreshes and
+ * frontend retries send the same request again while the first run is still going; every request with the same
+ * key (pipeline, pipeline version, normalized inputs) that arrives while a run is in flight waits for that run
+ * and gets its result instead of starting another multi-step pipeline. Completed results are kept for a while,
+ * so a repeat after the run finished is answered from memory. Failures are shared with the requests waiting on
+ * the run but never cached.
+ */
+@Component
+public class PipelineResultCache {
+
+    private final long ttlMillis;
+    private final int maxEntries;
+    private final long maxChars;
+
+    private final Map<String, CompletableFuture<String>> inFlight = new ConcurrentHashMap<>();
+    // Access-ordered, so iteration starts at the least recently used entry
+    private final LinkedHashMap<String, Entry> results = new LinkedHashMap<>(16, 0.75f, true);
+    private long cachedChars;
+    private final Map<String, Counters> counters = new ConcurrentHashMap<>();
+
+    private record Entry(String value, long expiresAt) {
+    }
+
+    private static final class Counters {
+        final AtomicLong runs = new AtomicLong();
+        final AtomicLong coalesced = new AtomicLong();
+        final AtomicLong cacheHits = new AtomicLong();
+        final AtomicLong failures = new AtomicLong();
+        final AtomicLong bypassed = new AtomicLong();
+        final AtomicLong runMillis = new AtomicLong();
+    }
+
+    /**
+     * @param ttlSeconds How long a completed result is served again; 0 turns the result cache off (coalescing
+     *                   of concurrent requests stays on).
+     * @param maxEntries Results kept at most, least recently used first out.
+     * @param maxChars   Total size of the kept results, in characters.
+     */
+    public PipelineResultCache(@Value("${pipeline.cache.ttl-seconds:600}") long ttlSeconds,
+                               @Value("${pipeline.cache.max-entries:500}") int maxEntries,
+                               @Value("${pipeline.cache.max-chars:20000000}") long maxChars) {
+        this.ttlMillis = ttlSeconds * 1000;
+        this.maxEntries = maxEntries;
+        this.maxChars = maxChars;
+    }
+
+    /**
+     * The result for the key: from the cache, from a run already in flight, or from running the pipeline now.
+     *
+     * @param pipeline  The pipeline name, for the metrics.
+     * @param key       The key from {@link #key}.
+     * @param useCached Whether a cached result may be returned; false still coalesces with a run in flight and
+     *                  caches the new result (a "regenerate" request gets a fresh run, not an older answer).
+     * @param run       Runs the pipeline; called at most once per key at a time.
+     */
+    public String getOrRun(String pipeline, String key, boolean useCached, Supplier<String> run) {
+        Counters stats = counters(pipeline);
+        if (useCached) {
+            String cached = lookup(key);
+            if (cached != null) {
+                stats.cacheHits.incrementAndGet();
+                return cached;
+            }
+        }
+
+        CompletableFuture<String> ours = new CompletableFuture<>();
+        CompletableFuture<String> existing = inFlight.putIfAbsent(key, ours);
+        if (existing != null) {
+            stats.coalesced.incrementAndGet();
+            return await(existing);
+        }
+
+        long started = System.currentTimeMillis();
+        stats.runs.incrementAndGet();
+        try {
+            String value = run.get();
+            store(key, value);
+            ours.complete(value);
+            return value;
+        } catch (RuntimeException | Error e) {
+            stats.failures.incrementAndGet();
+            ours.completeExceptionally(e);
+            throw e;
+        } finally {
+            inFlight.remove(key, ours);
+            stats.runMillis.addAndGet(System.currentTimeMillis() - started);
+        }
+    }
+
+    /**
+     * Runs the pipeline without coalescing or caching (profiled runs must really run), counting it as bypassed.
+     */
+    public String bypass(String pipeline, Supplier<String> run) {
+        counters(pipeline).bypassed.incrementAndGet();
+        return run.get();
+    }
+
+    /**
+     * The cache key: a SHA-256 over the pipeline, its version and each input part, with every part normalized
+     * (line endings, trailing spaces, surrounding blank lines) so inputs that differ only in whitespace match.
+     * A null part and an empty one are the same input.
+     */
+    public static String key(String pipeline, String version, List<String> parts) {
+        try {
+            MessageDigest digest = MessageDigest.getInstance("SHA-256");
+            digest.update((pipeline + "\u001f" + version).getBytes(StandardCharsets.UTF_8));
+            for (String part : parts) {
+                digest.update((byte) 0x1e);
+                digest.update(normalize(part).getBytes(StandardCharsets.UTF_8));
+            }
+            return HexFormat.of().formatHex(digest.digest());
+        } catch (NoSuchAlgorithmException e) {
+            throw new IllegalStateException("SHA-256 is not available", e);
+        }
+    }
+
+    /**
+     * The text a pipeline is run with, so that its key fully determines its result.
+     */
+    public static String normalize(String text) {
+        if (text == null) {
+            return "";
+        }
+        return text.replace("\r\n", "\n").replace('\r', '\n').replaceAll("[ \\t]+\n", "\n").strip();
+    }
+
+    /**
+     * Per-pipeline counters and the cache occupancy, for the metrics endpoint.
+     */
+    public Map<String, Object> stats() {
+        Map<String, Object> pipelines = new TreeMap<>();
+        counters.forEach((pipeline, c) -> {
+            long runs = c.runs.get();
+            long served = runs + c.coalesced.get() + c.cacheHits.get();
+            Map<String, Object> entry = new LinkedHashMap<>();
+            entry.put("requests", served + c.bypassed.get());
+            entry.put("runs", runs);
+            entry.put("coalesced", c.coalesced.get());
+            entry.put("cacheHits", c.cacheHits.get());
+            entry.put("bypassed", c.bypassed.get());
+            entry.put("failures", c.failures.get());
+            entry.put("runsSaved", served == 0 ? 0.0 : Math.round(1000.0 * (served - runs) / served) / 1000.0);
+            entry.put("meanRunMillis", runs == 0 ? 0 : c.runMillis.get() / runs);
+            pipelines.put(pipeline, entry);
+        });
+        Map<String, Object> body = new LinkedHashMap<>();
+        synchronized (this) {
+            evictExpired(System.currentTimeMillis());
+            body.put("entries", results.size());
+            body.put("chars", cachedChars);
+        }
+        body.put("inFlight", inFlight.size());
+        body.put("ttlSeconds", ttlMillis / 1000);
+        body.put("maxEntries", maxEntries);
+        body.put("pipelines", pipelines);
+        return body;
+    }
+
+    private Counters counters(String pipeline) {
+        return counters.computeIfAbsent(pipeline, name -> new Counters());
+    }
+
+    private static String await(CompletableFuture<String> future) {
+        try {
+            return future.get();
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            throw new RuntimeException("Interrupted while waiting for an identical pipeline run", e);
+        } catch (ExecutionException e) {
+            if (e.getCause() instanceof RuntimeException runtimeException) {
+                throw runtimeException;
+            }
+            if (e.getCause() instanceof Error error) {
+                throw error;
+            }
+            throw new RuntimeException(e.getCause());
+        }
+    }
+
+    private synchronized String lookup(String key) {
+        Entry entry = results.get(key);
+        if (entry == null) {
+            return null;
+        }
+        if (entry.expiresAt() <= System.currentTimeMillis()) {
+            remove(key);
+            return null;
+        }
+        return entry.value();
+    }
+
+    private synchronized void store(String key, String value) {
+        if (ttlMillis <= 0 || value == null || value.length() > maxChars) {
+            return;
+        }
+        remove(key);
+        results.put(key, new Entry(value, System.currentTimeMillis() + ttlMillis));
+        cachedChars += value.length();
+        evictExpired(System.currentTimeMillis());
+        Iterator<Map.Entry<String, Entry>> eldest = results.entrySet().iterator();
+        while ((results.size() > maxEntries || cachedChars > maxChars) && eldest.hasNext()) {
+            cachedChars -= eldest.next().getValue().value().length();
+            eldest.remove();
+        }
+    }
+
+    private void remove(String key) {
+        Entry removed = results.remove(key);
+        if (removed != null) {
+            cachedChars -= removed.value().length();
+        }
+    }
+
+    private void evictExpired(long now) {
+        Iterator<Map.Entry<String, Entry>> iterator = results.entrySet().iterator();
+        while (iterator.hasNext()) {
+            Entry entry = iterator.next().getValue();
+            if (entry.expiresAt() <= now) {
+                cachedChars -= entry.value().length();
+                iterator.remove();
+            }
+        }
+    }
+}
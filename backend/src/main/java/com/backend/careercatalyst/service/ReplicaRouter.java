@@ -0,0 +1,87 @@
+package com.backend.careercatalyst.service;
+
+import org.springframework.beans.factory.annotation.Value;
+import org.springframework.stereotype.Component;
+import org.springframework.web.reactive.function.client.WebClient;
+
+import java.nio.charset.StandardCharsets;
+import java.security.MessageDigest;
+import java.security.NoSuchAlgorithmException;
+import java.util.ArrayList;
+import java.util.Arrays;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.SortedMap;
+import java.util.TreeMap;
+
+/**
+ * Picks the resume-engine replica for a request with consistent hashing: each replica owns many points on a
+ * hash ring, and a key goes to the first point at or after its own hash. The same render key therefore always
+ * reaches the same replica (whose local artifact cache holds its files), and adding or removing a replica only
+ * moves the keys on the ring segments it gains or loses, about 1/N of them, instead of reshuffling all of them.
+ */
+@Component
+public class ReplicaRouter {
+
+    // Points per replica; enough to keep the load within a few percent of even for small clusters
+    private static final int VIRTUAL_NODES = 160;
+
+    private final TreeMap<Long, String> ring = new TreeMap<>();
+    private final Map<String, WebClient> clients = new LinkedHashMap<>();
+
+    /**
+     * @param pythonServiceUrl The single resume-engine URL, used when no replica list is configured.
+     * @param replicaUrls      Comma-separated resume-engine replica URLs (python.service.replicas).
+     */
+    public ReplicaRouter(WebClient.Builder webClientBuilder,
+                         @Value("${python.service.url}") String pythonServiceUrl,
+                         @Value("${python.service.replicas:}") String replicaUrls) {
+        List<String> replicas = new ArrayList<>();
+        for (String url : replicaUrls.split(",")) {
+            if (!url.isBlank()) {
+                replicas.add(url.trim());
+            }
+        }
+        if (replicas.isEmpty()) {
+            replicas.add(pythonServiceUrl);
+        }
+        for (String replica : replicas) {
+            clients.put(replica, webClientBuilder.clone().baseUrl(replica).build());
+            for (int i = 0; i < VIRTUAL_NODES; i++) {
+                ring.put(hash(replica + "#" + i), replica);
+            }
+        }
+    }
+
+    /**
+     * The replica URL that owns the given routing key.
+     */
+    public String replicaFor(String routingKey) {
+        SortedMap<Long, String> tail = ring.tailMap(hash(routingKey));
+        return tail.isEmpty() ? ring.firstEntry().getValue() : tail.get(tail.firstKey());
+    }
+
+    /**
+     * A WebClient bound to the replica that owns the given routing key.
+     */
+    public WebClient clientFor(String routingKey) {
+        return clients.get(replicaFor(routingKey));
+    }
+
+    /**
+     * The first 8 bytes of the key's MD5 digest as a signed long: cheap, and evenly spread over the ring.
+     */
+    static long hash(String key) {
+        try {
+            byte[] digest = MessageDigest.getInstance("MD5").digest(key.getBytes(StandardCharsets.UTF_8));
+            long value = 0;
+            for (byte b : Arrays.copyOf(digest, 8)) {
+                value = (value << 8) | (b & 0xFF);
+            }
+            return value;
+        } catch (NoSuchAlgorithmException e) {
+            throw new IllegalStateException("MD5 is not available", e);
+        }
+    }
+}
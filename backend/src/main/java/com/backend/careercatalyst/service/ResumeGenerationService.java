@@ -2,49 +2,136 @@ package com.backend.careercatalyst.service;
 
 import com.backend.careercatalyst.dto.GenerateRequest;
 import com.backend.careercatalyst.exception.PythonServiceException;
+import com.fasterxml.jackson.core.JsonProcessingException;
+import com.fasterxml.jackson.databind.ObjectMapper;
 import org.springframework.beans.factory.annotation.Autowired;
 import org.springframework.beans.factory.annotation.Value;
+import org.springframework.core.ParameterizedTypeReference;
+import org.springframework.core.io.InputStreamResource;
 import org.springframework.core.io.Resource;
+import org.springframework.http.HttpHeaders;
+import org.springframework.http.MediaType;
 import org.springframework.stereotype.Service;
-import org.springframework.web.reactive.function.client.WebClient;
 import reactor.core.publisher.Mono;
 import reactor.core.scheduler.Schedulers;
 
 import java.io.ByteArrayInputStream;
 import java.io.IOException;
+import java.io.InputStream;
+import java.net.URI;
+import java.net.http.HttpClient;
+import java.net.http.HttpRequest;
+import java.net.http.HttpResponse;
+import java.security.MessageDigest;
+import java.security.NoSuchAlgorithmException;
+import java.time.Duration;
+import java.util.HexFormat;
 import java.util.Map;
+import java.util.regex.Pattern;
 import java.util.zip.ZipEntry;
 import java.util.zip.ZipInputStream;
 
 @Service
 public class ResumeGenerationService {
 
-    private final WebClient webClient;
+    // Render keys are SHA-256 hex digests; anything else is a session directory from the local store
+    private static final Pattern RENDER_KEY = Pattern.compile("[0-9a-f]{64}");
+    // Asks the resume engine to keep a profile of the request (see resume-engine/app/profiling.py)
+    private static final String PROFILE_HEADER = "X-Profile";
+
+    private final ReplicaRouter replicaRouter;
     private final FileStorageService fileStorageService;
+    private final ObjectMapper objectMapper;
+    private final boolean sharedStore;
+    private final HttpClient httpClient = HttpClient.newBuilder().connectTimeout(Duration.ofSeconds(10)).build();
 
+    /**
+     * @param artifactStoreMode "local" unzips every render into file.storage.path on this node; "shared" keeps the
+     *                          files in the resume engine's artifact store, so any backend node can serve any
+     *                          download and the engine replicas share one render cache.
+     */
     @Autowired
-    public ResumeGenerationService(WebClient.Builder webClientBuilder,
+    public ResumeGenerationService(ReplicaRouter replicaRouter,
                                    FileStorageService fileStorageService,
-                                   @Value("${python.service.url}") String pythonServiceUrl) {
-        this.webClient = webClientBuilder.baseUrl(pythonServiceUrl).build();
+                                   ObjectMapper objectMapper,
+                                   @Value("${artifact.store.mode:local}") String artifactStoreMode) {
+        this.replicaRouter = replicaRouter;
         this.fileStorageService = fileStorageService;
+        this.objectMapper = objectMapper;
+        this.sharedStore = "shared".equalsIgnoreCase(artifactStoreMode);
     }
 
     /**
      * Calls the external Python microservice to generate the resume files.
      *
      * @param generateRequest The request data.
+     * @param profile         Whether the engine should keep a profile of the request.
      * @return A Mono emitting the response as a byte array (zipped files).
      */
-    private Mono<byte[]> callPythonService(GenerateRequest generateRequest) {
-        return this.webClient.post()
+    private Mono<byte[]> callPythonService(GenerateRequest generateRequest, boolean profile) {
+        byte[] body = toJson(generateRequest);
+        return replicaRouter.clientFor(sha256Hex(body)).post()
             .uri("/generate")
-            .bodyValue(generateRequest)
+            .headers(headers -> setProfileHeader(headers, profile))
+            .contentType(MediaType.APPLICATION_JSON)
+            .bodyValue(body)
             .retrieve()
             .bodyToMono(byte[].class)
             .onErrorMap(ex -> new PythonServiceException("Failed to get response from Python service", ex));
     }
 
+    /**
+     * Renders into the shared artifact store. The render key is the SHA-256 of the exact request body, and the
+     * request goes to the replica that owns that key, as do the later downloads of its files.
+     *
+     * @param generateRequest The request data.
+     * @param profile         Whether the engine should keep a profile of the request.
+     * @return A Mono emitting the render key.
+     */
+    private Mono<String> renderToStore(GenerateRequest generateRequest, boolean profile) {
+        byte[] body = toJson(generateRequest);
+        String renderKey = sha256Hex(body);
+        return replicaRouter.clientFor(renderKey).post()
+            .uri("/render")
+            .headers(headers -> setProfileHeader(headers, profile))
+            .contentType(MediaType.APPLICATION_JSON)
+            .bodyValue(body)
+            .retrieve()
+            .bodyToMono(new ParameterizedTypeReference<Map<String, Object>>() {})
+            .map(manifest -> (String) manifest.get("render_key"))
+            .onErrorMap(ex -> new PythonServiceException("Failed to get response from Python service", ex));
+    }
+
+    private static void setProfileHeader(HttpHeaders headers, boolean profile) {
+        if (profile) {
+            headers.set(PROFILE_HEADER, "1");
+        }
+    }
+
+    private byte[] toJson(GenerateRequest generateRequest) {
+        try {
+            return objectMapper.writeValueAsBytes(generateRequest);
+        } catch (JsonProcessingException e) {
+            throw new PythonServiceException("Failed to serialize the generate request.", e);
+        }
+    }
+
+    private static String sha256Hex(byte[] data) {
+        try {
+            return HexFormat.of().formatHex(MessageDigest.getInstance("SHA-256").digest(data));
+        } catch (NoSuchAlgorithmException e) {
+            throw new IllegalStateException("SHA-256 is not available", e);
+        }
+    }
+
+    private static Map<String, String> downloadUrls(String sessionId) {
+        return Map.of(
+            "pdfUrl", "/api/v1/download/" + sessionId + "/resume.pdf",
+            "latexUrl", "/api/v1/download/" + sessionId + "/resume.tex",
+            "jsonUrl", "/api/v1/download/" + sessionId + "/resume.json"
+        );
+    }
+
     /**
      * Generates a resume, saves the files, and returns their download URLs.
      * This method is fully reactive.
@@ -53,16 +140,24 @@ public class ResumeGenerationService {
      * @return A Mono emitting a map of download URLs for the generated files.
      */
     public Mono<Map<String, String>> generateAndSaveResume(GenerateRequest generateRequest) {
-        return callPythonService(generateRequest)
+        return generateAndSaveResume(generateRequest, false);
+    }
+
+    /**
+     * Like {@link #generateAndSaveResume(GenerateRequest)}, optionally asking the resume engine to profile the
+     * render; the profile is then listed under the replica's /profiles endpoint.
+     */
+    public Mono<Map<String, String>> generateAndSaveResume(GenerateRequest generateRequest, boolean profile) {
+        if (sharedStore) {
+            // The render key doubles as the download session id
+            return renderToStore(generateRequest, profile).map(ResumeGenerationService::downloadUrls);
+        }
+        return callPythonService(generateRequest, profile)
             .flatMap(zipFileBytes ->
                 // Wrap the blocking file I/O operation and run it on a dedicated thread pool
                 Mono.fromCallable(() -> fileStorageService.saveAndUnzipFiles(zipFileBytes))
                     .subscribeOn(Schedulers.boundedElastic())
-                    .map(sessionId -> Map.of(
-                        "pdfUrl", "/api/v1/download/" + sessionId + "/resume.pdf",
-                        "latexUrl", "/api/v1/download/" + sessionId + "/resume.tex",
-                        "jsonUrl", "/api/v1/download/" + sessionId + "/resume.json"
-                    ))
+                    .map(ResumeGenerationService::downloadUrls)
             );
     }
 
@@ -73,7 +168,23 @@ public class ResumeGenerationService {
      * @return A Mono emitting the raw byte array of the generated PDF.
      */
     public Mono<byte[]> getResumePreview(GenerateRequest generateRequest) {
-        return callPythonService(generateRequest)
+        return getResumePreview(generateRequest, false);
+    }
+
+    /**
+     * Like {@link #getResumePreview(GenerateRequest)}, optionally asking the resume engine to profile the render.
+     */
+    public Mono<byte[]> getResumePreview(GenerateRequest generateRequest, boolean profile) {
+        if (sharedStore) {
+            // Goes through the render cache, so previewing an unchanged resume again does not recompile it
+            return renderToStore(generateRequest, profile)
+                .flatMap(renderKey -> replicaRouter.clientFor(renderKey).get()
+                    .uri("/artifacts/{key}/resume.pdf", renderKey)
+                    .retrieve()
+                    .bodyToMono(byte[].class)
+                    .onErrorMap(ex -> new PythonServiceException("Failed to fetch the rendered preview.", ex)));
+        }
+        return callPythonService(generateRequest, profile)
             .map(zipFileBytes -> {
                 try {
                     return unzipFileFromBytes(zipFileBytes, "resume.pdf");
@@ -92,9 +203,46 @@ public class ResumeGenerationService {
      * @return The file as a Spring Resource.
      */
     public Resource loadFileAsResource(String sessionId, String fileName) {
+        if (RENDER_KEY.matcher(sessionId).matches()) {
+            return streamFromArtifactStore(sessionId, fileName);
+        }
         return fileStorageService.loadFileAsResource(sessionId, fileName);
     }
 
+    /**
+     * Streams a stored render's file from the replica that owns its key; the body is passed through to the
+     * client as it arrives, never buffered here.
+     */
+    private Resource streamFromArtifactStore(String renderKey, String fileName) {
+        URI uri = URI.create(replicaRouter.replicaFor(renderKey) + "/artifacts/" + renderKey + "/" + fileName);
+        try {
+            HttpResponse<InputStream> response = httpClient.send(
+                HttpRequest.newBuilder(uri).timeout(Duration.ofSeconds(60)).GET().build(),
+                HttpResponse.BodyHandlers.ofInputStream());
+            if (response.statusCode() != 200) {
+                response.body().close();
+                throw new RuntimeException("File not found: " + fileName);
+            }
+            long length = response.headers().firstValueAsLong("Content-Length").orElse(-1);
+            return new InputStreamResource(response.body()) {
+                @Override
+                public String getFilename() {
+                    return fileName;
+                }
+
+                @Override
+                public long contentLength() {
+                    return length;
+                }
+            };
+        } catch (IOException e) {
+            throw new RuntimeException("File not found: " + fileName, e);
+        } catch (InterruptedException e) {
+            Thread.currentThread().interrupt();
+            throw new RuntimeException("Interrupted while fetching " + fileName, e);
+        }
+    }
+
     /**
      * Helper method to extract a single file from a zipped byte array.
      *
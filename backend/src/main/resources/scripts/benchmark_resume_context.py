@@ -0,0 +1,147 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import numpy as np
+
+# Latency of the tailor and evaluate pipelines against resume length, with the whole resume in every prompt
+# (RESUME_CONTEXT=full) and with relevance-based context for long resumes (scripts/shared/resume_context.py).
+# Synthetic resumes of growing length are run through tailor.py and evaluate.py as the backend runs them, one
+# process per request. The stand-in model's latency grows with prompt length (STANDIN_MS_PER_1K_PROMPT_TOKENS),
+# so prompt size shows up in the timings; with a real MODEL_BACKEND the numbers are real and cost quota.
+#
+# Also reported per length: the resume text sent to the condensed steps, the local selection time, and how many
+# of the JD's skills that the full resume mentions are still visible to the model (in the chunks or the note).
+#
+#   python benchmark_resume_context.py --pages 1 2 4 8 16 --repeat 3
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared"))
+import resume_context
+from skill_taxonomy import default_index
+
+SCRIPTS = {"tailor": os.path.join(os.path.dirname(os.path.abspath(__file__)), "tailor.py"),
+           "evaluate": os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts1", "evaluate.py")}
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+Requirements:
+- 5+ years building backend services in Python or Go
+- Experience with PostgreSQL, Redis and Kafka
+- Docker, Kubernetes and AWS in production
+- Designing REST APIs and distributed systems
+Nice to have:
+- Terraform, Prometheus and Grafana
+- Mentoring engineers"""
+
+HEADER = """Dr. Jane Q. Doe
+jane.doe@example.com | +1 415 555 0100 | linkedin.com/in/janedoe
+
+SUMMARY
+Engineer and researcher with experience across backend systems, machine learning and teaching.
+
+SKILLS
+Languages: Python, Go, Java, C++, R
+Tools: Docker, Kubernetes, PostgreSQL, Git
+
+EDUCATION
+PhD in Computer Science, Stanford University (2010 - 2015)
+BSc in Mathematics, University of Toronto (2006 - 2010)"""
+
+# Bullet pools for the synthetic roles; only the backend pool matches the JD well
+BULLETS = {
+    "backend": ["Built {n} Python microservices on Kubernetes serving {m}M requests a day",
+                "Designed REST APIs backed by PostgreSQL and Redis, cutting p95 latency by {p}%",
+                "Moved batch jobs to a Kafka event pipeline processing {m}M events a day",
+                "Ran Docker based deployments on AWS with Terraform for {n} services",
+                "Added Prometheus and Grafana monitoring, reducing incident response time by {p}%",
+                "Mentored {n} engineers on Go and distributed systems design"],
+    "ml": ["Trained PyTorch vision models on {m}M images, improving accuracy by {p}%",
+           "Built a feature store in Spark used by {n} data science teams",
+           "Published {n} papers on representation learning at NeurIPS and ICML",
+           "Deployed NLP models with TensorFlow Serving for {m}M daily predictions"],
+    "frontend": ["Rebuilt the React and TypeScript dashboard, lifting engagement {p}%",
+                 "Led an accessibility audit across {n} web applications",
+                 "Introduced Storybook and Jest component tests for {n} teams"],
+    "teaching": ["Taught an undergraduate algorithms course to {m}00 students",
+                 "Supervised {n} master's theses in statistics",
+                 "Organized a reading group on causal inference for {n} semesters"],
+}
+ROLES = [("Staff Engineer", "Acme Cloud", "backend"), ("Research Scientist", "DeepVision Labs", "ml"),
+         ("Frontend Lead", "Pixelworks", "frontend"), ("Lecturer", "State University", "teaching"),
+         ("Backend Engineer", "Ledgerly", "backend"), ("Postdoctoral Fellow", "Vector Institute", "ml")]
+TOKENS_PER_PAGE = 550
+
+def make_resume(pages, seed=7):
+    """A resume of about `pages` pages: the pinned sections, then roles and publications until it is long enough."""
+    rng = random.Random(seed)
+    experience, publications, year = [], [], 2024
+    while resume_context.estimate_tokens(HEADER + "\n".join(experience + publications)) < pages * TOKENS_PER_PAGE:
+        title, company, pool = ROLES[len(publications) % len(ROLES)]
+        experience.append(f"\n{title}\n{company} ({year - 2} - {year})")
+        for template in rng.sample(BULLETS[pool], min(4, len(BULLETS[pool]))):
+            experience.append("- " + template.format(n=rng.randint(2, 12), m=rng.randint(1, 90), p=rng.randint(10, 60)))
+        publications.append(f"Doe, J. et al. A study of {rng.choice(['graph', 'sparse', 'causal', 'robust'])} "
+                            f"{rng.choice(['models', 'systems', 'estimators'])} ({year}). Journal of Things {rng.randint(1, 40)}.")
+        year -= 2
+    return HEADER + "\n\nEXPERIENCE" + "\n".join(experience) + "\n\nPUBLICATIONS\n" + "\n".join(publications)
+
+def run(script, resume, env, extra_args=()):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, SCRIPTS[script], *extra_args], input=f"{resume}\n---DELIMITER---\n{JOB_DESCRIPTION}",
+                            capture_output=True, text=True, env=env)
+    elapsed = (time.perf_counter() - started) * 1000.0
+    if result.returncode != 0:
+        raise RuntimeError(f"{script} failed: {result.stderr.strip()[-300:]}")
+    return elapsed
+
+def visible_skills(resume, analysis):
+    """Share of the JD's skills mentioned in the full resume that are still visible in the context the condensed
+    steps get, and the selection statistics (None when the resume is passed through unchanged)."""
+    index = default_index()
+    wanted = {s["name"] for s in index.rank(JOB_DESCRIPTION)}
+    in_resume = wanted & {s["name"] for s in index.rank(resume)}
+    context, stats = resume_context.for_prompt(resume, analysis, JOB_DESCRIPTION)
+    in_context = in_resume & {s["name"] for s in index.rank(context)}
+    return (round(len(in_context) / len(in_resume), 3) if in_resume else 1.0), stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline latency against resume length, full vs relevant context.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=150.0,
+                        help="Stand-in latency per 1,000 prompt tokens (ignored with a real MODEL_BACKEND)")
+    args = parser.parse_args()
+
+    base_env = dict(os.environ)
+    base_env.setdefault("MODEL_BACKEND", "standin")
+    base_env.setdefault("GOOGLE_API_KEY", "standin")
+    base_env.setdefault("STANDIN_JITTER_MS", "0")
+    base_env.setdefault("STANDIN_MS_PER_1K_PROMPT_TOKENS", str(args.ms_per_1k_tokens))
+    base_env["JD_PREFETCH_ENABLED"] = "0"  # Every run analyses the JD itself
+    analysis = {"required_skills": [s["name"] for s in default_index().rank(JOB_DESCRIPTION)]}
+
+    rows = []
+    for pages in args.pages:
+        resume = make_resume(pages)
+        recall, stats = visible_skills(resume, analysis)
+        row = {"pages": pages, "resume_tokens": resume_context.estimate_tokens(resume),
+               "context_tokens": stats["tokens_out"] if stats else resume_context.estimate_tokens(resume),
+               "selection_ms": stats["elapsed_ms"] if stats else 0.0, "jd_skills_visible": recall}
+        for mode in ("full", "relevant"):
+            env = dict(base_env, RESUME_CONTEXT=mode)
+            for script in SCRIPTS:
+                timings = [run(script, resume, env) for _ in range(args.repeat)]
+                row[f"{script}_{mode}_ms"] = round(float(np.mean(timings)), 1)
+        for script in SCRIPTS:
+            row[f"{script}_saved"] = round(1.0 - row[f"{script}_relevant_ms"] / row[f"{script}_full_ms"], 3)
+        rows.append(row)
+        print(json.dumps(row), file=sys.stderr)
+
+    print(json.dumps({"backend": base_env["MODEL_BACKEND"], "budget_tokens": resume_context.BUDGET_TOKENS,
+                      "ms_per_1k_prompt_tokens": float(base_env["STANDIN_MS_PER_1K_PROMPT_TOKENS"]),
+                      "results": rows}, indent=2))
+
+if __name__ == "__main__":
+    main()
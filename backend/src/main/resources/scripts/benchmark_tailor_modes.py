@@ -0,0 +1,107 @@
+import sys
+import json
+import time
+import argparse
+import urllib.request
+import numpy as np
+import google.generativeai as genai
+import tailor
+import model_client
+import admission
+
+# Compares the LaTeX-emitting tailor with the structured ResumeData mode on a corpus of resume/JD pairs:
+# output tokens (total and for steps 3-4) and end-to-end latency, optionally including the resume-engine render.
+#
+# Corpus format (JSONL), one pair per line:
+#   {"resume": "...", "job_description": "..."}
+
+MODES = {"latex": tailor.tailor_latex, "resume-data": tailor.tailor_resume_data}
+
+def recording_call(records):
+    """A drop-in for tailor.call_gemini_api that keeps each call's latency and token usage."""
+    model = genai.GenerativeModel(model_name=tailor.MODEL_NAME)
+
+    def call(prompt, step=None):
+        with admission.admit("tailor_benchmark", "batch"):
+            started = time.perf_counter()
+            response = model.generate_content(prompt)
+        usage = response.usage_metadata
+        records.append({
+            "latency_ms": (time.perf_counter() - started) * 1000.0,
+            "prompt_tokens": usage.prompt_token_count,
+            "output_tokens": usage.candidates_token_count,
+        })
+        return response.text
+    return call
+
+def render(engine_url, template, resume_data):
+    """Renders the structured result through the resume-engine's /generate endpoint; returns milliseconds."""
+    body = json.dumps({"template_name": template, "resume_data": resume_data}).encode("utf-8")
+    request = urllib.request.Request(engine_url.rstrip("/") + "/generate", data=body, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+    return (time.perf_counter() - started) * 1000.0
+
+def summarize(runs):
+    def stat(key):
+        values = [r[key] for r in runs if r.get(key) is not None]
+        if not values:
+            return None
+        return {"mean": round(float(np.mean(values)), 1), "p50": round(float(np.percentile(values, 50)), 1),
+                "p95": round(float(np.percentile(values, 95)), 1)}
+    return {
+        "runs": len(runs),
+        "failures": sum(1 for r in runs if r.get("error")),
+        "end_to_end_ms": stat("end_to_end_ms"),
+        "model_ms": stat("model_ms"),
+        "render_ms": stat("render_ms"),
+        "output_tokens": stat("output_tokens"),
+        "output_tokens_steps_3_4": stat("output_tokens_steps_3_4"),
+        "prompt_tokens": stat("prompt_tokens"),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the tailor's LaTeX and ResumeData output modes.")
+    parser.add_argument("corpus", help="JSONL file of resume/job_description pairs")
+    parser.add_argument("--engine-url", help="Also render ResumeData results through this resume-engine (e.g. http://127.0.0.1:8000)")
+    parser.add_argument("--template", default="professional", help="Template used for rendering")
+    args = parser.parse_args()
+
+    if not model_client.API_KEY:
+        print("Error: GOOGLE_API_KEY not found.", file=sys.stderr)
+        sys.exit(1)
+    genai.configure(api_key=model_client.API_KEY)
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        pairs = [json.loads(line) for line in f if line.strip()]
+
+    results = {}
+    for mode, pipeline in MODES.items():
+        runs = []
+        for pair in pairs:
+            records = []
+            run = {}
+            started = time.perf_counter()
+            try:
+                output = pipeline(pair["resume"], pair["job_description"], call=recording_call(records))
+                if mode == "resume-data" and args.engine_url:
+                    run["render_ms"] = render(args.engine_url, args.template, output)
+            except Exception as e:
+                run["error"] = str(e)
+            run["end_to_end_ms"] = (time.perf_counter() - started) * 1000.0
+            run["model_ms"] = sum(r["latency_ms"] for r in records)
+            run["output_tokens"] = sum(r["output_tokens"] or 0 for r in records)
+            run["output_tokens_steps_3_4"] = sum(r["output_tokens"] or 0 for r in records[2:])
+            run["prompt_tokens"] = sum(r["prompt_tokens"] or 0 for r in records)
+            runs.append(run)
+        results[mode] = summarize(runs)
+
+    latex, structured = results["latex"], results["resume-data"]
+    if latex["output_tokens"] and structured["output_tokens"]:
+        results["output_token_reduction"] = round(1.0 - structured["output_tokens"]["mean"] / latex["output_tokens"]["mean"], 3)
+        results["latency_reduction"] = round(1.0 - structured["end_to_end_ms"]["mean"] / latex["end_to_end_ms"]["mean"], 3)
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
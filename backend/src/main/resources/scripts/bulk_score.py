@@ -0,0 +1,261 @@
+import sys
+import os
+import re
+import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# The full evaluation reuses the ATS evaluator's prompts and helpers (scripts1/evaluate.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts1"))
+import evaluate
+from ats_scoring import JobProfile
+# Shared helpers (model client, admission control, document ingestion) live next to this script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared"))
+import model_client
+import document_ingest
+import jd_preprocess
+
+# --- CONFIGURATION ---
+MODEL_NAME = evaluate.MODEL_NAME
+
+SUPPORTED_EXTENSIONS = (".pdf", ".docx", ".txt", ".md", ".tex")
+CHECKPOINT_FILENAME = ".bulk_score_checkpoint.jsonl"
+DEFAULT_TOP_K = 10
+DEFAULT_CONCURRENCY = 4
+
+# --- TEXT EXTRACTION (runs in worker processes) ---
+
+def extract_text(path):
+    """Extracts normalized plain text from a resume file (cached by content hash; see document_ingest.py)."""
+    return document_ingest.ingest(path)["text"]
+
+def prerank_file(path, profile):
+    """Worker entry point: extracts one file and scores it with the evaluator's local ATS scorer."""
+    try:
+        text = extract_text(path)
+    except Exception as e:
+        return {"file": path, "error": f"Could not extract text: {e}"}
+    result = profile.score(text)
+    return {
+        "file": path,
+        "local_score": result["raw_score"],
+        "matched_skills": result["matched_keywords"],
+        "missing_skills": result["missing_keywords"],
+    }
+
+# --- HELPER FUNCTIONS ---
+
+def file_fingerprint(path):
+    """Identifies a file version by size and modification time, so edited resumes are re-scored (nanoseconds, so
+    an edit within the same second that keeps the size is still seen)."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def parse_score(report):
+    """Pulls the 'SCORE: n' value out of an evaluation report."""
+    match = re.search(r"SCORE:\s*\[?(\d+(?:\.\d+)?)", report)
+    return float(match.group(1)) if match else None
+
+def list_resume_files(directory):
+    """Lists supported resume files in the directory, in a stable order."""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(SUPPORTED_EXTENSIONS) and os.path.isfile(os.path.join(directory, name))
+    )
+
+class EventWriter:
+    """Streams NDJSON events to stdout and appends the durable ones to the checkpoint file."""
+
+    def __init__(self, checkpoint_path, jd_hash, resume):
+        self.lock = threading.Lock()
+        self.jd_hash = jd_hash
+        self.checkpoint_path = checkpoint_path
+        self.completed = self._load() if resume else {}
+        self.checkpoint = open(checkpoint_path, "a" if self.completed else "w", encoding="utf-8")
+        if not self.completed:
+            self._append({"event": "run", "jd_hash": jd_hash})
+
+    def _load(self):
+        """Reads a previous checkpoint for the same JD, keyed by (event, file)."""
+        completed = {}
+        if not os.path.exists(self.checkpoint_path):
+            return completed
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by an interruption
+            if record.get("event") == "run" and record.get("jd_hash") != self.jd_hash:
+                return {}  # Checkpoint belongs to another job description
+            completed[(record.get("event"), record.get("file"))] = record
+        return completed
+
+    def _append(self, record):
+        self.checkpoint.write(json.dumps(record) + "\n")
+        self.checkpoint.flush()
+
+    def cached(self, event, file=None, fingerprint=None):
+        record = self.completed.get((event, file))
+        if record is None or (fingerprint is not None and record.get("fingerprint") != fingerprint):
+            return None
+        return record
+
+    def emit(self, record, durable=True, cached=False):
+        with self.lock:
+            if durable and not cached:
+                self._append(record)
+            print(json.dumps(dict(record, cached=True) if cached else record), flush=True)
+
+    def close(self):
+        self.checkpoint.close()
+
+# --- PIPELINE STAGES ---
+
+def call_model(prompt, step):
+    """Bulk scoring yields to interactive requests: every call is admitted in the batch priority class."""
+    return model_client.generate(prompt, MODEL_NAME, "bulk_score", step, priority="batch")
+
+def analyze_job_description(job_description, writer):
+    """Step 1: analyses the JD once for the whole run (restored from the checkpoint when available)."""
+    record = writer.cached("jd_analysis")
+    if record:
+        writer.emit(record, cached=True)
+        return record["analysis"]
+    prompt = evaluate.PROMPT_JD.format(job_description=jd_preprocess.for_prompt(job_description))
+    analysis = json.loads(evaluate.clean_json_string(call_model(prompt, "jd_analysis")))
+    writer.emit({"event": "jd_analysis", "analysis": analysis})
+    return analysis
+
+def prerank_resumes(files, job_description, analysis, workers, writer):
+    """Step 2: extracts and locally scores every resume in parallel across processes."""
+    profile = JobProfile(job_description, analysis.get("required_skills", []), analysis.get("preferred_skills", []))
+
+    results, pending = [], []
+    for path in files:
+        record = writer.cached("prerank", path, file_fingerprint(path))
+        if record and "error" not in record:  # Failed extractions (from older checkpoints) are retried
+            writer.emit(record, cached=True)
+            results.append(record)
+        else:
+            pending.append(path)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(prerank_file, path, profile) for path in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                record = dict(result, event="prerank", fingerprint=file_fingerprint(result["file"]))
+                # A failed extraction is not checkpointed, so the file is retried when the run is resumed
+                writer.emit(record, durable="error" not in record)
+                results.append(record)
+
+    scored = [r for r in results if "local_score" in r]
+    return sorted(scored, key=lambda r: (-r["local_score"], r["file"]))
+
+def evaluate_candidate(candidate, rank, analysis):
+    """Step 3: the evaluate.py resume analysis and ATS report for one shortlisted candidate."""
+    resume_content = extract_text(candidate["file"])
+    resume_prompt = evaluate.PROMPT_RESUME.format(resume_content=resume_content)
+    resume_analysis = json.loads(evaluate.clean_json_string(call_model(resume_prompt, "resume_analysis")))
+
+    eval_prompt = evaluate.PROMPT_EVAL.format(
+        job_description_json=json.dumps(analysis, indent=2),
+        resume_json=json.dumps(resume_analysis, indent=2),
+        original_resume=resume_content
+    )
+    report = call_model(eval_prompt, "evaluation")
+    return {
+        "event": "evaluation",
+        "file": candidate["file"],
+        "fingerprint": candidate["fingerprint"],
+        "rank": rank,
+        "local_score": candidate["local_score"],
+        "score": parse_score(report),
+        "report": report,
+    }
+
+def evaluate_shortlist(shortlist, analysis, concurrency, writer):
+    """Runs full model evaluations for the top-K candidates, at most `concurrency` at a time."""
+    evaluations, pending = [], []
+    for rank, candidate in enumerate(shortlist, start=1):
+        record = writer.cached("evaluation", candidate["file"], candidate["fingerprint"])
+        if record:
+            # Ranked anew: files added or re-scored since the checkpoint can move a cached candidate
+            record = dict(record, rank=rank)
+            writer.emit(record, cached=True)
+            evaluations.append(record)
+        else:
+            pending.append((rank, candidate))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(evaluate_candidate, c, rank, analysis): c for rank, c in pending}
+        for future in as_completed(futures):
+            try:
+                record = future.result()
+            except Exception as e:
+                # Not checkpointed, so the candidate is retried when the run is resumed
+                writer.emit({"event": "error", "file": futures[future]["file"], "error": str(e)}, durable=False)
+                continue
+            writer.emit(record)
+            evaluations.append(record)
+    return evaluations
+
+# --- MAIN FUNCTION ---
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scores every resume in a directory against one job description.")
+    parser.add_argument("directory", help="Directory containing .pdf, .docx, .txt, .md or .tex resumes")
+    parser.add_argument("job_description", help="Job description text")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Candidates that get a full model evaluation")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Concurrent model evaluations")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes used for text extraction")
+    parser.add_argument("--checkpoint", help=f"Checkpoint file (default: <directory>/{CHECKPOINT_FILENAME})")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore any existing checkpoint and start over")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if not model_client.is_configured():
+        print("Error: GOOGLE_API_KEY not found.", file=sys.stderr)
+        sys.exit(1)
+    if not os.path.isdir(args.directory):
+        print(f"Error: Not a directory: {args.directory}", file=sys.stderr)
+        sys.exit(1)
+
+    jd_hash = hashlib.sha256(args.job_description.encode("utf-8")).hexdigest()
+    checkpoint_path = args.checkpoint or os.path.join(args.directory, CHECKPOINT_FILENAME)
+    writer = EventWriter(checkpoint_path, jd_hash, resume=not args.no_resume)
+
+    try:
+        files = list_resume_files(args.directory)
+        analysis = analyze_job_description(args.job_description, writer)
+        ranked = prerank_resumes(files, args.job_description, analysis, args.workers, writer)
+
+        shortlist = ranked[:max(args.top_k, 0)]
+        writer.emit({"event": "shortlist", "files": [c["file"] for c in shortlist]}, durable=False)
+        evaluations = evaluate_shortlist(shortlist, analysis, args.concurrency, writer)
+
+        writer.emit({
+            "event": "summary",
+            "total_files": len(files),
+            "scored": len(ranked),
+            "evaluated": len(evaluations),
+            "ranking": [
+                {"file": r["file"], "score": r.get("score"), "local_score": r["local_score"]}
+                for r in sorted(evaluations, key=lambda r: (-(r.get("score") or 0), r["rank"]))
+            ],
+        }, durable=False)
+
+    except Exception as e:
+        print(f"A critical error occurred during bulk scoring: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        writer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import tempfile
+import contextlib
+from telemetry import percentile
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: admission control is a no-op there
+    fcntl = None
+
+# --- CONFIGURATION ---
+STATE_DIR = os.getenv("ADMISSION_STATE_DIR", os.path.join(tempfile.gettempdir(), "career_catalyst_ai"))
+ENABLED = os.getenv("ADMISSION_ENABLED", "1") == "1"
+RATE_PER_SECOND = float(os.getenv("ADMISSION_RATE", "4"))        # Token bucket refill rate (model calls per second)
+BURST = float(os.getenv("ADMISSION_BURST", "8"))                 # Token bucket capacity
+MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8"))
+MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT", "120"))
+LEASE_SECONDS = float(os.getenv("ADMISSION_LEASE", "300"))       # In-flight calls older than this are presumed lost
+
+# Weighted fair queuing: an interactive flow gets this many turns for each batch turn
+CLASS_WEIGHTS = {"interactive": 4.0, "batch": 1.0}
+WAIT_HISTORY = 200
+POLL_SECONDS = 0.02
+MAX_POLL_SECONDS = 0.25
+
+class AdmissionTimeout(RuntimeError):
+    """Raised when a model call waited longer than ADMISSION_MAX_WAIT for admission."""
+
+# --- SHARED STATE ---
+
+def _state_paths():
+    os.makedirs(STATE_DIR, exist_ok=True)
+    return os.path.join(STATE_DIR, "admission.lock"), os.path.join(STATE_DIR, "admission_state.json")
+
+def _empty_state():
+    return {"tokens": BURST, "updated": time.time(), "virtual_time": 0.0, "flow_tags": {},
+            "queue": {}, "in_flight": {}, "waits": {c: [] for c in CLASS_WEIGHTS}, "admitted": {c: 0 for c in CLASS_WEIGHTS},
+            "timeouts": 0}
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+@contextlib.contextmanager
+def locked_state():
+    """Yields the shared admission state under an exclusive file lock and writes it back afterwards."""
+    lock_path, state_path = _state_paths()
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (FileNotFoundError, ValueError):
+                state = _empty_state()
+
+            # Drop entries of processes that died without releasing, and expired leases
+            now = time.time()
+            state["queue"] = {k: v for k, v in state["queue"].items() if _alive(v["pid"])}
+            state["in_flight"] = {k: v for k, v in state["in_flight"].items()
+                                  if _alive(v["pid"]) and now - v["started"] < LEASE_SECONDS}
+
+            # Refill the token bucket
+            state["tokens"] = min(BURST, state["tokens"] + (now - state["updated"]) * RATE_PER_SECOND)
+            state["updated"] = now
+
+            yield state
+
+            temp_path = state_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(temp_path, state_path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+# --- ADMISSION ---
+
+def _enqueue(state, ticket, priority, pipeline):
+    """Stamps the ticket with a WFQ virtual finish tag: per-flow (class, pipeline) fairness, weighted by class."""
+    flow = f"{priority}:{pipeline}"
+    start = max(state["virtual_time"], state["flow_tags"].get(flow, 0.0))
+    tag = start + 1.0 / CLASS_WEIGHTS[priority]
+    state["flow_tags"][flow] = tag
+    state["queue"][ticket] = {"tag": tag, "class": priority, "pipeline": pipeline, "pid": os.getpid(), "enqueued": time.time()}
+
+def _admit_eligible(state):
+    """Admits queued tickets in tag order while tokens and concurrency allow, on behalf of whichever processes
+    own them (each finds its ticket in in_flight on its next poll), so one lock pass can admit many calls."""
+    queue, admitted = state["queue"], []
+    while queue and state["tokens"] >= 1.0 and len(state["in_flight"]) < MAX_CONCURRENCY:
+        ticket = min(queue, key=lambda k: (queue[k]["tag"], queue[k]["enqueued"]))
+        entry = queue.pop(ticket)
+        state["tokens"] -= 1.0
+        state["virtual_time"] = entry["tag"]
+        now = time.time()
+        wait = now - entry["enqueued"]
+        state["in_flight"][ticket] = {"pid": entry["pid"], "started": now, "class": entry["class"],
+                                      "pipeline": entry["pipeline"], "wait": wait}
+        waits = state["waits"].setdefault(entry["class"], [])
+        waits.append(round(wait, 4))
+        del waits[:-WAIT_HISTORY]
+        state["admitted"][entry["class"]] = state["admitted"].get(entry["class"], 0) + 1
+        admitted.append(ticket)
+    return admitted
+
+def _ahead(state, ticket):
+    """How many queued tickets are ahead of this one."""
+    queue = state["queue"]
+    key = (queue[ticket]["tag"], queue[ticket]["enqueued"])
+    return sum(1 for entry in queue.values() if (entry["tag"], entry["enqueued"]) < key)
+
+@contextlib.contextmanager
+def admit(pipeline, priority="interactive"):
+    """Blocks until this process may make one model call; yields the seconds spent waiting in the queue."""
+    if not ENABLED or fcntl is None:
+        yield 0.0
+        return
+    if priority not in CLASS_WEIGHTS:
+        priority = "interactive"
+
+    ticket = uuid.uuid4().hex
+    with locked_state() as state:
+        _enqueue(state, ticket, priority, pipeline)
+
+    started, delay, wait, ahead = time.time(), POLL_SECONDS, None, None
+    try:
+        while wait is None:
+            with locked_state() as state:
+                if ticket not in state["queue"] and ticket not in state["in_flight"]:
+                    # The state file was reset or lost; queue again rather than wait for a ticket that is gone
+                    _enqueue(state, ticket, priority, pipeline)
+                _admit_eligible(state)
+                if ticket in state["in_flight"]:
+                    wait = state["in_flight"][ticket].get("wait", 0.0)
+                    timed_out, position = False, None
+                else:
+                    timed_out = time.time() - started > MAX_WAIT_SECONDS
+                    position = _ahead(state, ticket)
+                if timed_out:
+                    state["queue"].pop(ticket, None)
+                    state["timeouts"] = state.get("timeouts", 0) + 1
+            # Raised outside the lock, so the state (and the timeout count) is written back first
+            if timed_out:
+                raise AdmissionTimeout(f"Model call for '{pipeline}' was not admitted within {MAX_WAIT_SECONDS:.0f}s")
+            if wait is None:
+                # Back off while the queue is stuck; poll quickly at its head and once tickets ahead have left it
+                moved = position == 0 or (ahead is not None and position < ahead)
+                delay = POLL_SECONDS if moved else min(delay * 1.5, MAX_POLL_SECONDS)
+                ahead = position
+                time.sleep(delay)
+        yield wait
+    finally:
+        with locked_state() as state:
+            state["queue"].pop(ticket, None)
+            state["in_flight"].pop(ticket, None)
+
+def stats():
+    """Current queue depth and in-flight calls per class, plus recent wait-time percentiles."""
+    if fcntl is None:
+        return {"enabled": False}
+    with locked_state() as state:
+        return {
+            "enabled": ENABLED,
+            "tokens": round(state["tokens"], 2),
+            "queue_depth": {c: sum(1 for v in state["queue"].values() if v["class"] == c) for c in CLASS_WEIGHTS},
+            "in_flight": {c: sum(1 for v in state["in_flight"].values() if v["class"] == c) for c in CLASS_WEIGHTS},
+            "admitted": state["admitted"],
+            "timeouts": state.get("timeouts", 0),
+            "wait_seconds": {c: {"p50": percentile(w, 50), "p95": percentile(w, 95)} for c, w in state["waits"].items()},
+            "config": {"rate_per_second": RATE_PER_SECOND, "burst": BURST, "max_concurrency": MAX_CONCURRENCY,
+                       "class_weights": CLASS_WEIGHTS},
+        }
+
+# --- SIMULATION ---
+
+def _simulated_client(args):
+    """One simulated pipeline process: a few sequential model calls against the local stand-in."""
+    priority, pipeline, calls, seed = args
+    import model_client
+    outcomes = []
+    for step in range(calls):
+        started = time.time()
+        try:
+            model_client.generate(f"simulated prompt {seed}-{step}", "standin", pipeline, f"step_{step + 1}", priority)
+            outcomes.append((priority, time.time() - started, None))
+        except Exception as e:
+            outcomes.append((priority, time.time() - started, type(e).__name__))
+    return outcomes
+
+def simulate(interactive, batch, calls, use_admission):
+    """Fires a burst of interactive and batch pipelines at the stand-in, with or without admission control."""
+    import multiprocessing
+    simulation_dir = tempfile.mkdtemp(prefix="admission_sim_")
+    os.environ.update({"ADMISSION_STATE_DIR": simulation_dir, "MODEL_BACKEND": "standin",
+                       "ADMISSION_ENABLED": "1" if use_admission else "0", "STANDIN_STATE_DIR": simulation_dir})
+    # Unless set, admit what the stand-in provider sustains (its concurrency at its base latency), so the run
+    # compares queueing in front of the provider with retrying against it rather than a stricter rate limit
+    import model_standin
+    os.environ.setdefault("ADMISSION_MAX_CONCURRENCY", str(model_standin.PROVIDER_CONCURRENCY))
+    os.environ.setdefault("ADMISSION_BURST", str(model_standin.PROVIDER_CONCURRENCY))
+    os.environ.setdefault("ADMISSION_RATE", str(round(model_standin.PROVIDER_CONCURRENCY * 1000.0 /
+                                                      max(model_standin.LATENCY_MS, 1.0), 1)))
+    jobs = [("interactive", f"interactive_{i % 4}", calls, i) for i in range(interactive)]
+    jobs += [("batch", "bulk_score", calls, 1000 + i) for i in range(batch)]
+    jobs.sort(key=lambda job: job[3] % 1000)  # Interleave the classes so neither starts with a head start
+
+    started = time.time()
+    with multiprocessing.get_context("spawn").Pool(processes=len(jobs)) as pool:
+        results = [o for outcome in pool.map(_simulated_client, jobs) for o in outcome]
+    elapsed = time.time() - started
+
+    report = {"admission": use_admission, "wall_seconds": round(elapsed, 2)}
+    for priority in CLASS_WEIGHTS:
+        latencies = [r[1] for r in results if r[0] == priority and r[2] is None]
+        report[priority] = {
+            "calls": sum(1 for r in results if r[0] == priority),
+            "errors": sum(1 for r in results if r[0] == priority and r[2] is not None),
+            "error_types": sorted({r[2] for r in results if r[0] == priority and r[2] is not None}),
+            "p50_seconds": round(percentile(latencies, 50) or 0, 3),
+            "p95_seconds": round(percentile(latencies, 95) or 0, 3),
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspects or simulates the shared model-call admission controller.")
+    parser.add_argument("--stats", action="store_true", help="Print queue depth, in-flight calls and wait times")
+    parser.add_argument("--simulate", action="store_true", help="Run a burst against the local model stand-in")
+    parser.add_argument("--interactive", type=int, default=12, help="Simulated interactive pipelines")
+    parser.add_argument("--batch", type=int, default=12, help="Simulated batch pipelines")
+    parser.add_argument("--calls", type=int, default=3, help="Model calls per simulated pipeline")
+    args = parser.parse_args()
+
+    if args.simulate:
+        if fcntl is None:
+            print("Error: admission control needs fcntl (Linux/macOS).", file=sys.stderr)
+            sys.exit(1)
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        reports = [simulate(args.interactive, args.batch, args.calls, use) for use in (False, True)]
+        print(json.dumps(reports, indent=2))
+    else:
+        print(json.dumps(stats(), indent=2))
+
+if __name__ == "__main__":
+    main()
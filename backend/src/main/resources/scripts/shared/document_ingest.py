@@ -0,0 +1,530 @@
+import os
+import re
+import sys
+import json
+import time
+import zipfile
+import hashlib
+import argparse
+import tempfile
+import unicodedata
+import xml.etree.ElementTree as ET
+from telemetry import percentile
+
+# Document ingestion: turns an uploaded resume (PDF, DOCX, TeX or plain text) into the normalized plain text the
+# pipelines read on stdin, plus its section structure. Files are read page by page (PDF) or element by element
+# (DOCX) so large uploads stay memory-bounded, extractions are cached by content hash, and resumes we generated
+# ourselves (resume_files/<uuid>/resume.pdf|tex) are answered from the resume.json stored next to them.
+
+# --- CONFIGURATION ---
+CACHE_DIR = os.getenv("DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "career_catalyst_ai", "documents"))
+CACHE_ENABLED = os.getenv("DOCUMENT_CACHE_ENABLED", "1") == "1"
+MAX_PAGES = int(os.getenv("DOCUMENT_MAX_PAGES", "40"))           # Pages read from a PDF; resumes rarely exceed 3
+MAX_CHARS = int(os.getenv("DOCUMENT_MAX_CHARS", "200000"))       # Text kept from any one document
+# Bump when extraction or normalization changes, so cached results from the old code are not served
+EXTRACTOR_VERSION = 1
+HASH_CHUNK_BYTES = 1 << 20
+
+GENERATED_FILES = ("resume.pdf", "resume.tex")
+INDEX_FILENAME = "generated_index.json"
+
+# Canonical section names and the headings that map to them
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "internships", "internship"],
+    "education": ["education", "academic background", "academics", "qualifications"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "skills": ["skills", "technical skills", "programming skills", "core competencies", "technologies", "tech stack"],
+    "certifications": ["certifications", "certificates", "licenses", "licenses & certifications"],
+    "achievements": ["achievements", "awards", "honors", "honors & awards", "accomplishments"],
+    "publications": ["publications", "research"],
+    "languages": ["languages"],
+    "interests": ["interests", "hobbies", "extracurricular activities", "activities", "volunteering", "volunteer experience"],
+}
+HEADING_LOOKUP = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+
+BULLET_RE = re.compile(r"^\s*[\u2022\u2023\u25aa\u25ab\u25cf\u25e6\u2043\u2219\u00b7\u27a2\u2713\u2714\uf0b7\uf0a7*\u2013\u2014-]\s+")
+PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u202f\u205f\u3000]+")
+
+# --- NORMALIZATION AND SECTIONS ---
+
+def normalize_line(line):
+    """NFKC (ligatures, full-width forms), uniform '- ' bullets, no soft hyphens or control characters, single spaces."""
+    line = unicodedata.normalize("NFKC", line).replace("\u00ad", "")
+    line = "".join(ch for ch in line if ch == "\t" or unicodedata.category(ch)[0] != "C")
+    line = BULLET_RE.sub("- ", line)
+    return SPACES_RE.sub(" ", line).strip()
+
+def heading_name(line):
+    """The canonical section name when the line looks like a section heading, else None."""
+    key = re.sub(r"[^a-z& ]", "", line.lower()).strip()
+    if not key or len(key.split()) > 5:
+        return None
+    return HEADING_LOOKUP.get(key)
+
+def assemble(items):
+    """Builds the normalized text and section list from (kind, text) items yielded by an extractor.
+    Kinds: "heading" (a structural heading), "line", "page" (page break). Lines wrapped with a hyphen
+    are re-joined, page numbers dropped and blank runs collapsed."""
+    lines, sections, chars = [], [], 0
+    for kind, raw in items:
+        if kind == "page":
+            continue
+        for part in raw.split("\n"):
+            line = normalize_line(part)
+            if not line:
+                if lines and lines[-1]:
+                    lines.append("")
+                continue
+            if PAGE_NUMBER_RE.match(line):
+                continue
+            if lines and lines[-1].endswith("-") and line[:1].islower() and lines[-1][-2:-1].isalpha():
+                lines[-1] = lines[-1][:-1] + line
+                continue
+            name = heading_name(line)
+            if name or kind == "heading":
+                if lines and lines[-1]:
+                    lines.append("")
+                sections.append({"name": name or "other", "title": line, "start_line": len(lines)})
+            lines.append(line)
+            chars += len(line) + 1
+        if chars >= MAX_CHARS:
+            break
+    while lines and not lines[-1]:
+        lines.pop()
+    for index, section in enumerate(sections):
+        end = sections[index + 1]["start_line"] if index + 1 < len(sections) else len(lines)
+        section["end_line"] = end
+        section["chars"] = sum(len(line) + 1 for line in lines[section["start_line"]:end])
+    return "\n".join(lines)[:MAX_CHARS], sections
+
+# --- EXTRACTORS (each yields (kind, text) items) ---
+
+def iter_pdf(path, stats):
+    try:
+        import pdfplumber
+    except ImportError:
+        raise RuntimeError("PDF extraction needs pdfplumber (pip install pdfplumber).")
+    with pdfplumber.open(path) as pdf:
+        stats["pages"] = len(pdf.pages)
+        for number, page in enumerate(pdf.pages):
+            if number >= MAX_PAGES:
+                stats["truncated"] = True
+                break
+            text = page.extract_text() or ""
+            # Drop the page's parsed layout objects before moving on, so memory does not grow with page count
+            getattr(page, "close", page.flush_cache)()
+            yield "page", str(number + 1)
+            yield "line", text
+
+DOCX_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def iter_docx(path, stats):
+    """Streams word/document.xml paragraph by paragraph (no python-docx DOM of the whole file)."""
+    with zipfile.ZipFile(path) as archive:
+        with archive.open("word/document.xml") as document:
+            paragraphs = 0
+            for _, element in ET.iterparse(document, events=("end",)):
+                if element.tag != DOCX_NS + "p":
+                    continue
+                parts = []
+                for node in element.iter():
+                    if node.tag == DOCX_NS + "t" and node.text:
+                        parts.append(node.text)
+                    elif node.tag in (DOCX_NS + "tab",):
+                        parts.append(" ")
+                    elif node.tag in (DOCX_NS + "br", DOCX_NS + "cr"):
+                        parts.append("\n")
+                style = element.find(f"{DOCX_NS}pPr/{DOCX_NS}pStyle")
+                style = style.get(DOCX_NS + "val", "") if style is not None else ""
+                is_list = element.find(f"{DOCX_NS}pPr/{DOCX_NS}numPr") is not None or style.startswith("List")
+                text = "".join(parts)
+                element.clear()
+                paragraphs += 1
+                if style.startswith(("Heading", "Title")):
+                    yield "heading", text
+                else:
+                    yield "line", ("- " + text) if is_list and text.strip() else text
+            stats["paragraphs"] = paragraphs
+
+TEX_DROP_WITH_ARGS = re.compile(
+    r"\\(vspace|hspace|label|extracolsep|setlength|addtolength|titlespacing|titleformat|color|pagestyle|fancyhf|"
+    r"urlstyle|newcommand|renewcommand|usepackage|documentclass|includegraphics|hypersetup|definecolor)\*?"
+    r"(\[[^\]]*\])?(\{[^{}]*(\{[^{}]*\}[^{}]*)*\})*")
+TEX_ENVIRONMENT = re.compile(r"\\(begin|end)\{[^}]*\}(\[[^\]]*\])?(\{[^{}]*(\{[^{}]*\}[^{}]*)*\})*")
+TEX_SECTION = re.compile(r"\\(section|subsection|chapter)\*?\{([^{}]*(\{[^{}]*\}[^{}]*)*)\}")
+TEX_HREF = re.compile(r"\\href\{[^{}]*\}\{([^{}]*(\{[^{}]*\}[^{}]*)*)\}")
+TEX_MULTI_ARG = re.compile(r"\\[A-Za-z]+((\{[^{}]*(\{[^{}]*\}[^{}]*)*\}\s*){2,})")
+TEX_GROUP = re.compile(r"\{([^{}]*(\{[^{}]*\}[^{}]*)*)\}")
+TEX_COMMAND = re.compile(r"\\[A-Za-z]+\*?(\[[^\]]*\])?")
+TEX_ESCAPES = {r"\&": "&", r"\%": "%", r"\$": "$", r"\#": "#", r"\_": "_", r"\{": "{", r"\}": "}",
+               r"\textasciitilde{}": "~", r"\textasciicircum{}": "^", r"\textbackslash{}": "\\"}
+
+def iter_tex(path, stats):
+    """Reads the document body line by line and reduces the markup to text, keeping \\section titles as headings."""
+    body, has_document = [], False
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if not has_document and "\\begin{document}" in line:
+                # Everything before the body is preamble (packages, macro definitions)
+                has_document, body = True, []
+                line = line.split("\\begin{document}", 1)[1]
+            elif "\\end{document}" in line:
+                body.append(re.sub(r"(?<!\\)%.*", "", line.split("\\end{document}", 1)[0]))
+                break
+            body.append(re.sub(r"(?<!\\)%.*", "", line))
+    # A fragment without \begin{document}: skip lines that are pure commands (likely stray preamble)
+    text = "".join(body) if has_document else "".join(line for line in body if not line.lstrip().startswith("\\"))
+    for escape, char in TEX_ESCAPES.items():
+        text = text.replace(escape, "\x00" + str(ord(char)) + "\x00")
+    text = TEX_SECTION.sub(lambda m: "\n\x01" + m.group(2) + "\n", text)
+    text = TEX_HREF.sub(lambda m: m.group(1), text)
+    text = TEX_DROP_WITH_ARGS.sub("", text)
+    text = TEX_ENVIRONMENT.sub("\n", text)
+    text = text.replace("\\\\", "\n").replace("\\item", "\n- ").replace("$|$", "|").replace("$\\bullet$", "")
+    text = TEX_MULTI_ARG.sub(lambda m: " | ".join(g.group(1) for g in TEX_GROUP.finditer(m.group(1))), text)
+    text = TEX_COMMAND.sub("", text)
+    text = text.replace("{", "").replace("}", "").replace("&", " | ").replace("$", "")
+    text = text.replace("---", "\u2014").replace("--", "\u2013").replace("~", " ")
+    text = re.sub(r"\x00(\d+)\x00", lambda m: chr(int(m.group(1))), text)
+    for line in text.split("\n"):
+        line = re.sub(r"^(\s*\|\s*)+|(\s*\|\s*)+$", "", line)
+        if not line.strip(" -"):
+            continue  # Layout-only lines (blank lines are paragraph breaks in TeX, not content)
+        if line.startswith("\x01"):
+            yield "heading", line[1:]
+        else:
+            yield "line", line
+
+def iter_plain(path, stats):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            yield "line", line.rstrip("\n")
+
+def _field(item, name):
+    # resume.json is written from the pydantic model in snake_case; accept camelCase copies too
+    camel = re.sub(r"_([a-z])", lambda m: m.group(1).upper(), name)
+    value = item.get(name, item.get(camel)) if isinstance(item, dict) else None
+    return value.strip() if isinstance(value, str) else value
+
+def iter_resume_data(data, stats):
+    """Renders stored ResumeData as text in the same section layout the extractors produce."""
+    info = _field(data, "personal_info") or {}
+    yield "line", _field(info, "full_name") or ""
+    yield "line", " | ".join(v for v in (_field(info, k) for k in ("email", "phone", "address")) if v)
+    links = [f"github.com/{_field(info, 'github_handle')}" if _field(info, "github_handle") else "",
+             f"linkedin.com/in/{_field(info, 'linkedin_handle')}" if _field(info, "linkedin_handle") else "",
+             _field(info, "portfolio_url") or "", _field(info, "extra_info") or ""]
+    yield "line", " | ".join(link for link in links if link)
+
+    def entries(key, render):
+        rendered = [render(item) for item in (_field(data, key) or [])]
+        return [lines for lines in rendered if any(lines)]
+
+    sections = [
+        ("EDUCATION", entries("education", lambda e: [" | ".join(v for v in (_field(e, "degree"), _field(e, "institution"),
+            "-".join(v for v in (_field(e, "start_year"), _field(e, "end_year")) if v), _field(e, "gpa") and f"GPA: {_field(e, 'gpa')}") if v)])),
+        ("EXPERIENCE", entries("work_experience", lambda e: [" | ".join(v for v in (_field(e, "job_title"), _field(e, "company_name"),
+            _field(e, "location"), " - ".join(v for v in (_field(e, "start_date"), _field(e, "end_date")) if v)) if v)]
+            + [f"- {p.strip()}" for p in _field(e, "description_points") or [] if p and p.strip()])),
+        ("PROJECTS", entries("projects", lambda e: [" | ".join(v for v in (_field(e, "project_name"), _field(e, "tech_stack"),
+            " - ".join(v for v in (_field(e, "start_date"), _field(e, "end_date")) if v)) if v)]
+            + [f"- {p.strip()}" for p in _field(e, "description_points") or [] if p and p.strip()])),
+        ("SKILLS", entries("skills", lambda e: [": ".join(v for v in (_field(e, "name"), _field(e, "value")) if v)])),
+        ("ACHIEVEMENTS", entries("achievements", lambda e: [f"- {_field(e, 'description')}" if _field(e, "description") else ""])),
+        ("CERTIFICATIONS", entries("certifications", lambda e: [" | ".join(v for v in (_field(e, "name"), _field(e, "issuer"),
+            _field(e, "date")) if v)])),
+    ]
+    for title, items in sections:
+        if not items:
+            continue
+        yield "heading", title
+        for lines in items:
+            for line in lines:
+                yield "line", line
+
+EXTRACTORS = {".pdf": iter_pdf, ".docx": iter_docx, ".tex": iter_tex, ".txt": iter_plain, ".md": iter_plain}
+
+def detect_format(path):
+    """The extractor key from the extension, or from the file's magic bytes for unnamed uploads."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in EXTRACTORS:
+        return extension
+    with open(path, "rb") as f:
+        head = f.read(8)
+    if head.startswith(b"%PDF"):
+        return ".pdf"
+    if head.startswith(b"PK"):
+        return ".docx"
+    return ".txt"
+
+# --- CACHE AND GENERATED-RESUME INDEX ---
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_path(sha256):
+    return os.path.join(CACHE_DIR, sha256[:2], f"{sha256}.v{EXTRACTOR_VERSION}.json")
+
+def _write_json(path, payload):
+    # Write-then-rename so concurrent readers never see a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(temp_path, path)
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def index_generated(storage_dir):
+    """Maps the content hash of every generated resume.pdf/resume.tex under the storage directory to its
+    resume.json, so a downloaded-and-reuploaded copy short-circuits too. Only new sessions are hashed."""
+    index_path = os.path.join(CACHE_DIR, INDEX_FILENAME)
+    index = _read_json(index_path) or {}
+    index.setdefault("sessions", {})
+    index.setdefault("hashes", {})
+    try:
+        sessions = os.listdir(storage_dir)
+    except OSError:
+        return index
+    added = 0
+    for session in sessions:
+        session_dir = os.path.join(storage_dir, session)
+        json_path = os.path.join(session_dir, "resume.json")
+        if session in index["sessions"] or not os.path.isfile(json_path):
+            continue
+        for name in GENERATED_FILES:
+            path = os.path.join(session_dir, name)
+            if os.path.isfile(path):
+                index["hashes"][file_sha256(path)] = os.path.abspath(json_path)
+        index["sessions"][session] = time.time()
+        added += 1
+    if added:
+        _write_json(index_path, index)
+    return index
+
+def generated_resume_json(path, sha256, storage_dir=None):
+    """The stored resume.json for a resume we generated: next to the file, or found by content hash."""
+    if os.path.basename(path) in GENERATED_FILES:
+        sibling = os.path.join(os.path.dirname(os.path.abspath(path)), "resume.json")
+        if os.path.isfile(sibling):
+            return sibling
+    if storage_dir:
+        json_path = index_generated(storage_dir)["hashes"].get(sha256)
+        if json_path and os.path.isfile(json_path):
+            return json_path
+    return None
+
+# --- INGESTION ---
+
+def ingest(path, storage_dir=None, use_cache=None):
+    """Returns {"text", "sections", "source", "format", "sha256", "cached", ...} for one document."""
+    use_cache = CACHE_ENABLED if use_cache is None else use_cache
+    started = time.perf_counter()
+    sha256 = file_sha256(path)
+    if use_cache:
+        cached = _read_json(_cache_path(sha256))
+        if cached is not None:
+            cached.update(cached=True, elapsed_ms=round((time.perf_counter() - started) * 1000.0, 2))
+            return cached
+
+    stats = {}
+    fmt = detect_format(path)
+    json_path = generated_resume_json(path, sha256, storage_dir)
+    data = _read_json(json_path) if json_path else None
+    if isinstance(data, dict):
+        source, items = "resume_json", iter_resume_data(data, stats)
+    else:
+        source, items = "extracted", EXTRACTORS[fmt](path, stats)
+    text, sections = assemble(items)
+
+    result = {"text": text, "sections": sections, "source": source, "format": fmt.lstrip("."), "sha256": sha256,
+              "bytes": os.path.getsize(path), "chars": len(text), "extractor_version": EXTRACTOR_VERSION, **stats}
+    if use_cache:
+        try:
+            _write_json(_cache_path(sha256), result)
+        except OSError as e:
+            print(f"Warning: could not cache extraction: {e}", file=sys.stderr)
+    result.update(cached=False, elapsed_ms=round((time.perf_counter() - started) * 1000.0, 2))
+    return result
+
+# --- BENCHMARK ---
+
+def _docx_bytes(paragraphs):
+    """A minimal but valid DOCX (used to synthesize benchmark corpora without python-docx)."""
+    body = []
+    for style, text in paragraphs:
+        props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        text = text.replace("&", "&amp;").replace("<", "&lt;")
+        body.append(f'<w:p>{props}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>')
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="'
+                f'{DOCX_NS[1:-1]}"><w:body>{"".join(body)}</w:body></w:document>')
+    buffer = tempfile.SpooledTemporaryFile()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", '<?xml version="1.0"?><Types xmlns="http://schemas.openxmlformats.org/'
+                         'package/2006/content-types"><Default Extension="xml" ContentType="application/xml"/></Types>')
+        archive.writestr("word/document.xml", document)
+    buffer.seek(0)
+    return buffer.read()
+
+def _pdf_bytes(pages):
+    """A minimal text PDF with one Helvetica text stream per page."""
+    objects = ["<</Type/Catalog/Pages 2 0 R>>", None, "<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>"]
+    kids = []
+    for lines in pages:
+        escaped = [line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for line in lines]
+        stream = "BT /F1 10 Tf 50 750 Td 12 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(f"<</Length {len(stream.encode('latin-1', 'replace'))}>>stream\n{stream}\nendstream")
+        objects.append(f"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Resources<</Font<</F1 3 0 R>>>>/Contents {len(objects)} 0 R>>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<</Type/Pages/Kids[{' '.join(kids)}]/Count {len(kids)}>>"
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer<</Size {len(objects) + 1}/Root 1 0 R>>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def make_corpus(directory, count, seed=7):
+    """Writes a mixed corpus (PDF, DOCX, TeX, TXT and generated-session copies) for --benchmark."""
+    import random
+    rng = random.Random(seed)
+    skills = ["Python", "Java", "SQL", "Docker", "Kubernetes", "AWS", "React", "TypeScript", "Kafka", "Terraform"]
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        sections = [("SUMMARY", [f"Engineer with {rng.randint(1, 12)} years of experience in {rng.choice(skills)}."])]
+        sections.append(("EXPERIENCE", [f"- Built {rng.choice(['APIs', 'pipelines', 'dashboards'])} with {rng.choice(skills)} "
+                                        f"for {rng.randint(2, 900)}k users" for _ in range(rng.randint(4, 40))]))
+        sections.append(("EDUCATION", ["B.Tech Computer Science, State University, 2018"]))
+        sections.append(("SKILLS", [", ".join(rng.sample(skills, 6))]))
+        kind = ["pdf", "docx", "tex", "txt", "generated"][i % 5]
+        name = os.path.join(directory, f"resume_{i:04d}.{kind if kind != 'generated' else 'pdf'}")
+        if kind == "pdf":
+            lines = [f"Candidate {i}"] + [line for title, body in sections for line in [title] + body]
+            with open(name, "wb") as f:
+                f.write(_pdf_bytes([lines[start:start + 55] for start in range(0, len(lines), 55)]))
+        elif kind == "docx":
+            paragraphs = [("Title", f"Candidate {i}")]
+            for title, body in sections:
+                paragraphs += [("Heading1", title.title())] + [("ListParagraph" if line.startswith("- ") else "", line.lstrip("- ")) for line in body]
+            with open(name, "wb") as f:
+                f.write(_docx_bytes(paragraphs))
+        elif kind == "tex":
+            with open(name, "w", encoding="utf-8") as f:
+                f.write("\\documentclass{article}\n\\begin{document}\n\\textbf{Candidate " + str(i) + "}\\\\\n")
+                for title, body in sections:
+                    f.write(f"\\section*{{{title.title()}}}\n\\begin{{itemize}}\n")
+                    f.write("".join("  \\item " + line.lstrip("- ").replace("%", "\\%") + "\n" for line in body))
+                    f.write("\\end{itemize}\n")
+                f.write("\\end{document}\n")
+        elif kind == "txt":
+            with open(name, "w", encoding="utf-8") as f:
+                f.write(f"Candidate {i}\n" + "\n".join(line for title, body in sections for line in [title] + body))
+        else:
+            session = os.path.join(directory, "sessions", f"{i:08d}-0000-0000-0000-000000000000")
+            os.makedirs(session, exist_ok=True)
+            experience = [line.lstrip("- ") for line in sections[1][1]]
+            data = {"personal_info": {"full_name": f"Candidate {i}", "email": "c@example.com"},
+                    "work_experience": [{"job_title": "Engineer", "company_name": "Acme", "description_points": experience}],
+                    "skills": [{"name": "Skills", "value": sections[3][1][0]}]}
+            with open(os.path.join(session, "resume.json"), "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            pdf = _pdf_bytes([[f"Candidate {i}"] + experience[:50]])
+            with open(os.path.join(session, "resume.pdf"), "wb") as f:
+                f.write(pdf)
+            with open(name, "wb") as f:  # The user's re-upload of the downloaded PDF
+                f.write(pdf)
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def benchmark(directory, storage_dir, repeat):
+    """Ingests every file cold (empty cache), then warm, and reports throughput per format and source."""
+    global CACHE_DIR
+    files = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if os.path.isfile(os.path.join(directory, name)))
+    original_cache_dir, report = CACHE_DIR, {"files": len(files), "passes": {}}
+    CACHE_DIR = tempfile.mkdtemp(prefix="document_ingest_bench_")
+    try:
+        for label in ["cold"] + [f"warm_{n + 1}" for n in range(repeat)]:
+            groups, started = {}, time.perf_counter()
+            for path in files:
+                try:
+                    result = ingest(path, storage_dir=storage_dir, use_cache=True)
+                    key = f"{result['format']}:{result['source']}"
+                    elapsed, size, error = result["elapsed_ms"], result["bytes"], None
+                except Exception as e:
+                    key, elapsed, size, error = f"{os.path.splitext(path)[1].lstrip('.')}:error", 0.0, 0, f"{type(e).__name__}: {e}"
+                group = groups.setdefault(key, {"files": 0, "bytes": 0, "latencies": [], "errors": []})
+                group["files"] += 1
+                group["bytes"] += size
+                group["latencies"].append(elapsed)
+                if error and len(group["errors"]) < 3:
+                    group["errors"].append(error[:200])
+            total_s = time.perf_counter() - started
+            report["passes"][label] = {
+                "files_per_s": round(len(files) / total_s, 1) if total_s else None,
+                "mb_per_s": round(sum(g["bytes"] for g in groups.values()) / 1e6 / total_s, 2) if total_s else None,
+                "by_format": {key: {"files": g["files"], "bytes": g["bytes"],
+                                    "p50_ms": round(percentile(g["latencies"], 50), 2),
+                                    "p95_ms": round(percentile(g["latencies"], 95), 2),
+                                    **({"errors": g["errors"]} if g["errors"] else {})} for key, g in sorted(groups.items())},
+            }
+    finally:
+        CACHE_DIR = original_cache_dir
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Extracts normalized resume text and sections from PDF, DOCX, TeX or text files.")
+    parser.add_argument("path", nargs="?", help="Document to ingest")
+    parser.add_argument("--storage-dir", help="Generated resume sessions directory (file.storage.path) for the resume.json short-circuit")
+    parser.add_argument("--text", action="store_true", help="Print only the normalized text (ready for a pipeline's stdin)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the extraction cache")
+    parser.add_argument("--index-generated", metavar="DIR", help="Index the generated sessions under DIR and exit")
+    parser.add_argument("--make-corpus", metavar="DIR", help="Write a mixed synthetic corpus to DIR and exit")
+    parser.add_argument("--count", type=int, default=100, help="Files for --make-corpus")
+    parser.add_argument("--benchmark", metavar="DIR", help="Measure cold/warm ingestion throughput over the files in DIR")
+    parser.add_argument("--repeat", type=int, default=1, help="Warm passes for --benchmark")
+    args = parser.parse_args()
+
+    if args.make_corpus:
+        make_corpus(args.make_corpus, args.count)
+        print(json.dumps({"corpus": args.make_corpus, "files": args.count}))
+    elif args.benchmark:
+        storage_dir = args.storage_dir or os.path.join(args.benchmark, "sessions")
+        print(json.dumps(benchmark(args.benchmark, storage_dir, args.repeat), indent=2))
+    elif args.index_generated:
+        print(json.dumps({"generated_files": len(index_generated(args.index_generated)["hashes"])}))
+    elif args.path:
+        try:
+            result = ingest(args.path, storage_dir=args.storage_dir, use_cache=not args.no_cache)
+        except (OSError, RuntimeError, zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            print(f"Error: could not ingest {args.path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(result["text"] if args.text else json.dumps(result, ensure_ascii=False))
+    else:
+        parser.error("a path (or --benchmark / --make-corpus / --index-generated) is required")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import importlib
+import subprocess
+import tempfile
+import jd_preprocess
+from telemetry import percentile
+
+# Speculative JD analysis: the frontend sends the job description as soon as it is pasted, the analysis runs in
+# a detached background process, and the tailor/evaluate pipelines later pick up the finished (or in-flight)
+# result by content hash instead of starting their own Step 1 after the resume arrives.
+
+# --- CONFIGURATION ---
+PREFETCH_DIR = os.getenv("JD_PREFETCH_DIR", os.path.join(tempfile.gettempdir(), "career_catalyst_ai", "jd_prefetch"))
+ENABLED = os.getenv("JD_PREFETCH_ENABLED", "1") == "1"
+TTL_SECONDS = float(os.getenv("JD_PREFETCH_TTL", "3600"))
+# How long a pipeline waits to join an in-flight prefetch before doing the analysis itself
+JOIN_TIMEOUT_SECONDS = float(os.getenv("JD_PREFETCH_JOIN_TIMEOUT", "90"))
+POLL_SECONDS = 0.1
+
+RESOURCES_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# Pipelines whose JD analysis depends on the JD alone: (scripts folder, module, prompt template)
+# The cover letter's first step analyses the JD together with the resume, so it cannot be prefetched.
+PIPELINES = {
+    "tailor": ("scripts", "tailor", "PROMPT_STEP_1"),
+    "evaluate": ("scripts1", "evaluate", "PROMPT_JD"),
+}
+
+# --- KEYS AND FILES ---
+
+def normalize(job_description):
+    """The JD as the backend passes it to the pipelines (PipelineResultCache.normalize): LF line endings, no
+    trailing spaces or tabs, no surrounding whitespace."""
+    text = job_description.replace("\r\n", "\n").replace("\r", "\n")
+    return re.sub(r"[ \t]+\n", "\n", text).strip()
+
+def jd_handle(job_description):
+    """The handle returned to callers: a content hash of the normalized JD, so a paste with CRLF line endings or
+    trailing spaces gets the same handle as the text the pipelines receive."""
+    return hashlib.sha256(normalize(job_description).encode("utf-8")).hexdigest()[:32]
+
+def _key_paths(handle, pipeline, prompt_template):
+    # The prompt template and the JD preprocessing version are part of the key, so editing a prompt or the
+    # boilerplate rules never serves an analysis made with the old ones
+    prompt_hash = hashlib.sha256((prompt_template + jd_preprocess.cache_tag()).encode("utf-8")).hexdigest()[:8]
+    base = os.path.join(PREFETCH_DIR, f"{handle}.{pipeline}.{prompt_hash}")
+    return base + ".json", base + ".pending"
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _write_json(path, data):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+def _fresh(result):
+    return result is not None and time.time() - result.get("completed", 0) < TTL_SECONDS
+
+def _in_flight(pending_path):
+    pending = _read_json(pending_path)
+    return pending is not None and _alive(pending["pid"]) and time.time() - pending["started"] < JOIN_TIMEOUT_SECONDS
+
+def _log_event(event):
+    try:
+        with open(os.path.join(PREFETCH_DIR, "events.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(dict(event, ts=time.time())) + "\n")
+    except OSError:
+        pass
+
+def _cleanup():
+    """Removes results and stale pending markers older than the TTL."""
+    cutoff = time.time() - TTL_SECONDS
+    for name in os.listdir(PREFETCH_DIR):
+        path = os.path.join(PREFETCH_DIR, name)
+        if name.endswith((".json", ".pending", ".tmp")) and os.path.getmtime(path) < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def _load_pipeline(pipeline):
+    folder, module_name, template_name = PIPELINES[pipeline]
+    sys.path.append(os.path.join(RESOURCES_DIR, folder))
+    module = importlib.import_module(module_name)
+    return module, getattr(module, template_name)
+
+# --- PREFETCH ---
+
+def prefetch(job_description, pipelines):
+    """Starts a background analysis of the JD for every pipeline that has no fresh or in-flight result yet."""
+    os.makedirs(PREFETCH_DIR, exist_ok=True)
+    _cleanup()
+    handle = jd_handle(job_description)
+    status = {}
+    for pipeline in pipelines:
+        _, prompt_template = _load_pipeline(pipeline)
+        result_path, pending_path = _key_paths(handle, pipeline, prompt_template)
+        if _fresh(_read_json(result_path)):
+            status[pipeline] = "ready"
+        elif _in_flight(pending_path):
+            status[pipeline] = "in_flight"
+        else:
+            with open(os.path.join(PREFETCH_DIR, "worker.log"), "a") as log:
+                worker = subprocess.Popen(
+                    [sys.executable, os.path.abspath(__file__), "--run", pipeline],
+                    stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=log,
+                    start_new_session=True  # Outlives this process, so the caller gets its handle immediately
+                )
+            # Written by the parent so a pipeline arriving right after this returns already sees the prefetch
+            _write_json(pending_path, {"pid": worker.pid, "started": time.time()})
+            worker.stdin.write(job_description.encode("utf-8"))
+            worker.stdin.close()
+            status[pipeline] = "started"
+    return {"handle": handle, "pipelines": status}
+
+def run_worker(pipeline, job_description):
+    """Background half of prefetch(): runs the pipeline's JD analysis prompt and stores the raw response."""
+    import model_client
+    module, prompt_template = _load_pipeline(pipeline)
+    result_path, pending_path = _key_paths(jd_handle(job_description), pipeline, prompt_template)
+    started = time.perf_counter()
+    try:
+        prompt = prompt_template.format(job_description=jd_preprocess.for_prompt(job_description))
+        analysis = model_client.generate(prompt, module.MODEL_NAME, pipeline, "jd_analysis_prefetch")
+        _write_json(result_path, {"analysis": analysis, "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 1),
+                                  "completed": time.time()})
+    except Exception as e:
+        print(f"Prefetch for {pipeline} failed: {e}", file=sys.stderr)
+        _log_event({"pipeline": pipeline, "outcome": "failed"})
+    finally:
+        try:
+            os.remove(pending_path)
+        except OSError:
+            pass
+
+# --- LOOKUP ---
+
+def resolve(pipeline, job_description, prompt_template, compute, handle=None):
+    """The JD analysis for a pipeline: a finished prefetch, an in-flight one (waited for), or compute() now.
+    A handle that no longer matches the JD (edited after prefetching) is ignored in favour of the content hash."""
+    if not ENABLED:
+        return compute()
+    content_handle = jd_handle(job_description)
+    if handle and handle != content_handle:
+        print("Warning: JD prefetch handle does not match the job description; looking up by content.", file=sys.stderr)
+
+    os.makedirs(PREFETCH_DIR, exist_ok=True)
+    result_path, pending_path = _key_paths(content_handle, pipeline, prompt_template)
+    started = time.perf_counter()
+    result = _read_json(result_path)
+    outcome = "ready"
+    if not _fresh(result) and _in_flight(pending_path):
+        outcome = "joined"
+        while not _fresh(result) and _in_flight(pending_path):
+            time.sleep(POLL_SECONDS)
+            result = _read_json(result_path)
+    waited_ms = (time.perf_counter() - started) * 1000.0
+
+    if _fresh(result):
+        # Perceived latency saved: the analysis time the user no longer waits for after submitting
+        _log_event({"pipeline": pipeline, "outcome": outcome, "waited_ms": round(waited_ms, 1),
+                    "saved_ms": round(max(0.0, result["elapsed_ms"] - waited_ms), 1)})
+        return result["analysis"]
+
+    analysis = compute()
+    _write_json(result_path, {"analysis": analysis, "elapsed_ms": round((time.perf_counter() - started) * 1000.0 - waited_ms, 1),
+                              "completed": time.time()})
+    _log_event({"pipeline": pipeline, "outcome": "miss", "waited_ms": round(waited_ms, 1), "saved_ms": 0.0})
+    return analysis
+
+def cached(pipeline, job_description, prompt_template):
+    """A fresh stored analysis for the JD (prefetched or left by an earlier run), or None; never waits or computes."""
+    if not ENABLED:
+        return None
+    result = _read_json(_key_paths(jd_handle(job_description), pipeline, prompt_template)[0])
+    return result["analysis"] if _fresh(result) else None
+
+def stats():
+    events = []
+    try:
+        with open(os.path.join(PREFETCH_DIR, "events.jsonl"), "r", encoding="utf-8") as f:
+            events = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        pass
+    lookups = [e for e in events if e["outcome"] in ("ready", "joined", "miss")]
+    saved = [e["saved_ms"] for e in lookups if e["outcome"] != "miss"]
+    return {
+        "lookups": len(lookups),
+        "ready": sum(1 for e in lookups if e["outcome"] == "ready"),
+        "joined_in_flight": sum(1 for e in lookups if e["outcome"] == "joined"),
+        "misses": sum(1 for e in lookups if e["outcome"] == "miss"),
+        "failed_prefetches": sum(1 for e in events if e["outcome"] == "failed"),
+        "saved_ms": {"p50": percentile(saved, 50), "p95": percentile(saved, 95), "total": round(sum(saved), 1)},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Starts a background JD analysis (JD on stdin) and prints its handle.")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES), help="Comma-separated pipelines to prefetch for")
+    parser.add_argument("--run", choices=list(PIPELINES), help=argparse.SUPPRESS)
+    parser.add_argument("--stats", action="store_true", help="Print hit counts and the perceived latency saved")
+    args = parser.parse_args()
+
+    if args.stats:
+        print(json.dumps(stats(), indent=2))
+        return
+
+    # Analysed as the pipelines will see it, so the prefetched result answers their lookup
+    job_description = normalize(sys.stdin.read())
+    if args.run:
+        run_worker(args.run, job_description)
+        return
+    if not job_description:
+        print("Error: No job description provided.", file=sys.stderr)
+        sys.exit(1)
+    pipelines = [p.strip() for p in args.pipelines.split(",") if p.strip()]
+    unknown = [p for p in pipelines if p not in PIPELINES]
+    if unknown:
+        print(f"Error: JD prefetch is not supported for: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+    if not ENABLED:
+        print(json.dumps({"handle": jd_handle(job_description), "pipelines": {p: "disabled" for p in pipelines}}))
+        return
+    print(json.dumps(prefetch(job_description, pipelines)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import functools
+
+# Local job description preprocessing before prompting. Pasted postings carry a lot of text no pipeline step
+# needs: benefits, EEO and accommodation statements, legal footers, application instructions, long company
+# histories, and paragraphs repeated by the job board. The posting is segmented into sections by its headings,
+# sections are kept, compressed or dropped by what their heading says, every remaining paragraph or bullet is
+# checked against a curated boilerplate phrase index, and repeated paragraphs are dropped. What is left, the
+# title, role summary, responsibilities and requirements, is what the prompts receive.
+#
+# Only prompt text is cleaned: content-hash keys (jd_prefetch handles, tailor sessions, the question bank) and
+# the local ATS scorer keep using the JD as pasted.
+#
+#   python jd_preprocess.py < posting.txt          # the cleaned text, statistics on stderr
+#   python jd_preprocess.py --corpus jd_preprocess_corpus.jsonl [--model]
+#                                                  # token reduction and parity over a recorded corpus
+
+# --- CONFIGURATION ---
+ENABLED = os.getenv("JD_PREPROCESS", "1") == "1"
+# Bumped whenever the rules below change what reaches the prompts; stored JD analyses are keyed on it
+VERSION = 2
+# A cleaned posting shorter than MIN_KEEP_RATIO of the original, or shorter than MIN_KEEP_CHARS after losing
+# more than half of it, is treated as a misfire and the original is used instead, so an unusual layout can
+# never cost the prompt its requirements
+MIN_KEEP_CHARS = 300
+MIN_KEEP_RATIO = 0.2
+# Compressed sections ("About us") keep this many sentences: enough for the company's name and what it does
+COMPRESSED_SENTENCES = 2
+MAX_HEADING_WORDS = 7
+
+BULLET_RE = re.compile(r"^\s*(?:[-*•◦▪‣–]|\d+[.)])\s+")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+
+# Section headings, by what the section holds
+KEEP_HEADINGS = re.compile(
+    r"responsibilit|what you('ll| will)? (do|work on|own)|duties|day[- ]to[- ]day|the role|role overview|about the "
+    r"(role|job|position|team|opportunity)|your (impact|mission)|requirement|qualification|must[- ]have|"
+    r"what you('ll)? (need|bring)|skills|you have|experience|preferred|nice[- ]to[- ]have|bonus|desired|"
+    r"tech(nology)? stack|technolog|who you are|about you|ideal candidate|job description|summary|overview", re.I)
+COMPRESS_HEADINGS = re.compile(r"^(about(?! (the (role|job|position|team|opportunity)|you))|who we are|our "
+                               r"(story|mission|company|culture|values)|company (overview|description)|why (join|work)|"
+                               r"life at)", re.I)
+DROP_HEADINGS = {
+    "benefits": re.compile(r"benefit|perks|what we offer|we offer|compensation|salary|pay (range|transparency)|"
+                           r"total rewards|rewards|why you'?ll love", re.I),
+    "eeo": re.compile(r"equal (employment )?opportunit|\beeo\b|diversity|inclusion|accommodation|belonging", re.I),
+    "legal": re.compile(r"legal|disclaimer|privacy|notice|e-verify|right to work|fraud|recruit(ment)? agenc", re.I),
+    "apply": re.compile(r"how to apply|application (process|instructions)|next steps|interview process|to apply", re.I),
+}
+
+# A job title, not a section: "Privacy Engineer", "LEGAL COUNSEL", "Benefits Specialist" match the drop patterns
+# above but name the role being hired for
+ROLE_WORDS = re.compile(
+    r"\b(engineer|developer|analyst|counsel|attorney|lawyer|paralegal|specialist|recruiter|sourcer|manager|director|"
+    r"officer|lead|head|architect|scientist|designer|consultant|coordinator|administrator|associate|advisor|partner|"
+    r"intern|representative|generalist|assistant|technician|writer|strategist|auditor)\b", re.I)
+
+# Whole-line section names that are headings even without a colon or capitals ("Benefits", "How to apply");
+# a closed list, so no job title can match it
+DROP_SECTION_NAMES = re.compile(
+    r"^(?:(?:benefits|perks)(?: (?:and|&) (?:benefits|perks))?|what we offer|compensation(?: (?:and|&) benefits)?|"
+    r"salary(?: range)?|total rewards|how to apply|application (?:process|instructions)|next steps|interview process|"
+    r"eeo(?: statement)?|equal (?:employment )?opportunity(?: employer| statement)?|"
+    r"diversity(?: (?:and|&) inclusion)?(?: statement)?|accommodations?|legal(?: notice| disclaimer)?|disclaimer|"
+    r"privacy(?: notice| policy)?|notice to (?:recruiters|agencies)|fraud (?:alert|warning))$", re.I)
+
+# Curated boilerplate phrases. A paragraph or bullet matching one of these is dropped unless it also carries a
+# requirement signal, so "3+ years of experience; we offer a hybrid schedule" survives.
+BOILERPLATE_PHRASES = {
+    "eeo": [
+        "equal opportunity employer", "equal employment opportunity", "without regard to", "regardless of race",
+        "race, color, religion", "sexual orientation", "gender identity", "national origin", "protected veteran",
+        "protected characteristic", "reasonable accommodation", "individuals with disabilities", "affirmative action",
+        "diverse and inclusive", "diversity, equity", "we celebrate diversity", "all qualified applicants",
+        "committed to creating an inclusive", "pay transparency",
+    ],
+    "benefits": [
+        "401(k)", "401k", "health, dental", "medical, dental", "dental and vision", "paid time off", "unlimited pto",
+        "parental leave", "competitive salary", "competitive compensation", "stock options", "equity package",
+        "wellness stipend", "learning stipend", "gym membership", "free lunch", "commuter benefits",
+        "salary range", "base salary", "pay range", "annual bonus", "benefits package", "life insurance",
+    ],
+    "legal": [
+        "e-verify", "background check", "drug screen", "privacy policy", "privacy notice", "applicant privacy",
+        "by applying", "by submitting", "unsolicited resumes", "recruitment agencies", "third-party agencies",
+        "at-will", "fraudulent", "scam", "work authorization", "sponsorship is not available", "arrest and conviction",
+        "fair chance", "this job description is not", "not intended to be all-inclusive", "subject to change",
+    ],
+    "apply": [
+        "apply now", "click apply", "to apply,", "submit your resume", "send your cv", "please apply",
+        "we look forward to hearing from you", "only shortlisted candidates", "applications will be reviewed",
+    ],
+}
+BOILERPLATE_RE = {category: re.compile("|".join(re.escape(p) for p in phrases), re.I)
+                  for category, phrases in BOILERPLATE_PHRASES.items()}
+# Signs that a paragraph states what the job needs or involves
+REQUIREMENT_SIGNAL = re.compile(
+    r"\b\d+\+?\s*(years?|yrs)\b|experience (with|in)|proficien|knowledge of|familiar(ity)? with|expertise|"
+    r"you will|you'll|responsib|degree in|bachelor|master'?s|phd|certifi|hands-on|ability to|skills? in|"
+    r"design(ing)?|build(ing)?|develop(ing)?|maintain|collaborat|own(ing)? the", re.I)
+
+# --- SEGMENTATION ---
+
+def _is_heading(line):
+    stripped = line.strip().strip("#*_ ").rstrip()
+    if not stripped or BULLET_RE.match(line):
+        return False
+    if line.lstrip().startswith("#"):
+        return True
+    words = stripped.rstrip(":").split()
+    if len(words) > MAX_HEADING_WORDS:
+        return False
+    if stripped.endswith(":") or stripped.isupper():
+        return True
+    return not stripped.endswith((".", ",", ";", "!", "?")) and len(words) <= 5 and \
+        sum(w[:1].isupper() for w in words) >= max(1, len(words) - 2) and \
+        bool(KEEP_HEADINGS.search(stripped) or COMPRESS_HEADINGS.search(stripped) or
+             any(p.search(stripped) for p in DROP_HEADINGS.values()))
+
+def _is_marked_heading(line):
+    """A heading by its form (markdown #, trailing colon, all caps) or a known section name on its own, not just a
+    short capitalized line that happens to contain a section word; only these can drop a section."""
+    stripped = line.strip().strip("#*_ ").rstrip()
+    return line.lstrip().startswith("#") or stripped.endswith(":") or stripped.isupper() or \
+        bool(DROP_SECTION_NAMES.match(stripped))
+
+def segment(job_description):
+    """Splits a posting into sections: [{"heading": str or None, "marked": bool, "units": [str]}]. A unit is one
+    bullet or one paragraph (consecutive non-bullet lines, kept as lines); the text before the first heading is
+    a section without one. marked is whether the heading is one by its form (see _is_marked_heading)."""
+    sections = [{"heading": None, "marked": False, "units": []}]
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            sections[-1]["units"].append("\n".join(paragraph))
+            paragraph.clear()
+
+    for line in job_description.replace("\r\n", "\n").split("\n"):
+        if not line.strip():
+            flush()
+        elif _is_heading(line):
+            flush()
+            sections.append({"heading": line.strip().strip("#*_ "), "marked": _is_marked_heading(line), "units": []})
+        elif BULLET_RE.match(line):
+            flush()
+            sections[-1]["units"].append(line.strip())
+        else:
+            paragraph.append(line.strip())
+    flush()
+    return [s for s in sections if s["heading"] or s["units"]]
+
+def classify(heading):
+    """keep, compress, or the drop category of a section heading (keep for unknown headings)."""
+    if heading is None or KEEP_HEADINGS.search(heading):
+        return "keep"
+    if COMPRESS_HEADINGS.search(heading):
+        return "compress"
+    for category, pattern in DROP_HEADINGS.items():
+        if pattern.search(heading):
+            return category
+    return "keep"
+
+def section_action(section, leading):
+    """keep, compress or a drop category for a segmented section. A drop needs a marked heading that is not a
+    job title, and the leading section (the posting's title) is never dropped."""
+    action = classify(section["heading"])
+    if action in ("keep", "compress"):
+        return action
+    if leading or not section["marked"] or ROLE_WORDS.search(section["heading"]):
+        return "keep"
+    return action
+
+def boilerplate_category(unit):
+    """The boilerplate category a paragraph or bullet falls in, or None if it should be kept."""
+    if REQUIREMENT_SIGNAL.search(unit):
+        return None
+    for category, pattern in BOILERPLATE_RE.items():
+        if pattern.search(unit):
+            return category
+    return None
+
+def _normalized(unit):
+    return re.sub(r"[^a-z0-9]+", " ", BULLET_RE.sub("", unit).lower()).strip()
+
+# --- PREPROCESSING ---
+
+def estimate_tokens(text):
+    """Roughly four characters per token, the estimate used across the pipelines."""
+    return max(1, len(text) // 4) if text else 0
+
+def preprocess(job_description):
+    """Returns (cleaned text, statistics)."""
+    stats = {"chars_in": len(job_description), "sections": 0, "sections_dropped": {}, "sections_compressed": 0,
+             "units_dropped": {}, "duplicates": 0, "fallback": False}
+    seen, blocks = set(), []
+    for position, section in enumerate(segment(job_description)):
+        stats["sections"] += 1
+        action = section_action(section, leading=position == 0)
+        if action not in ("keep", "compress"):
+            stats["sections_dropped"][action] = stats["sections_dropped"].get(action, 0) + 1
+            continue
+        units = section["units"]
+        if action == "compress":
+            stats["sections_compressed"] += 1
+            text = " ".join(u for u in units if not BULLET_RE.match(u))
+            units = [" ".join(SENTENCE_RE.split(text)[:COMPRESSED_SENTENCES])] if text else []
+        kept = []
+        for unit in units:
+            key = _normalized(unit)
+            if not key:
+                continue
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(key)
+            category = boilerplate_category(unit)
+            if category:
+                stats["units_dropped"][category] = stats["units_dropped"].get(category, 0) + 1
+                continue
+            kept.append(unit)
+        # A heading with nothing under it is usually the posting's title line ("## Data Engineer - Acme")
+        if kept or (section["heading"] and not units and action == "keep"):
+            blocks.append("\n".join(([section["heading"]] if section["heading"] else []) + kept))
+    cleaned = "\n\n".join(blocks)
+
+    original = len(job_description.strip())
+    if len(cleaned) < MIN_KEEP_RATIO * original or (len(cleaned) < MIN_KEEP_CHARS and len(cleaned) < original / 2):
+        cleaned, stats["fallback"] = job_description.strip(), True
+    stats.update(chars_out=len(cleaned), tokens_in=estimate_tokens(job_description), tokens_out=estimate_tokens(cleaned))
+    stats["token_reduction"] = round(1.0 - stats["tokens_out"] / stats["tokens_in"], 3) if stats["tokens_in"] else 0.0
+    return cleaned, stats
+
+def cache_tag():
+    """Identifies what for_prompt() does, for keys of results computed from its output."""
+    return f"jd_preprocess.v{VERSION}" if ENABLED else "jd_preprocess.off"
+
+@functools.lru_cache(maxsize=32)
+def _cached_clean(job_description):
+    return preprocess(job_description)[0]
+
+def for_prompt(job_description):
+    """The JD text to put into a prompt: the cleaned posting (memoized, pipelines send it in several steps),
+    or the posting as pasted when JD_PREPROCESS=0."""
+    if not ENABLED or not job_description:
+        return job_description
+    return _cached_clean(job_description)
+
+# --- CORPUS CHECK ---
+
+def _scripts1():
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts1"))
+
+def parity(job_description, cleaned):
+    """What the cleaning could cost the prompts: the share of the skills found in the original (by the skill
+    taxonomy) still found in the cleaned text, and the share of the terms of the original's requirement and
+    preferred-skill sections (by the ATS scorer's headings) still present. Postings without such headings have
+    no keyword recall."""
+    _scripts1()
+    from skill_taxonomy import default_index
+    from ats_scoring import tokenize, REQUIRED_HEADINGS, PREFERRED_HEADINGS, GENERIC_TERMS
+
+    index = default_index()
+    original_skills = {s["name"] for s in index.rank(job_description)}
+    cleaned_skills = {s["name"] for s in index.rank(cleaned)}
+    required = sorted({term for section in segment(job_description) if section["heading"] and
+                       (REQUIRED_HEADINGS.search(section["heading"]) or PREFERRED_HEADINGS.search(section["heading"]))
+                       for unit in section["units"] for term in tokenize(unit)
+                       if term not in GENERIC_TERMS and any(c.isalpha() for c in term)})
+    cleaned_terms = set(tokenize(cleaned))
+    return {
+        "skills": len(original_skills),
+        "skill_recall": round(len(original_skills & cleaned_skills) / len(original_skills), 3) if original_skills else 1.0,
+        "lost_skills": sorted(original_skills - cleaned_skills),
+        "required_keywords": len(required),
+        "required_keyword_recall": round(sum(k in cleaned_terms for k in required) / len(required), 3) if required else None,
+        "lost_keywords": [k for k in required if k not in cleaned_terms],
+    }
+
+def model_parity(job_description, cleaned):
+    """Jaccard overlap of the required and preferred skills the evaluate pipeline's JD analysis returns for the
+    original and for the cleaned posting. Two model calls per posting, through the configured backend."""
+    _scripts1()
+    import evaluate
+
+    def skills(text):
+        try:
+            analysis = json.loads(evaluate.clean_json_string(evaluate.call_gemini_api(
+                evaluate.PROMPT_JD.format(job_description=text), "jd_analysis")))
+        except ValueError:
+            return set()
+        return {str(s).strip().lower() for key in ("required_skills", "preferred_skills") for s in analysis.get(key) or []}
+
+    original, reduced = skills(job_description), skills(cleaned)
+    return round(len(original & reduced) / len(original | reduced), 3) if original | reduced else 1.0
+
+def corpus_report(path, with_model=False):
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    rows = []
+    for record in records:
+        job_description = record["job_description"]
+        started = time.perf_counter()
+        cleaned, stats = preprocess(job_description)
+        stats["elapsed_ms"] = (time.perf_counter() - started) * 1000.0
+        row = dict(stats, **parity(job_description, cleaned))
+        row["id"] = record.get("id") or hashlib.sha256(job_description.encode()).hexdigest()[:8]
+        if with_model:
+            row["analysis_jaccard"] = model_parity(job_description, cleaned)
+        rows.append(row)
+    tokens_in = sum(r["tokens_in"] for r in rows)
+    tokens_out = sum(r["tokens_out"] for r in rows)
+
+    def mean(key):
+        values = [r[key] for r in rows if r.get(key) is not None]
+        return round(sum(values) / len(values), 3) if values else None
+
+    report = {
+        "postings": len(rows),
+        "tokens_in": tokens_in,
+        "tokens_out": tokens_out,
+        "token_reduction": round(1.0 - tokens_out / tokens_in, 3) if tokens_in else 0.0,
+        "mean_token_reduction": mean("token_reduction"),
+        "mean_elapsed_ms": mean("elapsed_ms"),
+        "fallbacks": sum(r["fallback"] for r in rows),
+        "mean_skill_recall": mean("skill_recall"),
+        "mean_required_keyword_recall": mean("required_keyword_recall"),
+        "losses": [{"id": r["id"], "skills": r["lost_skills"], "keywords": r["lost_keywords"]}
+                   for r in rows if r["lost_skills"] or r["lost_keywords"]],
+        "per_posting": [{k: r[k] for k in ("id", "tokens_in", "tokens_out", "token_reduction", "sections_dropped",
+                                           "sections_compressed", "units_dropped", "duplicates", "fallback",
+                                           "skill_recall", "required_keyword_recall")} for r in rows],
+    }
+    if with_model:
+        report["mean_analysis_jaccard"] = mean("analysis_jaccard")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Strips boilerplate from a job description (stdin) before prompting.")
+    parser.add_argument("--corpus", help="JSONL of {\"job_description\": ...} records: print the token reduction "
+                                         "and the parity check instead")
+    parser.add_argument("--model", action="store_true",
+                        help="With --corpus, also compare the model's JD analyses of the original and cleaned postings")
+    args = parser.parse_args()
+    if args.corpus:
+        print(json.dumps(corpus_report(args.corpus, args.model), indent=2))
+        return
+    cleaned, stats = preprocess(sys.stdin.read())
+    print(json.dumps(stats), file=sys.stderr)
+    print(cleaned)
+
+if __name__ == "__main__":
+    main()
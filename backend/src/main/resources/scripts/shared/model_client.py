@@ -0,0 +1,143 @@
+import io
+import os
+import sys
+import time
+import warnings
+import threading
+import contextlib
+import admission
+import telemetry
+import profiling
+import model_routing
+
+# --- CONFIGURATION ---
+API_KEY = os.getenv("GOOGLE_API_KEY")
+# "gemini" calls the real API; "standin" answers locally (see model_standin.py) for load tests and simulations
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini")
+# Default priority class for every call made by this process; bulk jobs set "batch"
+DEFAULT_PRIORITY = os.getenv("MODEL_PRIORITY", "interactive")
+MAX_RETRIES = int(os.getenv("MODEL_MAX_RETRIES", "2"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("MODEL_RETRY_BACKOFF", "1.0"))
+
+# Exception class names (google.api_core and the stand-in) worth retrying: quota, overload and timeouts
+TRANSIENT_ERRORS = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+                    "DeadlineExceeded", "StandinRateLimitError"}
+# A timed-out call goes straight to the fallback tier (when there is one) instead of being retried on the same model
+TIMEOUT_ERRORS = {"DeadlineExceeded", "Timeout", "TimeoutError", "ReadTimeout"}
+# Telemetry fields copied onto a call's span when the run is being profiled
+PROFILE_ATTRS = ("model", "tier", "outcome", "retries", "fallback_used", "admission_wait_ms", "model_ms",
+                 "prompt_tokens", "output_tokens")
+
+_models = {}
+
+# --- HELPER FUNCTIONS ---
+
+@contextlib.contextmanager
+def captured_warnings(sink):
+    """Collects SDK warnings and stderr output into `sink` and replays them on stderr afterwards, so they are
+    kept in the call record instead of being interleaved with (or hidden from) the script's own messages.
+    Only on the main thread, since swapping sys.stderr and the warnings filters is process-wide."""
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    original_stderr = sys.stderr
+    buffer = io.StringIO()
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("default")
+        sys.stderr = buffer
+        try:
+            yield
+        finally:
+            sys.stderr = original_stderr
+            lines = [f"{w.category.__name__}: {w.message}" for w in caught]
+            lines += [line for line in buffer.getvalue().splitlines() if line.strip()]
+            for line in lines:
+                print(f"[model_client] {line}", file=sys.stderr)
+            sink.extend(lines)
+
+def is_configured():
+    """True when model calls can be made: an API key is present, or the local stand-in is selected."""
+    return MODEL_BACKEND == "standin" or bool(API_KEY)
+
+def _gemini_model(model_name, sink):
+    model = _models.get(model_name)
+    if model is None:
+        import google.generativeai as genai
+        with captured_warnings(sink):
+            genai.configure(api_key=API_KEY)
+            model = genai.GenerativeModel(model_name=model_name)
+        _models[model_name] = model
+    return model
+
+def _generate_content(prompt, model_name, timeout, sink):
+    if MODEL_BACKEND == "standin":
+        import model_standin
+        return model_standin.generate_content(prompt, model_name, timeout)
+    model = _gemini_model(model_name, sink)
+    with captured_warnings(sink):
+        if timeout:
+            return model.generate_content(prompt, request_options={"timeout": timeout})
+        return model.generate_content(prompt)
+
+def generate(prompt, model_name, pipeline, step, priority=None):
+    """The single entry point for model calls: picks the model from the routing table, waits for admission,
+    retries transient failures, falls back to the next tier on timeout or error, records the call's tokens
+    and latency, and returns the model's text response. `model_name` is used only when no route applies."""
+    priority = priority or DEFAULT_PRIORITY
+    chain = model_routing.route(pipeline, step, model_name)
+    entry = {"ts": time.time(), "pipeline": pipeline, "step": step, "model": chain[0][1], "tier": chain[0][0],
+             "backend": MODEL_BACKEND, "priority": priority, "retries": 0, "fallback_used": False,
+             "admission_wait_ms": 0.0, "model_ms": 0.0, "prompt_chars": len(prompt)}
+    sink = []
+    started = time.perf_counter()
+    try:
+        for position, (tier, model, timeout) in enumerate(chain):
+            has_fallback = position + 1 < len(chain)
+            entry.update(model=model, tier=tier, fallback_used=position > 0)
+            attempt = 0
+            try:
+                while True:
+                    try:
+                        with admission.admit(pipeline, priority) as wait:
+                            entry["admission_wait_ms"] += wait * 1000.0
+                            call_started = time.perf_counter()
+                            try:
+                                response = _generate_content(prompt, model, timeout, sink)
+                            finally:
+                                entry["model_ms"] += (time.perf_counter() - call_started) * 1000.0
+                        text = response.text
+                        break
+                    except admission.AdmissionTimeout:
+                        raise
+                    except Exception as e:
+                        name = type(e).__name__
+                        if attempt >= MAX_RETRIES or name not in TRANSIENT_ERRORS or (has_fallback and name in TIMEOUT_ERRORS):
+                            raise
+                        attempt += 1
+                        entry["retries"] += 1
+                        time.sleep(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                break
+            except admission.AdmissionTimeout:
+                raise
+            except Exception as e:
+                if not has_fallback:
+                    raise
+                entry.setdefault("fallback_errors", []).append(f"{model}: {type(e).__name__}: {e}"[:200])
+
+        usage = getattr(response, "usage_metadata", None)
+        entry.update(outcome="ok", output_chars=len(text),
+                     prompt_tokens=getattr(usage, "prompt_token_count", None),
+                     output_tokens=getattr(usage, "candidates_token_count", None))
+        return text
+    except Exception as e:
+        entry.update(outcome="admission_timeout" if isinstance(e, admission.AdmissionTimeout) else "error",
+                     error=f"{type(e).__name__}: {e}"[:300])
+        raise
+    finally:
+        entry["latency_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        entry["admission_wait_ms"] = round(entry["admission_wait_ms"], 1)
+        entry["model_ms"] = round(entry["model_ms"], 1)
+        if sink:
+            entry["warnings"] = sink[:10]
+        telemetry.record(entry)
+        profiling.add_span("model/" + step, started, {key: entry.get(key) for key in PROFILE_ATTRS})
@@ -0,0 +1,155 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+from telemetry import percentile
+
+# --- CONFIGURATION ---
+ROUTING_PATH = os.getenv("MODEL_ROUTING_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_routing.json"))
+
+RESOURCES_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+_TABLE = None
+
+# --- ROUTING ---
+
+def load_table(path=ROUTING_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    for name, tier in table["tiers"].items():
+        if tier.get("fallback") and tier["fallback"] not in table["tiers"]:
+            raise ValueError(f"Tier '{name}' falls back to unknown tier '{tier['fallback']}'")
+    return table
+
+def default_table():
+    """Loads the routing table once per process; an unreadable table disables routing rather than failing calls."""
+    global _TABLE
+    if _TABLE is None:
+        try:
+            _TABLE = load_table()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: model routing table not loaded ({e}); using each script's MODEL_NAME.", file=sys.stderr)
+            _TABLE = {"tiers": {}, "routes": {}}
+    return _TABLE
+
+def route(pipeline, step, default_model, table=None):
+    """The attempt chain for one call: [(tier, model, timeout_seconds), ...], primary first, then fallbacks.
+    Steps missing from the table use the default tier; without any table, the script's own MODEL_NAME."""
+    table = table or default_table()
+    tiers = table.get("tiers", {})
+    tier_name = table.get("routes", {}).get(pipeline, {}).get(step) or table.get("default_tier")
+    chain, seen = [], set()
+    while tier_name in tiers and tier_name not in seen:
+        seen.add(tier_name)
+        tier = tiers[tier_name]
+        chain.append((tier_name, tier["model"], tier.get("timeout_seconds")))
+        tier_name = tier.get("fallback")
+    return chain or [(None, default_model, None)]
+
+# --- BENCHMARK ---
+
+SAMPLE_PAIR = {
+    "resume": "Jane Doe\njane@example.com\nSoftware Engineer at Acme (2020-Present)\n- Built Python and SQL services on AWS\n"
+              "- Led migration to Docker and Kubernetes\nSkills: Python, Java, SQL, Docker, Kubernetes, AWS, communication",
+    "job_description": "Backend Engineer at Globex. Required: Python, SQL, REST APIs, Docker. Preferred: Kubernetes, AWS. "
+                       "You will design services, mentor engineers and collaborate with product teams.",
+}
+
+BENCHMARK_PIPELINES = {
+    "tailor": ("scripts/tailor.py", []),
+    "evaluate": ("scripts1/evaluate.py", []),
+    "coverletter": ("scripts2/coverletter.py", []),
+    "interview": ("scripts3/interview_generator.py", []),
+}
+
+def similarity(a, b):
+    """Output parity: Jaccard similarity of the word sets (JSON outputs are compared in canonical form)."""
+    def words(text):
+        try:
+            text = json.dumps(json.loads(text), sort_keys=True)
+        except ValueError:
+            pass
+        return set(re.findall(r"\w+", text.lower()))
+    wa, wb = words(a), words(b)
+    return 1.0 if not wa and not wb else len(wa & wb) / len(wa | wb)
+
+def run_pipeline(pipeline, pair, routing_path, telemetry_path, backend):
+    script, args = BENCHMARK_PIPELINES[pipeline]
+    stdin = pair["job_description"] if pipeline == "interview" else pair["resume"] + "\n---DELIMITER---\n" + pair["job_description"]
+    env = dict(os.environ, MODEL_ROUTING_PATH=routing_path, MODEL_TELEMETRY_PATH=telemetry_path, MODEL_BACKEND=backend,
+               JD_PREFETCH_ENABLED="0", QUESTION_BANK_ENABLED="0")
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.join(RESOURCES_DIR, script)] + args, input=stdin,
+                               capture_output=True, text=True, env=env, timeout=600)
+    return (time.perf_counter() - started) * 1000.0, completed.returncode == 0, completed.stdout
+
+def benchmark(configs, pairs, pipelines, repeat, backend):
+    """Runs every pipeline under every routing configuration; parity is measured against the first configuration."""
+    outputs, report = {}, {}
+    for config in configs:
+        telemetry_path = tempfile.mktemp(prefix="routing_bench_", suffix=".jsonl")
+        results = {}
+        for pipeline in pipelines:
+            latencies, failures, parities = [], 0, []
+            for index, pair in enumerate(pairs):
+                for _ in range(repeat):
+                    elapsed_ms, ok, stdout = run_pipeline(pipeline, pair, config, telemetry_path, backend)
+                    if not ok:
+                        failures += 1
+                        continue
+                    latencies.append(elapsed_ms)
+                    baseline = outputs.setdefault((pipeline, index), stdout)
+                    parities.append(similarity(baseline, stdout))
+            results[pipeline] = {
+                "runs": len(pairs) * repeat,
+                "failures": failures,
+                "p50_ms": round(percentile(latencies, 50) or 0, 1),
+                "p95_ms": round(percentile(latencies, 95) or 0, 1),
+                "output_parity": round(sum(parities) / len(parities), 3) if parities else None,
+            }
+
+        calls = []
+        if os.path.exists(telemetry_path):
+            with open(telemetry_path, "r", encoding="utf-8") as f:
+                calls = [json.loads(line) for line in f if line.strip()]
+            os.remove(telemetry_path)
+        report[config] = {
+            "pipelines": results,
+            "model_calls": len(calls),
+            "fallbacks": sum(1 for c in calls if c.get("fallback_used")),
+            "models": sorted({c.get("model") for c in calls if c.get("model")}),
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Shows the model routing table, or benchmarks routing configurations.")
+    parser.add_argument("--show", nargs=2, metavar=("PIPELINE", "STEP"), help="Print the attempt chain for one step")
+    parser.add_argument("--benchmark", nargs="*", metavar="ROUTING_JSON",
+                        help="Routing files to compare (default: the active table); the first is the parity baseline")
+    parser.add_argument("--corpus", help="JSONL of resume/job_description pairs (default: one built-in sample)")
+    parser.add_argument("--pipelines", default=",".join(BENCHMARK_PIPELINES), help="Comma-separated pipelines to run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per pair and pipeline")
+    parser.add_argument("--backend", choices=["standin", "gemini"], default="standin", help="Model backend for the benchmark")
+    args = parser.parse_args()
+
+    if args.show:
+        print(json.dumps([{"tier": t, "model": m, "timeout_seconds": s} for t, m, s in route(args.show[0], args.show[1], None)], indent=2))
+    elif args.benchmark is not None:
+        configs = [os.path.abspath(c) for c in args.benchmark] or [ROUTING_PATH]
+        for config in configs:
+            load_table(config)  # Fail fast on a broken file
+        pairs = [SAMPLE_PAIR]
+        if args.corpus:
+            with open(args.corpus, "r", encoding="utf-8") as f:
+                pairs = [json.loads(line) for line in f if line.strip()]
+        pipelines = [p.strip() for p in args.pipelines.split(",") if p.strip()]
+        print(json.dumps(benchmark(configs, pairs, pipelines, args.repeat, args.backend), indent=2))
+    else:
+        print(json.dumps(default_table(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import re
+import json
+import time
+import random
+import tempfile
+import contextlib
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# A local stand-in for the Gemini API, used by simulations and load tests so they cost nothing and never
+# touch the real quota. It answers in the shape each pipeline step expects, with configurable latency and
+# a provider-side concurrency limit beyond which calls are rejected like a 429.
+
+# --- CONFIGURATION ---
+LATENCY_MS = float(os.getenv("STANDIN_LATENCY_MS", "400"))
+# Per-model latency multipliers, so routing configurations can be compared (JSON: {"model": factor})
+MODEL_LATENCY_FACTORS = json.loads(os.getenv("STANDIN_MODEL_LATENCY_FACTORS",
+                                             '{"gemini-2.5-flash-lite": 1.0, "gemini-2.5-flash": 2.5, "gemini-2.5-pro": 6.0}'))
+JITTER_MS = float(os.getenv("STANDIN_JITTER_MS", "150"))
+# Added latency per 1,000 prompt tokens, for comparisons where prompt length matters (0: latency is flat)
+MS_PER_1K_PROMPT_TOKENS = float(os.getenv("STANDIN_MS_PER_1K_PROMPT_TOKENS", "0"))
+PROVIDER_CONCURRENCY = int(os.getenv("STANDIN_PROVIDER_CONCURRENCY", "10"))
+STATE_DIR = os.getenv("STANDIN_STATE_DIR", os.path.join(tempfile.gettempdir(), "career_catalyst_ai"))
+
+class StandinRateLimitError(RuntimeError):
+    """The stand-in's equivalent of a 429 / ResourceExhausted response."""
+
+class DeadlineExceeded(RuntimeError):
+    """Named like google.api_core.exceptions.DeadlineExceeded so callers treat both alike."""
+
+class UsageMetadata:
+    def __init__(self, prompt_token_count, candidates_token_count):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.total_token_count = prompt_token_count + candidates_token_count
+
+class StandinResponse:
+    def __init__(self, text, prompt):
+        self.text = text
+        self.usage_metadata = UsageMetadata(estimate_tokens(prompt), estimate_tokens(text))
+
+def estimate_tokens(text):
+    """Roughly four characters per token, as for English text with Gemini tokenizers."""
+    return max(1, len(text) // 4)
+
+# --- CANNED RESPONSES ---
+
+QUESTIONS = [
+    {"category": "introduction", "question": "Walk me through your background.", "answer": "A concise summary of experience."},
+    {"category": "introduction", "question": "Why this role?", "answer": "Connects goals to the team's mission."},
+] + [
+    {"category": "technical", "question": f"Explain a design decision in project {i}.", "answer": "Trade-offs and results."}
+    for i in range(1, 6)
+] + [
+    {"category": "behavioral", "question": f"Describe a time you handled conflict ({i}).", "answer": "STAR-formatted story."}
+    for i in range(1, 4)
+]
+
+RESUME_DATA = {
+    "personal_info": {"full_name": "Alex Doe", "address": "Springfield", "email": "alex@example.com", "phone": "5550100",
+                      "github_handle": "alexdoe", "linkedin_handle": "alexdoe", "portfolio_url": None, "extra_info": None},
+    "education": [{"degree": "B.Sc. Computer Science", "institution": "State University", "start_year": "2016",
+                   "end_year": "2020", "gpa": None}],
+    "work_experience": [{"job_title": "Software Engineer", "company_name": "Acme", "location": "Remote", "start_date": "2020",
+                         "end_date": "Present", "description_points": ["Built Python services handling 2M requests/day."]}],
+    "projects": [{"project_name": "Pipeline", "start_date": "2021", "end_date": "2022", "tech_stack": "Python, Docker",
+                  "description_points": ["Automated deployments."]}],
+    "skills": [{"name": "Languages", "value": "Python, Java, SQL"}],
+    "achievements": [],
+    "certifications": [],
+}
+
+LETTER_FIELDS = {"candidate_name": "Alex Doe", "candidate_email": "alex@example.com", "candidate_phone": "555-010-0100",
+                 "job_title": "Software Engineer", "company_name": "Acme"}
+
+UNITS_RE = re.compile(r"\*\*Units \(JSON\):\*\*\n(.*)\n")
+
+def unit_answers(prompt, units):
+    """Per-unit answers for the batched tailor-session steps (tailor_session.py)."""
+    if '{"units":' in prompt:
+        shapes = {"personal_info": RESUME_DATA["personal_info"], "work_experience": RESUME_DATA["work_experience"][0],
+                  "projects": RESUME_DATA["projects"][0]}
+        answers = {uid: shapes.get(unit["kind"]) or RESUME_DATA.get(unit["kind"]) or [{"description": unit["text"]}]
+                   for uid, unit in units.items()}
+        answers = {uid: {k: v for k, v in a.items() if k != "description_points"} if isinstance(a, dict) else a
+                   for uid, a in answers.items()}
+        return json.dumps({"units": answers})
+    if "enhancement plan" in prompt:
+        return json.dumps({"bullets": {uid: "Led the effort: " + unit["bullet"] + " (~20% faster)" for uid, unit in units.items()}})
+    return json.dumps({"bullets": {uid: "Integrate Python and quantify the impact." for uid in units}})
+
+def canned_text(prompt):
+    """Picks a response shaped like what the pipeline step that sent this prompt expects."""
+    units = UNITS_RE.search(prompt)
+    if units:
+        return unit_answers(prompt, json.loads(units.group(1)))
+    if "JSON list" in prompt or "JSON array" in prompt:
+        return json.dumps(QUESTIONS)
+    if "SCORE:" in prompt:
+        return "SCORE: [7/10]\n\nFEEDBACK:\n- Strong overlap on core skills.\n- Quantify impact in recent roles."
+    if "\\documentclass" in prompt:
+        return "\\documentclass{article}\n\\begin{document}\nTailored resume\n\\end{document}"
+    asks_for_json = re.search(r"(Return|Output)[^\n]*JSON", prompt) is not None
+    fields = re.search(r"^Fields: (.*)$", prompt, re.M)
+    if asks_for_json and fields:
+        return json.dumps({name: LETTER_FIELDS.get(name, "") for name in fields.group(1).split(", ")})
+    if asks_for_json and "personal_info" in prompt:
+        return json.dumps(RESUME_DATA)
+    if asks_for_json:
+        return json.dumps({"required_skills": ["Python", "SQL"], "preferred_skills": ["Docker"],
+                           "technical_skills": ["Python", "SQL"], "behavioral_traits": ["Ownership"],
+                           "key_responsibilities": ["Build services"], "experience_level": "Mid"})
+    return "Dear Hiring Manager,\n\n" + "I am excited to apply for this role. " * 20 + "\n\nSincerely,\nAlex Doe"
+
+# --- PROVIDER SIMULATION ---
+
+@contextlib.contextmanager
+def _provider_slot():
+    """Counts concurrent calls across processes and rejects those beyond PROVIDER_CONCURRENCY."""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = os.path.join(STATE_DIR, "standin_in_flight")
+
+    def adjust(delta):
+        with open(path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            current = int(f.read().strip() or 0)
+            if delta > 0 and current >= PROVIDER_CONCURRENCY:
+                return False
+            f.seek(0)
+            f.truncate()
+            f.write(str(max(0, current + delta)))
+            return True
+
+    if not adjust(1):
+        raise StandinRateLimitError("429 Resource has been exhausted (stand-in provider concurrency limit)")
+    try:
+        yield
+    finally:
+        adjust(-1)
+
+def generate_content(prompt, model_name=None, timeout=None):
+    """Mirrors GenerativeModel.generate_content: sleeps for the simulated latency and returns a response object."""
+    with _provider_slot():
+        latency = max(0.0, random.gauss(LATENCY_MS, JITTER_MS)) + MS_PER_1K_PROMPT_TOKENS * estimate_tokens(prompt) / 1000.0
+        latency *= MODEL_LATENCY_FACTORS.get(model_name, 1.0) / 1000.0
+        if timeout and latency > timeout:
+            time.sleep(timeout)
+            raise DeadlineExceeded(f"504 Deadline of {timeout}s exceeded (stand-in)")
+        time.sleep(latency)
+        return StandinResponse(canned_text(prompt), prompt)
@@ -0,0 +1,253 @@
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import tempfile
+import threading
+import functools
+import contextlib
+
+# Opt-in profiling for pipeline runs. A run is profiled when it is asked for (--profile, which Java passes for
+# requests carrying an X-Profile header) or when it turns out slower than PROFILE_SLOW_MS. Every profiled run
+# records a span timeline (each model call via model_client, plus the spans a pipeline adds around prompt
+# formatting, JSON cleanup and its own steps); a sampled share of runs also has its stacks sampled from a
+# background thread, so a slow run usually comes with a profile of where the time went. Profiles are kept
+# as JSON files with bounded retention and can be listed and exported (folded stacks for flame graphs).
+#
+#   python profiling.py --list
+#   python profiling.py --show <id>            # the whole profile as JSON
+#   python profiling.py --folded <id> > out.folded && flamegraph.pl out.folded > out.svg
+
+# --- CONFIGURATION ---
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "career_catalyst_ai", "profiles"))
+# Runs slower than this are kept automatically; 0 keeps only requested profiles
+SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "20000"))
+# Share of runs whose stacks are sampled (requested runs always are); spans are recorded for every run
+SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))
+INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+MAX_PROFILES = int(os.getenv("PROFILE_MAX_COUNT", "200"))
+MAX_AGE_SECONDS = float(os.getenv("PROFILE_MAX_AGE", str(3 * 24 * 3600)))
+MAX_STACK_DEPTH = 64
+
+_current = None  # The profile of this run; pipelines are one run per process
+
+# --- STACK SAMPLING ---
+
+class StackSampler:
+    """Samples the call stack of one thread every interval and counts identical stacks (folded format)."""
+
+    def __init__(self, thread_id, interval_ms):
+        self.thread_id, self.interval = thread_id, interval_ms / 1000.0
+        self.counts, self.samples = {}, 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+# --- PROFILES AND SPANS ---
+
+class Profile:
+    def __init__(self, kind, name, requested, sampled):
+        self.id = time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        self.kind, self.name, self.requested = kind, name, requested
+        self.started, self.started_perf = time.time(), time.perf_counter()
+        self.spans, self._depth = [], 0
+        self.sampler = StackSampler(threading.get_ident(), INTERVAL_MS) if sampled else None
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started_perf) * 1000.0
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        record = {"name": name, "start_ms": round(self.elapsed_ms(), 2), "depth": self._depth}
+        if attrs:
+            record["attrs"] = attrs
+        self.spans.append(record)
+        self._depth += 1
+        try:
+            yield record.setdefault("attrs", {})
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            self._depth -= 1
+            record["duration_ms"] = round(self.elapsed_ms() - record["start_ms"], 2)
+            if not record["attrs"]:
+                del record["attrs"]
+
+    def to_dict(self, duration_ms, trigger):
+        return {"id": self.id, "kind": self.kind, "name": self.name, "ts": self.started,
+                "duration_ms": round(duration_ms, 1), "trigger": trigger,
+                "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+                "samples": self.sampler.samples if self.sampler else 0,
+                "sample_interval_ms": INTERVAL_MS if self.sampler else None,
+                "stacks": self.sampler.counts if self.sampler else {}}
+
+def span(name, **attrs):
+    """A timed span in the current run's profile; a no-op (yielding a throwaway dict) when nothing is profiled."""
+    if _current is None:
+        return contextlib.nullcontext({})
+    return _current.span(name, **attrs)
+
+def add_span(name, started_perf, attrs=None):
+    """Records an already finished span that began at time.perf_counter() value `started_perf`, for code that
+    times itself anyway (model_client). Its depth is that of the innermost open span."""
+    if _current is None:
+        return
+    start_ms = (started_perf - _current.started_perf) * 1000.0
+    record = {"name": name, "start_ms": round(start_ms, 2), "depth": _current._depth,
+              "duration_ms": round(_current.elapsed_ms() - start_ms, 2)}
+    if attrs:
+        record["attrs"] = attrs
+    _current.spans.append(record)
+
+@contextlib.contextmanager
+def profiled(kind, name, requested=False):
+    """Profiles the enclosed run and keeps the profile if it was requested or ran slower than SLOW_MS."""
+    global _current
+    if not (requested or SLOW_MS > 0):
+        yield None
+        return
+    profile = Profile(kind, name, requested, sampled=requested or random.random() < SAMPLE_RATE)
+    _current = profile
+    if profile.sampler:
+        profile.sampler.start()
+    try:
+        yield profile
+    finally:
+        _current = None
+        if profile.sampler:
+            profile.sampler.stop()
+        duration_ms = profile.elapsed_ms()
+        if requested or duration_ms >= SLOW_MS:
+            save(profile.to_dict(duration_ms, "requested" if requested else "slow"))
+
+def profiled_main(pipeline):
+    """Decorates a pipeline's main(): profiles the run, and takes --profile off the command line before the
+    script parses its own arguments."""
+    def decorate(main):
+        @functools.wraps(main)
+        def wrapper(*args, **kwargs):
+            requested = "--profile" in sys.argv
+            if requested:
+                sys.argv.remove("--profile")
+            with profiled("pipeline", pipeline, requested) as profile:
+                try:
+                    return main(*args, **kwargs)
+                finally:
+                    if profile is not None and requested:
+                        print(json.dumps({"profile_id": profile.id}), file=sys.stderr)
+        return wrapper
+    return decorate
+
+# --- STORAGE ---
+
+def _path(profile_id):
+    if not profile_id or not all(c.isalnum() or c == "-" for c in profile_id):
+        raise ValueError("Invalid profile id.")
+    return os.path.join(PROFILE_DIR, profile_id + ".json")
+
+def save(profile):
+    """Writes the profile and prunes the directory to MAX_PROFILES files no older than MAX_AGE_SECONDS.
+    Profiling must never break a pipeline, so errors are only reported."""
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = _path(profile["id"])
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(profile, f)
+        os.replace(path + ".tmp", path)
+        prune()
+    except OSError as e:
+        print(f"Warning: could not save profile: {e}", file=sys.stderr)
+
+def prune():
+    cutoff = time.time() - MAX_AGE_SECONDS
+    entries = []
+    for name in os.listdir(PROFILE_DIR):
+        path = os.path.join(PROFILE_DIR, name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if name.endswith(".json"):
+            entries.append((mtime, path))
+        elif name.endswith(".tmp") and mtime < cutoff:
+            entries.append((0, path))
+    entries.sort(reverse=True)
+    for index, (mtime, path) in enumerate(entries):
+        if index >= MAX_PROFILES or mtime < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def load(profile_id):
+    with open(_path(profile_id), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def summary(profile):
+    spans = sorted((s for s in profile["spans"] if s["depth"] == 0), key=lambda s: -s.get("duration_ms", 0))
+    result = {key: profile[key] for key in ("id", "kind", "name", "ts", "duration_ms", "trigger", "samples")}
+    result["top_spans"] = [{"name": s["name"], "duration_ms": s.get("duration_ms")} for s in spans[:5]]
+    return result
+
+def list_profiles():
+    """Summaries of the stored profiles, newest first."""
+    try:
+        names = sorted((n for n in os.listdir(PROFILE_DIR) if n.endswith(".json")), reverse=True)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names:
+        try:
+            profiles.append(summary(load(name[:-len(".json")])))
+        except (OSError, ValueError, KeyError):
+            continue
+    return profiles
+
+def folded(profile):
+    """The sampled stacks in the folded format read by flamegraph.pl and speedscope."""
+    return "\n".join(f"{stack} {count}" for stack, count in sorted(profile["stacks"].items()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Lists and exports stored pipeline profiles.")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--list", action="store_true", help="Summaries of the stored profiles, newest first")
+    group.add_argument("--show", metavar="ID", help="One profile as JSON (spans and sampled stacks)")
+    group.add_argument("--folded", metavar="ID", help="One profile's sampled stacks in folded format")
+    args = parser.parse_args()
+    try:
+        if args.list:
+            print(json.dumps(list_profiles(), indent=2))
+        elif args.show:
+            print(json.dumps(load(args.show), indent=2))
+        else:
+            print(folded(load(args.folded)))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
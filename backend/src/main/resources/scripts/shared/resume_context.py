@@ -0,0 +1,254 @@
+import os
+import re
+import math
+import heapq
+import time
+import document_ingest
+from skill_taxonomy import default_index
+
+# Relevance-based resume context for long resumes and academic CVs. The tailor's plan step and the evaluator's
+# report step only need the parts of the resume that bear on the job, yet the whole text is put in each of
+# their prompts, so their latency grows with CV length. Here the resume is split into chunks (the
+# contact block, each bullet or line of an entry, each paragraph), the chunks are scored against the analysed
+# JD requirements with BM25 over words and word pairs, and the best chunks up to a token budget are passed on
+# in document order under their section and entry headings. Everything left out is listed in a short note at
+# the end (omitted entries by heading, and the skills mentioned only there), so the model knows it exists.
+#
+# Resumes within the budget are passed through unchanged. Steps that need every detail (the tailor's draft and
+# review, which rewrite the whole resume, and the evaluator's resume analysis, which lists all skills and
+# projects) keep the full text.
+
+# --- CONFIGURATION ---
+# "relevant" selects chunks for long resumes; "full" always passes the whole text
+MODE = os.getenv("RESUME_CONTEXT", "relevant")
+# Resumes up to this many (estimated) tokens, about two dense pages, are passed through unchanged; longer ones
+# are cut down to it
+BUDGET_TOKENS = int(os.getenv("RESUME_CONTEXT_TOKENS", "1500"))
+CHARS_PER_TOKEN = 4
+# Sections that are always kept whole: short, and needed by every step
+PINNED_SECTIONS = ("summary", "skills", "languages", "education", "certifications")
+# Query weights of the JD analysis lists
+QUERY_FIELDS = {"required_skills": 2.0, "preferred_skills": 1.0, "key_responsibilities": 1.0}
+MAX_ENTRY_HEADER_WORDS = 14
+# Share of the budget kept for the note on what was left out, which lists at most MAX_NOTED_ENTRIES entries
+NOTE_SHARE = 0.1
+MAX_NOTED_ENTRIES = 8
+MAX_NOTED_SKILLS = 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Weight left to a query term for each selected chunk that already covers it
+COVERAGE_DECAY = 0.5
+# Resumes are in reverse chronological order: a chunk's score gets up to this much extra the nearer it is to the top
+RECENCY_BONUS = 0.25
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOPWORDS = frozenset("""a an and are as at be by for from has have in into is it its of on or our that the their
+this to was we were will with you your i me my using use used via per across within over under about""".split())
+
+# --- CHUNKING ---
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN
+
+def terms(text):
+    """Words and adjacent word pairs, so phrases like "machine learning" match as a unit."""
+    words = [w for w in TOKEN_RE.findall(text.lower()) if w not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def _paragraphs(body):
+    paragraph = []
+    for line in body + [""]:
+        if line:
+            paragraph.append(line)
+        elif paragraph:
+            yield paragraph
+            paragraph = []
+
+def chunk_resume(resume_content):
+    """The resume as sections in document order: {"name", "title", "pinned", "entries": [{"header", "chunks"}]}.
+    The contact block is a pinned section without a title. In sections with '- ' bullets an entry is the header
+    lines before a run of bullets; without bullets, a paragraph whose first line is short is an entry with that
+    header, and any other line stands alone (publication and award lists)."""
+    text, sections = document_ingest.assemble([("line", resume_content)])
+    lines = text.split("\n")
+    first = sections[0]["start_line"] if sections else len(lines)
+    contact = [line for line in lines[:first] if line]
+    result = [{"name": "contact", "title": None, "pinned": True, "entries": [{"header": None, "chunks": contact}]}] \
+        if contact else []
+
+    for section in sections:
+        body = lines[section["start_line"] + 1:section["end_line"]]
+        entries = []
+        if any(line.startswith("- ") for line in body):
+            current = None
+            for line in body:
+                if not line:
+                    continue
+                if line.startswith("- "):
+                    if current is None:
+                        current = {"header": None, "chunks": []}
+                        entries.append(current)
+                    current["chunks"].append(line)
+                elif current is not None and current["chunks"] and line[:1].islower():
+                    current["chunks"][-1] += " " + line  # A bullet wrapped onto the next line
+                elif current is None or current["chunks"]:
+                    current = {"header": line, "chunks": []}
+                    entries.append(current)
+                else:
+                    current["header"] += "\n" + line
+        else:
+            for paragraph in _paragraphs(body):
+                header = paragraph[0]
+                if len(paragraph) > 1 and len(header.split()) <= MAX_ENTRY_HEADER_WORDS and not header.endswith("."):
+                    entries.append({"header": paragraph[0], "chunks": paragraph[1:]})
+                else:
+                    entries.extend({"header": None, "chunks": [line]} for line in paragraph)
+        result.append({"name": section["name"], "title": section["title"], "pinned": section["name"] in PINNED_SECTIONS,
+                       "entries": [e for e in entries if e["header"] or e["chunks"]]})
+    return result
+
+# --- SCORING ---
+
+def query_weights(analysis, job_description=None):
+    """Term weights from the JD analysis lists; the JD text itself when the analysis has none."""
+    weights = {}
+    for field, weight in QUERY_FIELDS.items():
+        for item in (analysis or {}).get(field) or []:
+            for term in set(terms(str(item))):
+                weights[term] = weights.get(term, 0.0) + weight
+    if not weights and job_description:
+        for term in terms(job_description):
+            weights[term] = weights.get(term, 0.0) + 1.0
+    return weights
+
+def bm25_contributions(documents, weights):
+    """Per document (a list of terms), the BM25 contribution of each query term it contains, with IDF over the
+    documents; a document's BM25 score is the sum of its contributions."""
+    if not documents:
+        return []
+    doc_freq = {}
+    for document in documents:
+        for term in set(document):
+            if term in weights:
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+    count = len(documents)
+    avg_length = sum(len(d) for d in documents) / count or 1.0
+    idf = {term: math.log(1.0 + (count - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+    contributions = []
+    for document in documents:
+        counts = {}
+        for term in document:
+            if term in idf:
+                counts[term] = counts.get(term, 0) + 1
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * len(document) / avg_length)
+        contributions.append({t: weights[t] * idf[t] * tf * (BM25_K1 + 1.0) / (tf + norm) for t, tf in counts.items()})
+    return contributions
+
+# --- SELECTION ---
+
+def select_context(resume_content, analysis, job_description=None, budget_tokens=None):
+    """Returns (context text, statistics): the pinned sections, then the highest-scoring chunks that fit the
+    budget, in document order, followed by a note on what was left out."""
+    started = time.perf_counter()
+    budget = (budget_tokens or BUDGET_TOKENS) * CHARS_PER_TOKEN * (1.0 - NOTE_SHARE)
+    sections = chunk_resume(resume_content)
+
+    # Every entry header is scored with its own chunks, so a bullet under a matching role ranks higher
+    candidates = []
+    used = 0
+    for s_index, section in enumerate(sections):
+        used += len(section["title"] or "") + 1
+        for e_index, entry in enumerate(section["entries"]):
+            if section["pinned"]:
+                used += sum(len(c) + 1 for c in entry["chunks"]) + len(entry["header"] or "") + 1
+                continue
+            for c_index, chunk in enumerate(entry["chunks"]):
+                candidates.append((s_index, e_index, c_index, chunk))
+            if not entry["chunks"]:
+                candidates.append((s_index, e_index, None, entry["header"]))
+    weights = query_weights(analysis, job_description)
+    contributions = bm25_contributions([terms(chunk + " " + (sections[s]["entries"][e]["header"] or ""))
+                                        for s, e, _, chunk in candidates], weights)
+
+    # Greedy selection in which a query term counts for less each time an already selected chunk covers it,
+    # so the budget goes to as many different requirements as possible rather than to ten versions of the best
+    # one. Scores only ever decrease, so a chunk is re-scored lazily when it reaches the top of the heap.
+    covered = {}
+
+    def score(index):
+        prior = 1.0 + RECENCY_BONUS * (1.0 - index / len(candidates))
+        return prior * sum(value * COVERAGE_DECAY ** covered.get(term, 0) for term, value in contributions[index].items())
+
+    heap = [(-score(i), i) for i in range(len(candidates))]
+    heapq.heapify(heap)
+    selected, shown_entries = set(), set()
+    while heap:
+        negative, index = heapq.heappop(heap)
+        current = score(index)
+        if heap and current < -negative and current < -heap[0][0]:
+            heapq.heappush(heap, (-current, index))
+            continue
+        s, e, c, chunk = candidates[index]
+        header = sections[s]["entries"][e]["header"]
+        cost = len(chunk) + 1 + (len(header) + 1 if header and c is not None and (s, e) not in shown_entries else 0)
+        if used + cost > budget:
+            continue
+        used += cost
+        selected.add((s, e, c))
+        shown_entries.add((s, e))
+        for term in contributions[index]:
+            covered[term] = covered.get(term, 0) + 1
+
+    shown, omitted_entries, omitted_chunks = [], [], []
+    for s_index, section in enumerate(sections):
+        lines = []
+        for e_index, entry in enumerate(section["entries"]):
+            if section["pinned"]:
+                lines.extend(([entry["header"]] if entry["header"] else []) + entry["chunks"])
+                continue
+            kept = [chunk for c_index, chunk in enumerate(entry["chunks"]) if (s_index, e_index, c_index) in selected]
+            dropped = [chunk for c_index, chunk in enumerate(entry["chunks"]) if (s_index, e_index, c_index) not in selected]
+            omitted_chunks.extend(dropped)
+            if (s_index, e_index) in shown_entries:
+                lines.extend(([entry["header"]] if entry["header"] else []) + kept)
+                if dropped and entry["header"]:
+                    lines.append(f"(+{len(dropped)} more not shown)")
+            elif entry["header"]:
+                omitted_chunks.append(entry["header"])
+                omitted_entries.append((section["title"], entry["header"].replace("\n", ", "), len(entry["chunks"])))
+            elif dropped:
+                omitted_entries.append((section["title"], None, len(dropped)))
+        if lines:
+            shown.append("\n".join(([section["title"]] if section["title"] else []) + lines))
+    context = "\n\n".join(shown)
+
+    note = []
+    if omitted_entries or omitted_chunks:
+        note.append("NOT SHOWN (the resume was condensed to the parts most relevant to this job; these also exist):")
+        grouped = {}
+        for title, header, count in omitted_entries:
+            if header and len(note) <= MAX_NOTED_ENTRIES:
+                note.append(f"- {title}: {header}" + (f" ({count} lines)" if count else ""))
+            else:
+                grouped[title] = grouped.get(title, 0) + max(count, 1)
+        note.extend(f"- {title}: {count} further lines" for title, count in grouped.items())
+        index = default_index()
+        shown_skills = {s["name"] for s in index.rank(context)}
+        extra = [s["name"] for s in index.rank("\n".join(omitted_chunks)) if s["name"] not in shown_skills]
+        if extra:
+            note.append("Skills mentioned only in the parts not shown: " + ", ".join(extra[:MAX_NOTED_SKILLS]))
+    if note:
+        context += "\n\n" + "\n".join(note)
+
+    return context, {
+        "tokens_in": estimate_tokens(resume_content), "tokens_out": estimate_tokens(context),
+        "chunks": len(candidates), "chunks_selected": len(selected), "entries_omitted": len(omitted_entries),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 2),
+    }
+
+def for_prompt(resume_content, analysis, job_description=None, budget_tokens=None):
+    """The resume text for a prompt that does not need all of it: unchanged when it fits the budget (or
+    RESUME_CONTEXT=full), otherwise the relevant chunks. Returns (text, statistics or None when unchanged)."""
+    if MODE == "full" or estimate_tokens(resume_content) <= (budget_tokens or BUDGET_TOKENS):
+        return resume_content, None
+    return select_context(resume_content, analysis, job_description, budget_tokens)
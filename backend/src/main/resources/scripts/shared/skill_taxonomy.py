@@ -0,0 +1,224 @@
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from collections import deque
+
+# --- CONFIGURATION ---
+TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json"))
+
+# Characters that continue a token: a match must not be glued to one of these on either side
+WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+SUFFIX_CHARS = frozenset("+#")
+WHITESPACE = str.maketrans({"\n": " ", "\t": " ", "\r": " ", " ": " "})
+# Context aliases ("Go", "C", "R") are ordinary prose ("Go to market", "the C-suite", "R&D") unless they sit in a
+# list of other skills ("C/C++", "Python, Go") or next to one of these words ("Go developer", "written in C")
+LIST_GAP_RE = re.compile(r"^(?:[\s,/&|;:()\[\]]|\band\b|\bor\b)*$")
+CONTEXT_WORDS_AFTER = frozenset("programming language languages developer developers engineer engineers code "
+                                "services microservices runtime compiler toolchain".split())
+CONTEXT_WORDS_BEFORE = CONTEXT_WORDS_AFTER | {"in", "using"}
+
+# --- SKILL INDEX ---
+
+class SkillIndex:
+    """Aho-Corasick automaton over every alias in the taxonomy; extraction is one linear pass over the text."""
+
+    def __init__(self, skills):
+        self.skills = skills
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for skill_id, skill in enumerate(skills):
+            for alias in skill.get("aliases", []):
+                self._add(alias.lower(), skill_id, None)
+            # Aliases that are everyday words in lowercase ("Go", "Spring") only count with their exact casing
+            for alias in skill.get("exact_case_aliases", []):
+                self._add(alias.lower(), skill_id, alias)
+            # ...and these only in a technical context as well (see LIST_GAP_RE)
+            for alias in skill.get("context_aliases", []):
+                self._add(alias.lower(), skill_id, alias, contextual=True)
+        self._link()
+
+    @classmethod
+    def load(cls, path=TAXONOMY_PATH):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["skills"])
+
+    def _add(self, alias, skill_id, exact, contextual=False):
+        alias = alias.translate(WHITESPACE)
+        node = 0
+        for char in alias:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append((len(alias), skill_id, exact, contextual))
+
+    def _link(self):
+        """Breadth-first construction of failure links, merging each node's outputs with its fallback's."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    @property
+    def node_count(self):
+        return len(self._goto)
+
+    def extract(self, text):
+        """Returns non-overlapping (start, end, skill) matches, preferring the longest alias at each position."""
+        original = text.translate(WHITESPACE)
+        lowered = original.lower()
+        if len(lowered) != len(original):  # A few Unicode characters change length when lowercased
+            lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in original)
+
+        goto, fail, out = self._goto, self._fail, self._out
+        candidates, node = [], 0
+        for position, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, skill_id, exact, contextual in out[node]:
+                start, end = position - length + 1, position + 1
+                if start > 0 and lowered[start - 1] in WORD_CHARS:
+                    continue
+                if end < len(lowered) and (lowered[end] in WORD_CHARS or (lowered[end - 1] in WORD_CHARS and lowered[end] in SUFFIX_CHARS)):
+                    continue
+                if exact is not None and original[start:end] != exact:
+                    continue
+                candidates.append((start, end, skill_id, contextual))
+
+        matches, covered_until = [], 0
+        for match in sorted(candidates, key=lambda m: (m[0], m[0] - m[1])):
+            if match[0] >= covered_until:
+                matches.append(match)
+                covered_until = match[1]
+        return [(start, end, self.skills[skill_id]) for i, (start, end, skill_id, contextual) in enumerate(matches)
+                if not contextual or _in_context(lowered, matches, i)]
+
+    def rank(self, text, category=None, limit=None):
+        """Canonical skills found in the text, ranked by mention count and then by first appearance."""
+        found = {}
+        for start, end, skill in self.extract(text):
+            if category and skill["category"] != category:
+                continue
+            entry = found.get(skill["name"])
+            if entry is None:
+                found[skill["name"]] = {"name": skill["name"], "category": skill["category"], "group": skill["group"],
+                                        "count": 1, "first_position": start, "mentions": [text[start:end]]}
+            else:
+                entry["count"] += 1
+                if text[start:end] not in entry["mentions"]:
+                    entry["mentions"].append(text[start:end])
+        ranked = sorted(found.values(), key=lambda s: (-s["count"], s["first_position"]))
+        return ranked[:limit] if limit else ranked
+
+    def top_skills(self, text, category, limit):
+        """Just the canonical names of the top skills of one category."""
+        return [s["name"] for s in self.rank(text, category, limit)]
+
+def _in_context(lowered, matches, i):
+    """Whether the match at i is listed with another skill or has a technical word on either side."""
+    start, end = matches[i][0], matches[i][1]
+    if i > 0 and LIST_GAP_RE.match(lowered[matches[i - 1][1]:start]):
+        return True
+    if i + 1 < len(matches) and LIST_GAP_RE.match(lowered[end:matches[i + 1][0]]):
+        return True
+    before = lowered[max(0, start - 40):start].split()
+    after = lowered[end:end + 40].split()
+    return bool(before and before[-1].strip(":") in CONTEXT_WORDS_BEFORE or
+                after and after[0].strip(",.;:") in CONTEXT_WORDS_AFTER)
+
+_DEFAULT_INDEX = None
+
+def default_index():
+    """Loads and compiles the bundled taxonomy once per process."""
+    global _DEFAULT_INDEX
+    if _DEFAULT_INDEX is None:
+        _DEFAULT_INDEX = SkillIndex.load()
+    return _DEFAULT_INDEX
+
+# --- BENCHMARK ---
+
+def synthetic_corpus(index, documents=200, words=600, seed=7):
+    """Resume-like documents mixing taxonomy aliases into filler text."""
+    rng = random.Random(seed)
+    aliases = [a for s in index.skills
+               for a in s.get("aliases", []) + s.get("exact_case_aliases", []) + s.get("context_aliases", [])]
+    filler = "led the team to design build and ship a reliable platform for customers across several regions".split()
+    corpus = []
+    for _ in range(documents):
+        corpus.append(" ".join(rng.choice(aliases) if rng.random() < 0.08 else rng.choice(filler) for _ in range(words)))
+    return corpus
+
+def benchmark(paths, repeat):
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = SkillIndex.load()
+    load_ms = (time.perf_counter() - started) * 1000.0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if paths:
+        corpus = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                corpus.append(f.read())
+    else:
+        corpus = synthetic_corpus(index)
+
+    total_chars = sum(len(doc) for doc in corpus)
+    matches = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for doc in corpus:
+            matches += len(index.extract(doc))
+    seconds = time.perf_counter() - started
+
+    return {
+        "skills": len(index.skills),
+        "aliases": sum(len(s.get("aliases", [])) + len(s.get("exact_case_aliases", [])) + len(s.get("context_aliases", []))
+                       for s in index.skills),
+        "trie_nodes": index.node_count,
+        "load_ms": round(load_ms, 2),
+        "memory_kib": round(current / 1024.0, 1),
+        "peak_memory_kib": round(peak / 1024.0, 1),
+        "documents": len(corpus) * repeat,
+        "matches": matches,
+        "documents_per_second": round(len(corpus) * repeat / seconds, 1),
+        "mb_per_second": round(total_chars * repeat / seconds / 1e6, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Extracts canonical skills from text (stdin or files) using the bundled taxonomy.")
+    parser.add_argument("files", nargs="*", help="Text files to analyse (default: stdin, or a synthetic corpus with --benchmark)")
+    parser.add_argument("--category", choices=["technical", "behavioral"], help="Only report skills of this category")
+    parser.add_argument("--limit", type=int, help="Maximum number of skills to report")
+    parser.add_argument("--benchmark", action="store_true", help="Report load time, memory footprint and extraction throughput")
+    parser.add_argument("--repeat", type=int, default=5, help="Benchmark repetitions over the corpus")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print(json.dumps(benchmark(args.files, args.repeat), indent=2))
+        return
+
+    texts = [open(p, "r", encoding="utf-8", errors="ignore").read() for p in args.files] or [sys.stdin.read()]
+    print(json.dumps(default_index().rank("\n".join(texts), args.category, args.limit), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+# --- CONFIGURATION ---
+TELEMETRY_PATH = os.getenv("MODEL_TELEMETRY_PATH", os.path.join(tempfile.gettempdir(), "career_catalyst_ai", "model_calls.jsonl"))
+ENABLED = os.getenv("MODEL_TELEMETRY_ENABLED", "1") == "1"
+# The log is rotated to <path>.1 past this size; the report reads both files
+MAX_BYTES = int(os.getenv("MODEL_TELEMETRY_MAX_BYTES", str(20 * 1024 * 1024)))
+
+GROUPINGS = {
+    "pipeline": lambda r: r.get("pipeline"),
+    "step": lambda r: f"{r.get('pipeline')}/{r.get('step')}",
+    "model": lambda r: r.get("model"),
+}
+
+# --- SINK ---
+
+def record(entry):
+    """Appends one model-call record as a JSON line. Telemetry must never break a pipeline, so errors are only reported."""
+    if not ENABLED:
+        return
+    try:
+        os.makedirs(os.path.dirname(TELEMETRY_PATH), exist_ok=True)
+        try:
+            if os.path.getsize(TELEMETRY_PATH) > MAX_BYTES:
+                os.replace(TELEMETRY_PATH, TELEMETRY_PATH + ".1")
+        except FileNotFoundError:
+            pass
+        # One write per line on an O_APPEND file keeps lines from concurrent processes intact
+        with open(TELEMETRY_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        print(f"Warning: could not write model telemetry: {e}", file=sys.stderr)
+
+def load(since=None):
+    records = []
+    for path in (TELEMETRY_PATH + ".1", TELEMETRY_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since is None or entry.get("ts", 0) >= since:
+                        records.append(entry)
+        except FileNotFoundError:
+            continue
+    return records
+
+# --- AGGREGATION ---
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+def summarize(records):
+    def distribution(key):
+        values = [r[key] for r in records if r.get(key) is not None]
+        if not values:
+            return None
+        return {"p50": round(percentile(values, 50), 1), "p95": round(percentile(values, 95), 1),
+                "total": round(sum(values), 1)}
+
+    return {
+        "calls": len(records),
+        "errors": sum(1 for r in records if r.get("outcome") != "ok"),
+        "retries": sum(r.get("retries", 0) for r in records),
+        "latency_ms": distribution("latency_ms"),
+        "model_ms": distribution("model_ms"),
+        "admission_wait_ms": distribution("admission_wait_ms"),
+        "prompt_tokens": distribution("prompt_tokens"),
+        "output_tokens": distribution("output_tokens"),
+    }
+
+def report(records, by):
+    groups = {}
+    for entry in records:
+        groups.setdefault(GROUPINGS[by](entry), []).append(entry)
+    summaries = {str(key): summarize(group) for key, group in groups.items()}
+    # Largest share of total latency first: the first rows are the ones worth optimizing
+    ordered = sorted(summaries.items(), key=lambda item: -((item[1]["latency_ms"] or {}).get("total") or 0))
+    return {"records": len(records), "by": by, "groups": dict(ordered)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Reports latency and token usage of model calls per pipeline and step.")
+    parser.add_argument("--by", choices=list(GROUPINGS), default="step", help="Grouping of the report")
+    parser.add_argument("--since-hours", type=float, help="Only include calls from the last N hours")
+    parser.add_argument("--pipeline", help="Only include calls from this pipeline")
+    parser.add_argument("--errors", action="store_true", help="List the most recent failed calls instead")
+    args = parser.parse_args()
+
+    records = load(time.time() - args.since_hours * 3600 if args.since_hours else None)
+    if args.pipeline:
+        records = [r for r in records if r.get("pipeline") == args.pipeline]
+    if args.errors:
+        print(json.dumps([r for r in records if r.get("outcome") != "ok"][-20:], indent=2))
+    else:
+        print(json.dumps(report(records, args.by), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,18 @@ import sys
 import os
 import json
 import re
-import google.generativeai as genai
-import contextlib
+import argparse
+
+# Shared helpers (model client, admission control) live next to this script
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared"))
+import model_client
+import profiling
+import jd_prefetch
+import jd_preprocess
+import resume_context
 
 # --- CONFIGURATION ---
-API_KEY = os.getenv("GOOGLE_API_KEY")
+# Per-step models come from scripts/shared/model_routing.json; this is only used for steps without a route
 MODEL_NAME = "gemini-2.5-flash-lite"
 
 # --- EMBEDDED PROMPTS ---
@@ -288,24 +295,99 @@ LATEX_TEMPLATE = r"""
 \end{document}
 """
 
+# --- STRUCTURED (RESUME DATA) MODE ---
+# Steps 3 and 4 emit a ResumeData JSON document (backend/resume-engine/app/models.py) instead of a full LaTeX
+# document, so the model writes only the content and the resume-engine templates supply the layout.
+
+RESUME_DATA_SCHEMA = """
+{{
+  "personal_info": {{"full_name": "", "address": "", "email": "", "phone": "", "github_handle": null, "linkedin_handle": null, "portfolio_url": null, "extra_info": null}},
+  "education": [{{"degree": "", "institution": "", "start_year": "", "end_year": "", "gpa": null}}],
+  "work_experience": [{{"job_title": "", "company_name": "", "location": "", "start_date": "", "end_date": "", "description_points": [""]}}],
+  "projects": [{{"project_name": "", "start_date": "", "end_date": "", "tech_stack": "", "description_points": [""]}}],
+  "skills": [{{"name": "Languages", "value": "Java, Python"}}],
+  "achievements": [{{"description": ""}}],
+  "certifications": [{{"name": "", "issuer": "", "date": ""}}]
+}}
+"""
+
+PROMPT_STEP_3_JSON = """
+You are a meticulous and expert resume writer. Your sole task is to act as a pure execution engine.
+You will take a strategic plan and the original resume content and render the tailored resume as structured JSON.
+---
+### ## INPUTS
+
+**Strategic Tailoring Plan (JSON):**
+{strategic_plan_json}
+
+**Original Plain Text Resume:**
+{resume_content}
+
+---
+### ## CORE DIRECTIVES
+
+1.  Your primary guide is the **Strategic Tailoring Plan**.
+You must implement every suggestion it contains for reordering, rephrasing, and enhancing content.
+2.  Use the **Original Plain Text Resume** as the source of truth for all content that is not explicitly altered by the strategic plan.
+3.  **DO NOT INVENT INFORMATION:** Do not add any skills or experiences that are not present in the original resume or suggested by the strategic plan.
+4.  Order the entries of each list by their importance for this job.
+---
+### ## OUTPUT FORMAT
+
+* Return ONLY a JSON object with exactly this structure (use null for unknown optional values and [] for empty sections):
+""" + RESUME_DATA_SCHEMA + """
+* Write plain text only: no LaTeX commands, no escaping, no markdown.
+* github_handle and linkedin_handle are the bare handles, not URLs.
+* For 'skills', use one entry per category (e.g. Languages, Frameworks, Developer Tools).
+* Keep the content to what fits on one page.
+"""
+
+PROMPT_STEP_4_JSON = """
+You are a meticulous senior hiring manager at the target company.
+Your final task is to review the tailored resume draft (as structured JSON) and provide a final, polished version.
+You are the last line of quality control.
+
+**Original Job Requirements & Tone Analysis (JSON):**
+{jd_analysis_json}
+
+**Strategic Tailoring Plan (JSON):**
+{strategic_plan_json}
+
+**Tailored Resume Draft (JSON):**
+{resume_data_draft}
+
+**Instructions:**
+Review the draft against the plan and requirements.
+Ask yourself:
+1. **Adherence to Plan:** Does the draft perfectly implement every instruction from the strategic plan?
+2. **Tone & Culture Fit:** Does the language and phrasing match the company's tone identified in the analysis?
+3. **Impact & ATS Score:** Is the resume highly impactful and optimized for ATS scanners?
+4. **Final Polish:** Make any final, minor edits necessary to improve flow, conciseness, and impact.
+{validation_errors}
+**Output Format:**
+Return ONLY the final JSON object, with exactly the same structure and keys as the draft. Plain text values only, no LaTeX or markdown.
+"""
+
+# Field specification mirroring backend/resume-engine/app/models.py: (field, required, type)
+RESUME_DATA_FIELDS = {
+    "personal_info": [("full_name", True, str), ("address", True, str), ("email", True, str), ("phone", True, str),
+                      ("github_handle", False, str), ("linkedin_handle", False, str), ("portfolio_url", False, str),
+                      ("extra_info", False, str)],
+    "education": [("degree", True, str), ("institution", True, str), ("start_year", True, str), ("end_year", True, str),
+                  ("gpa", False, str)],
+    "work_experience": [("job_title", True, str), ("company_name", True, str), ("location", True, str),
+                        ("start_date", True, str), ("end_date", True, str), ("description_points", True, list)],
+    "projects": [("project_name", True, str), ("start_date", True, str), ("end_date", True, str),
+                 ("tech_stack", True, str), ("description_points", True, list)],
+    "skills": [("name", True, str), ("value", True, str)],
+    "achievements": [("description", True, str)],
+    "certifications": [("name", True, str), ("issuer", True, str), ("date", True, str)],
+}
+
 # --- HELPER FUNCTIONS ---
 
-@contextlib.contextmanager
-def suppress_stderr():
-    original_stderr = sys.stderr
-    sys.stderr = open(os.devnull, 'w', encoding='utf-8')
-    try:
-        yield
-    finally:
-        sys.stderr.close()
-        sys.stderr = original_stderr
-
-def call_gemini_api(prompt):
-    with suppress_stderr():
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel(model_name=MODEL_NAME)
-        response = model.generate_content(prompt)
-    return response.text
+def call_gemini_api(prompt, step=None):
+    return model_client.generate(prompt, MODEL_NAME, "tailor", step)
 
 def clean_json_string(json_string):
     match = re.search(r'\{[\s\S]*\}|\[[\s\S]*\]', json_string)
@@ -329,41 +411,159 @@ def read_input_from_stdin():
     except Exception:
         return "", ""
 
+def validate_resume_data(data):
+    """Checks and normalizes a ResumeData document locally; returns (data, errors)."""
+    errors = []
+    if not isinstance(data, dict):
+        return data, ["The top level must be a JSON object."]
+
+    def check_item(section, item, path):
+        if not isinstance(item, dict):
+            errors.append(f"{path} must be an object.")
+            return None
+        clean = {}
+        for field, required, kind in RESUME_DATA_FIELDS[section]:
+            value = item.get(field)
+            if value is None or value == "":
+                if required and kind is str:
+                    clean[field] = ""  # Required strings may be empty; the templates skip empty values
+                elif required:
+                    clean[field] = []
+                else:
+                    clean[field] = None
+                continue
+            if kind is str and isinstance(value, (int, float)):
+                value = str(value)
+            if kind is list:
+                if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                    errors.append(f"{path}.{field} must be a list of strings.")
+                    continue
+                value = [v.strip() for v in value if v.strip()]
+            elif not isinstance(value, str):
+                errors.append(f"{path}.{field} must be a string.")
+                continue
+            clean[field] = value
+        return clean
+
+    result = {"personal_info": check_item("personal_info", data.get("personal_info"), "personal_info")}
+    if not (result["personal_info"] or {}).get("full_name"):
+        errors.append("personal_info.full_name is required.")
+    for section in RESUME_DATA_FIELDS:
+        if section == "personal_info":
+            continue
+        items = data.get(section) or []
+        if not isinstance(items, list):
+            errors.append(f"{section} must be a list.")
+            items = []
+        result[section] = [c for c in (check_item(section, item, f"{section}[{i}]") for i, item in enumerate(items)) if c]
+    return result, errors
+
+def analyze_jd(job_description, call=call_gemini_api):
+    return call(PROMPT_STEP_1.format(job_description=jd_preprocess.for_prompt(job_description)), "jd_analysis")
+
+def analyze_and_plan(resume_content, job_description, call=call_gemini_api, jd_analysis=None):
+    """Steps 1 and 2, shared by both output formats. Step 1 is skipped when a (prefetched) analysis is given.
+    The plan only needs the parts of a long resume relevant to the JD; steps 3 and 4 rewrite the whole resume
+    and get the full text."""
+    # Step 1
+    analysis_str = jd_analysis if jd_analysis is not None else analyze_jd(job_description, call)
+    analysis_json = json.loads(clean_json_string(analysis_str))
+
+    with profiling.span("resume_context") as attrs:
+        plan_context, stats = resume_context.for_prompt(resume_content, analysis_json, job_description)
+        if stats:
+            attrs.update(stats)
+
+    # Step 2
+    p2 = PROMPT_STEP_2.format(jd_analysis_json=json.dumps(analysis_json), resume_content=plan_context)
+    plan_str = call(p2, "tailoring_plan")
+    plan_json = json.loads(clean_json_string(plan_str))
+    return analysis_json, plan_json
+
+def tailor_latex(resume_content, job_description, call=call_gemini_api, jd_analysis=None):
+    """The original pipeline: steps 3 and 4 emit a complete LaTeX document."""
+    analysis_json, plan_json = analyze_and_plan(resume_content, job_description, call, jd_analysis)
+
+    # Step 3
+    p3 = PROMPT_STEP_3.format(
+        strategic_plan_json=json.dumps(plan_json), 
+        resume_content=resume_content, 
+        DEFAULT_LATEX_TEMPLATE=LATEX_TEMPLATE
+    )
+    latex_draft = call(p3, "latex_draft")
+
+    # Step 4
+    p4 = PROMPT_STEP_4.format(
+        jd_analysis_json=json.dumps(analysis_json), 
+        strategic_plan_json=json.dumps(plan_json), 
+        latex_draft=latex_draft
+    )
+    final_latex = call(p4, "latex_review")
+    return clean_final_latex(final_latex)
+
+def tailor_resume_data(resume_content, job_description, call=call_gemini_api, jd_analysis=None):
+    """Structured pipeline: steps 3 and 4 emit a ResumeData JSON document, validated locally."""
+    analysis_json, plan_json = analyze_and_plan(resume_content, job_description, call, jd_analysis)
+
+    # Step 3
+    p3 = PROMPT_STEP_3_JSON.format(strategic_plan_json=json.dumps(plan_json), resume_content=resume_content)
+    draft_str = call(p3, "resume_data_draft")
+    with profiling.span("validate_resume_data"):
+        draft, draft_errors = validate_resume_data(json.loads(clean_json_string(draft_str)))
+
+    # Step 4: the review also repairs anything the local validation flagged in the draft
+    validation_errors = ""
+    if draft_errors:
+        validation_errors = "5. **Fix Validation Errors:** " + " ".join(draft_errors) + "\n"
+    p4 = PROMPT_STEP_4_JSON.format(
+        jd_analysis_json=json.dumps(analysis_json),
+        strategic_plan_json=json.dumps(plan_json),
+        resume_data_draft=json.dumps(draft),
+        validation_errors=validation_errors
+    )
+    final_str = call(p4, "resume_data_review")
+    with profiling.span("validate_resume_data"):
+        final, final_errors = validate_resume_data(json.loads(clean_json_string(final_str)))
+    if final_errors:
+        raise ValueError("Tailored resume data failed validation: " + " ".join(final_errors))
+    return final
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tailors a resume (stdin: resume, delimiter, job description).")
+    parser.add_argument("--format", choices=["latex", "resume-data"], default="latex",
+                        help="latex: a complete LaTeX document; resume-data: ResumeData JSON for the resume-engine templates")
+    parser.add_argument("--jd-handle", help="Handle from jd_prefetch.py; the prefetched JD analysis replaces Step 1")
+    parser.add_argument("--session", help="Tailor session id; re-runs only send new or edited bullets to the model "
+                                          "(see tailor_session.py)")
+    return parser.parse_args()
+
+@profiling.profiled_main("tailor")
 def main():
+    args = parse_args()
     resume_content, job_description = read_input_from_stdin()
 
-    if not API_KEY:
+    if not model_client.is_configured():
         print("Error: GOOGLE_API_KEY not found.", file=sys.stderr)
         sys.exit(1)
 
     try:
-        # Step 1
-        p1 = PROMPT_STEP_1.format(job_description=job_description)
-        analysis_str = call_gemini_api(p1)
-        analysis_json = json.loads(clean_json_string(analysis_str))
-
-        # Step 2
-        p2 = PROMPT_STEP_2.format(jd_analysis_json=json.dumps(analysis_json), resume_content=resume_content)
-        plan_str = call_gemini_api(p2)
-        plan_json = json.loads(clean_json_string(plan_str))
-
-        # Step 3
-        p3 = PROMPT_STEP_3.format(
-            strategic_plan_json=json.dumps(plan_json), 
-            resume_content=resume_content, 
-            DEFAULT_LATEX_TEMPLATE=LATEX_TEMPLATE
-        )
-        latex_draft = call_gemini_api(p3)
-
-        # Step 4
-        p4 = PROMPT_STEP_4.format(
-            jd_analysis_json=json.dumps(analysis_json), 
-            strategic_plan_json=json.dumps(plan_json), 
-            latex_draft=latex_draft
-        )
-        final_latex = call_gemini_api(p4)
-        
-        print(clean_final_latex(final_latex))
+        if args.session:
+            import tailor_session
+            with profiling.span("tailor_session", format=args.format) as attrs:
+                output, report = tailor_session.tailor_with_session(args.session, resume_content, job_description,
+                                                                    call_gemini_api, args.format, args.jd_handle)
+                attrs.update(report)
+            print(output)
+            return
+
+        # Step 1 comes from a speculative prefetch when one was started for this JD
+        with profiling.span("jd_analysis", prefetched=bool(args.jd_handle)):
+            jd_analysis = jd_prefetch.resolve("tailor", job_description, PROMPT_STEP_1,
+                                              lambda: analyze_jd(job_description), args.jd_handle)
+        if args.format == "resume-data":
+            print(json.dumps(tailor_resume_data(resume_content, job_description, jd_analysis=jd_analysis), indent=2))
+        else:
+            print(tailor_latex(resume_content, job_description, jd_analysis=jd_analysis))
 
     except Exception as e:
         print(f"Error in tailor.py: {e}", file=sys.stderr)
@@ -0,0 +1,527 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared"))
+import jd_prefetch
+import jd_preprocess
+import document_ingest
+from tailor import PROMPT_STEP_1, LATEX_TEMPLATE, clean_json_string, validate_resume_data, analyze_jd
+
+# Incremental tailoring: a session remembers the JD analysis, the structure of every resume fragment and, per JD,
+# the enhancement plan and rewrite of every bullet, all keyed by content hashes. A re-run parses the resume
+# locally, sends only the fragments and bullets it has not seen before to the model (in one batched call per
+# step), and reassembles the tailored resume from the cached and new pieces. Unlike the four-call pipeline in
+# tailor.py, the entry order of the original resume is kept; only the bullets themselves are rewritten.
+
+# --- CONFIGURATION ---
+SESSION_DIR = os.getenv("TAILOR_SESSION_DIR", os.path.join(tempfile.gettempdir(), "career_catalyst_ai", "tailor_sessions"))
+TTL_SECONDS = float(os.getenv("TAILOR_SESSION_TTL", str(7 * 24 * 3600)))
+MAX_BULLETS_PER_JD = int(os.getenv("TAILOR_SESSION_MAX_BULLETS", "400"))  # Least recently used bullets are dropped
+HISTORY_LENGTH = 20
+# The classic pipeline's calls per run (JD analysis, plan, draft, review), the baseline for the savings report
+BASELINE_CALLS = 4
+CHARS_PER_TOKEN = 4  # Token estimate used for cached units, whose calls are not repeated
+SESSION_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Where each canonical section of document_ingest goes in ResumeData. Sections without a place there (summary,
+# interests) are carried through unchanged: in their original position in the LaTeX output, and in
+# personal_info.extra_info for resume-data
+SECTION_TARGETS = {
+    "experience": "work_experience", "projects": "projects", "education": "education", "skills": "skills",
+    "languages": "skills", "certifications": "certifications", "achievements": "achievements",
+    "publications": "achievements", "other": "achievements",
+}
+ENTRY_SECTIONS = ("work_experience", "projects")
+# Document titles that can open the contact block but are not the candidate's name
+NOT_A_NAME = {"resume", "curriculum vitae", "cv", "bio data", "biodata"}
+
+# --- EMBEDDED PROMPTS ---
+
+PROMPT_STRUCTURE = """
+You are a precise resume parser. Convert each resume fragment below into the structured fields listed for its kind.
+Copy the content exactly: do not rewrite, shorten, reorder or add anything.
+
+**Fields per kind:**
+- personal_info: {{"full_name": "", "address": "", "email": "", "phone": "", "github_handle": null, "linkedin_handle": null, "portfolio_url": null, "extra_info": null}}
+- work_experience: {{"job_title": "", "company_name": "", "location": "", "start_date": "", "end_date": ""}}
+- projects: {{"project_name": "", "start_date": "", "end_date": "", "tech_stack": ""}}
+- education: a list of {{"degree": "", "institution": "", "start_year": "", "end_year": "", "gpa": null}}
+- skills: a list of {{"name": "Languages", "value": "Java, Python"}}, one entry per category
+- achievements: a list of {{"description": ""}}
+- certifications: a list of {{"name": "", "issuer": "", "date": ""}}
+
+**Units (JSON):**
+{units_json}
+
+**Output Format:**
+Return ONLY a JSON object of the form {{"units": {{"<id>": <fields>}}}} with an entry for every unit id.
+Plain text values only, no LaTeX or markdown. Use null for unknown optional values.
+github_handle and linkedin_handle are the bare handles, not URLs.
+"""
+
+PROMPT_BULLET_PLAN = """
+You are a master resume strategist and career coach. Plan how to tailor individual resume bullet points to the job requirements.
+**Job Requirements & Tone Analysis (JSON):**
+{jd_analysis_json}
+
+**Units (JSON):**
+{units_json}
+
+**Instructions:**
+1. For each bullet ("entry" is the role or project it belongs to), give one specific recommendation: which keywords from the job requirements to integrate and how to rephrase it to match the required tone.
+2. For bullets that lack numbers, suggest a plausible and realistic metric, framed clearly as a suggestion.
+**Output Format:**
+Return ONLY a JSON object of the form {{"bullets": {{"<id>": "<recommendation>"}}}} with an entry for every unit id.
+"""
+
+PROMPT_BULLET_REWRITE = """
+You are a meticulous and expert resume writer. Rewrite each resume bullet point below by applying its enhancement plan.
+**Job Requirements & Tone Analysis (JSON):**
+{jd_analysis_json}
+
+**Units (JSON):**
+{units_json}
+
+**Rules:**
+1. Implement the plan for every bullet and keep each one to one or two lines.
+2. **DO NOT INVENT INFORMATION:** Add no skills, employers or results that are not in the bullet or suggested by its plan.
+3. Plain text only: no LaTeX commands, no escaping, no markdown and no leading bullet character.
+**Output Format:**
+Return ONLY a JSON object of the form {{"bullets": {{"<id>": "<rewritten bullet>"}}}} with an entry for every unit id.
+"""
+
+# Bump when the session format, the parsing or a prompt changes, so a stale session is started over
+SESSION_VERSION = "1-" + hashlib.sha256((PROMPT_STEP_1 + PROMPT_STRUCTURE + PROMPT_BULLET_PLAN + PROMPT_BULLET_REWRITE)
+                                        .encode("utf-8")).hexdigest()[:8]
+
+# --- HELPER FUNCTIONS ---
+
+def content_hash(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:24]
+
+def estimate_tokens(*texts):
+    return sum(len(text) for text in texts) / CHARS_PER_TOKEN
+
+def _session_path(session_id):
+    if not SESSION_ID_RE.match(session_id or ""):
+        raise ValueError("Session ids are 1-64 letters, digits, '-' or '_'.")
+    return os.path.join(SESSION_DIR, session_id + ".json")
+
+def _new_session():
+    return {"version": SESSION_VERSION, "jd": {}, "structure": {}, "bullets": {}, "layout": {}, "history": []}
+
+def load_session(session_id):
+    try:
+        with open(_session_path(session_id), "r", encoding="utf-8") as f:
+            session = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return _new_session()
+    return session if session.get("version") == SESSION_VERSION else _new_session()
+
+def save_session(session_id, session):
+    os.makedirs(SESSION_DIR, exist_ok=True)
+    path = _session_path(session_id)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(session, f)
+    os.replace(temp_path, path)
+
+def prune_sessions():
+    """Removes sessions (and leftover temp files) untouched for longer than the TTL."""
+    cutoff = time.time() - TTL_SECONDS
+    try:
+        names = os.listdir(SESSION_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        path = os.path.join(SESSION_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+# --- PARSING ---
+
+def _entries(section, body):
+    """Splits an experience or projects section into entries: header lines followed by '- ' bullets. Sections
+    written without bullet marks are read as paragraphs whose first line is the header and the rest bullets."""
+    marked = any(line.startswith("- ") for line in body)
+    entries, current = [], None
+    for line in body:
+        if not line:
+            if not marked:
+                current = None
+            continue
+        if not marked:
+            if current is None:
+                current = {"section": section, "header": [line], "bullets": []}
+                entries.append(current)
+            else:
+                current["bullets"].append(line)
+        elif line.startswith("- "):
+            if current is None:
+                current = {"section": section, "header": [], "bullets": []}
+                entries.append(current)
+            current["bullets"].append(line[2:].strip())
+        elif current is not None and current["bullets"] and line[:1].islower():
+            current["bullets"][-1] += " " + line  # A bullet wrapped onto the next line
+        elif current is None or current["bullets"]:
+            current = {"section": section, "header": [line], "bullets": []}
+            entries.append(current)
+        else:
+            current["header"].append(line)
+    for entry in entries:
+        entry["header"] = "\n".join(entry["header"])
+    return entries
+
+def parse_resume(resume_content):
+    """The plain-text resume as contact block, entries (with bullets) and section blocks, in document order."""
+    text, sections = document_ingest.assemble([("line", resume_content)])
+    lines = text.split("\n")
+    first = sections[0]["start_line"] if sections else len(lines)
+    parsed = {"contact": "\n".join(line for line in lines[:first] if line), "entries": [], "blocks": [], "order": [],
+              "passthrough": []}
+    for section in sections:
+        target = SECTION_TARGETS.get(section["name"])
+        body = lines[section["start_line"] + 1:section["end_line"]]
+        if not any(body):
+            continue
+        if target is None:
+            parsed["order"].append(f"passthrough:{len(parsed['passthrough'])}")
+            parsed["passthrough"].append({"title": section["title"], "lines": [line for line in body if line]})
+            continue
+        if target not in parsed["order"]:
+            parsed["order"].append(target)
+        if target in ENTRY_SECTIONS:
+            parsed["entries"].extend(_entries(target, body))
+        else:
+            parsed["blocks"].append({"section": target, "text": "\n".join(line for line in body if line)})
+    return parsed
+
+# --- BATCHED MODEL STEPS ---
+
+def _charge(units, prompt, response, sizes):
+    """Splits a batched call's estimated tokens over its units in proportion to each unit's share of the payload."""
+    total = estimate_tokens(prompt, response)
+    weight = sum(sizes.values()) or 1
+    return {uid: total * sizes[uid] / weight for uid in units}
+
+def _batch(call, step, template, units, answers_key, **fields):
+    """One model call for all units ({id: payload}); returns ({id: answer}, {id: estimated tokens})."""
+    units_json = json.dumps(units, ensure_ascii=False)
+    prompt = template.format(units_json=units_json, **fields)
+    response = call(prompt, step)
+    try:
+        answers = json.loads(clean_json_string(response)).get(answers_key) or {}
+    except (ValueError, AttributeError):
+        answers = {}
+    if not isinstance(answers, dict):
+        answers = {}
+    sizes = {uid: len(json.dumps(payload, ensure_ascii=False)) + len(json.dumps(answers.get(uid), ensure_ascii=False))
+             for uid, payload in units.items()}
+    return answers, _charge(units, prompt, response, sizes)
+
+def _contact_name(lines):
+    """The first contact line that reads like a name: has letters, is not a document title and holds no email,
+    link or number. Empty when there is none (the resume then validates without a name, see tailor_with_session)."""
+    for line in lines:
+        # "Jane Doe | jane@example.com": the name is the first part
+        candidate = re.split(r"[|\u2022\u00b7]", line)[0].strip()
+        if not re.search(r"[^\W\d_]", candidate) or candidate.lower() in NOT_A_NAME:
+            continue
+        if re.search(r"@|https?://|www\.|\.com\b|\d{3}", candidate):
+            continue
+        return candidate
+    return ""
+
+def _fallback_structure(kind, text):
+    """A literal reading of a fragment the model did not return, so the resume still validates and renders."""
+    lines = text.split("\n")
+    if kind == "personal_info":
+        name = _contact_name(lines)
+        contact = " ".join(lines)
+        email = re.search(r"[\w.+-]+@[\w-]+\.[\w.]+", contact)
+        phone = re.search(r"\+?\d[\d ()-]{7,}\d", contact)
+        return {"full_name": name, "address": "", "email": email.group(0) if email else "",
+                "phone": phone.group(0) if phone else ""}
+    if kind == "work_experience":
+        return {"job_title": lines[0], "company_name": " ".join(lines[1:])}
+    if kind == "projects":
+        return {"project_name": lines[0], "tech_stack": " ".join(lines[1:])}
+    if kind == "skills":
+        return [{"name": name.strip(), "value": value.strip()} if value else {"name": "Skills", "value": name.strip()}
+                for name, _, value in (line.partition(":") for line in lines)]
+    if kind == "education":
+        return [{"institution": lines[0], "degree": " ".join(lines[1:])}]
+    if kind == "certifications":
+        return [{"name": line.lstrip("- ")} for line in lines]
+    return [{"description": line.lstrip("- ")} for line in lines]
+
+def resolve_structure(session, units, call, report):
+    """Structured fields for every (kind, text) fragment; only fragments never seen before are sent to the model."""
+    cache = session["structure"]
+    keyed = {content_hash(kind, text): (kind, text) for kind, text in units}
+    missing = {key: unit for key, unit in keyed.items() if key not in cache}
+    for key in keyed:
+        if key not in missing:
+            report["tokens_saved"] += cache[key]["tokens"]
+    report["structure_units"] = {"reused": len(keyed) - len(missing), "new": len(missing)}
+    if missing:
+        ids = {f"u{i + 1}": key for i, key in enumerate(missing)}
+        answers, tokens = _batch(call, "resume_structure", PROMPT_STRUCTURE,
+                                 {uid: {"kind": missing[key][0], "text": missing[key][1]} for uid, key in ids.items()},
+                                 "units")
+        for uid, key in ids.items():
+            kind, text = missing[key]
+            value = answers.get(uid)
+            if isinstance(value, dict if kind in ("personal_info", *ENTRY_SECTIONS) else list):
+                cache[key] = {"value": value, "tokens": tokens[uid]}
+            else:
+                # Not cached, so the next run asks again
+                cache[key] = {"value": _fallback_structure(kind, text), "tokens": 0.0, "fallback": True}
+                report.setdefault("structure_fallbacks", []).append(kind)
+            report["tokens_used"] += tokens[uid]
+    value = {key: cache[key]["value"] for key in keyed}
+    for key in keyed:
+        if cache[key].get("fallback"):
+            del cache[key]
+    return value
+
+def resolve_bullets(session, jd_hash, analysis_json, entries, call, report):
+    """The tailored text of every bullet; only bullets without a cached rewrite for this JD are planned and rewritten."""
+    cache = session["bullets"].setdefault(jd_hash, {})
+    now = time.time()
+    context = {}
+    for entry in entries:
+        for bullet in entry["bullets"]:
+            context.setdefault(content_hash(bullet), (entry["header"].split("\n")[0], bullet))
+    missing = [key for key in context if key not in cache]
+    for key in context:
+        if key in cache:
+            cache[key]["used"] = now
+            report["tokens_saved"] += cache[key]["tokens"]
+
+    if missing:
+        ids = {f"b{i + 1}": key for i, key in enumerate(missing)}
+        analysis = json.dumps(analysis_json, ensure_ascii=False)
+        plans, plan_tokens = _batch(call, "bullet_plan", PROMPT_BULLET_PLAN,
+                                    {uid: {"entry": context[key][0], "bullet": context[key][1]} for uid, key in ids.items()},
+                                    "bullets", jd_analysis_json=analysis)
+        plans = {uid: plans.get(uid) if isinstance(plans.get(uid), str) else "" for uid in ids}
+        rewrites, rewrite_tokens = _batch(call, "bullet_rewrite", PROMPT_BULLET_REWRITE,
+                                          {uid: {"entry": context[key][0], "bullet": context[key][1], "plan": plans[uid]}
+                                           for uid, key in ids.items()},
+                                          "bullets", jd_analysis_json=analysis)
+        for uid, key in ids.items():
+            rewrite = rewrites.get(uid)
+            tokens = plan_tokens[uid] + rewrite_tokens[uid]
+            report["tokens_used"] += tokens
+            if isinstance(rewrite, str) and rewrite.strip():
+                cache[key] = {"plan": plans[uid], "rewrite": rewrite.strip().lstrip("-\u2022 ").strip(),
+                              "tokens": tokens, "used": now}
+        report["bullets_unanswered"] = sum(1 for key in missing if key not in cache)
+
+    if len(cache) > MAX_BULLETS_PER_JD:
+        for key in sorted(cache, key=lambda k: cache[k]["used"])[:len(cache) - MAX_BULLETS_PER_JD]:
+            del cache[key]
+    # A bullet the model did not answer keeps its original wording
+    return {key: cache[key]["rewrite"] if key in cache else context[key][1] for key in context}
+
+# --- ASSEMBLY ---
+
+def _prioritize_skills(value, wanted):
+    """Moves the skills the JD asks for to the front of a comma-separated list, keeping the order otherwise."""
+    skills = [skill.strip() for skill in value.split(",") if skill.strip()]
+    return ", ".join(sorted(skills, key=lambda skill: skill.lower() not in wanted))
+
+def assemble_resume_data(parsed, structure, rewrites, analysis_json):
+    data = {"personal_info": structure[content_hash("personal_info", parsed["contact"])],
+            "education": [], "work_experience": [], "projects": [], "skills": [], "achievements": [], "certifications": []}
+    for entry in parsed["entries"]:
+        fields = dict(structure[content_hash(entry["section"], entry["header"])]) if entry["header"] else {}
+        fields["description_points"] = [rewrites[content_hash(bullet)] for bullet in entry["bullets"]]
+        data[entry["section"]].append(fields)
+    for block in parsed["blocks"]:
+        data[block["section"]].extend(structure[content_hash(block["section"], block["text"])])
+    # ResumeData's only free-text field; kept as written when the contact block had nothing there
+    passthrough = "\n\n".join(f"{block['title']}\n" + "\n".join(block["lines"]) for block in parsed["passthrough"])
+    if passthrough and not data["personal_info"].get("extra_info"):
+        data["personal_info"] = dict(data["personal_info"], extra_info=passthrough)
+
+    wanted = {str(skill).strip().lower() for key in ("required_skills", "preferred_skills")
+              for skill in (analysis_json.get(key) or []) if isinstance(skill, str)}
+    for skill in data["skills"]:
+        if isinstance(skill, dict) and isinstance(skill.get("value"), str):
+            skill["value"] = _prioritize_skills(skill["value"], wanted)
+    return data
+
+LATEX_ESCAPES = str.maketrans({
+    "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#", "_": r"\_", "{": r"\{", "}": r"\}",
+    "~": r"\textasciitilde{}", "^": r"\textasciicircum{}", "\\": r"\textbackslash{}",
+})
+
+def _tex(value):
+    return (value or "").translate(LATEX_ESCAPES)
+
+def _dates(start, end):
+    return " -- ".join(_tex(part) for part in (start, end) if part)
+
+def _items(points):
+    if not points:
+        return []
+    return ["      \\resumeItemListStart"] + [f"        \\resumeItem{{{_tex(point)}}}" for point in points] + \
+           ["      \\resumeItemListEnd"]
+
+def render_latex(data, order, passthrough=()):
+    """A complete LaTeX document in the tailor template's layout, with sections in the original resume's order.
+    Sections ResumeData has no place for (passthrough) are written as they were, under their own heading."""
+    info = data["personal_info"]
+    contact = [_tex(info.get("phone"))] if info.get("phone") else []
+    if info.get("email"):
+        contact.append(f"\\href{{mailto:{_tex(info['email'])}}}{{\\underline{{{_tex(info['email'])}}}}}")
+    for key, site in (("linkedin_handle", "linkedin.com/in/"), ("github_handle", "github.com/")):
+        if info.get(key):
+            url = site + _tex(info[key])
+            contact.append(f"\\href{{https://{url}}}{{\\underline{{{url}}}}}")
+    if info.get("portfolio_url"):
+        contact.append(f"\\url{{{_tex(info['portfolio_url'])}}}")
+    body = ["\\begin{document}", "", "\\begin{center}",
+            f"    \\textbf{{\\Huge \\scshape {_tex(info.get('full_name'))}}} \\\\ \\vspace{{1pt}}",
+            "    \\small " + " $|$ ".join(contact), "\\end{center}", ""]
+
+    for section in order:
+        if section.startswith("passthrough:"):
+            block = passthrough[int(section.split(":")[1])]
+            bullets = [line[2:] for line in block["lines"] if line.startswith("- ")]
+            title = block["title"].title() if block["title"].isupper() else block["title"]
+            body.append(f"\\section{{{_tex(title)}}}")
+            if len(bullets) == len(block["lines"]):
+                body += ["  \\resumeItemListStart"] + [f"    \\resumeItem{{{_tex(b)}}}" for b in bullets] + \
+                        ["  \\resumeItemListEnd"]
+            else:
+                body += [" \\begin{itemize}[leftmargin=0.15in, label={}]", "    \\item {\\small",
+                         " \\\\\n".join(_tex(line) for line in block["lines"]), "    }", " \\end{itemize}"]
+            body.append("")
+            continue
+        entries = [entry for entry in data.get(section, []) if any(entry.values())]
+        if not entries:
+            continue
+        if section == "education":
+            body += ["\\section{Education}", "  \\resumeSubHeadingListStart"]
+            for e in entries:
+                gpa = f"GPA: {_tex(e['gpa'])}" if e.get("gpa") else ""
+                body.append(f"    \\resumeSubheading{{{_tex(e['institution'])}}}{{{_dates(e['start_year'], e['end_year'])}}}"
+                            f"{{{_tex(e['degree'])}}}{{{gpa}}}")
+            body.append("  \\resumeSubHeadingListEnd")
+        elif section == "work_experience":
+            body += ["\\section{Experience}", "  \\resumeSubHeadingListStart"]
+            for e in entries:
+                body.append(f"    \\resumeSubheading{{{_tex(e['job_title'])}}}{{{_dates(e['start_date'], e['end_date'])}}}"
+                            f"{{{_tex(e['company_name'])}}}{{{_tex(e['location'])}}}")
+                body += _items(e["description_points"])
+            body.append("  \\resumeSubHeadingListEnd")
+        elif section == "projects":
+            body += ["\\section{Projects}", "  \\resumeSubHeadingListStart"]
+            for e in entries:
+                title = f"\\textbf{{{_tex(e['project_name'])}}}"
+                if e.get("tech_stack"):
+                    title += f" $|$ \\emph{{{_tex(e['tech_stack'])}}}"
+                body.append(f"    \\resumeProjectHeading{{{title}}}{{{_dates(e['start_date'], e['end_date'])}}}")
+                body += _items(e["description_points"])
+            body.append("  \\resumeSubHeadingListEnd")
+        elif section == "skills":
+            lines = [f"     \\textbf{{{_tex(e['name'])}}}{{: {_tex(e['value'])}}}" for e in entries]
+            body += ["\\section{Technical Skills}", " \\begin{itemize}[leftmargin=0.15in, label={}]", "    \\item {\\small",
+                     " \\\\\n".join(lines), "    }", " \\end{itemize}"]
+        elif section == "certifications":
+            points = [", ".join(_tex(part) for part in (e["name"], e["issuer"], e["date"]) if part) for e in entries]
+            body += ["\\section{Certifications}", "  \\resumeItemListStart"] + \
+                    [f"    \\resumeItem{{{point}}}" for point in points] + ["  \\resumeItemListEnd"]
+        elif section == "achievements":
+            body += ["\\section{Achievements}", "  \\resumeItemListStart"] + \
+                    [f"    \\resumeItem{{{_tex(e['description'])}}}" for e in entries] + ["  \\resumeItemListEnd"]
+        body.append("")
+    body.append("\\end{document}")
+    preamble = LATEX_TEMPLATE[:LATEX_TEMPLATE.index("\\begin{document}")].strip()
+    return preamble + "\n\n" + "\n".join(body)
+
+# --- SESSION RUN ---
+
+def _layout(parsed):
+    """Bullet hashes by (entry header, position), to tell edited bullets from added ones on the next run."""
+    return {f"{entry['section']}:{content_hash(entry['header'])}:{position}": content_hash(bullet)
+            for entry in parsed["entries"] for position, bullet in enumerate(entry["bullets"])}
+
+def tailor_with_session(session_id, resume_content, job_description, call, output_format="latex", jd_handle=None):
+    """Tailors the resume within a session; returns (output, report). The report counts the model calls made and
+    the (estimated) tokens spent and saved against the classic pipeline and the session's cached units."""
+    prune_sessions()
+    session = load_session(session_id)
+    calls = []
+
+    def counted_call(prompt, step):
+        calls.append(step)
+        return call(prompt, step)
+
+    report = {"session": session_id, "calls_made": 0, "calls_baseline": BASELINE_CALLS,
+              "tokens_used": 0.0, "tokens_saved": 0.0}
+
+    # JD analysis: from the session, else from a prefetch, else Step 1 now
+    jd_hash = jd_prefetch.jd_handle(job_description)
+    cached_jd = session["jd"].get(jd_hash)
+    if cached_jd:
+        analysis_json = cached_jd["analysis"]
+        report["tokens_saved"] += cached_jd["tokens"]
+        report["jd_analysis"] = "session"
+    else:
+        analysis_str = jd_prefetch.resolve("tailor", job_description, PROMPT_STEP_1,
+                                           lambda: analyze_jd(job_description, counted_call), jd_handle)
+        analysis_json = json.loads(clean_json_string(analysis_str))
+        tokens = estimate_tokens(PROMPT_STEP_1.format(job_description=jd_preprocess.for_prompt(job_description)), analysis_str)
+        report["tokens_used" if calls else "tokens_saved"] += tokens
+        report["jd_analysis"] = "model" if calls else "prefetch"
+        session["jd"] = {key: value for key, value in session["jd"].items() if key in session["bullets"]}
+        session["jd"][jd_hash] = {"analysis": analysis_json, "tokens": tokens}
+
+    parsed = parse_resume(resume_content)
+    units = [("personal_info", parsed["contact"])]
+    units += [(entry["section"], entry["header"]) for entry in parsed["entries"] if entry["header"]]
+    units += [(block["section"], block["text"]) for block in parsed["blocks"]]
+    structure = resolve_structure(session, units, counted_call, report)
+    cached_before = set(session["bullets"].get(jd_hash, {}))
+    rewrites = resolve_bullets(session, jd_hash, analysis_json, parsed["entries"], counted_call, report)
+
+    # What changed since the previous run of this session
+    previous, layout = session["layout"], _layout(parsed)
+    new_bullets = {slot: key for slot, key in layout.items() if key not in cached_before}
+    report["bullets"] = {
+        "total": len(layout),
+        "reused": len(layout) - len(new_bullets),
+        "changed": sum(1 for slot in new_bullets if slot in previous),
+        "added": sum(1 for slot in new_bullets if slot not in previous),
+        "removed": len(set(previous) - set(layout)),
+    }
+    session["layout"] = layout
+
+    data, errors = validate_resume_data(assemble_resume_data(parsed, structure, rewrites, analysis_json))
+    if "personal_info" in report.get("structure_fallbacks", ()):
+        # A contact block read without the model may have no recognizable name; the rest of the run still counts
+        errors = [error for error in errors if not error.startswith("personal_info.full_name")]
+    if errors:
+        raise ValueError("Tailored resume data failed validation: " + " ".join(errors))
+    if output_format == "resume-data":
+        output = json.dumps(data, indent=2)
+    else:
+        output = render_latex(data, parsed["order"], parsed["passthrough"])
+
+    report.update(calls_made=len(calls), steps=calls, calls_saved=BASELINE_CALLS - len(calls),
+                  tokens_used=round(report["tokens_used"]), tokens_saved=round(report["tokens_saved"]), ts=time.time())
+    session["history"] = (session["history"] + [report])[-HISTORY_LENGTH:]
+    save_session(session_id, session)
+    return output, report
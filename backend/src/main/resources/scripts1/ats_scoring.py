@@ -0,0 +1,325 @@
+import os
+import re
+import json
+import time
+import numpy as np
+
+# --- CONFIGURATION ---
+
+# Optional precomputed document frequencies (and score calibration), built by benchmark_ats_score.py
+TERM_STATS_PATH = os.getenv("ATS_TERM_STATS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ats_term_stats.json"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+DEFAULT_AVG_DOC_LENGTH = 450.0
+
+REQUIRED_SKILL_WEIGHT = 2.0
+PREFERRED_SKILL_WEIGHT = 1.0
+SKILL_SHARE = 0.6
+TERM_SHARE = 0.4
+MAX_KEYWORDS = 25
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+SPLIT_PATTERN = re.compile(r"\s*(?:,|;|/|\band\b|\bor\b|\(|\))\s*")
+REQUIRED_HEADINGS = re.compile(r"requirement|qualification|must have|what you('ll)? (need|bring)|skills|you have|experience", re.I)
+PREFERRED_HEADINGS = re.compile(r"preferred|nice to have|bonus|plus|desired|good to have", re.I)
+
+STOPWORDS = frozenset("""
+a about above across after all also an and any are as at be been being both but by can could do does each etc for
+from has have having he her his how i if in into is it its may more most must not of on one or other our out over
+per she should so such than that the their them then there these they this those through to under up us was we
+were what when where which while who will with within would you your
+""".split())
+
+# Words that show up in every posting and carry no skill signal on their own
+GENERIC_TERMS = frozenset("""
+ability able applicants candidate candidates company degree demonstrated environment excellent experience
+experienced familiarity good great ideal including job knowledge least looking minimum new plus preferred
+proficiency proficient related required requirements responsibilities role skills solid strong team understanding
+using well work working year years
+""".split())
+
+# --- TEXT HELPERS ---
+
+def tokenize(text):
+    """Lowercases and splits text into terms, keeping tokens like 'c++', 'c#' and 'node.js'."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+def phrase_set(tokens, max_n=3):
+    """All 1..max_n-grams of a token list, used for constant-time skill phrase lookups."""
+    grams = set(tokens)
+    for n in range(2, max_n + 1):
+        grams.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+def extract_keyword_sections(job_description):
+    """Splits a raw JD into required and preferred keyword lists using its section headings."""
+    required_lines, preferred_lines, current = [], [], None
+    for line in job_description.splitlines():
+        stripped = line.strip(" \t-*•:")
+        if not stripped:
+            continue
+        # Bullets are never headings; a heading is a short label line, usually ending in a colon
+        is_bullet = line.lstrip()[:1] in ("-", "*", "•")
+        is_heading = not is_bullet and (line.rstrip().endswith(":") or (len(stripped.split()) <= 5 and not stripped.endswith(".")))
+        if is_heading and PREFERRED_HEADINGS.search(stripped):
+            current = preferred_lines
+            continue
+        if is_heading and REQUIRED_HEADINGS.search(stripped):
+            current = required_lines
+            continue
+        if current is not None:
+            current.append(stripped)
+        elif PREFERRED_HEADINGS.search(stripped):
+            preferred_lines.append(stripped)
+
+    # Postings without recognizable sections: treat the whole text as requirements
+    if not required_lines and not preferred_lines:
+        required_lines = [job_description]
+
+    def keywords(lines):
+        counts = {}
+        for line in lines:
+            for term in tokenize(line):
+                if term not in GENERIC_TERMS and any(c.isalpha() for c in term):
+                    counts[term] = counts.get(term, 0) + 1
+        return sorted(counts, key=lambda t: (-counts[t], t))[:MAX_KEYWORDS]
+
+    required = keywords(required_lines)
+    preferred = [k for k in keywords(preferred_lines) if k not in required]
+    return required, preferred
+
+# --- TERM STATISTICS ---
+
+class TermStatistics:
+    """Reference-corpus document frequencies used for IDF weights, plus an optional score calibration."""
+
+    def __init__(self, doc_freq=None, doc_count=0, avg_doc_length=DEFAULT_AVG_DOC_LENGTH, calibration=None):
+        self.doc_freq = doc_freq or {}
+        self.doc_count = doc_count
+        self.avg_doc_length = avg_doc_length
+        self.calibration = calibration
+
+    @classmethod
+    def load(cls, path=TERM_STATS_PATH):
+        """Loads precomputed statistics, or neutral ones (all terms equally rare) if none are bundled."""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("doc_freq"), data.get("doc_count", 0),
+                   data.get("avg_doc_length", DEFAULT_AVG_DOC_LENGTH), data.get("calibration"))
+
+    @classmethod
+    def build(cls, documents):
+        """Computes document frequencies over a corpus of resumes and job descriptions."""
+        doc_freq, total_length = {}, 0
+        for document in documents:
+            tokens = tokenize(document)
+            total_length += len(tokens)
+            for term in set(tokens):
+                doc_freq[term] = doc_freq.get(term, 0) + 1
+        count = len(documents)
+        return cls(doc_freq, count, total_length / count if count else DEFAULT_AVG_DOC_LENGTH)
+
+    def save(self, path=TERM_STATS_PATH):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "doc_freq": self.doc_freq,
+                "doc_count": self.doc_count,
+                "avg_doc_length": self.avg_doc_length,
+                "calibration": self.calibration,
+            }, f)
+
+    def idf(self, terms):
+        """BM25 IDF for each term, as a vector aligned with `terms`."""
+        if not self.doc_count:
+            return np.ones(len(terms))
+        df = np.array([self.doc_freq.get(t, 0) for t in terms], dtype=float)
+        return np.log1p((self.doc_count - df + 0.5) / (df + 0.5))
+
+    def calibrate(self, raw_scores):
+        """Maps raw 0-10 scores onto the LLM's scale using the fitted linear calibration, if any."""
+        if not self.calibration:
+            return raw_scores
+        return raw_scores * self.calibration["slope"] + self.calibration["intercept"]
+
+_DEFAULT_STATS = None
+
+def default_statistics():
+    """Loads the bundled term statistics once per process."""
+    global _DEFAULT_STATS
+    if _DEFAULT_STATS is None:
+        _DEFAULT_STATS = TermStatistics.load()
+    return _DEFAULT_STATS
+
+# --- SCORING ENGINE ---
+
+class JobProfile:
+    """A job description compiled once into a term vocabulary, BM25 query weights and weighted skill phrases."""
+
+    def __init__(self, job_description, required_skills=None, preferred_skills=None, stats=None):
+        self.stats = stats or default_statistics()
+        if required_skills is None and preferred_skills is None:
+            required_skills, preferred_skills = extract_keyword_sections(job_description)
+
+        # Query side of BM25: distinct JD terms, weighted by IDF and (log-damped) JD frequency
+        counts = {}
+        for term in tokenize(job_description):
+            counts[term] = counts.get(term, 0) + 1
+        self.terms = sorted(counts)
+        self.vocabulary = {term: i for i, term in enumerate(self.terms)}
+        query_tf = np.array([counts[t] for t in self.terms], dtype=float)
+        self.query_weights = self.stats.idf(self.terms) * (1.0 + np.log(query_tf)) if self.terms else np.zeros(0)
+        self.max_term_score = float(self.query_weights.sum() * (BM25_K1 + 1.0)) or 1.0
+
+        # Skill side: normalized phrases with their weights (required skills count double)
+        self.skills, weights = [], []
+        for skills, weight in ((required_skills or [], REQUIRED_SKILL_WEIGHT), (preferred_skills or [], PREFERRED_SKILL_WEIGHT)):
+            for skill in skills:
+                variants = self._skill_variants(str(skill))
+                if variants and all(s[0] != str(skill) for s in self.skills):
+                    self.skills.append((str(skill), variants))
+                    weights.append(weight)
+        self.skill_weights = np.array(weights, dtype=float)
+        self.is_required = self.skill_weights == REQUIRED_SKILL_WEIGHT
+
+    @staticmethod
+    def _skill_variants(skill):
+        """A skill like 'Python/Django' matches on the whole phrase or any of its parts."""
+        whole = " ".join(tokenize(skill))
+        parts = [" ".join(tokenize(p)) for p in SPLIT_PATTERN.split(skill)]
+        return [v for v in dict.fromkeys([whole] + parts) if v]
+
+    def term_matrix(self, token_lists):
+        """Term-frequency matrix (documents x JD vocabulary) built with one bincount per document."""
+        matrix = np.zeros((len(token_lists), len(self.terms)))
+        vocabulary = self.vocabulary
+        for row, tokens in enumerate(token_lists):
+            indices = [vocabulary[t] for t in tokens if t in vocabulary]
+            if indices:
+                matrix[row] = np.bincount(indices, minlength=len(self.terms))
+        return matrix
+
+    def score_many(self, resume_texts):
+        """Scores many resumes at once; returns one result dict per resume, in order."""
+        started = time.perf_counter()
+        token_lists = [tokenize(text) for text in resume_texts]
+
+        # BM25 relevance of each resume to the JD, normalized to [0, 1)
+        tf = self.term_matrix(token_lists)
+        doc_lengths = np.array([len(t) for t in token_lists], dtype=float)[:, None]
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_lengths / self.stats.avg_doc_length)
+        term_scores = (tf * (BM25_K1 + 1.0) / (tf + norm)) @ self.query_weights / self.max_term_score
+
+        # Weighted skill coverage: a boolean (documents x skills) hit matrix against each resume's n-grams
+        hits = np.array([
+            [any(v in grams for v in variants) for _, variants in self.skills]
+            for grams in (phrase_set(tokens) for tokens in token_lists)
+        ], dtype=bool).reshape(len(token_lists), len(self.skills))
+        total_weight = self.skill_weights.sum()
+        coverage = hits @ self.skill_weights / total_weight if total_weight else np.zeros(len(token_lists))
+
+        raw = 10.0 * (SKILL_SHARE * coverage + TERM_SHARE * term_scores)
+        scores = np.clip(np.rint(self.stats.calibrate(raw)), 1, 10)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        results = []
+        for row in range(len(token_lists)):
+            results.append({
+                "score": int(scores[row]),
+                "raw_score": round(float(raw[row]), 2),
+                "skill_coverage": round(float(coverage[row]), 3),
+                "term_relevance": round(float(term_scores[row]), 3),
+                "matched_keywords": [self.skills[i][0] for i in np.flatnonzero(hits[row])],
+                "missing_keywords": [self.skills[i][0] for i in np.flatnonzero(~hits[row] & self.is_required)]
+                                    + [self.skills[i][0] for i in np.flatnonzero(~hits[row] & ~self.is_required)],
+                "elapsed_ms": round(elapsed_ms / max(len(token_lists), 1), 3),
+            })
+        return results
+
+    def score(self, resume_text):
+        """Scores a single resume against this job description."""
+        return self.score_many([resume_text])[0]
+
+class JobSet:
+    """Many compiled JobProfiles stacked into matrices, so one resume is scored against all of them at once.
+
+    The resume is tokenized once; BM25 term saturation is computed once over the union of the JD vocabularies and
+    every JD's term relevance is one row of a (JDs x vocabulary) query-weight matrix product, and skill hits are
+    looked up once per distinct skill and weighted per JD with a (JDs x skills) matrix. Each row equals what
+    JobProfile.score gives for that JD alone."""
+
+    def __init__(self, profiles):
+        self.profiles = list(profiles)
+        self.stats = self.profiles[0].stats if self.profiles else default_statistics()
+        terms = sorted({t for profile in self.profiles for t in profile.terms})
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.query_weights = np.zeros((len(self.profiles), len(terms)))
+        self.max_term_scores = np.array([profile.max_term_score for profile in self.profiles], dtype=float)
+
+        # Distinct skills (by their variants) across all JDs, and each JD's weight for each of them
+        skill_index, self.skill_variants, cells = {}, [], []
+        for row, profile in enumerate(self.profiles):
+            self.query_weights[row, [self.vocabulary[t] for t in profile.terms]] = profile.query_weights
+            for (_, variants), weight in zip(profile.skills, profile.skill_weights):
+                key = tuple(variants)
+                if key not in skill_index:
+                    skill_index[key] = len(self.skill_variants)
+                    self.skill_variants.append(variants)
+                cells.append((row, skill_index[key], weight))
+        self.skill_weights = np.zeros((len(self.profiles), len(self.skill_variants)))
+        # Accumulated: a JD may list skills that differ only in spelling ("Python", "python"), and JobProfile
+        # counts each of them
+        for row, column, weight in cells:
+            self.skill_weights[row, column] += weight
+        self.total_skill_weights = self.skill_weights.sum(axis=1)
+
+    def score(self, resume_text):
+        """Scores the resume against every JD; returns one result dict per JD, in order."""
+        started = time.perf_counter()
+        tokens = tokenize(resume_text)
+
+        # BM25: the resume is the only document, so its term saturation is a single vector over the vocabulary
+        tf = np.zeros(len(self.vocabulary))
+        indices = [self.vocabulary[t] for t in tokens if t in self.vocabulary]
+        if indices:
+            tf = np.bincount(indices, minlength=len(self.vocabulary)).astype(float)
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * len(tokens) / self.stats.avg_doc_length)
+        term_scores = self.query_weights @ (tf * (BM25_K1 + 1.0) / (tf + norm)) / self.max_term_scores
+
+        grams = phrase_set(tokens)
+        hits = np.array([any(v in grams for v in variants) for variants in self.skill_variants], dtype=bool)
+        covered = self.skill_weights @ hits
+        coverage = np.divide(covered, self.total_skill_weights, out=np.zeros(len(self.profiles)),
+                             where=self.total_skill_weights > 0)
+
+        raw = 10.0 * (SKILL_SHARE * coverage + TERM_SHARE * term_scores)
+        scores = np.clip(np.rint(self.stats.calibrate(raw)), 1, 10)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+        hit_by_variants = {tuple(v): bool(h) for v, h in zip(self.skill_variants, hits)}
+        results = []
+        for row, profile in enumerate(self.profiles):
+            skill_hits = [hit_by_variants[tuple(variants)] for _, variants in profile.skills]
+            results.append({
+                "score": int(scores[row]),
+                "raw_score": round(float(raw[row]), 2),
+                "skill_coverage": round(float(coverage[row]), 3),
+                "term_relevance": round(float(term_scores[row]), 3),
+                "matched_keywords": [name for (name, _), hit in zip(profile.skills, skill_hits) if hit],
+                "missing_keywords": [name for (name, _), hit, required in zip(profile.skills, skill_hits, profile.is_required)
+                                     if not hit and required]
+                                    + [name for (name, _), hit, required in zip(profile.skills, skill_hits, profile.is_required)
+                                       if not hit and not required],
+                "elapsed_ms": round(elapsed_ms / max(len(self.profiles), 1), 3),
+            })
+        return results
+
+def local_ats_score(resume_content, job_description, jd_analysis=None):
+    """Deterministic ATS keyword score; uses the model's JD analysis for skills when it is available."""
+    if jd_analysis:
+        profile = JobProfile(job_description, jd_analysis.get("required_skills", []), jd_analysis.get("preferred_skills", []))
+    else:
+        profile = JobProfile(job_description)
+    return profile.score(resume_content)
@@ -0,0 +1,174 @@
+import sys
+import re
+import json
+import time
+import argparse
+import numpy as np
+import evaluate
+from ats_scoring import JobProfile, JobSet, TermStatistics, TERM_STATS_PATH
+from telemetry import percentile
+
+# Benchmarks the local ATS scorer on a corpus of resume/JD pairs and compares it with the LLM's SCORE.
+#
+# Corpus format (JSONL), one pair per line:
+#   {"resume": "...", "job_description": "...", "llm_score": 7}
+# "llm_score" is optional; pass --run-llm to fill missing ones with the full evaluate.py pipeline.
+
+def load_corpus(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def rank(values):
+    return np.argsort(np.argsort(values)).astype(float)
+
+def correlation(x, y):
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if len(x) < 2 or x.std() == 0 or y.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(x, y)[0, 1])
+
+def run_llm_evaluation(resume_content, job_description):
+    """Runs the three evaluate.py model steps and returns the report's SCORE."""
+    jd_analysis = json.loads(evaluate.clean_json_string(evaluate.call_gemini_api(evaluate.PROMPT_JD.format(job_description=job_description), "jd_analysis")))
+    resume_analysis = json.loads(evaluate.clean_json_string(evaluate.call_gemini_api(evaluate.PROMPT_RESUME.format(resume_content=resume_content), "resume_analysis")))
+    report = evaluate.call_gemini_api(evaluate.PROMPT_EVAL.format(
+        job_description_json=json.dumps(jd_analysis, indent=2),
+        resume_json=json.dumps(resume_analysis, indent=2),
+        original_resume=resume_content
+    ), "evaluation")
+    match = re.search(r"SCORE:\s*\[?(\d+)", report)
+    return int(match.group(1)) if match else None
+
+def benchmark_latency(pairs, stats, repeat):
+    """Per-pair latency (profile compile + score) and batched throughput (one profile per JD)."""
+    latencies = []
+    for _ in range(repeat):
+        for pair in pairs:
+            started = time.perf_counter()
+            JobProfile(pair["job_description"], stats=stats).score(pair["resume"])
+            latencies.append((time.perf_counter() - started) * 1000.0)
+
+    by_jd = {}
+    for pair in pairs:
+        by_jd.setdefault(pair["job_description"], []).append(pair["resume"])
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for job_description, resumes in by_jd.items():
+            JobProfile(job_description, stats=stats).score_many(resumes)
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        "pairs": len(pairs),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "mean_ms": round(float(np.mean(latencies)), 3),
+        "batched_pairs_per_second": round(len(pairs) * repeat / batch_seconds, 1) if batch_seconds else None,
+    }
+
+# Skill lists as a model's JD analysis can return them, with skills that share their variants ("Python" and
+# "python"); JobSet folds those into one column and must still weigh each of them as JobProfile does
+OVERLAPPING_SKILLS = [
+    (["Python", "python", "Docker"], ["AWS"]),
+    (["Python/Django", "Django"], ["django", "PostgreSQL"]),
+]
+
+def benchmark_ranking(pairs, stats, repeat):
+    """One resume against every distinct JD of the corpus: a JobProfile.score per JD (what running the scorer
+    per posting costs, profiles compiled once) against one JobSet.score, and whether both give the same results
+    (also for JDs with overlapping skill lists, checked but not timed)."""
+    job_descriptions = list(dict.fromkeys(p["job_description"] for p in pairs))
+    resumes = list(dict.fromkeys(p["resume"] for p in pairs))
+    profiles = [JobProfile(jd, stats=stats) for jd in job_descriptions]
+    job_set = JobSet(profiles)
+
+    checked = profiles + [JobProfile(job_descriptions[0], required, preferred, stats=stats)
+                          for required, preferred in OVERLAPPING_SKILLS if job_descriptions]
+    checked_set = JobSet(checked)
+    mismatches = 0
+    for resume in resumes + ["I know python well", "Django and PostgreSQL developer"]:
+        expected = [profile.score(resume) for profile in checked]
+        for one, many in zip(expected, checked_set.score(resume)):
+            one.pop("elapsed_ms"), many.pop("elapsed_ms")
+            mismatches += one != many
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for resume in resumes:
+            for profile in profiles:
+                profile.score(resume)
+    per_job_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for resume in resumes:
+            job_set.score(resume)
+    job_set_seconds = time.perf_counter() - started
+
+    rankings = len(resumes) * repeat
+    return {
+        "jobs": len(job_descriptions),
+        "resumes": len(resumes),
+        "per_job_ms_per_ranking": round(per_job_seconds * 1000.0 / rankings, 3) if rankings else None,
+        "job_set_ms_per_ranking": round(job_set_seconds * 1000.0 / rankings, 3) if rankings else None,
+        "speedup": round(per_job_seconds / job_set_seconds, 1) if job_set_seconds else None,
+        "mismatched_results": mismatches,
+    }
+
+def calibration_report(pairs, stats):
+    """Agreement between the local score and the LLM score, before and after a linear fit."""
+    scored = [p for p in pairs if p.get("llm_score") is not None]
+    if len(scored) < 2:
+        return {"pairs_with_llm_score": len(scored)}, None
+
+    uncalibrated = TermStatistics(stats.doc_freq, stats.doc_count, stats.avg_doc_length)
+    raw = np.array([JobProfile(p["job_description"], stats=uncalibrated).score(p["resume"])["raw_score"] for p in scored])
+    llm = np.array([float(p["llm_score"]) for p in scored])
+    slope, intercept = np.polyfit(raw, llm, 1)
+    local = np.clip(np.rint(raw), 1, 10)
+    calibrated = np.clip(np.rint(raw * slope + intercept), 1, 10)
+
+    report = {
+        "pairs_with_llm_score": len(scored),
+        "pearson": round(correlation(raw, llm), 3),
+        "spearman": round(correlation(rank(raw), rank(llm)), 3),
+        "mae_uncalibrated": round(float(np.abs(local - llm).mean()), 3),
+        "mae_calibrated": round(float(np.abs(calibrated - llm).mean()), 3),
+        "within_1_calibrated": round(float((np.abs(calibrated - llm) <= 1).mean()), 3),
+        "fit": {"slope": round(float(slope), 4), "intercept": round(float(intercept), 4)},
+    }
+    return report, {"slope": float(slope), "intercept": float(intercept)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks and calibrates the local ATS scorer.")
+    parser.add_argument("corpus", help="JSONL file of resume/job_description pairs")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions over the corpus")
+    parser.add_argument("--run-llm", action="store_true", help="Fill missing llm_score values with the full model evaluation")
+    parser.add_argument("--build-stats", action="store_true", help=f"Rebuild term statistics from the corpus into {TERM_STATS_PATH}")
+    parser.add_argument("--write-calibration", action="store_true", help="Store the fitted calibration with the term statistics")
+    args = parser.parse_args()
+
+    pairs = load_corpus(args.corpus)
+    if args.run_llm:
+        for pair in pairs:
+            if pair.get("llm_score") is None:
+                pair["llm_score"] = run_llm_evaluation(pair["resume"], pair["job_description"])
+
+    if args.build_stats:
+        documents = [p["resume"] for p in pairs] + list({p["job_description"] for p in pairs})
+        stats = TermStatistics.build(documents)
+    else:
+        stats = TermStatistics.load()
+
+    calibration, fit = calibration_report(pairs, stats)
+    if args.write_calibration and fit:
+        stats.calibration = fit
+    if args.build_stats or (args.write_calibration and fit):
+        stats.save()
+
+    print(json.dumps({
+        "latency": benchmark_latency(pairs, stats, args.repeat),
+        "ranking": benchmark_ranking(pairs, stats, args.repeat),
+        "calibration": calibration,
+    }, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
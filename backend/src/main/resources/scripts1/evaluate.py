@@ -2,13 +2,26 @@ import sys
 import os
 import json
 import re
-import google.generativeai as genai
-import contextlib
+import argparse
+from ats_scoring import local_ats_score
+
+# Shared helpers (skill taxonomy, model client) live in scripts/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "shared"))
+from skill_taxonomy import default_index
+import model_client
+import profiling
+import jd_prefetch
+import jd_preprocess
+import resume_context
 
 # --- CONFIGURATION ---
-API_KEY = os.getenv("GOOGLE_API_KEY")
+# Per-step models come from scripts/shared/model_routing.json; this is only used for steps without a route
 MODEL_NAME = "gemini-2.5-flash-lite"
 
+# "local": the resume's skills come from the skill taxonomy (falling back to the model when it finds too few); "model": always call the model
+SKILL_EXTRACTION_MODE = os.getenv("SKILL_EXTRACTION_MODE", "local")
+MIN_LOCAL_TECHNICAL_SKILLS = 5
+
 # --- EMBEDDED PROMPTS ---
 
 # Originally from: scripts1/prompt_step1_jd_analysis.txt
@@ -86,24 +99,9 @@ The text should be clean.
 
 # --- HELPER FUNCTIONS ---
 
-@contextlib.contextmanager
-def suppress_stderr():
-    """A context manager to temporarily suppress stderr to hide library warnings."""
-    original_stderr = sys.stderr
-    sys.stderr = open(os.devnull, 'w', encoding='utf-8')
-    try:
-        yield
-    finally:
-        sys.stderr.close()
-        sys.stderr = original_stderr
-
-def call_gemini_api(prompt: str) -> str:
-    """Calls the Gemini API with a given prompt and returns the text response."""
-    with suppress_stderr():
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel(model_name=MODEL_NAME)
-        response = model.generate_content(prompt)
-    return response.text
+def call_gemini_api(prompt: str, step: str = None) -> str:
+    """Calls the Gemini API (through the shared admission controller) and returns the text response."""
+    return model_client.generate(prompt, MODEL_NAME, "evaluate", step)
 
 def clean_json_string(json_string: str) -> str:
     """Finds and extracts the first valid JSON object or array from a string."""
@@ -132,33 +130,71 @@ def read_input_from_stdin():
         print(f"Error reading from stdin: {e}", file=sys.stderr)
         sys.exit(1)
 
+def analyze_resume_locally(resume_content):
+    """Builds the resume's skill lists with the skill taxonomy instead of PROMPT_RESUME, or returns None if it finds too few."""
+    index = default_index()
+    technical = [s["name"] for s in index.rank(resume_content, "technical")]
+    if len(technical) < MIN_LOCAL_TECHNICAL_SKILLS:
+        return None
+    return {
+        "technical_skills": technical,
+        "soft_skills": [s["name"] for s in index.rank(resume_content, "behavioral")],
+        "note": "Skills were extracted with a skill taxonomy; experience and projects are in the original resume.",
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluates a resume against a job description read from stdin.")
+    parser.add_argument("--local-only", action="store_true", help="Print only the instant local keyword score as JSON")
+    parser.add_argument("--local-first", action="store_true", help="Print the local keyword score as a JSON line before the model report")
+    parser.add_argument("--jd-handle", help="Handle from scripts/shared/jd_prefetch.py; the prefetched JD analysis replaces Step 1")
+    return parser.parse_args()
+
 # --- MAIN FUNCTION ---
 
+@profiling.profiled_main("evaluate")
 def main():
-    if not API_KEY:
+    args = parse_args()
+    resume_content, job_description = read_input_from_stdin()
+
+    # The local keyword score needs no model call, so it can be returned before the slower report
+    if args.local_only or args.local_first:
+        with profiling.span("local_ats_score"):
+            local_score = local_ats_score(resume_content, job_description)
+        print(json.dumps(local_score), flush=True)
+        if args.local_only:
+            return
+
+    if not model_client.is_configured():
         print("Error: GOOGLE_API_KEY environment variable was not received from Java service.", file=sys.stderr)
         sys.exit(1)
 
     try:
-        resume_content, job_description = read_input_from_stdin()
-
-        # STEP 1: Analyze the Job Description
-        prompt1 = PROMPT_JD.format(job_description=job_description)
-        jd_analysis_str = call_gemini_api(prompt1)
+        # STEP 1: Analyze the Job Description (or pick up a speculative prefetch of it)
+        prompt1 = PROMPT_JD.format(job_description=jd_preprocess.for_prompt(job_description))
+        jd_analysis_str = jd_prefetch.resolve("evaluate", job_description, PROMPT_JD,
+                                              lambda: call_gemini_api(prompt1, "jd_analysis"), args.jd_handle)
         jd_analysis_json = json.loads(clean_json_string(jd_analysis_str))
 
-        # STEP 2: Analyze the Resume
-        prompt2 = PROMPT_RESUME.format(resume_content=resume_content)
-        resume_analysis_str = call_gemini_api(prompt2)
-        resume_analysis_json = json.loads(clean_json_string(resume_analysis_str))
-
-        # STEP 3: Perform the Comprehensive ATS Evaluation
+        # STEP 2: Analyze the Resume (locally from the skill taxonomy when it is confident)
+        with profiling.span("resume_analysis_local", mode=SKILL_EXTRACTION_MODE):
+            resume_analysis_json = analyze_resume_locally(resume_content) if SKILL_EXTRACTION_MODE == "local" else None
+        if resume_analysis_json is None:
+            prompt2 = PROMPT_RESUME.format(resume_content=resume_content)
+            resume_analysis_str = call_gemini_api(prompt2, "resume_analysis")
+            resume_analysis_json = json.loads(clean_json_string(resume_analysis_str))
+
+        # STEP 3: Perform the Comprehensive ATS Evaluation (on the relevant parts of a long resume; the structured
+        # analysis above was made from all of it)
+        with profiling.span("resume_context") as attrs:
+            original_resume, context_stats = resume_context.for_prompt(resume_content, jd_analysis_json, job_description)
+            if context_stats:
+                attrs.update(context_stats)
         prompt3 = PROMPT_EVAL.format(
             job_description_json=json.dumps(jd_analysis_json, indent=2),
             resume_json=json.dumps(resume_analysis_json, indent=2),
-            original_resume=resume_content
+            original_resume=original_resume
         )
-        final_evaluation = call_gemini_api(prompt3)
+        final_evaluation = call_gemini_api(prompt3, "evaluation")
         
         # The final report is printed to standard output, which Java will capture
         print(final_evaluation)
@@ -0,0 +1,167 @@
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from ats_scoring import JobProfile, JobSet
+import evaluate  # Also puts scripts/shared on the path
+import profiling
+import jd_prefetch
+import jd_preprocess
+
+# Ranks one resume against many job descriptions. Running evaluate.py once per saved posting costs three
+# sequential model calls each and re-reads the resume every time; here the resume is tokenized once, each
+# distinct JD is analysed once (reusing stored model analyses), and all postings are scored together by
+# ats_scoring.JobSet. The narrative report is left to evaluate.py for the postings the user actually opens:
+# every ranked posting carries its jd_handle, which the evaluate request passes so its JD analysis step is
+# answered from the store instead of the model.
+#
+# stdin: the resume, "\n---DELIMITER---\n", then the job descriptions separated by "\n---JOB---\n".
+
+# --- CONFIGURATION ---
+JOB_SEPARATOR = "\n---JOB---\n"
+MAX_JOBS = 100
+# Concurrent JD analyses in "model" mode; the admission controller still bounds the calls in flight
+ANALYSIS_WORKERS = 4
+# Model calls one evaluate.py run makes per posting (JD analysis, resume analysis, evaluation)
+CALLS_PER_EVALUATION = 3
+TITLE_CHARS = 80
+
+# --- ANALYSIS ---
+
+def read_input_from_stdin():
+    full_input = sys.stdin.read()
+    parts = full_input.split("\n---DELIMITER---\n", 1)
+    if len(parts) != 2:
+        print("Error: Invalid input format. Expected the resume, a delimiter and the job descriptions.", file=sys.stderr)
+        sys.exit(1)
+    jobs = [job.strip() for job in parts[1].split(JOB_SEPARATOR)]
+    return parts[0], [job for job in jobs if job]
+
+def posting_title(job_description):
+    first_line = next((line.strip(" \t-*#:") for line in job_description.splitlines() if line.strip()), "")
+    return first_line[:TITLE_CHARS]
+
+def parse_analysis(analysis_str):
+    try:
+        analysis = json.loads(evaluate.clean_json_string(analysis_str))
+    except ValueError:
+        return None
+    return analysis if isinstance(analysis, dict) else None
+
+def analyze_jobs(job_descriptions, mode):
+    """One JobProfile per distinct JD, keyed by jd_handle, plus where its skill lists came from.
+
+    cached: a stored model analysis when one is fresh, otherwise the local heading-based keyword extraction.
+    model:  missing analyses are computed by the model (and stored for the later reports).
+    local:  the local extraction only."""
+    distinct = {}
+    for job_description in job_descriptions:
+        distinct.setdefault(jd_prefetch.jd_handle(job_description), job_description)
+
+    analyses = {}
+    if mode != "local":
+        for handle, job_description in distinct.items():
+            analyses[handle] = ("cached", jd_prefetch.cached("evaluate", job_description, evaluate.PROMPT_JD))
+    if mode == "model":
+        missing = [h for h, (_, analysis) in analyses.items() if analysis is None]
+
+        def compute(handle):
+            job_description = distinct[handle]
+            prompt = evaluate.PROMPT_JD.format(job_description=jd_preprocess.for_prompt(job_description))
+            return jd_prefetch.resolve("evaluate", job_description, evaluate.PROMPT_JD,
+                                       lambda: evaluate.call_gemini_api(prompt, "jd_analysis"))
+
+        with profiling.span("jd_analysis_model", jobs=len(missing)), \
+                ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS) as pool:
+            for handle, analysis in zip(missing, pool.map(compute, missing)):
+                analyses[handle] = ("model", analysis)
+
+    profiles, sources = {}, {}
+    for handle, job_description in distinct.items():
+        source, analysis_str = analyses.get(handle, ("local", None))
+        analysis = parse_analysis(analysis_str) if analysis_str is not None else None
+        if analysis is None:
+            source = "local"
+            profiles[handle] = JobProfile(job_description)
+        else:
+            profiles[handle] = JobProfile(job_description, analysis.get("required_skills", []),
+                                          analysis.get("preferred_skills", []))
+        sources[handle] = source
+    return profiles, sources
+
+def rank_jobs(resume_content, job_descriptions, mode="cached", prefetch_top=0):
+    started = time.perf_counter()
+    handles = [jd_prefetch.jd_handle(jd) for jd in job_descriptions]
+    with profiling.span("analyze_jobs", mode=mode):
+        profiles, sources = analyze_jobs(job_descriptions, mode)
+    order = list(profiles)
+    with profiling.span("score", jobs=len(order)):
+        results = dict(zip(order, JobSet(profiles[h] for h in order).score(resume_content)))
+
+    ranking = []
+    for index, (handle, job_description) in enumerate(zip(handles, job_descriptions)):
+        result = dict(results[handle], index=index, jd_handle=handle, title=posting_title(job_description),
+                      analysis=sources[handle])
+        del result["elapsed_ms"]
+        ranking.append(result)
+    ranking.sort(key=lambda r: (-r["raw_score"], r["index"]))
+    for position, result in enumerate(ranking, 1):
+        result["rank"] = position
+
+    # Reports are generated only for postings the user opens; warming the JD analysis of the likeliest ones
+    # in the background makes opening them faster without generating any report
+    prefetched = 0
+    if prefetch_top and mode != "model":
+        with profiling.span("prefetch_top", jobs=prefetch_top):
+            for result in ranking[:prefetch_top]:
+                if result["analysis"] == "local":
+                    jd_prefetch.prefetch(job_descriptions[result["index"]], ["evaluate"])
+                    prefetched += 1
+
+    counts = {source: list(sources.values()).count(source) for source in ("cached", "model", "local")}
+    return {
+        "ranking": ranking,
+        "stats": {
+            "jobs": len(job_descriptions),
+            "distinct_jobs": len(profiles),
+            "analyses": counts,
+            "model_calls": counts["model"],
+            "sequential_evaluation_calls": CALLS_PER_EVALUATION * len(job_descriptions),
+            "prefetched_analyses": prefetched,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000.0, 1),
+        },
+    }
+
+# --- MAIN FUNCTION ---
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ranks one resume against many job descriptions read from stdin.")
+    parser.add_argument("--analysis", choices=["cached", "model", "local"], default="cached",
+                        help="Where each JD's skill lists come from (see analyze_jobs)")
+    parser.add_argument("--prefetch-top", type=int, default=0,
+                        help="Start background JD analyses for this many top-ranked postings without a stored one")
+    return parser.parse_args()
+
+@profiling.profiled_main("rank_jobs")
+def main():
+    args = parse_args()
+    resume_content, job_descriptions = read_input_from_stdin()
+    if not job_descriptions:
+        print("Error: No job descriptions provided.", file=sys.stderr)
+        sys.exit(1)
+    if len(job_descriptions) > MAX_JOBS:
+        print(f"Error: At most {MAX_JOBS} job descriptions can be ranked at once.", file=sys.stderr)
+        sys.exit(1)
+    if args.analysis == "model" and not evaluate.model_client.is_configured():
+        print("Error: GOOGLE_API_KEY environment variable was not received from Java service.", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        print(json.dumps(rank_jobs(resume_content, job_descriptions, args.analysis, args.prefetch_top)))
+    except Exception as e:
+        print(f"A critical error occurred while ranking the job descriptions: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+# Compares the cover letter modes of coverletter.py: model calls and end-to-end latency per letter for the
+# four-step model chain against local extraction and assembly, plus the local extraction's field accuracy.
+#
+# Corpus format (JSONL), one pair per line:
+#   {"resume": "...", "job_description": "...", "expected": {"candidate_name": "...", "job_title": "...", ...}}
+# "expected" is optional; a field expected as null must be left to the model fallback (a local guess counts
+# as wrong). Without --corpus a small built-in set is used. The model is the local stand-in
+# unless MODEL_BACKEND is set (a real backend makes the latency numbers meaningful, and costs quota).
+#
+#   STANDIN_LATENCY_MS=400 python benchmark_coverletter.py --repeat 3
+
+os.environ.setdefault("MODEL_BACKEND", "standin")
+os.environ.setdefault("GOOGLE_API_KEY", "standin")
+import coverletter
+from letter_assembly import extract_fields, REQUIRED_FIELDS
+
+SAMPLES = [
+    {"resume": "JOHN A. SMITH\nAustin, TX | (512) 555-0142 | john.smith@gmail.com | linkedin.com/in/johnsmith\n"
+               "EXPERIENCE\nSoftware Engineer, Acme (2019 - 2023)\n- Built Python services handling 2M requests/day.",
+     "job_description": "Senior Backend Engineer at Stripe\nAbout Stripe:\nStripe builds payments infrastructure.\n"
+                        "Requirements:\n- 5+ years of Python\n- Distributed systems",
+     "expected": {"candidate_name": "John A. Smith", "candidate_email": "john.smith@gmail.com",
+                  "candidate_phone": "(512) 555-0142", "job_title": "Senior Backend Engineer", "company_name": "Stripe"}},
+    {"resume": "Priya Sharma\npriya.sharma@outlook.com   +91 98765 43210\nhttps://www.linkedin.com/in/priya-sharma-123/\n"
+               "Bengaluru, Karnataka\nSUMMARY\nData scientist with 4 years of NLP experience.",
+     "job_description": "Job Title: Data Scientist II\nCompany: Flipkart\nWe are looking for a data scientist to "
+                        "build ranking models.",
+     "expected": {"candidate_name": "Priya Sharma", "candidate_email": "priya.sharma@outlook.com",
+                  "candidate_phone": "+91 98765 43210", "job_title": "Data Scientist II", "company_name": "Flipkart"}},
+    {"resume": "Alex Doe\nalex@example.com\nSkills: Python, PyTorch\nProjects\n- Built a lane detection model.",
+     "job_description": "We're hiring a Machine Learning Engineer to join Acme Robotics, where you'll build "
+                        "perception models.\nResponsibilities:\n- Train and ship models",
+     "expected": {"candidate_name": "Alex Doe", "candidate_email": "alex@example.com",
+                  "job_title": "Machine Learning Engineer", "company_name": "Acme Robotics"}},
+    {"resume": "Maria Garcia-Lopez | maria@garcia.io | 555.123.4567\nPRODUCT DESIGN\n- Led the redesign of a "
+               "checkout flow, lifting conversion 12%.",
+     "job_description": "Product Designer - Figma\nYou will design collaborative tools used by millions.",
+     "expected": {"candidate_name": "Maria Garcia-Lopez", "candidate_email": "maria@garcia.io",
+                  "candidate_phone": "555.123.4567", "job_title": "Product Designer", "company_name": "Figma"}},
+    # Not companies: what follows the dash is a location and pay, or a team when the JD names the employer
+    {"resume": "Sam Lee\nsam.lee@example.com",
+     "job_description": "Full Stack Developer (React/Node) - Remote - 120k\nBuild our customer web apps.",
+     "expected": {"job_title": "Full Stack Developer (React/Node)", "company_name": None}},
+    {"resume": "Sam Lee\nsam.lee@example.com",
+     "job_description": "Software Engineer II - Payments\nMicrosoft is hiring a software engineer for Azure "
+                        "commerce.\nRequirements:\n- C# and distributed systems",
+     "expected": {"job_title": "Software Engineer II", "company_name": "Microsoft"}},
+    {"resume": "Experienced engineer.\nWorked on many things over the years.",
+     "job_description": "Help us grow. Great benefits.",
+     "expected": {}},
+]
+
+def load_corpus(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def field_accuracy(pairs):
+    """Share of expected fields the local extraction got exactly right, missed, or got wrong."""
+    right = missed = wrong = 0
+    fallback = 0
+    for pair in pairs:
+        found, missing = extract_fields(pair["resume"], pair["job_description"])
+        fallback += bool(missing)
+        for name, expected in (pair.get("expected") or {}).items():
+            if expected is None:
+                right += name not in found
+                wrong += name in found
+            elif name not in found:
+                missed += 1
+            elif found[name][0] == expected:
+                right += 1
+            else:
+                wrong += 1
+    total = right + missed + wrong
+    return {"expected_fields": total, "correct": round(right / total, 3) if total else None,
+            "missed": missed, "wrong": wrong, "letters_needing_fallback": fallback}
+
+def run_mode(pairs, mode, repeat):
+    latencies, calls = [], []
+    for _ in range(repeat):
+        for pair in pairs:
+            started = time.perf_counter()
+            if mode == "model":
+                _, report = coverletter.write_letter_model(pair["resume"], pair["job_description"])
+            else:
+                _, report = coverletter.write_letter_local(pair["resume"], pair["job_description"])
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            calls.append(report["model_calls"])
+    return {"letters": len(latencies), "model_calls_per_letter": round(float(np.mean(calls)), 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1), "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "mean_ms": round(float(np.mean(latencies)), 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compares the local and model cover letter modes.")
+    parser.add_argument("--corpus", help="JSONL file of resume/job_description pairs (default: built-in samples)")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    pairs = load_corpus(args.corpus) if args.corpus else SAMPLES
+    model = run_mode(pairs, "model", args.repeat)
+    local = run_mode(pairs, "local", args.repeat)
+    print(json.dumps({
+        "backend": os.environ["MODEL_BACKEND"],
+        "required_fields": list(REQUIRED_FIELDS),
+        "extraction": field_accuracy(pairs),
+        "model": model,
+        "local": local,
+        "model_calls_saved": round(1.0 - local["model_calls_per_letter"] / model["model_calls_per_letter"], 3),
+        "mean_latency_saved": round(1.0 - local["mean_ms"] / model["mean_ms"], 3),
+    }, indent=2))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,23 @@ import sys
 import os
 import json
 import re
-import google.generativeai as genai
-import contextlib
+
+# Shared helpers (model client, admission control) live in scripts/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "shared"))
+import model_client
+import profiling
+import jd_preprocess
+from letter_assembly import extract_fields, clean_body, assemble_letter
+
+# "local": contact details, job title and company are extracted locally (the model is asked only for fields the
+# heuristics miss) and the letter is assembled around model-written body paragraphs, one or two calls in all;
+# "model": the original four-step chain (analysis, outline, draft, review)
+COVERLETTER_MODE = os.getenv("COVERLETTER_MODE", "local")
+# Model calls the four-step chain makes, for the call savings reported by the local mode
+BASELINE_CALLS = 4
 
 # --- CONFIGURATION ---
-API_KEY = os.getenv("GOOGLE_API_KEY")
+# Per-step models come from scripts/shared/model_routing.json; this is only used for steps without a route
 MODEL_NAME = "gemini-2.5-flash-lite"
 
 # --- EMBEDDED PROMPTS ---
@@ -136,26 +148,51 @@ Output Format:
 Provide the final, perfected, and complete plain text of the cover letter. Your output should contain nothing else.
 """
 
+# Local mode: asks only for the letter fields the local extraction could not find
+PROMPT_FIELDS = """
+You are an expert data extractor. Extract the following fields from the resume and job description.
+Fields: {field_list}
+
+Resume Content:
+{resume_content}
+
+Job Description:
+{job_description}
+
+Output Format:
+Return ONLY a single, flat JSON object with exactly the keys listed above (candidate_* fields come from the resume,
+job_title and company_name from the job description).
+If a piece of information is not found, return an empty string "" for its value.
+"""
+
+# Local mode: the model writes the body paragraphs only; everything around them is assembled locally
+PROMPT_BODY = """
+You are an expert human copywriter with 20 years of experience writing professional correspondence.
+Your writing is clear, confident, and feels completely natural. You NEVER use robotic or overly complex language.
+Your task is to write the body of {candidate_name}'s cover letter for the {job_title} position at {company_name}.
+
+Original Resume Content:
+{resume_content}
+
+Original Job Description:
+{job_description}
+
+CRITICAL WRITING RULES:
+
+Write ONLY the body paragraphs: an opening paragraph, two or three paragraphs connecting the candidate's most compelling experience to the job's key requirements, and a short closing paragraph.
+DO NOT write a header, contact details, date, subject line, greeting or sign-off; they are added separately.
+DO NOT use placeholders like [Company Name]; use the names given above.
+The tone should be professional, confident, and match the company's tone as shown in the job description. Avoid clichés and AI-sounding phrases.
+Vary sentence structure to make the letter engaging to read.
+Output Format:
+Return ONLY the plain text paragraphs, separated by a blank line. DO NOT use any markdown formatting like ** or ##.
+"""
+
 # --- HELPER FUNCTIONS ---
 
-@contextlib.contextmanager
-def suppress_stderr():
-    """A context manager to temporarily suppress SDK warnings."""
-    original_stderr = sys.stderr
-    sys.stderr = open(os.devnull, 'w', encoding='utf-8')
-    try:
-        yield
-    finally:
-        sys.stderr.close()
-        sys.stderr = original_stderr
-
-def call_gemini(prompt):
-    """Calls the Gemini API and returns the text response."""
-    with suppress_stderr():
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel(model_name=MODEL_NAME)
-        response = model.generate_content(prompt)
-    return response.text
+def call_gemini(prompt, step=None):
+    """Calls the Gemini API (through the shared admission controller) and returns the text response."""
+    return model_client.generate(prompt, MODEL_NAME, "coverletter", step)
 
 def clean_json(json_string):
     """Extracts the first valid JSON object or array from a string."""
@@ -179,34 +216,85 @@ def read_input_from_stdin():
         print(f"Error reading stdin: {e}", file=sys.stderr)
         sys.exit(1)
 
+def write_letter_model(resume_content, job_description):
+    """The original chain: the model extracts, outlines, drafts and reviews the whole letter."""
+    job_description = jd_preprocess.for_prompt(job_description)
+    # Step 1: Analysis
+    prompt1 = PROMPT_1.format(job_description=job_description, resume_content=resume_content)
+    analysis_str = call_gemini(prompt1, "analysis")
+    analysis_json = json.loads(clean_json(analysis_str))
+
+    # Step 2: Outlining
+    prompt2 = PROMPT_2.format(analysis_json=json.dumps(analysis_json, indent=2))
+    outline_str = call_gemini(prompt2, "outline")
+    outline_json = json.loads(clean_json(outline_str))
+
+    # Step 3: Drafting
+    prompt3 = PROMPT_3.format(outline_json=json.dumps(outline_json, indent=2), resume_content=resume_content, job_description=job_description)
+    cover_letter_draft = call_gemini(prompt3, "draft")
+
+    # Step 4: Reviewing
+    prompt4 = PROMPT_4.format(cover_letter_draft=cover_letter_draft, analysis_json=json.dumps(analysis_json, indent=2))
+    return call_gemini(prompt4, "review"), {"mode": "model", "model_calls": BASELINE_CALLS}
+
+def write_letter_local(resume_content, job_description, call=call_gemini):
+    """Local fields and assembly around a model-written body; the model is asked for fields only on a miss."""
+    with profiling.span("extract_fields"):
+        found, missing = extract_fields(resume_content, job_description)
+    # Fields are read from the posting as pasted; the prompts get it without its boilerplate
+    job_description = jd_preprocess.for_prompt(job_description)
+    fields = {name: value for name, (value, _) in found.items()}
+    sources = {name: source for name, (_, source) in found.items()}
+    calls = 0
+
+    if missing:
+        prompt = PROMPT_FIELDS.format(field_list=", ".join(missing), resume_content=resume_content,
+                                      job_description=job_description)
+        calls += 1
+        try:
+            extracted = json.loads(clean_json(call(prompt, "fields")))
+        except ValueError:
+            extracted = {}
+        for name in missing:
+            value = extracted.get(name) if isinstance(extracted, dict) else None
+            if isinstance(value, str) and value.strip():
+                fields[name], sources[name] = value.strip(), "model"
+
+    prompt = PROMPT_BODY.format(candidate_name=fields.get("candidate_name") or "the candidate",
+                                job_title=fields.get("job_title") or "advertised",
+                                company_name=fields.get("company_name") or "the company",
+                                resume_content=resume_content, job_description=job_description)
+    calls += 1
+    body_str = call(prompt, "body")
+    with profiling.span("assemble_letter"):
+        body, unresolved = clean_body(body_str, fields)
+        letter = assemble_letter(fields, body)
+    report = {"mode": "local", "model_calls": calls, "baseline_calls": BASELINE_CALLS,
+              "calls_saved": BASELINE_CALLS - calls, "fields": sources,
+              "fallback_fields": missing, "missing_fields": [f for f in missing if f not in fields]}
+    if unresolved:
+        report["unresolved_placeholders"] = unresolved
+    return letter, report
+
 # --- MAIN EXECUTION ---
 
+@profiling.profiled_main("coverletter")
 def main():
-    if not API_KEY:
+    if not model_client.is_configured():
         print("Error: GOOGLE_API_KEY environment variable not found.", file=sys.stderr)
         sys.exit(1)
 
     try:
         resume_content, job_description = read_input_from_stdin()
 
-        # Step 1: Analysis
-        prompt1 = PROMPT_1.format(job_description=job_description, resume_content=resume_content)
-        analysis_str = call_gemini(prompt1)
-        analysis_json = json.loads(clean_json(analysis_str))
-        
-        # Step 2: Outlining
-        prompt2 = PROMPT_2.format(analysis_json=json.dumps(analysis_json, indent=2))
-        outline_str = call_gemini(prompt2)
-        outline_json = json.loads(clean_json(outline_str))
-
-        # Step 3: Drafting
-        prompt3 = PROMPT_3.format(outline_json=json.dumps(outline_json, indent=2), resume_content=resume_content, job_description=job_description)
-        cover_letter_draft = call_gemini(prompt3)
-
-        # Step 4: Reviewing
-        prompt4 = PROMPT_4.format(cover_letter_draft=cover_letter_draft, analysis_json=json.dumps(analysis_json, indent=2))
-        final_cover_letter = call_gemini(prompt4)
-        
+        # The report (mode, model calls, field sources) goes on the profile; stderr is kept for errors
+        with profiling.span("write_letter") as attrs:
+            if COVERLETTER_MODE == "model":
+                final_cover_letter, report = write_letter_model(resume_content, job_description)
+            else:
+                final_cover_letter, report = write_letter_local(resume_content, job_description)
+            attrs.update(report)
+
         # Send the final result to stdout for the Java application to capture
         print(final_cover_letter)
 
@@ -0,0 +1,224 @@
+import re
+import datetime
+
+# Local extraction of the cover letter's mechanical parts and assembly of the finished letter. The candidate's
+# contact details come from the resume header and the job title and company from the JD, by regex and layout
+# heuristics; only fields these cannot find with confidence are asked of the model (coverletter.py). The
+# header, date, subject line, greeting and sign-off are then written here around the body paragraphs, the one
+# part the model still writes, so no placeholder or misformatted subject line can reach the output.
+
+# --- CONFIGURATION ---
+
+# Fields the letter cannot be assembled well without; a miss on any of them triggers the model fallback
+REQUIRED_FIELDS = ("candidate_name", "candidate_email", "job_title", "company_name")
+HEADER_LINES = 6  # Contact details are looked for in the first lines of the resume only
+DATE_FORMAT = "%B %d, %Y"
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w/])\+?\(?\d[\d\s().-]{7,18}\d(?![\w/])")
+LINKEDIN_RE = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9_%-]+/?", re.I)
+GITHUB_RE = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9-]+/?", re.I)
+URL_RE = re.compile(r"(?:https?://|www\.)[^\s|,;]+|\b[a-z0-9-]+\.(?:dev|io|me|site|com|net|org)(?:/[^\s|,;]*)?\b", re.I)
+ADDRESS_RE = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*[A-Z][A-Za-z .'-]+(?:,\s*[A-Z][A-Za-z .'-]+)?(?:\s+\d{5,6})?$")
+NAME_WORD_RE = re.compile(r"^[A-Z][A-Za-z'’-]*\.?$")
+SEPARATORS_RE = re.compile(r"\s*[|•·◦▪♦]\s*|\s{3,}|\t")
+NOT_A_NAME = {"resume", "curriculum", "vitae", "cv", "profile", "summary", "contact", "objective"}
+
+ROLE_WORDS = re.compile(r"\b(engineer|developer|manager|analyst|designer|scientist|architect|intern|specialist|"
+                        r"consultant|lead|administrator|coordinator|director|officer|technician|associate|"
+                        r"programmer|researcher|representative|accountant|writer|strategist|owner|sre|devops)s?\b", re.I)
+LABELED_TITLE_RE = re.compile(r"^\s*(?:job\s*title|position(?:\s*title)?|role|title)\s*[:\-–—]\s*(.+?)\s*$", re.I | re.M)
+LABELED_COMPANY_RE = re.compile(r"^\s*(?:company(?:\s*name)?|organi[sz]ation|employer|hiring\s*company)\s*[:\-–—]\s*(.+?)\s*$",
+                                re.I | re.M)
+TITLE_AT_COMPANY_RE = re.compile(r"^(.+?)\s+(at|@|[-–—|])\s+(.+)$")
+# What follows a title after a dash is often a place, a schedule, pay or a team rather than the employer
+NOT_A_COMPANY_RE = re.compile(r"\d|[$€£]|\b(?:remote|hybrid|on-?site|in[- ]office|full[- ]time|part[- ]time|contract|"
+                              r"permanent|temporary|freelance|internship|salary|per\s+(?:hour|year|annum)|usd|eur|gbp|"
+                              r"team|department|division|squad|relocation|visa|urgent|immediate)\b", re.I)
+CAPITALIZED = r"[A-Z][\w&.'+-]*(?:\s+(?:&\s+)?[A-Z][\w&.'+-]*){0,3}"
+SEEKING_RE = re.compile(r"\b(?:hiring|seeking|looking\s+for)\s+(?:an?\s+)?(?:(?:talented|experienced|motivated|skilled|"
+                        r"passionate)\s+)*(" + r"[A-Z][\w+#./-]*(?:\s+[A-Z][\w+#./-]*){0,5})")
+COMPANY_PATTERNS = [
+    re.compile(r"\bAbout\s+(" + CAPITALIZED + r")\s*[:\n]"),
+    re.compile(r"\b(?:[Jj]oin|[Aa]t)\s+(" + CAPITALIZED + r")(?=[,.!\s])"),
+    re.compile(r"(?:^|[.!]\s+)(" + CAPITALIZED + r")\s+is\s+(?:hiring|looking|seeking|an?\s|the\s)", re.M),
+]
+NOT_A_COMPANY = {"us", "the", "the role", "the team", "you", "we", "our", "this", "this role", "a", "an", "our team",
+                 "the company", "company", "scale", "least"}
+
+PLACEHOLDER_RE = re.compile(r"\[([^\]\n]{2,40})\]")
+GREETING_RE = re.compile(r"^\s*(dear\b.*|to whom it may concern.*|hello\b.*|hi\b.*)$", re.I)
+SIGN_OFF_RE = re.compile(r"^\s*(sincerely|best regards|kind regards|warm regards|regards|respectfully|yours truly|"
+                         r"yours sincerely|best|thank you)\s*,?\s*$", re.I)
+HEADER_LINE_RE = re.compile(r"^\s*(subject\s*:|re\s*:)", re.I)
+
+# --- HELPERS ---
+
+def _clean(value):
+    return re.sub(r"\s+", " ", value or "").strip(" \t-–—|,;:")
+
+def _digits(text):
+    return sum(c.isdigit() for c in text)
+
+def _looks_like_name(line):
+    words = line.split()
+    if not 2 <= len(words) <= 4 or any(w.lower().strip(".") in NOT_A_NAME for w in words):
+        return False
+    # All-caps headers ("JANE DOE") count as names too
+    return all(NAME_WORD_RE.match(w.capitalize() if w.isupper() else w) for w in words) and not ROLE_WORDS.search(line)
+
+def _header_parts(resume_content):
+    """The first lines of the resume, each split into its separator-delimited parts."""
+    lines = [line.strip() for line in resume_content.splitlines() if line.strip()][:HEADER_LINES]
+    return lines, [part for line in lines for part in SEPARATORS_RE.split(line) if part.strip()]
+
+# --- EXTRACTION ---
+
+def extract_contact(resume_content):
+    """Contact fields from the resume header: {field: (value, source)} for the fields found."""
+    fields = {}
+    lines, parts = _header_parts(resume_content)
+    header = "\n".join(lines)
+
+    email = EMAIL_RE.search(header) or EMAIL_RE.search(resume_content)
+    if email:
+        fields["candidate_email"] = (email.group(0), "regex")
+    for match in PHONE_RE.finditer(header):
+        if 10 <= _digits(match.group(0)) <= 15:
+            fields["candidate_phone"] = (_clean(match.group(0)), "regex")
+            break
+    for field, pattern in (("candidate_linkedin", LINKEDIN_RE), ("candidate_github", GITHUB_RE)):
+        match = pattern.search(resume_content)
+        if match:
+            fields[field] = (match.group(0).rstrip("/"), "regex")
+    for match in URL_RE.finditer(EMAIL_RE.sub(" ", header)):
+        url = match.group(0).rstrip("/.")
+        if not (LINKEDIN_RE.search(url) or GITHUB_RE.search(url)):
+            fields["candidate_portfolio"] = (url, "regex")
+            break
+
+    # The name is the first header part that reads as a name once contact details are taken out of it
+    for part in parts:
+        candidate = _clean(URL_RE.sub("", EMAIL_RE.sub("", PHONE_RE.sub("", part))))
+        if _looks_like_name(candidate):
+            fields["candidate_name"] = (candidate.title() if candidate.isupper() else candidate, "header")
+            break
+    for part in parts:
+        candidate = _clean(part)
+        if ADDRESS_RE.match(candidate) and candidate != fields.get("candidate_name", ("",))[0]:
+            fields["candidate_address"] = (candidate, "header")
+            break
+    return fields
+
+def _company_candidate(value):
+    value = _clean(re.sub(r"\s*\(.*?\)", "", value))
+    return value if value and value.lower() not in NOT_A_COMPANY and len(value) <= 60 else None
+
+def _pattern_company(job_description):
+    for pattern in COMPANY_PATTERNS:
+        for match in pattern.finditer(job_description):
+            company = _company_candidate(match.group(1))
+            if company and not ROLE_WORDS.search(company):
+                return company
+    return None
+
+def extract_job(job_description):
+    """Job title and company from the JD: {field: (value, source)} for the fields found."""
+    fields = {}
+    title = LABELED_TITLE_RE.search(job_description)
+    if title and len(title.group(1).split()) <= 10:
+        fields["job_title"] = (_clean(title.group(1)), "labeled")
+    company = LABELED_COMPANY_RE.search(job_description)
+    if company and _company_candidate(company.group(1)):
+        fields["company_name"] = (_company_candidate(company.group(1)), "labeled")
+
+    # A posting usually opens with its title, often as "Title at Company" or "Title - Company"
+    header_company = None
+    if "job_title" not in fields:
+        for line in [line.strip(" \t#*:") for line in job_description.splitlines() if line.strip()][:3]:
+            if len(line.split()) > 12 or line.endswith(".") or not ROLE_WORDS.search(line):
+                continue
+            split = TITLE_AT_COMPANY_RE.match(line)
+            if split and ROLE_WORDS.search(split.group(1)) and not ROLE_WORDS.search(split.group(3)):
+                fields["job_title"] = (_clean(split.group(1)), "header")
+                company = _company_candidate(split.group(3))
+                if company and not NOT_A_COMPANY_RE.search(company):
+                    # "at Company" names the employer; what follows a dash only counts if the JD names it again
+                    # ("Software Engineer II - Payments" is a team)
+                    rest = job_description.replace(line, "", 1)
+                    if split.group(2) in ("at", "@") or re.search(r"\b" + re.escape(company) + r"\b", rest):
+                        header_company = company
+            else:
+                fields["job_title"] = (_clean(line), "header")
+            break
+    if "job_title" not in fields:
+        for match in SEEKING_RE.finditer(job_description):
+            words = match.group(1).split()
+            # Keep the capitalized phrase up to and including its last role word
+            ends = [i for i, w in enumerate(words) if ROLE_WORDS.fullmatch(w.strip(".,"))]
+            if ends:
+                fields["job_title"] = (" ".join(words[:ends[-1] + 1]), "pattern")
+                break
+    # An unconfirmed header split stays missing, so the model fallback is asked for the company
+    if "company_name" not in fields:
+        company = _pattern_company(job_description)
+        if company:
+            fields["company_name"] = (company, "pattern")
+        elif header_company:
+            fields["company_name"] = (header_company, "header")
+    return fields
+
+def extract_fields(resume_content, job_description):
+    """All letter fields found locally, and the required ones that were not."""
+    fields = dict(extract_contact(resume_content), **extract_job(job_description))
+    return fields, [f for f in REQUIRED_FIELDS if f not in fields]
+
+# --- ASSEMBLY ---
+
+def clean_body(body, fields):
+    """Keeps only the body paragraphs of the model's text: drops any greeting, subject line, sign-off and
+    markdown it wrote anyway, and fills placeholders for fields that are known. Returns (body, unresolved)."""
+    lines = [line.rstrip() for line in body.replace("\r\n", "\n").split("\n")]
+    for index, line in enumerate(lines):
+        if SIGN_OFF_RE.match(line):
+            lines = lines[:index]
+            break
+    lines = [line for line in lines if not (GREETING_RE.match(line) or HEADER_LINE_RE.match(line))]
+    text = re.sub(r"\*\*|__|^#+\s*", "", "\n".join(lines), flags=re.M)
+
+    known = {"company": fields.get("company_name"), "company name": fields.get("company_name"),
+             "job title": fields.get("job_title"), "position": fields.get("job_title"), "role": fields.get("job_title"),
+             "your name": fields.get("candidate_name"), "candidate name": fields.get("candidate_name"),
+             "name": fields.get("candidate_name"), "hiring manager": "Hiring Manager"}
+    unresolved = []
+
+    def fill(match):
+        value = known.get(match.group(1).strip().lower())
+        if value:
+            return value
+        unresolved.append(match.group(0))
+        return match.group(0)
+
+    text = PLACEHOLDER_RE.sub(fill, text)
+    paragraphs = [re.sub(r"\s*\n\s*", " ", p).strip() for p in re.split(r"\n\s*\n", text)]
+    return "\n\n".join(p for p in paragraphs if p), unresolved
+
+def assemble_letter(fields, body, today=None):
+    """The finished plain-text letter: header, date, recipient, subject line, body and sign-off."""
+    name = fields.get("candidate_name") or ""
+    today = today or datetime.date.today()
+    contact = [fields.get(f) for f in ("candidate_phone", "candidate_email")]
+    links = [fields.get(f) for f in ("candidate_linkedin", "candidate_github", "candidate_portfolio")]
+    header = [name, fields.get("candidate_address"), " | ".join(v for v in contact if v), " | ".join(v for v in links if v)]
+    recipient = ["Hiring Manager", fields.get("company_name")]
+    subject = f"Subject: Application for {fields.get('job_title') or 'the advertised position'}" + (f" - {name}" if name else "")
+    blocks = [
+        "\n".join(line for line in header if line),
+        today.strftime(DATE_FORMAT),
+        "\n".join(line for line in recipient if line),
+        subject,
+        "Dear Hiring Manager,",
+        body,
+        "Sincerely,\n" + name if name else "Sincerely,",
+    ]
+    return "\n\n".join(block for block in blocks if block)
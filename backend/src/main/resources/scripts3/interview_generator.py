@@ -2,12 +2,24 @@ import sys
 import os
 import json
 import re
-import google.generativeai as genai
-import contextlib
+
+# Shared helpers (skill taxonomy, model client) live in scripts/shared
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "shared"))
+from skill_taxonomy import default_index
+from question_bank import QuestionBank, CATEGORY_COUNTS
+import model_client
+import profiling
+import jd_preprocess
 
 # --- CONFIGURATION ---
-API_KEY = os.getenv("GOOGLE_API_KEY")
-MODEL_NAME = "gemini-2.5-flash-lite" 
+# Per-step models come from scripts/shared/model_routing.json; this is only used for steps without a route
+MODEL_NAME = "gemini-2.5-flash-lite"
+
+# "local": Step 1 is answered by the skill taxonomy (falling back to the model when it finds too little); "model": always call the model
+SKILL_EXTRACTION_MODE = os.getenv("SKILL_EXTRACTION_MODE", "local")
+TOP_TECHNICAL_SKILLS = 3
+TOP_BEHAVIORAL_TRAITS = 2
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "1") == "1"
 
 # --- EMBEDDED PROMPTS ---
 
@@ -39,7 +51,8 @@ Return the output as a RAW JSON list of objects with this exact structure:
 [
   {{
     "question": "The interview question here...",
-    "answer": "The ideal answer or key points to cover..."
+    "answer": "The ideal answer or key points to cover...",
+    "category": "introduction" | "technical" | "behavioral"
   }},
   ...
 ]
@@ -47,23 +60,38 @@ Return the output as a RAW JSON list of objects with this exact structure:
 Do not include markdown formatting (like ```json). Just the raw JSON.
 """
 
-# --- HELPER FUNCTIONS ---
+# Step 2 (top-up): Generate only the categories the question bank could not supply
+PROMPT_STEP_2_TOPUP = """
+Based on this job description analysis:
+{analysis_json}
 
-@contextlib.contextmanager
-def suppress_stderr():
-    original_stderr = sys.stderr
-    sys.stderr = open(os.devnull, 'w', encoding='utf-8')
-    try:
-        yield
-    finally:
-        sys.stderr.close()
-        sys.stderr = original_stderr
+Act as an expert Technical Recruiter and Hiring Manager. Generate interview questions tailored specifically to this role, ONLY for these categories:
+{category_list}
+
+Category definitions:
+- "introduction": standard opening but tailored to the JD.
+- "technical": deep dive into specific tools/languages mentioned in the JD.
+- "behavioral": using the STAR method, focusing on challenges likely to happen in this specific job.
 
-def call_gemini(prompt):
-    with suppress_stderr():
-        genai.configure(api_key=API_KEY)
-        model = genai.GenerativeModel(MODEL_NAME)
-        return model.generate_content(prompt).text
+For EACH question, provide a "Model Answer" or "Key Talking Points" that a candidate should mention to impress the interviewer.
+
+Return the output as a RAW JSON list of objects with this exact structure:
+[
+  {{
+    "question": "The interview question here...",
+    "answer": "The ideal answer or key points to cover...",
+    "category": "<one of the categories above>"
+  }},
+  ...
+]
+
+Do not include markdown formatting (like ```json). Just the raw JSON.
+"""
+
+# --- HELPER FUNCTIONS ---
+
+def call_gemini(prompt, step=None):
+    return model_client.generate(prompt, MODEL_NAME, "interview", step)
 
 def clean_json(text):
     # Removes markdown code blocks if present
@@ -75,6 +103,35 @@ def clean_json(text):
     match = re.search(r'\{[\s\S]*\}|\[[\s\S]*\]', text)
     return match.group(0) if match else "[]"
 
+def question_list(reply):
+    """The questions in a parsed model reply: the list itself, or the list inside an object such as
+    {"questions": [...]}; items that are not question objects are dropped."""
+    if isinstance(reply, dict):
+        reply = reply.get("questions", next((v for v in reply.values() if isinstance(v, list)), []))
+    if not isinstance(reply, list):
+        return []
+    return [q for q in reply if isinstance(q, dict)]
+
+def analyze_locally(job_description):
+    """Finds the top technical skills and behavioral traits with the skill taxonomy, or None if it finds too few."""
+    index = default_index()
+    technical = index.top_skills(job_description, "technical", TOP_TECHNICAL_SKILLS)
+    behavioral = index.top_skills(job_description, "behavioral", TOP_BEHAVIORAL_TRAITS)
+    if len(technical) < TOP_TECHNICAL_SKILLS or len(behavioral) < TOP_BEHAVIORAL_TRAITS:
+        return None
+    return json.dumps({"technical_skills": technical, "behavioral_traits": behavioral})
+
+def open_question_bank():
+    """Opens the persistent question bank; generation continues without it if it is disabled or unavailable."""
+    if not QUESTION_BANK_ENABLED:
+        return None
+    try:
+        return QuestionBank()
+    except Exception as e:
+        print(f"Warning: question bank unavailable: {e}", file=sys.stderr)
+        return None
+
+@profiling.profiled_main("interview")
 def main():
     # Read JD from Stdin (passed by Java)
     try:
@@ -87,30 +144,69 @@ def main():
     except Exception:
         sys.exit(1)
 
-    if not API_KEY:
+    if not model_client.is_configured():
         print("Error: GOOGLE_API_KEY not found.", file=sys.stderr)
         sys.exit(1)
 
+    # --- QUESTION BANK: near-identical postings are served without any model call ---
+    bank = open_question_bank()
+    if bank:
+        try:
+            with profiling.span("question_bank_lookup"):
+                banked = bank.lookup(job_description)
+            if banked is not None:
+                print(json.dumps(banked))
+                return
+        except Exception as e:
+            print(f"Warning: question bank lookup failed: {e}", file=sys.stderr)
+
     # --- CHAIN PROMPTING START ---
     
-    # STEP 1: Deep Analysis
+    # STEP 1: Deep Analysis (locally from the skill taxonomy when it is confident)
     try:
-        p1 = PROMPT_STEP_1.format(job_description=job_description)
-        analysis_raw = call_gemini(p1)
-        analysis_json = clean_json(analysis_raw)
+        analysis_json = analyze_locally(job_description) if SKILL_EXTRACTION_MODE == "local" else None
+        if analysis_json is None:
+            p1 = PROMPT_STEP_1.format(job_description=jd_preprocess.for_prompt(job_description))
+            analysis_raw = call_gemini(p1, "jd_analysis")
+            analysis_json = clean_json(analysis_raw)
     except Exception as e:
         print(f"Error in Step 1: {e}", file=sys.stderr)
         print("[]") # Return empty JSON to avoid crashing Java
         sys.exit(1)
 
-    # STEP 2: Question Generation
+    # STEP 2: Question Generation (only the categories the bank cannot supply)
     try:
-        p2 = PROMPT_STEP_2.format(analysis_json=analysis_json)
-        questions_raw = call_gemini(p2)
-        questions_json = clean_json(questions_raw)
-        
+        reused, missing = {}, list(CATEGORY_COUNTS)
+        if bank:
+            try:
+                with profiling.span("question_bank_reuse"):
+                    reused, missing = bank.reusable(job_description, analysis_json)
+            except Exception as e:
+                print(f"Warning: question bank lookup failed: {e}", file=sys.stderr)
+
+        if not missing:
+            generated = []
+        elif reused:
+            category_list = "\n".join(f"- {CATEGORY_COUNTS[c]} \"{c}\" questions" for c in missing)
+            p2 = PROMPT_STEP_2_TOPUP.format(analysis_json=analysis_json, category_list=category_list)
+            generated = question_list(json.loads(clean_json(call_gemini(p2, "questions_topup"))))
+        else:
+            p2 = PROMPT_STEP_2.format(analysis_json=analysis_json)
+            generated = question_list(json.loads(clean_json(call_gemini(p2, "questions"))))
+
+        # Keep the PROMPT_STEP_2 order: introduction, technical, behavioral
+        combined = [q for c in CATEGORY_COUNTS for q in reused.get(c, [])] + generated
+        questions = [q for c in CATEGORY_COUNTS for q in combined if q.get("category") == c] + \
+                    [q for q in combined if q.get("category") not in CATEGORY_COUNTS]
+
+        if bank and missing:
+            try:
+                bank.store(job_description, analysis_json, questions)
+            except Exception as e:
+                print(f"Warning: could not store questions in the bank: {e}", file=sys.stderr)
+
         # Output strictly JSON to Java (Standard Output)
-        print(questions_json) 
+        print(json.dumps(questions))
     except Exception as e:
         print(f"Error in Step 2: {e}", file=sys.stderr)
         print("[]")
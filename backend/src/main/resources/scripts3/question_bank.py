@@ -0,0 +1,242 @@
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import argparse
+import tempfile
+import numpy as np
+
+# --- CONFIGURATION ---
+BANK_PATH = os.getenv("QUESTION_BANK_PATH", os.path.join(tempfile.gettempdir(), "career_catalyst_ai", "question_bank.sqlite3"))
+MAX_ENTRIES = int(os.getenv("QUESTION_BANK_MAX_ENTRIES", "500"))
+TTL_DAYS = float(os.getenv("QUESTION_BANK_TTL_DAYS", "30"))
+# Estimated Jaccard similarity of JD text at which the stored questions are served as they are
+SERVE_SIMILARITY = float(os.getenv("QUESTION_BANK_SERVE_SIMILARITY", "0.8"))
+# Below the serve threshold, categories whose skills/traits are unchanged are still reused from JDs at least this similar
+TOPUP_SIMILARITY = float(os.getenv("QUESTION_BANK_TOPUP_SIMILARITY", "0.4"))
+
+# MinHash/LSH layout: BANDS * ROWS permutations; JDs sharing any band bucket become candidates
+BANDS = 16
+ROWS = 4
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 31) - 1
+
+# Question mix requested by PROMPT_STEP_2, used to size top-up requests
+CATEGORY_COUNTS = {"introduction": 2, "technical": 5, "behavioral": 3}
+
+_rng = np.random.RandomState(20240501)
+_PERM_A = _rng.randint(1, MERSENNE_PRIME, size=BANDS * ROWS).astype(np.uint64)
+_PERM_B = _rng.randint(0, MERSENNE_PRIME, size=BANDS * ROWS).astype(np.uint64)
+
+# --- SIMILARITY HELPERS ---
+
+def shingles(text):
+    """Word 3-grams of the lowercased JD, hashed to 31-bit integers (stable across processes)."""
+    words = re.findall(r"[a-z0-9+#]+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = {" ".join(words)} if words else set()
+    else:
+        grams = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.array(sorted(zlib.crc32(g.encode("utf-8")) & MERSENNE_PRIME for g in grams), dtype=np.uint64)
+
+def minhash(text):
+    """MinHash signature: for every permutation, the minimum permuted shingle hash."""
+    hashes = shingles(text)
+    if not len(hashes):
+        return np.full(BANDS * ROWS, MERSENNE_PRIME, dtype=np.uint64)
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+def band_buckets(signature):
+    """One bucket key per band of ROWS signature values."""
+    return [f"{band}:" + ",".join(str(v) for v in signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: the share of permutations where the two minimums agree."""
+    return float((signature_a == signature_b).mean())
+
+def normalize_analysis(analysis_json):
+    """Reduces a Step 1 analysis to sorted technical-skill and behavioral-trait keys, whatever its exact JSON shape."""
+    try:
+        analysis = json.loads(analysis_json) if isinstance(analysis_json, str) else analysis_json
+    except (TypeError, ValueError):
+        return "", ""
+    technical, behavioral = set(), set()
+
+    def collect(value, target):
+        if isinstance(value, str):
+            target.add(re.sub(r"\s+", " ", value.strip().lower()))
+        elif isinstance(value, list):
+            for item in value:
+                collect(item, target)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                collect(item, behavioral if re.search(r"behav|trait|soft", key, re.I) else target)
+
+    if isinstance(analysis, dict):
+        for key, value in analysis.items():
+            collect(value, behavioral if re.search(r"behav|trait|soft", key, re.I) else technical)
+    return "|".join(sorted(technical)), "|".join(sorted(behavioral))
+
+def group_by_category(questions):
+    groups = {}
+    for item in questions:
+        category = str(item.get("category", "")).lower() if isinstance(item, dict) else ""
+        groups.setdefault(category if category in CATEGORY_COUNTS else "", []).append(item)
+    return groups
+
+# --- QUESTION BANK ---
+
+class QuestionBank:
+    """Persistent store of generated questions, indexed by analysed skills/traits and by MinHash/LSH over the JD text."""
+
+    def __init__(self, path=BANK_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                technical_key TEXT NOT NULL,
+                behavioral_key TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                questions TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS lsh (bucket TEXT NOT NULL, entry_id INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS lsh_bucket ON lsh (bucket);
+            CREATE INDEX IF NOT EXISTS entries_technical ON entries (technical_key);
+            CREATE INDEX IF NOT EXISTS entries_behavioral ON entries (behavioral_key);
+            CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    def _count(self, name):
+        with self.db:
+            self.db.execute("INSERT INTO stats (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+
+    def _candidates(self, signature, technical_key=None, behavioral_key=None):
+        """Entries sharing an LSH bucket with the signature (or the same skills key), with their similarity."""
+        buckets = band_buckets(signature)
+        rows = self.db.execute(
+            f"SELECT DISTINCT e.id, e.technical_key, e.behavioral_key, e.signature, e.questions FROM entries e "
+            f"JOIN lsh l ON l.entry_id = e.id WHERE l.bucket IN ({','.join('?' * len(buckets))}) AND e.created_at >= ?",
+            buckets + [time.time() - TTL_DAYS * 86400]
+        ).fetchall()
+        if technical_key is not None:
+            rows += self.db.execute(
+                "SELECT id, technical_key, behavioral_key, signature, questions FROM entries "
+                "WHERE (technical_key = ? OR behavioral_key = ?) AND created_at >= ?",
+                (technical_key, behavioral_key, time.time() - TTL_DAYS * 86400)
+            ).fetchall()
+        candidates = {}
+        for entry_id, technical, behavioral, blob, questions in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint64))
+            candidates[entry_id] = (score, technical, behavioral, json.loads(questions))
+        return sorted(((v[0], k) + v[1:] for k, v in candidates.items()), key=lambda c: c[0], reverse=True)
+
+    def _touch(self, entry_id):
+        with self.db:
+            self.db.execute("UPDATE entries SET last_used_at = ?, hits = hits + 1 WHERE id = ?", (time.time(), entry_id))
+
+    def lookup(self, job_description):
+        """Questions for a near-duplicate JD (similarity >= SERVE_SIMILARITY), served without any model call."""
+        self._count("lookups")
+        candidates = self._candidates(minhash(job_description))
+        if candidates and candidates[0][0] >= SERVE_SIMILARITY:
+            score, entry_id, _, _, questions = candidates[0]
+            self._touch(entry_id)
+            self._count("hits")
+            return questions
+        return None
+
+    def reusable(self, job_description, analysis_json):
+        """Reusable questions by category for this analysed JD, plus the categories that still need generating."""
+        technical_key, behavioral_key = normalize_analysis(analysis_json)
+        signature = minhash(job_description)
+        reused = {}
+        for score, entry_id, technical, behavioral, questions in self._candidates(signature, technical_key, behavioral_key):
+            groups = group_by_category(questions)
+            usable = {
+                "introduction": score >= TOPUP_SIMILARITY,
+                "technical": technical == technical_key and bool(technical_key),
+                "behavioral": behavioral == behavioral_key and bool(behavioral_key),
+            }
+            taken = False
+            for category, ok in usable.items():
+                if ok and category not in reused and groups.get(category):
+                    reused[category] = groups[category]
+                    taken = True
+            if taken:
+                self._touch(entry_id)
+        missing = [c for c in CATEGORY_COUNTS if c not in reused]
+        self._count("misses" if len(missing) == len(CATEGORY_COUNTS) else "full_hits" if not missing else "topups")
+        return reused, missing
+
+    def store(self, job_description, analysis_json, questions):
+        """Saves a generated question set and evicts expired or least recently used entries beyond MAX_ENTRIES."""
+        technical_key, behavioral_key = normalize_analysis(analysis_json)
+        signature = minhash(job_description)
+        now = time.time()
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO entries (technical_key, behavioral_key, signature, questions, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (technical_key, behavioral_key, signature.tobytes(), json.dumps(questions), now, now)
+            )
+            self.db.executemany("INSERT INTO lsh (bucket, entry_id) VALUES (?, ?)",
+                                [(bucket, cursor.lastrowid) for bucket in band_buckets(signature)])
+            self.evict()
+
+    def evict(self):
+        stale = [row[0] for row in self.db.execute(
+            "SELECT id FROM entries WHERE created_at < ? UNION "
+            "SELECT id FROM (SELECT id FROM entries ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+            (time.time() - TTL_DAYS * 86400, MAX_ENTRIES)
+        )]
+        if stale:
+            marks = ",".join("?" * len(stale))
+            self.db.execute(f"DELETE FROM lsh WHERE entry_id IN ({marks})", stale)
+            self.db.execute(f"DELETE FROM entries WHERE id IN ({marks})", stale)
+            self.db.execute("INSERT INTO stats (name, value) VALUES ('evictions', ?) "
+                            "ON CONFLICT(name) DO UPDATE SET value = value + ?", (len(stale), len(stale)))
+
+    def stats(self):
+        counters = dict(self.db.execute("SELECT name, value FROM stats"))
+        lookups = counters.get("lookups", 0)
+        served = counters.get("hits", 0) + counters.get("full_hits", 0)
+        return {
+            "entries": self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            "lookups": lookups,
+            "near_duplicate_hits": counters.get("hits", 0),
+            "skill_key_hits": counters.get("full_hits", 0),
+            "topups": counters.get("topups", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(served / lookups, 3) if lookups else None,
+            "topup_rate": round(counters.get("topups", 0) / lookups, 3) if lookups else None,
+            "config": {"max_entries": MAX_ENTRIES, "ttl_days": TTL_DAYS,
+                       "serve_similarity": SERVE_SIMILARITY, "topup_similarity": TOPUP_SIMILARITY},
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspects the interview question bank.")
+    parser.add_argument("--stats", action="store_true", help="Print entry count, hit rates and configuration")
+    parser.add_argument("--clear", action="store_true", help="Delete every stored question set")
+    args = parser.parse_args()
+
+    bank = QuestionBank()
+    if args.clear:
+        with bank.db:
+            bank.db.execute("DELETE FROM lsh")
+            bank.db.execute("DELETE FROM entries")
+            bank.db.execute("DELETE FROM stats")
+    print(json.dumps(bank.stats(), indent=2))
+    bank.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import axios from 'axios';
 import { saveAs } from 'file-saver'; // Make sure to install this: npm install file-saver
 import Navbar from '../components/Navbar';
@@ -8,6 +8,16 @@ import './AiTailorPage.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8080';
 
+const newSessionId = () => (window.crypto?.randomUUID ? window.crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+
+// An edit of the previous resume rather than a different one: most of its lines are still there
+const isSameResume = (previous: string, current: string) => {
+    const lines = previous.split('\n').map(line => line.trim()).filter(Boolean);
+    if (lines.length === 0) return false;
+    const kept = new Set(current.split('\n').map(line => line.trim()));
+    return lines.filter(line => kept.has(line)).length * 2 >= lines.length;
+};
+
 const AiTailorPage: React.FC = () => {
     const [resumeText, setResumeText] = useState('');
     const [jobDescription, setJobDescription] = useState('');
@@ -16,6 +26,25 @@ const AiTailorPage: React.FC = () => {
     const [error, setError] = useState('');
     const [copyButtonText, setCopyButtonText] = useState('Copy');
 
+    const [jdHandle, setJdHandle] = useState('');
+    // One tailor session per resume: re-running after editing a few bullets only re-tailors those bullets.
+    // The first run of a resume takes the full pipeline (with its review step); the session is only sent when
+    // re-running an edited version of the resume tailored last.
+    const [sessionId, setSessionId] = useState(newSessionId);
+    const [lastTailoredResume, setLastTailoredResume] = useState('');
+
+    // Start the JD analysis while the resume is still being pasted; the handle lets the request reuse it
+    useEffect(() => {
+        setJdHandle('');
+        if (jobDescription.trim().length < 100) return;
+        const timer = setTimeout(() => {
+            axios.post(`${API_BASE_URL}/api/v1/jd/prefetch`, { jobDescription, pipelines: ['tailor'] })
+                .then(response => setJdHandle(response.data.handle || ''))
+                .catch(err => console.warn("JD prefetch failed:", err));
+        }, 1500);
+        return () => clearTimeout(timer);
+    }, [jobDescription]);
+
     const handleTailorResume = async () => {
         if (!resumeText || !jobDescription) {
             setError('Please provide both your resume and the job description.');
@@ -27,9 +56,13 @@ const AiTailorPage: React.FC = () => {
         setCopyButtonText('Copy');
 
         try {
-            const payload = { resumeText, jobDescription };
+            const rerun = isSameResume(lastTailoredResume, resumeText);
+            const id = rerun ? sessionId : newSessionId();
+            const payload = { resumeText, jobDescription, jdHandle, ...(rerun ? { sessionId } : {}) };
             const response = await axios.post(`${API_BASE_URL}/api/v1/tailor`, payload);
             setTailoredResume(response.data.tailoredResume);
+            setSessionId(id);
+            setLastTailoredResume(resumeText);
         } catch (err) {
             console.error("Error tailoring resume:", err);
             setError('Failed to get AI suggestions. The service may be down.');
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import axios from 'axios';
 import { saveAs } from 'file-saver';
 import Navbar from '../components/Navbar';       // Assuming you have these components
@@ -17,6 +17,20 @@ const AtsEvaluatorPage: React.FC = () => {
     const [error, setError] = useState('');
     const [copyButtonText, setCopyButtonText] = useState('Copy');
 
+    const [jdHandle, setJdHandle] = useState('');
+
+    // Start the JD analysis while the resume is still being pasted; the handle lets the request reuse it
+    useEffect(() => {
+        setJdHandle('');
+        if (jobDescription.trim().length < 100) return;
+        const timer = setTimeout(() => {
+            axios.post(`${API_BASE_URL}/api/v1/jd/prefetch`, { jobDescription, pipelines: ['evaluate'] })
+                .then(response => setJdHandle(response.data.handle || ''))
+                .catch(err => console.warn("JD prefetch failed:", err));
+        }, 1500);
+        return () => clearTimeout(timer);
+    }, [jobDescription]);
+
     // Adapted handler function
     const handleEvaluateResume = async () => {
         if (!resumeText || !jobDescription) {
@@ -30,7 +44,7 @@ const AtsEvaluatorPage: React.FC = () => {
 
         try {
             // NOTE: The payload keys `resume` and `jobDescription` must match your Spring Boot DTO
-            const payload = { resume: resumeText, jobDescription: jobDescription };
+            const payload = { resume: resumeText, jobDescription: jobDescription, jdHandle: jdHandle };
             // NOTE: Using the correct API endpoint for the evaluator
             const response = await axios.post(`${API_BASE_URL}/api/v1/evaluate-resume`, payload);
             // NOTE: Using the correct response key `evaluation` from your backend